@@ -0,0 +1,227 @@
+"""
+Benchmarks for the detection, aggregation and fan-out hot paths.
+
+Each case is a setup function taking one size parameter and returning the
+callable to time; setup cost is never measured.
+"""
+from types import SimpleNamespace
+from typing import Callable, Dict, List
+
+from benchmarks.fixtures import (make_orders, make_ui_orders, make_scrip_master, BookClient, MockFollower)
+
+
+BENCHMARKS: Dict[str, Dict] = {}
+
+
+def benchmark(name: str, params: List[int], quick: List[int] = None):
+    """
+    Register a benchmark.
+
+    Args:
+        name: Benchmark name (cases are reported as name[param])
+        params: Sizes to run
+        quick: Sizes for --quick runs (default: params)
+    """
+    def register(setup: Callable[[int], Callable[[], object]]):
+        BENCHMARKS[name] = {'setup': setup, 'params': params, 'quick': quick or params}
+        return setup
+    return register
+
+
+@benchmark('filter_and_aggregate_orders', [100, 1000, 10000, 100000], quick=[100, 1000, 10000])
+def bench_aggregate(size: int):
+    """Aggregate a day's order book by symbol and side."""
+    from order_utils import filter_and_aggregate_orders
+
+    orders = make_orders(size)
+    return lambda: filter_and_aggregate_orders(orders)
+
+
+@benchmark('aggregate_snapshot', [100, 1000, 10000, 100000], quick=[100, 1000, 10000])
+def bench_aggregate_snapshot(size: int):
+    """Aggregate an already-parsed OrderBookSnapshot (shared with the poll that built it)."""
+    from order_utils import filter_and_aggregate_orders
+    from order_snapshot import OrderBookSnapshot
+
+    snapshot = OrderBookSnapshot.from_orders(make_orders(size))
+    return lambda: filter_and_aggregate_orders(snapshot)
+
+
+@benchmark('aggregate_by_contract', [100, 1000, 10000, 100000], quick=[100, 1000, 10000])
+def bench_aggregate_by_contract(size: int):
+    """Aggregate a day's order book by underlying, expiry and strike."""
+    from order_utils import aggregate_by_contract
+
+    orders = make_orders(size)
+    return lambda: aggregate_by_contract(orders, level='strike')
+
+
+@benchmark('running_aggregates_poll', [100, 1000, 10000, 100000], quick=[100, 1000, 10000])
+def bench_running_aggregates_poll(size: int):
+    """Fold a poll with one modified order into RunningAggregates and read the view."""
+    from order_utils import RunningAggregates
+
+    orders = make_orders(size)
+    aggregates = RunningAggregates()
+    aggregates.update(orders)
+    live = next(order for order in orders if order['status'] == 'open')
+    prices = iter(range(10 ** 9))
+
+    def poll():
+        live['price'] = str(100 + next(prices) % 50)
+        aggregates.update(orders)
+        return aggregates.rows()
+    return poll
+
+
+@benchmark('trade_history_query', [1000, 10000, 100000], quick=[1000, 10000])
+def bench_trade_history_query(size: int):
+    """One symbol's trades over a week out of 20 stored trading days."""
+    from datetime import date, timedelta
+    from trade_history import TradeHistoryStore
+
+    store = TradeHistoryStore(':memory:')
+    orders = make_orders(size)
+    days = 20
+    for day in range(days):
+        store.record(orders[day::days], 'A1', date(2025, 10, 1) + timedelta(days=day))
+    symbol = orders[0]['tradingsymbol']
+    return lambda: store.trades(date(2025, 10, 6), date(2025, 10, 12), symbol=symbol)
+
+
+@benchmark('smart_polling_scan', [100, 1000, 10000], quick=[100, 1000])
+def bench_smart_polling_scan(size: int):
+    """SmartPollingMonitor poll of an unchanged book (the common case)."""
+    from smart_polling import SmartPollingMonitor
+    from session_recorder import UnlimitedGovernor
+
+    monitor = SmartPollingMonitor(BookClient(make_orders(size)), governor=UnlimitedGovernor())
+    return monitor.check_for_new_orders
+
+
+@benchmark('polling_monitor_scan', [100, 1000, 10000], quick=[100, 1000])
+def bench_polling_monitor_scan(size: int):
+    """PollingOrderMonitor poll of an unchanged book."""
+    from polling_monitor import PollingOrderMonitor
+    from session_recorder import UnlimitedGovernor
+
+    monitor = PollingOrderMonitor(BookClient(make_orders(size)), governor=UnlimitedGovernor())
+    return monitor.check_for_new_orders
+
+
+@benchmark('copy_trader_scan', [100, 1000, 10000], quick=[100, 1000])
+def bench_copy_trader_scan(size: int):
+    """MultiAccountCopyTrader poll of an unchanged master book."""
+    trader = _make_trader(BookClient(make_orders(size)), followers=[])
+    return trader.check_for_new_orders
+
+
+@benchmark('record_copy', [1000, 100000], quick=[1000])
+def bench_record_copy(size: int):
+    """OrderTracker.record_copy with `size` records already held."""
+    tracker = _filled_tracker(size)
+    order = make_orders(1)[0]
+    response = {'status': True, 'data': {'orderid': 'F1'}}
+
+    def run():
+        tracker.record_copy(order, 'Follower 1', True, response)
+        tracker.copy_records.pop()  # Keep the record count at `size`
+    return run
+
+
+@benchmark('tracker_statistics', [1000, 100000], quick=[1000])
+def bench_tracker_statistics(size: int):
+    """OrderTracker.get_statistics over `size` copy records."""
+    return _filled_tracker(size).get_statistics
+
+
+@benchmark('should_copy_order', [1, 100])
+def bench_should_copy_order(size: int):
+    """CopyTradingSettings.should_copy_order with `size` allowed and blocked symbols."""
+    from multi_account_copy_trader import CopyTradingSettings
+
+    orders = make_orders(1000)
+    symbols = sorted({o['tradingsymbol'] for o in orders})
+    settings = CopyTradingSettings()
+    settings.copy_all_orders = False
+    settings.allowed_symbols = symbols[:size]
+    settings.blocked_symbols = symbols[-size:]
+
+    def run():
+        for order in orders:
+            settings.should_copy_order(order)
+    return run
+
+
+@benchmark('api_orders_all_json', [100, 1000, 10000], quick=[100, 1000])
+def bench_api_orders_all(size: int):
+    """Serve /api/orders/all with `size` orders through Flask."""
+    import web_ui
+
+    orders = make_ui_orders(size)
+    client = web_ui.app.test_client()
+
+    def run():
+        web_ui.all_orders = orders
+        return client.get('/api/orders/all').data
+    return run
+
+
+@benchmark('copy_fan_out', [1, 10, 50, 200], quick=[1, 10, 50])
+def bench_copy_fan_out(size: int):
+    """copy_order_to_followers for one master order to `size` mock followers."""
+    followers = [MockFollower(f"Follower {i}") for i in range(size)]
+    trader = _make_trader(BookClient([]), followers)
+    order = make_orders(1)[0]
+
+    def run():
+        trader.copy_order_to_followers(order)
+        trader.tracker.copy_records.clear()
+    return run
+
+
+@benchmark('instrument_lookup', [1000, 100000], quick=[1000, 100000])
+def bench_instrument_lookup(size: int):
+    """1000 lot-size lookups by token in a memory-mapped index of `size` instruments."""
+    import atexit
+    import os
+    import tempfile
+    from instrument_master import InstrumentMaster, build_index
+
+    fd, path = tempfile.mkstemp(suffix='.bin')
+    os.close(fd)
+    atexit.register(os.remove, path)
+    build_index(make_scrip_master(size), path, freeze_limits={})
+    master = InstrumentMaster(path, url='unused')
+    tokens = [str(40000 + i * size // 1000) for i in range(1000)]
+
+    def run():
+        for token in tokens:
+            master.by_token(token)
+    return run
+
+
+def _make_trader(master: BookClient, followers: List):
+    """Build a copy trader around stand-in clients (no logins)."""
+    from multi_account_copy_trader import MultiAccountCopyTrader, CopyTradingSettings
+
+    settings = CopyTradingSettings()
+    settings.decouple_placement = False
+    master.account = SimpleNamespace(name='Master', client_id=master.client_id)
+    client_manager = SimpleNamespace(master_client=master, follower_clients=followers,
+                                     get_all_active_followers=lambda: followers)
+    config = SimpleNamespace(master_account=master.account, follower_accounts=[])
+    return MultiAccountCopyTrader(config, settings, client_manager=client_manager)
+
+
+def _filled_tracker(size: int):
+    """OrderTracker holding `size` copy records (1 in 20 failed)."""
+    from multi_account_copy_trader import OrderTracker
+
+    tracker = OrderTracker()
+    for i, order in enumerate(make_orders(min(size, 1000)) * (size // min(size, 1000))):
+        success = i % 20 != 0
+        tracker.record_copy(order, f"Follower {i % 10}", success,
+                            {'data': {'orderid': str(i)}} if success else None,
+                            None if success else 'Rejected')
+    return tracker
@@ -0,0 +1,159 @@
+"""
+Synthetic trading-day data for the benchmarks.
+Deterministic (seeded) so every run measures the same work.
+"""
+import random
+from datetime import datetime
+from typing import Dict, List
+
+
+UNDERLYINGS = [('NIFTY', 25000, 50, 75), ('BANKNIFTY', 56000, 100, 35),
+               ('FINNIFTY', 26500, 50, 65), ('SENSEX', 82000, 100, 20)]
+EXPIRIES = ['28OCT25', '04NOV25', '25NOV25']
+STATUSES = ['complete'] * 7 + ['open', 'rejected', 'cancelled']
+
+
+def make_orders(count: int, seed: int = 7) -> List[Dict]:
+    """
+    Build a master order book with realistic option orders.
+
+    Args:
+        count: Number of orders
+        seed: Random seed
+
+    Returns:
+        Order dictionaries shaped like the orderBook API response
+    """
+    rng = random.Random(seed)
+    orders = []
+    for i in range(count):
+        underlying, spot, step, lot = rng.choice(UNDERLYINGS)
+        strike = spot + step * rng.randint(-20, 20)
+        option = rng.choice(['CE', 'PE'])
+        if rng.random() < 0.05:
+            symbol = f"{underlying}-EQ"  # A few non-option orders
+        else:
+            symbol = f"{underlying}{rng.choice(EXPIRIES)}{strike}{option}"
+        status = rng.choice(STATUSES)
+        quantity = lot * rng.randint(1, 10)
+        price = round(rng.uniform(5, 500), 2)
+        orders.append({
+            'orderid': f"2510{i:08d}",
+            'tradingsymbol': symbol,
+            'symboltoken': str(40000 + i % 5000),
+            'transactiontype': rng.choice(['BUY', 'SELL']),
+            'exchange': 'NFO',
+            'ordertype': rng.choice(['MARKET', 'LIMIT']),
+            'producttype': 'CARRYFORWARD',
+            'variety': 'NORMAL',
+            'duration': 'DAY',
+            'status': status,
+            'orderstatus': status,
+            'quantity': str(quantity),
+            'filledshares': str(quantity if status == 'complete' else 0),
+            'price': str(price),
+            'averageprice': str(price if status == 'complete' else 0),
+            'triggerprice': '0',
+            'updatetime': f"27-Oct-2025 {9 + i % 6:02d}:{i % 60:02d}:{(i * 7) % 60:02d}",
+        })
+    return orders
+
+
+def make_scrip_master(count: int) -> List[Dict]:
+    """
+    Build scrip-master rows for option contracts.
+
+    Args:
+        count: Number of instruments
+
+    Returns:
+        Dictionaries shaped like the broker's scrip-master JSON
+    """
+    rows = []
+    for i in range(count):
+        underlying, spot, step, lot = UNDERLYINGS[i % len(UNDERLYINGS)]
+        expiry = EXPIRIES[(i // len(UNDERLYINGS)) % len(EXPIRIES)]
+        strike = spot + step * (i // (len(UNDERLYINGS) * len(EXPIRIES) * 2))
+        option = 'CE' if i % 2 == 0 else 'PE'
+        rows.append({
+            'token': str(40000 + i),
+            'symbol': f"{underlying}{expiry}{strike}{option}",
+            'name': underlying,
+            'expiry': f"{expiry[:5]}20{expiry[5:]}",
+            'strike': f"{strike * 100:.6f}",
+            'lotsize': str(lot),
+            'instrumenttype': 'OPTIDX',
+            'exch_seg': 'BFO' if underlying == 'SENSEX' else 'NFO',
+            'tick_size': '5.000000',
+        })
+    return rows
+
+
+def make_ui_orders(count: int, seed: int = 7) -> List[Dict]:
+    """Orders as the web UI stores them for /api/orders/all."""
+    now = datetime(2025, 10, 27, 10, 15).strftime('%Y-%m-%d %H:%M:%S')
+    return [{
+        'order_id': order['orderid'],
+        'symbol': order['tradingsymbol'],
+        'transaction_type': order['transactiontype'],
+        'order_type': order['ordertype'],
+        'quantity': order['quantity'],
+        'price': order['price'],
+        'status': order['status'],
+        'time': now,
+        'exchange': order['exchange'],
+        'product_type': order['producttype'],
+        'filled_quantity': order['filledshares'],
+        'average_price': order['averageprice'],
+    } for order in make_orders(count, seed)]
+
+
+class BookClient:
+    """Client stand-in that serves the same order book on every call."""
+
+    def __init__(self, orders: List[Dict], client_id: str = 'BENCH'):
+        """
+        Initialize client.
+
+        Args:
+            orders: Order book to serve
+            client_id: Account ID reported to the rate governor
+        """
+        self.client_id = client_id
+        self.response = {'status': True, 'message': 'SUCCESS', 'data': orders}
+
+    def get_order_book(self, deadline: float = None, hedge: bool = False):
+        """Return the order book."""
+        return self.response
+
+
+class FollowerAccount:
+    """Account details for a mock follower."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.client_id = name
+
+
+class MockFollower:
+    """
+    Follower client stand-in whose place_order succeeds immediately.
+
+    Deliberately not unittest.mock.Mock, whose own overhead would dominate.
+    """
+
+    def __init__(self, name: str):
+        """
+        Initialize follower.
+
+        Args:
+            name: Account name
+        """
+        self.account = FollowerAccount(name)
+        self.orders = 0
+
+    def place_order(self, order_params: Dict) -> Dict:
+        """Accept the order."""
+        self.orders += 1
+        return {'status': True, 'message': 'SUCCESS',
+                'data': {'orderid': f"{self.account.name}-{self.orders}"}}
@@ -2,6 +2,7 @@
 Configuration module for SmartAPI credentials and settings.
 """
 import os
+from datetime import timedelta, timezone
 
 # Try to load environment variables from .env file (for local development)
 # In production, environment variables should be set directly in the deployment platform
@@ -12,6 +13,9 @@ except ImportError:
     # python-dotenv not available (this is fine in production)
     pass
 
+# Exchange and broker times are IST (no DST)
+IST = timezone(timedelta(hours=5, minutes=30), 'IST')
+
 
 class Config:
     """Configuration class for application settings."""
@@ -26,6 +30,35 @@ class Config:
     # Polling settings
     POLL_INTERVAL_SECONDS = 120  # 2 minutes
     
+    # REST API root (set to a local smartapi_simulator.py URL for offline load tests)
+    SMARTAPI_ROOT_URL = os.getenv('SMARTAPI_ROOT_URL') or None
+    
+    # Session recording (every order book / trade book response, for replay with session_recorder.py)
+    RECORD_SESSION_PATH = os.getenv('RECORD_SESSION_PATH') or None
+    
+    # Order update stream (push-based order status)
+    ORDER_FEED_URL = os.getenv('ORDER_FEED_URL', 'wss://tns.angelone.in/smart-order-update')
+    
+    # Logging (queued and written off the hot path; 'json' for log collectors)
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'text')
+    
+    # Trading calendar (holidays and special sessions; default: nse_holidays.json)
+    MARKET_CALENDAR_PATH = os.getenv('MARKET_CALENDAR_PATH') or None
+    
+    # Instrument master (lot / tick / freeze sizes; index rebuilt daily from the scrip master)
+    INSTRUMENT_MASTER_URL = os.getenv(
+        'INSTRUMENT_MASTER_URL',
+        'https://margincalculator.angelbroking.com/OpenAPI_File/files/OpenAPIScripMaster.json')
+    INSTRUMENT_INDEX_PATH = os.getenv('INSTRUMENT_INDEX_PATH', '.instrument_index.bin')
+    
+    # Trade history (daily trade book snapshots, queried by date / symbol / account)
+    TRADE_HISTORY_PATH = os.getenv('TRADE_HISTORY_PATH', '.trade_history.db')
+    
+    # Session cache (reuse logins across restarts and processes)
+    USE_SESSION_CACHE = os.getenv('USE_SESSION_CACHE', 'true').lower() != 'false'
+    SESSION_CACHE_PATH = os.getenv('SESSION_CACHE_PATH', '.session_cache.json')
+    
     @classmethod
     def validate(cls):
         """Validate that all required configuration is present."""
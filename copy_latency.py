@@ -0,0 +1,177 @@
+"""
+End-to-end copy latency tracing.
+Timestamps each stage from the master's fill to every follower's order
+acknowledgement, so slow copies can be traced to the stage that cost the time.
+
+Stages (all Unix timestamps):
+    exchange  - master order time reported by the broker (exchorderupdatetime / updatetime, IST)
+    detected  - order book response or stream update that showed the completion
+    decided   - should_copy_order() finished (includes time queued for placement)
+    built     - follower order parameters ready
+    sent      - follower place_order() called
+    acked     - placeOrder response received (send_to_ack includes any
+                placement limiter wait; see PlacementLimiter statistics)
+"""
+import time
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
+from config import IST  # Broker times are IST
+
+
+BROKER_TIME_FORMATS = ('%d-%b-%Y %H:%M:%S', '%Y-%m-%d %H:%M:%S', '%d-%m-%Y %H:%M:%S')
+MONTHS = {name: number for number, name in enumerate(
+    ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'), start=1)}
+
+# (name, from stage, to stage) for each reported interval
+INTERVALS = (
+    ('fill_to_detect', 'exchange', 'detected'),
+    ('detect_to_decide', 'detected', 'decided'),
+    ('decide_to_build', 'decided', 'built'),
+    ('build_to_send', 'built', 'sent'),
+    ('send_to_ack', 'sent', 'acked'),
+    ('detect_to_ack', 'detected', 'acked'),
+    ('fill_to_ack', 'exchange', 'acked'),
+)
+
+
+@lru_cache(maxsize=4096)
+def parse_broker_time(value) -> Optional[float]:
+    """
+    Parse a broker timestamp ('27-Oct-2025 10:15:32', IST) to Unix time.
+
+    Args:
+        value: Timestamp string from the order book or order update
+
+    Returns:
+        Unix timestamp, or None if missing or unparseable
+    """
+    if not value or not isinstance(value, str):
+        return None
+    value = value.strip()
+    # Fast path for the usual 'DD-Mon-YYYY HH:MM:SS' (strptime is ~10x slower)
+    if len(value) == 20 and value[2] == '-' and value[6] == '-' and value[11] == ' ':
+        try:
+            return datetime(int(value[7:11]), MONTHS[value[3:6]], int(value[0:2]),
+                            int(value[12:14]), int(value[15:17]), int(value[18:20]),
+                            tzinfo=IST).timestamp()
+        except (KeyError, ValueError):
+            pass
+    for fmt in BROKER_TIME_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).replace(tzinfo=IST).timestamp()
+        except ValueError:
+            continue
+    return None
+
+
+def master_order_time(order: Dict) -> Optional[str]:
+    """
+    Master order time as reported by the broker (unparsed).
+
+    The exchange's update time is preferred over the broker's. Both have
+    one-second resolution, so fill_to_detect carries up to 1s of rounding.
+    """
+    for field in ('exchorderupdatetime', 'exchtime', 'updatetime'):
+        if order.get(field):
+            return order[field]
+    return None
+
+
+class CopyTrace:
+    """Stage timestamps for one master order, shared by all its follower copies."""
+
+    __slots__ = ('order_id', 'source', 'master_time', 'detected', 'decided')
+
+    def __init__(self, order: Dict, detected: float = None, source: str = None):
+        """
+        Initialize trace.
+
+        Args:
+            order: Master order
+            detected: When the completion was observed (default: now)
+            source: How it was detected ('poll', 'stream', 'reconcile')
+        """
+        self.order_id = order.get('orderid')
+        self.source = source
+        self.master_time = master_order_time(order)  # Parsed only when summarizing
+        self.detected = detected if detected is not None else time.time()
+        self.decided = None
+
+    def mark_decided(self):
+        """Record that the copy decision was made."""
+        self.decided = time.time()
+
+    def follower_timings(self, built: float = None, sent: float = None,
+                         acked: float = None) -> Dict:
+        """
+        Stage timestamps for one follower copy (kept cheap: this is on the copy path).
+
+        Args:
+            built: When order parameters were ready
+            sent: When place_order was called
+            acked: When place_order returned
+
+        Returns:
+            Dictionary of stage -> Unix timestamp, plus 'source' and the raw 'master_time'
+        """
+        return {'source': self.source, 'master_time': self.master_time,
+                'detected': self.detected, 'decided': self.decided,
+                'built': built, 'sent': sent, 'acked': acked}
+
+
+def intervals(timings: Dict) -> Dict[str, float]:
+    """
+    Interval durations for one follower copy.
+
+    Args:
+        timings: Stage timestamps from CopyTrace.follower_timings
+
+    Returns:
+        Dictionary of interval name -> milliseconds (only where both ends are known)
+    """
+    stages = dict(timings, exchange=parse_broker_time(timings.get('master_time')))
+    durations = {}
+    for name, start, end in INTERVALS:
+        if stages.get(start) is not None and stages.get(end) is not None:
+            durations[name] = (stages[end] - stages[start]) * 1000
+    return durations
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def summarize(records: Iterable[Dict]) -> Dict[str, Dict[str, Dict]]:
+    """
+    Summarize copy latencies per follower.
+
+    Args:
+        records: Copy records with a 'latency' entry (see OrderTracker.record_copy)
+
+    Returns:
+        {follower: {interval: {'count', 'p50_ms', 'p95_ms', 'p99_ms'}}}
+    """
+    samples: Dict[str, Dict[str, List[float]]] = {}
+    for record in records:
+        timings = record.get('latency')
+        if not timings:
+            continue
+        per_follower = samples.setdefault(record['follower'], {})
+        for name, value in intervals(timings).items():
+            per_follower.setdefault(name, []).append(value)
+
+    summary = {}
+    for follower, values_by_interval in samples.items():
+        summary[follower] = {}
+        for name, values in values_by_interval.items():
+            values.sort()
+            summary[follower][name] = {
+                'count': len(values),
+                'p50_ms': percentile(values, 0.50),
+                'p95_ms': percentile(values, 0.95),
+                'p99_ms': percentile(values, 0.99),
+            }
+    return summary
@@ -0,0 +1,160 @@
+"""
+Detect -> copy pipeline.
+Detection pushes master orders onto a bounded queue that a placement thread
+drains, so a slow placeOrder or a read timeout never delays the next poll.
+"""
+import queue
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+
+_STOP = object()  # Sentinel that tells the placement thread to exit
+
+
+class CopyPipeline:
+    """
+    Bounded hand-off between the detection loop and order placement.
+
+    A single placement thread keeps master orders in detection order (legs
+    of a spread are copied in the order they were placed). When the queue is
+    full new events are refused rather than blocking detection (the caller
+    gets False and must hand the order back for a later retry), and events
+    that waited longer than stale_after are counted (and optionally skipped).
+    """
+
+    def __init__(self, handler: Callable[[Dict], None], maxsize: int = 100,
+                 stale_after: float = 10.0, drop_stale: bool = False):
+        """
+        Initialize pipeline.
+
+        Args:
+            handler: Called on the placement thread with each master order
+            maxsize: Maximum events waiting for placement (default: 100)
+            stale_after: Seconds in the queue after which an event is stale (default: 10)
+            drop_stale: If True, stale events are skipped instead of copied late
+        """
+        self.handler = handler
+        self.maxsize = maxsize
+        self.stale_after = stale_after
+        self.drop_stale = drop_stale
+
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._thread: Optional[threading.Thread] = None
+        self._stats_lock = threading.Lock()
+
+        # Backpressure metrics
+        self.submitted = 0
+        self.processed = 0
+        self.dropped = 0
+        self.stale = 0
+        self.max_depth = 0
+        self._queue_times = deque(maxlen=500)  # Recent seconds spent queued
+
+    @property
+    def depth(self) -> int:
+        """Events currently waiting for placement."""
+        return self._queue.qsize()
+
+    def start(self):
+        """Start the placement thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="copy-placement", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 30.0):
+        """
+        Let the placement thread finish queued events, then stop it.
+
+        Args:
+            timeout: Seconds to wait for the queue to drain (default: 30)
+        """
+        if not self._thread:
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def submit(self, order: Dict, source: str = 'poll') -> bool:
+        """
+        Queue a master order for copying without blocking.
+
+        Args:
+            order: Master order dictionary
+            source: Where the order was detected ('poll', 'stream', 'reconcile')
+
+        Returns:
+            True if queued, False if the queue was full and the event was not taken
+        """
+        try:
+            self._queue.put_nowait((time.time(), order, source))
+        except queue.Full:
+            with self._stats_lock:
+                self.dropped += 1
+            print(f"[{datetime.now()}] ⚠️  Copy queue full ({self.maxsize}) - "
+                  f"order {order.get('orderid')} from {source} not queued")
+            return False
+
+        with self._stats_lock:
+            self.submitted += 1
+            self.max_depth = max(self.max_depth, self._queue.qsize())
+        return True
+
+    def _run(self):
+        """Placement loop: drain events until the stop sentinel."""
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+
+            enqueued_at, order, source = item
+            waited = time.time() - enqueued_at
+            is_stale = waited > self.stale_after
+
+            with self._stats_lock:
+                self._queue_times.append(waited)
+                if is_stale:
+                    self.stale += 1
+
+            if is_stale:
+                print(f"[{datetime.now()}] ⚠️  Order {order.get('orderid')} waited "
+                      f"{waited:.1f}s in the copy queue"
+                      + (" - skipped as stale" if self.drop_stale else ""))
+                if self.drop_stale:
+                    continue
+
+            try:
+                self.handler(order)
+            except Exception as e:
+                print(f"❌ Error copying order {order.get('orderid')}: {e}")
+            finally:
+                with self._stats_lock:
+                    self.processed += 1
+
+    def get_statistics(self) -> Dict:
+        """
+        Get backpressure metrics.
+
+        Returns:
+            Dictionary with counts, queue depth and queue times in milliseconds
+        """
+        with self._stats_lock:
+            times = sorted(self._queue_times)
+            count = len(times)
+            return {
+                'submitted': self.submitted,
+                'processed': self.processed,
+                'dropped': self.dropped,
+                'stale': self.stale,
+                'depth': self.depth,
+                'max_depth': self.max_depth,
+                'avg_queue_ms': sum(times) / count * 1000 if count else 0.0,
+                'p95_queue_ms': times[min(count - 1, int(count * 0.95))] * 1000 if count else 0.0,
+                'max_queue_ms': times[-1] * 1000 if count else 0.0,
+            }
@@ -2,38 +2,89 @@
 Display functions for formatting and printing order/trade information.
 """
 from datetime import datetime
+from structured_log import get_logger
+
+
+log = get_logger('orders')
+
+# Order block (like Angel One dashboard); formatted by the log writer, not the caller
+ORDER_TEMPLATE = (
+    f"{'='*100}\n"
+    "Order ID: {orderid}\n"
+    "Trading Symbol: {tradingsymbol}\n"
+    "Exchange: {exchange}\n"
+    "Product Type: {producttype}\n"
+    "Transaction Type: {transactiontype}\n"
+    "Order Type: {ordertype}\n"
+    "Status: {status}\n"
+    "Price: ₹{price}\n"
+    "Trigger Price: ₹{triggerprice}\n"
+    "Quantity: {quantity}\n"
+    "Filled Quantity: {filledshares}\n"
+    "Pending Quantity: {unfilledshares}\n"
+    "Average Price: ₹{averageprice}\n"
+    "Order Time: {ordertime}\n"
+    "Variety: {variety}\n"
+    "Duration: {duration}\n"
+    "{message}"
+    f"{'='*100}\n"
+)
+NEW_ORDER_BANNER = "\n" + "🔔 " * 30 + "\nNEW ORDER DETECTED AT {clock}\n" + "🔔 " * 30 + "\n\n"
+
+
+def order_fields(order):
+    """
+    Fields of an order for ORDER_TEMPLATE (cheap lookups only).
+    
+    Args:
+        order: Order dictionary from orderBook API
+        
+    Returns:
+        Dictionary of display fields
+    """
+    get = order.get
+    return {
+        'orderid': get('orderid', 'N/A'),
+        'tradingsymbol': get('tradingsymbol', 'N/A'),
+        'exchange': get('exchange', 'N/A'),
+        'producttype': get('producttype', 'N/A'),
+        'transactiontype': get('transactiontype', 'N/A'),
+        'ordertype': get('ordertype', 'N/A'),
+        'status': get('status', 'N/A'),
+        'price': get('price', 0),
+        'triggerprice': get('triggerprice', 0),
+        'quantity': get('quantity', 0),
+        'filledshares': get('filledshares', 0),
+        'unfilledshares': get('unfilledshares', 0),
+        'averageprice': get('averageprice', 0),
+        'ordertime': get('ordertagtime', 'N/A') or get('updatetime', 'N/A'),
+        'variety': get('variety', 'N/A'),
+        'duration': get('duration', 'N/A'),
+        # Rejection or cancellation reason, if any
+        'message': f"Message: {get('text')}\n" if get('text') else '',
+    }
 
 
 def display_option_order(order):
     """
     Display a single order in formatted output (like Angel One dashboard).
     
+    Written as one log record, so the caller never waits on the terminal.
+    
     Args:
         order: Order dictionary from orderBook API
     """
-    print(f"{'='*100}")
-    print(f"Order ID: {order.get('orderid', 'N/A')}")
-    print(f"Trading Symbol: {order.get('tradingsymbol', 'N/A')}")
-    print(f"Exchange: {order.get('exchange', 'N/A')}")
-    print(f"Product Type: {order.get('producttype', 'N/A')}")
-    print(f"Transaction Type: {order.get('transactiontype', 'N/A')}")
-    print(f"Order Type: {order.get('ordertype', 'N/A')}")
-    print(f"Status: {order.get('status', 'N/A')}")
-    print(f"Price: ₹{order.get('price', 0)}")
-    print(f"Trigger Price: ₹{order.get('triggerprice', 0)}")
-    print(f"Quantity: {order.get('quantity', 0)}")
-    print(f"Filled Quantity: {order.get('filledshares', 0)}")
-    print(f"Pending Quantity: {order.get('unfilledshares', 0)}")
-    print(f"Average Price: ₹{order.get('averageprice', 0)}")
-    print(f"Order Time: {order.get('ordertagtime', 'N/A') or order.get('updatetime', 'N/A')}")
-    print(f"Variety: {order.get('variety', 'N/A')}")
-    print(f"Duration: {order.get('duration', 'N/A')}")
-    
-    # Show any rejection or cancellation reason if available
-    if order.get('text'):
-        print(f"Message: {order.get('text')}")
+    log.info('order', ORDER_TEMPLATE, **order_fields(order))
+
+
+def display_new_order(order):
+    """
+    Announce a newly detected order with its details (one log record).
     
-    print(f"{'='*100}\n")
+    Args:
+        order: Order dictionary from orderBook API
+    """
+    log.info('new_order', NEW_ORDER_BANNER + ORDER_TEMPLATE, **order_fields(order))
 
 
 def display_aggregated_orders(aggregated_orders):
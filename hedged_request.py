@@ -0,0 +1,204 @@
+"""
+Deadline-bounded, optionally hedged API reads.
+A slow order book call no longer stalls the caller for the full 7s HTTP
+read timeout: it gives up at the deadline, and can fire a second request
+once the first has been slower than usual.
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Optional
+
+from rate_governor import RateGovernor
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when no response arrived before the caller's deadline."""
+
+
+class CallerSaturated(DeadlineExceeded):
+    """Raised at once when every worker is still busy with abandoned calls."""
+
+
+class HedgedCaller:
+    """
+    Runs a read with a deadline and an optional hedge request.
+
+    The hedge goes out only when the first request has run longer than the
+    observed p95 latency and the rate governor has room for another call, so
+    hedging never spends budget the pollers need.
+    """
+
+    MIN_SAMPLES = 20  # Latency samples needed before hedging kicks in
+
+    def __init__(self, fetch: Callable[[], Dict], governor: RateGovernor, account: str,
+                 endpoint: str = 'orderBook', max_workers: int = 4):
+        """
+        Initialize hedged caller.
+
+        Args:
+            fetch: Function performing the API call
+            governor: Rate governor that pays for hedge requests
+            account: Account (client ID) the calls are made for
+            endpoint: Endpoint name in the governor (default: 'orderBook')
+            max_workers: Requests in flight at once, including ones abandoned at
+                         their deadline that are still running (default: 4)
+        """
+        self.fetch = fetch
+        self.governor = governor
+        self.account = account
+        self.endpoint = endpoint
+        self.max_workers = max_workers
+
+        self._executor = None
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=200)  # Seconds, successful calls only
+        self._in_flight = 0  # Submitted requests not finished yet
+
+        # Tail-latency counters
+        self.calls = 0
+        self.deadline_misses = 0
+        self.hedges_sent = 0
+        self.hedges_won = 0
+        self.hedges_skipped = 0  # Wanted to hedge but the budget (or a worker) had no room
+        self.saturated = 0  # Calls refused because stalled requests held every worker
+        self.time_saved = 0.0  # Seconds saved by hedges that beat the first request
+
+    def p95_latency(self) -> Optional[float]:
+        """Observed p95 latency, or None until enough calls were made."""
+        with self._lock:
+            if len(self._latencies) < self.MIN_SAMPLES:
+                return None
+            latencies = sorted(self._latencies)
+        return latencies[int(len(latencies) * 0.95) - 1]
+
+    def _timed_fetch(self):
+        """Run the fetch and return (result, finished_at)."""
+        start = time.time()
+        result = self.fetch()
+        finished = time.time()
+        with self._lock:
+            self._latencies.append(finished - start)
+        return result, finished
+
+    def _submit(self):
+        """
+        Start a request if a worker is free.
+
+        Returns:
+            Future, or None if max_workers requests are still in flight
+        """
+        with self._lock:
+            if self._in_flight >= self.max_workers:
+                return None
+            self._in_flight += 1
+        future = self._executor.submit(self._timed_fetch)
+        future.add_done_callback(self._finished)
+        return future
+
+    def _finished(self, future):
+        """A submitted request ended (answered, failed or abandoned and done)."""
+        with self._lock:
+            self._in_flight -= 1
+
+    def call(self, deadline: Optional[float] = None, hedge: bool = False):
+        """
+        Make the call, bounded by a deadline.
+
+        Args:
+            deadline: Seconds the caller is willing to wait (None = no limit)
+            hedge: Send a second request if the first is slower than p95
+
+        Returns:
+            Result of the first request to succeed
+
+        Raises:
+            DeadlineExceeded: If no request succeeded before the deadline
+            CallerSaturated: If earlier requests abandoned at their deadline
+                             still hold every worker (raised without waiting,
+                             so a new poll never queues behind stalled ones)
+        """
+        if deadline is None and not hedge:
+            return self._timed_fetch()[0]
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                thread_name_prefix=f"{self.endpoint}-call")
+        self.calls += 1
+        primary = self._submit()
+        if primary is None:
+            self.saturated += 1
+            raise CallerSaturated(f"{self.endpoint}: {self.max_workers} requests still in flight")
+        started = time.time()
+        end = started + deadline if deadline is not None else None
+
+        def remaining():
+            return None if end is None else max(0.0, end - time.time())
+
+        pending = {primary}
+        hedge_future = None
+
+        p95 = self.p95_latency() if hedge else None
+        if p95 is not None and (end is None or started + p95 < end):
+            done, pending = wait(pending, timeout=p95)
+            if not done:
+                with self._lock:
+                    worker_free = self._in_flight < self.max_workers
+                if worker_free and self.governor.try_acquire(self.account, self.endpoint) == 0:
+                    hedge_future = self._submit()
+                if hedge_future is not None:
+                    pending.add(hedge_future)
+                    self.hedges_sent += 1
+                else:
+                    self.hedges_skipped += 1
+            else:
+                pending = done
+
+        error = None
+        while pending:
+            done, pending = wait(pending, timeout=remaining(), return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                if future.exception() is not None:
+                    error = future.exception()
+                    continue
+                result, finished = future.result()
+                if future is hedge_future:
+                    self.hedges_won += 1
+                    primary.add_done_callback(
+                        lambda f, won_at=finished: self._count_saving(f, won_at))
+                return result
+
+        if error is not None and not pending:
+            raise error
+        self.deadline_misses += 1
+        raise DeadlineExceeded(f"{self.endpoint} timed out after {deadline}s deadline")
+
+    def _count_saving(self, primary, won_at: float):
+        """Once the beaten first request finishes, add how much later it was."""
+        if primary.exception() is None:
+            _, finished = primary.result()
+            with self._lock:
+                self.time_saved += max(0.0, finished - won_at)
+
+    def get_statistics(self) -> Dict:
+        """
+        Get tail-latency and hedge counters.
+
+        Returns:
+            Dictionary of counters (hedges_sent is the extra rate budget spent)
+        """
+        p95 = self.p95_latency()
+        return {
+            'calls': self.calls,
+            'deadline_misses': self.deadline_misses,
+            'hedges_sent': self.hedges_sent,
+            'hedges_won': self.hedges_won,
+            'hedges_skipped': self.hedges_skipped,
+            'saturated': self.saturated,
+            'in_flight': self._in_flight,
+            'time_saved_ms': self.time_saved * 1000,
+            'p95_ms': p95 * 1000 if p95 is not None else None,
+        }
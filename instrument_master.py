@@ -0,0 +1,463 @@
+"""
+Instrument master index: lot size, tick size and freeze quantity by token or symbol.
+The broker's scrip-master JSON (hundreds of MB, re-issued every morning) is
+built once a day into a compact binary index that is memory-mapped on
+start, so a cold start only reads a header and every lookup is an O(1)
+hash probe into the mapped file - nothing is parsed until it is asked for.
+The scrip master is parsed one row at a time while the index is built, and
+a long-running process rebuilds the index before each session's pre-open.
+
+Index layout (little-endian):
+    header    magic, version, record count, hash table size, build time, blob size
+    records   fixed-size rows: blob offset/length, lot size, tick (paise),
+              freeze quantity, strike (paise)
+    tables    two open-addressing tables of record numbers (+1, 0 = empty),
+              keyed by 'EXCHANGE:token' and 'EXCHANGE:symbol'
+    blob      per-record text fields joined by \\x1f
+"""
+import io
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from datetime import datetime
+from typing import Dict, IO, Iterable, Iterator, NamedTuple, Optional
+
+from config import Config, IST
+from market_calendar import TradingCalendar, get_calendar
+from structured_log import get_logger
+
+
+log = get_logger('instrument_master')
+
+FREEZE_LIMITS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'nse_freeze_limits.json')
+
+MAGIC = b'IMIX'
+VERSION = 1
+_HEADER = struct.Struct('<4sHHIIdQ')
+_RECORD = struct.Struct('<IHxxiiiq')
+_SLOT = struct.Struct('<I')
+_SEPARATOR = b'\x1f'
+
+# Text fields of a record, in blob order
+_TEXT_FIELDS = ('exch_seg', 'token', 'symbol', 'name', 'expiry', 'instrumenttype')
+
+REFRESH_LEAD_SECONDS = 30 * 60  # Daily refresh this long before a session's pre-open
+REFRESH_RETRY_SECONDS = 10 * 60  # Retry interval while the scrip master is not out yet
+
+
+class Instrument(NamedTuple):
+    """One instrument from the scrip master."""
+    token: str
+    symbol: str
+    name: str
+    exchange: str
+    instrument_type: str
+    expiry: str
+    strike: float
+    lot_size: int
+    tick_size: float
+    freeze_qty: int  # 0 = no freeze limit known
+
+
+def _number(value) -> float:
+    """Scrip-master numeric field ('75', '5.000000', '', None) as float."""
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def load_freeze_limits(path: str = FREEZE_LIMITS_PATH) -> Dict[str, int]:
+    """
+    Load per-underlying freeze quantities.
+
+    Args:
+        path: Freeze limits file (default: nse_freeze_limits.json)
+
+    Returns:
+        Dictionary of underlying name -> maximum quantity per order
+    """
+    try:
+        with open(path, encoding='utf-8') as f:
+            return {name: int(limit) for name, limit in json.load(f).get('limits', {}).items()}
+    except FileNotFoundError:
+        return {}
+
+
+def iter_json_array(f: IO[str], chunk_size: int = 1 << 20) -> Iterator:
+    """
+    Parse a JSON array one element at a time.
+
+    The scrip master is hundreds of MB of JSON; json.load would hold all of
+    it, plus a dictionary per row, in memory at once.
+
+    Args:
+        f: Text file holding a JSON array
+        chunk_size: Characters read at a time
+
+    Yields:
+        Array elements, in order
+
+    Raises:
+        ValueError: If the file is not a JSON array
+    """
+    decoder = json.JSONDecoder()
+    buffer, position = '', 0
+    started = eof = False
+
+    while True:
+        while position < len(buffer) and buffer[position] in ' \t\r\n,':
+            position += 1
+        if position < len(buffer):
+            if not started:
+                if buffer[position] != '[':
+                    raise ValueError("not a JSON array")
+                started = True
+                position += 1
+                continue
+            if buffer[position] == ']':
+                return
+            try:
+                value, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                # A value ending with the buffer (e.g. a number) may go on in the next chunk
+                if end < len(buffer) or eof:
+                    yield value
+                    position = end
+                    continue
+        elif eof:
+            raise ValueError("JSON array is not closed")
+
+        chunk = f.read(chunk_size)
+        buffer = buffer[position:] + chunk
+        position = 0
+        eof = not chunk
+
+
+def build_index(instruments: Iterable[Dict], path: str, freeze_limits: Dict[str, int] = None,
+                built_at: float = None) -> int:
+    """
+    Build an index file from scrip-master rows (written atomically).
+
+    Args:
+        instruments: Scrip-master dictionaries ('token', 'symbol', 'name',
+                     'expiry', 'strike', 'lotsize', 'instrumenttype',
+                     'exch_seg', 'tick_size'); strike and tick size in paise
+        path: Index file to write
+        freeze_limits: Underlying -> freeze quantity, applied to derivatives
+                       (default: nse_freeze_limits.json)
+        built_at: Build time to record (default: now)
+
+    Returns:
+        Number of instruments indexed
+    """
+    freeze_limits = load_freeze_limits() if freeze_limits is None else freeze_limits
+    records, blob, token_keys, symbol_keys = [], bytearray(), [], []
+
+    for row in instruments:
+        texts = [str(row.get(field) or '').encode('utf-8') for field in _TEXT_FIELDS]
+        exchange, token, symbol, name = texts[0], texts[1], texts[2], texts[3]
+        if not token:
+            continue
+        derivative = bool(texts[4])  # Only derivatives have an expiry
+        freeze_qty = freeze_limits.get(row.get('name') or '', 0) if derivative else 0
+
+        encoded = _SEPARATOR.join(texts)
+        records.append(_RECORD.pack(len(blob), len(encoded),
+                                    int(_number(row.get('lotsize'))) or 1,
+                                    round(_number(row.get('tick_size'))),
+                                    freeze_qty,
+                                    max(round(_number(row.get('strike'))), 0)))
+        blob += encoded
+        token_keys.append(exchange + b':' + token)
+        symbol_keys.append(exchange + b':' + symbol)
+
+    count = len(records)
+    table_size = 1
+    while table_size < max(count * 2, 8):
+        table_size *= 2
+
+    tables = bytearray()
+    for keys in (token_keys, symbol_keys):
+        table = [0] * table_size
+        mask = table_size - 1
+        for number, key in enumerate(keys):
+            slot = zlib.crc32(key) & mask
+            while table[slot]:
+                slot = (slot + 1) & mask
+            table[slot] = number + 1  # On duplicate keys the first row wins
+        tables += struct.pack(f'<{table_size}I', *table)
+
+    header = _HEADER.pack(MAGIC, VERSION, 0, count, table_size,
+                          time.time() if built_at is None else built_at, len(blob))
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.instrument_index')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(header)
+            f.write(b''.join(records))
+            f.write(tables)
+            f.write(blob)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return count
+
+
+class _MappedIndex:
+    """One mapped index file (replaced as a whole on refresh)."""
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, count, table_size, built_at, _ = _HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"not an instrument index (version {VERSION}): {path}")
+        self.count = count
+        self.built_at = built_at
+        self.mask = table_size - 1
+        self.token_table = _HEADER.size + count * _RECORD.size
+        self.symbol_table = self.token_table + table_size * _SLOT.size
+        self.blob = self.symbol_table + table_size * _SLOT.size
+
+    def find(self, table: int, field: int, exchange: str, value) -> Optional[Instrument]:
+        """Probe a hash table for 'exchange:value'."""
+        value = str(value)
+        slot = zlib.crc32(f"{exchange}:{value}".encode('utf-8')) & self.mask
+        while True:
+            (entry,) = _SLOT.unpack_from(self.map, table + slot * _SLOT.size)
+            if not entry:
+                return None
+            offset, length, lot_size, tick, freeze_qty, strike = _RECORD.unpack_from(
+                self.map, _HEADER.size + (entry - 1) * _RECORD.size)
+            start = self.blob + offset
+            texts = self.map[start:start + length].decode('utf-8').split('\x1f')
+            if texts[field] == value and texts[0] == exchange:
+                exchange, token, symbol, name, expiry, instrument_type = texts
+                return Instrument(token, symbol, name, exchange, instrument_type, expiry,
+                                  strike / 100, lot_size, tick / 100, freeze_qty)
+            slot = (slot + 1) & self.mask
+
+
+class InstrumentMaster:
+    """
+    Memory-mapped instrument lookups by token or trading symbol.
+
+    A missing index behaves as an empty one (every lookup returns None), so
+    callers can fall back to their old behaviour until the first refresh.
+    A refresh swaps in the new mapping; lookups already running finish on
+    the old one.
+    """
+
+    def __init__(self, path: str = None, url: str = None):
+        """
+        Initialize instrument master (maps the index if it exists).
+
+        Args:
+            path: Index file (default: INSTRUMENT_INDEX_PATH)
+            url: Scrip-master download URL (default: INSTRUMENT_MASTER_URL)
+        """
+        self.path = path or Config.INSTRUMENT_INDEX_PATH
+        self.url = url or Config.INSTRUMENT_MASTER_URL
+        self._index: Optional[_MappedIndex] = None
+        self._refresh_stop: Optional[threading.Event] = None
+        self._open()
+
+    def _open(self):
+        """Map the index file (if there is a valid one)."""
+        try:
+            self._index = _MappedIndex(self.path)
+        except FileNotFoundError:
+            self._index = None
+        except (ValueError, struct.error, OSError) as e:
+            log.warning('instrument_index_invalid', "⚠️  Ignoring instrument index: {error}", error=str(e))
+            self._index = None
+
+    @property
+    def built_at(self) -> float:
+        """When the mapped index was built (0 if there is none)."""
+        return self._index.built_at if self._index else 0.0
+
+    def __len__(self):
+        return self._index.count if self._index else 0
+
+    def by_token(self, token, exchange: str = 'NFO') -> Optional[Instrument]:
+        """
+        Look up an instrument by symbol token.
+
+        Args:
+            token: Symbol token (as in an order's 'symboltoken')
+            exchange: Exchange segment ('NFO', 'NSE', 'BFO', ...)
+
+        Returns:
+            Instrument, or None if unknown
+        """
+        index = self._index
+        return index.find(index.token_table, 1, exchange, token) if index else None
+
+    def by_symbol(self, symbol: str, exchange: str = 'NFO') -> Optional[Instrument]:
+        """
+        Look up an instrument by trading symbol.
+
+        Args:
+            symbol: Trading symbol, e.g. 'NIFTY28OCT2525000CE'
+            exchange: Exchange segment ('NFO', 'NSE', 'BFO', ...)
+
+        Returns:
+            Instrument, or None if unknown
+        """
+        index = self._index
+        return index.find(index.symbol_table, 2, exchange, symbol) if index else None
+
+    def for_order(self, order: Dict) -> Optional[Instrument]:
+        """Look up the instrument of an order (by token, else by symbol)."""
+        exchange = order.get('exchange') or 'NFO'
+        token = order.get('symboltoken')
+        instrument = self.by_token(token, exchange) if token else None
+        return instrument or self.by_symbol(order.get('tradingsymbol') or '', exchange)
+
+    def is_stale(self, now: float = None) -> bool:
+        """Whether the index is missing or was built before today (IST)."""
+        now = time.time() if now is None else now
+        if self._index is None:
+            return True
+        return datetime.fromtimestamp(self.built_at, IST).date() < datetime.fromtimestamp(now, IST).date()
+
+    def refresh(self, source: str = None) -> int:
+        """
+        Rebuild the index from the scrip master and map the new one.
+
+        Args:
+            source: Local scrip-master JSON file (default: download from the URL)
+
+        Returns:
+            Number of instruments indexed
+        """
+        started = time.perf_counter()
+        if source is None:
+            count = self._download()
+        else:
+            with open(source, encoding='utf-8') as f:
+                count = build_index(iter_json_array(f), self.path)
+        self._open()
+        log.info('instrument_index_built', "📇 Instrument index: {count} instruments in {seconds:.1f}s",
+                 count=count, seconds=time.perf_counter() - started)
+        return count
+
+    def _download(self) -> int:
+        """
+        Download the scrip master and build the index from it.
+
+        The response is streamed to a temporary file, then parsed row by row
+        into the index.
+
+        Returns:
+            Number of instruments indexed
+        """
+        import requests
+
+        with tempfile.TemporaryFile() as f:
+            with requests.get(self.url, stream=True, timeout=120) as response:
+                response.raise_for_status()
+                for chunk in response.iter_content(chunk_size=1 << 20):
+                    f.write(chunk)
+            f.seek(0)
+            with io.TextIOWrapper(f, encoding='utf-8') as text:
+                return build_index(iter_json_array(text), self.path)
+
+    def ensure_fresh(self) -> bool:
+        """
+        Refresh the index if it is stale; keeps the old one if that fails.
+
+        Returns:
+            True if an index (fresh or not) is available
+        """
+        if self.is_stale():
+            try:
+                self.refresh()
+            except Exception as e:
+                log.warning('instrument_refresh_failed',
+                            "⚠️  Could not refresh instrument master: {error}", error=str(e))
+        return self._index is not None
+
+    def seconds_until_refresh(self, calendar: TradingCalendar, now: float = None) -> float:
+        """
+        Seconds until the next daily refresh (REFRESH_LEAD_SECONDS before a pre-open).
+
+        Args:
+            calendar: Trading calendar
+            now: Unix time (default: now)
+
+        Returns:
+            Seconds to wait
+        """
+        now = time.time() if now is None else now
+        session = calendar.next_session(now)
+        while session.pre_open - REFRESH_LEAD_SECONDS <= now:
+            session = calendar.next_session(session.close + 1)
+        return session.pre_open - REFRESH_LEAD_SECONDS - now
+
+    def start_daily_refresh(self, calendar: TradingCalendar = None) -> threading.Thread:
+        """
+        Keep the index fresh on a background thread.
+
+        A process that runs for days would otherwise keep its start-day
+        index and miss contracts listed since (new weeklies). The refresh
+        runs before each session's pre-open, and is retried every
+        REFRESH_RETRY_SECONDS while the index is still stale.
+
+        Args:
+            calendar: Trading calendar (default: the process-wide one)
+
+        Returns:
+            The refresh thread (a daemon; stop it with stop_daily_refresh())
+        """
+        calendar = calendar or get_calendar()
+        stop = self._refresh_stop = threading.Event()
+
+        def run():
+            wait = self.seconds_until_refresh(calendar)
+            while not stop.wait(wait):
+                self.ensure_fresh()
+                wait = REFRESH_RETRY_SECONDS if self.is_stale() else self.seconds_until_refresh(calendar)
+
+        thread = threading.Thread(target=run, name='instrument-refresh', daemon=True)
+        thread.start()
+        return thread
+
+    def stop_daily_refresh(self):
+        """Stop the background refresh started by start_daily_refresh()."""
+        if self._refresh_stop is not None:
+            self._refresh_stop.set()
+            self._refresh_stop = None
+
+
+_master: Optional[InstrumentMaster] = None
+
+
+def get_instrument_master() -> InstrumentMaster:
+    """Get the process-wide instrument master (mapped on first use, not refreshed)."""
+    global _master
+    if _master is None:
+        _master = InstrumentMaster()
+    return _master
+
+
+if __name__ == '__main__':
+    import sys
+
+    master = InstrumentMaster()
+    master.refresh(sys.argv[1] if len(sys.argv) > 1 else None)
+    print(f"✅ {len(master)} instruments indexed in {master.path}")
@@ -0,0 +1,213 @@
+"""
+Rate-aware login scheduler for bringing up many SmartAPI sessions at once.
+Logs accounts in concurrently while keeping every API key inside its login budget.
+"""
+import heapq
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+
+class LoginBudget:
+    """Sliding-window login budget for a single API key."""
+
+    def __init__(self, max_logins: int, window_seconds: float):
+        """
+        Initialize login budget.
+
+        Args:
+            max_logins: Logins allowed per window
+            window_seconds: Length of the sliding window in seconds
+        """
+        self.max_logins = max_logins
+        self.window_seconds = window_seconds
+        self._slots = deque()  # Start times of granted logins
+        self._lock = threading.Lock()
+
+    def reserve(self, not_before: float = None) -> float:
+        """
+        Reserve the next free login slot.
+
+        Args:
+            not_before: Earliest acceptable start (Unix time), e.g. after a
+                        server-side rate-limit error
+
+        Returns:
+            Seconds the caller must wait before starting its login
+        """
+        slot = self.reserve_slot(not_before)
+        return max(0.0, slot - time.time())
+
+    def reserve_slot(self, not_before: float = None) -> float:
+        """
+        Reserve the next free login slot.
+
+        Args:
+            not_before: Earliest acceptable start (Unix time)
+
+        Returns:
+            Unix time at which the login may start
+        """
+        with self._lock:
+            now = time.time()
+
+            # Drop slots that have left the window
+            while self._slots and self._slots[0] <= now - self.window_seconds:
+                self._slots.popleft()
+
+            if len(self._slots) < self.max_logins:
+                slot = now
+            else:
+                # Free up when the login max_logins places back leaves the window
+                slot = self._slots[-self.max_logins] + self.window_seconds
+            if not_before is not None:
+                slot = max(slot, not_before)
+
+            # Kept in start order so the window arithmetic above stays valid
+            index = len(self._slots)
+            while index and self._slots[index - 1] > slot:
+                index -= 1
+            self._slots.insert(index, slot)
+            return slot
+
+
+class LoginScheduler:
+    """
+    Runs logins concurrently up to the SmartAPI login budget.
+
+    SmartAPI allows only 3-5 session creations per minute per API key, so
+    accounts sharing a key are spaced out while accounts on different keys
+    are logged in side by side.
+    """
+
+    def __init__(self, logins_per_window: int = 3, window_seconds: float = 60,
+                 max_parallel: int = 8):
+        """
+        Initialize login scheduler.
+
+        Args:
+            logins_per_window: Logins allowed per API key per window (default: 3)
+            window_seconds: Budget window in seconds (default: 60)
+            max_parallel: Maximum logins in flight at once (default: 8)
+        """
+        self.logins_per_window = logins_per_window
+        self.window_seconds = window_seconds
+        self.max_parallel = max_parallel
+        self._budgets: Dict[str, LoginBudget] = {}
+        self._budgets_lock = threading.Lock()
+
+    def _budget_for(self, api_key: str) -> LoginBudget:
+        """Get (or create) the login budget for an API key."""
+        with self._budgets_lock:
+            if api_key not in self._budgets:
+                self._budgets[api_key] = LoginBudget(self.logins_per_window,
+                                                     self.window_seconds)
+            return self._budgets[api_key]
+
+    def _restore(self, client) -> Dict:
+        """
+        Try to bring a client up from the session cache (no login budget used).
+
+        Args:
+            client: MultiAccountClient (or compatible) instance
+
+        Returns:
+            Result dictionary, or None if the client needs a full login
+        """
+        start = time.time()
+        try:
+            restored = client.restore_session()
+        except Exception:
+            restored = False
+        if not restored:
+            return None
+        return {
+            'account': client.account.name,
+            'success': True,
+            'queue_wait': 0.0,
+            'latency': time.time() - start,
+            'error': None
+        }
+
+    def _login(self, client, budget: LoginBudget, wait_time: float) -> Dict:
+        """
+        Log a single client in (its slot has already opened).
+
+        Args:
+            client: MultiAccountClient (or compatible) instance
+            budget: Login budget of the client's API key (for its own retries)
+            wait_time: Seconds the login waited for its slot
+
+        Returns:
+            Result dictionary for this account
+        """
+        start = time.time()
+        try:
+            success = bool(client.initialize_session(budget=budget))
+            error = None if success else "Login failed"
+        except Exception as e:
+            success = False
+            error = str(e)
+
+        return {
+            'account': client.account.name,
+            'success': success,
+            'queue_wait': wait_time,
+            'latency': time.time() - start,
+            'error': error
+        }
+
+    def run(self, clients: List) -> List[Dict]:
+        """
+        Log in all clients, honouring the per-key budget.
+
+        Clients whose cached session is still good are restored without a
+        login. The rest get slots in list order (so put the most important
+        account, the master, first) and are handed to a worker only when
+        their slot opens, so an account waiting on a busy key never holds a
+        worker that an account on another key could use.
+
+        Args:
+            clients: List of MultiAccountClient instances
+
+        Returns:
+            List of per-account result dictionaries, in the same order as clients
+        """
+        if not clients:
+            return []
+
+        workers = max(1, min(self.max_parallel, len(clients)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="login") as executor:
+            results = [future.result() for future in
+                       [executor.submit(self._restore, client) for client in clients]]
+
+            # Reserve slots up front so accounts on one key keep their order
+            queued = time.time()
+            due = []  # Heap of (slot start, index)
+            for index, client in enumerate(clients):
+                if results[index] is None:
+                    heapq.heappush(due, (self._budget_for(client.api_key).reserve_slot(), index))
+
+            futures = {}
+            while due:
+                slot, index = heapq.heappop(due)
+                delay = slot - time.time()
+                if delay > 0:
+                    time.sleep(delay)
+                client = clients[index]
+                futures[index] = executor.submit(self._login, client, self._budget_for(client.api_key),
+                                                 max(0.0, slot - queued))
+            for index, future in futures.items():
+                results[index] = future.result()
+        return results
+
+    @staticmethod
+    def print_report(results: List[Dict]):
+        """Print per-account login latency."""
+        print("\n⏱️  Login latency:")
+        for result in results:
+            status = "✅" if result['success'] else "❌"
+            print(f"   {status} {result['account']}: {result['latency']:.2f}s "
+                  f"(queued {result['queue_wait']:.1f}s)")
@@ -10,6 +10,8 @@ from order_monitor import (
     check_and_display_aggregated_orders,
     get_trading_history_for_date
 )
+from order_utils import RunningAggregates
+from trade_history import get_trade_history
 from config import Config
 
 
@@ -42,8 +44,15 @@ def run_continuous_monitoring():
         print(f"Starting continuous monitoring (polling every {Config.POLL_INTERVAL_SECONDS} seconds)")
         print("Press Ctrl+C to stop\n")
         
+        # Only new and changed orders are aggregated on each poll; the view is shown when it changes
+        aggregates = RunningAggregates()
+        trade_history = get_trade_history()
         while True:
-            check_and_display_aggregated_orders(client)
+            check_and_display_aggregated_orders(client, aggregates)
+            try:
+                trade_history.sync_today(client)  # Keeps the session's fills for later history queries
+            except Exception as e:
+                print(f"Error while syncing trade history: {e}")
             time.sleep(Config.POLL_INTERVAL_SECONDS)
             
     except KeyboardInterrupt:
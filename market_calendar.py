@@ -0,0 +1,219 @@
+"""
+NSE trading-session calendar.
+Sessions (regular days, holidays, Muhurat trading) come from a local
+holiday file and are precomputed per year as Unix timestamps, so checking
+whether the market is open is one bisect and is right whatever timezone
+the server runs in (Render runs in UTC).
+"""
+import json
+import os
+import time
+from bisect import bisect_right
+from datetime import date, datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional
+
+from config import Config, IST
+from structured_log import get_logger
+
+
+log = get_logger('market_calendar')
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'nse_holidays.json')
+
+# Session phases
+CLOSED, PRE_OPEN, OPEN = 'closed', 'pre_open', 'open'
+
+
+class Session(NamedTuple):
+    """One trading session (times are Unix timestamps)."""
+    day: date
+    pre_open: float
+    open: float
+    close: float
+    name: str = 'Regular'
+
+
+def _at(day: date, hhmm: str) -> float:
+    """Unix timestamp of an 'HH:MM' IST time on a day."""
+    hour, minute = hhmm.split(':')
+    return datetime(day.year, day.month, day.day, int(hour), int(minute), tzinfo=IST).timestamp()
+
+
+class TradingCalendar:
+    """
+    Trading sessions by day, loaded from a holiday file.
+
+    Years missing from the file fall back to every weekday being a regular
+    session (with a warning), so an outdated file never stops monitoring.
+    """
+
+    def __init__(self, path: str = None):
+        """
+        Initialize calendar.
+
+        Args:
+            path: Holiday file (default: MARKET_CALENDAR_PATH or nse_holidays.json)
+        """
+        self.path = path or Config.MARKET_CALENDAR_PATH or DEFAULT_PATH
+        with open(self.path, encoding='utf-8') as f:
+            data = json.load(f)
+
+        self.regular_session = data['regular_session']
+        self.years: Dict[str, Dict] = data.get('years', {})
+        self._sessions: List[Session] = []
+        self._starts: List[float] = []  # pre_open of each session, for bisect
+        self._built_years = set()
+
+    def _build_year(self, year: int):
+        """Precompute the sessions of one year."""
+        if year in self._built_years:
+            return
+        self._built_years.add(year)
+
+        info = self.years.get(str(year))
+        if info is None:
+            log.warning('calendar_missing_year',
+                        "⚠️  No holiday calendar for {year} in {path} - treating every weekday as a trading day",
+                        year=year, path=self.path)
+            info = {}
+        elif info.get('status') != 'final':
+            log.warning('calendar_unverified',
+                        "⚠️  Holiday calendar for {year} is marked '{status}' - check it against the NSE circular",
+                        year=year, status=info.get('status'))
+        holidays = info.get('holidays', {})
+        specials = info.get('special_sessions', {})
+
+        day = date(year, 1, 1)
+        while day.year == year:
+            key = day.isoformat()
+            if key in specials:
+                special = specials[key]
+                self._sessions.append(Session(day, _at(day, special.get('pre_open', special['open'])),
+                                              _at(day, special['open']), _at(day, special['close']),
+                                              special.get('name', 'Special')))
+            elif day.weekday() < 5 and key not in holidays:
+                regular = self.regular_session
+                self._sessions.append(Session(day, _at(day, regular['pre_open']),
+                                              _at(day, regular['open']), _at(day, regular['close'])))
+            day += timedelta(days=1)
+
+        self._sessions.sort(key=lambda session: session.pre_open)
+        self._starts = [session.pre_open for session in self._sessions]
+
+    def _ensure(self, now: float):
+        """Make sure the year of `now` and the next one are precomputed."""
+        year = datetime.fromtimestamp(now, IST).year
+        if year + 1 not in self._built_years or year not in self._built_years:
+            self._build_year(year)
+            self._build_year(year + 1)
+
+    def session_at(self, now: float = None) -> Optional[Session]:
+        """
+        Get the session in progress (pre-open included).
+
+        Args:
+            now: Unix time (default: now)
+
+        Returns:
+            Session, or None if the market is closed
+        """
+        now = time.time() if now is None else now
+        self._ensure(now)
+        i = bisect_right(self._starts, now) - 1
+        if i >= 0 and now <= self._sessions[i].close:
+            return self._sessions[i]
+        return None
+
+    def phase(self, now: float = None) -> str:
+        """
+        Get the market phase.
+
+        Args:
+            now: Unix time (default: now)
+
+        Returns:
+            PRE_OPEN, OPEN or CLOSED
+        """
+        now = time.time() if now is None else now
+        session = self.session_at(now)
+        if session is None:
+            return CLOSED
+        return OPEN if now >= session.open else PRE_OPEN
+
+    def is_open(self, now: float = None, include_pre_open: bool = False) -> bool:
+        """Whether the market is open (optionally counting pre-open)."""
+        phase = self.phase(now)
+        return phase == OPEN or (include_pre_open and phase == PRE_OPEN)
+
+    def next_session(self, now: float = None) -> Session:
+        """
+        Get the session in progress, or else the next one.
+
+        Args:
+            now: Unix time (default: now)
+
+        Returns:
+            Session
+        """
+        now = time.time() if now is None else now
+        self._ensure(now)
+        i = max(bisect_right(self._starts, now) - 1, 0)
+        while True:
+            for session in self._sessions[i:]:
+                if session.close >= now:
+                    return session
+            # Past the last precomputed session (e.g. a long break at year end)
+            i = len(self._sessions)
+            self._build_year(max(self._built_years) + 1)
+
+    def last_session(self, now: float = None) -> Session:
+        """
+        Get the session in progress, or else the latest one that has started.
+
+        Args:
+            now: Unix time (default: now)
+
+        Returns:
+            Session (e.g. Friday's from Friday's close until Monday's pre-open)
+        """
+        now = time.time() if now is None else now
+        self._ensure(now)
+        i = bisect_right(self._starts, now) - 1
+        while i < 0:
+            # Before the first precomputed session (e.g. early January)
+            self._build_year(min(self._built_years) - 1)
+            i = bisect_right(self._starts, now) - 1
+        return self._sessions[i]
+
+    def seconds_until_open(self, now: float = None, include_pre_open: bool = True) -> float:
+        """
+        Seconds until the next session starts (0 while one is in progress).
+
+        Args:
+            now: Unix time (default: now)
+            include_pre_open: Count from the pre-open rather than the open
+
+        Returns:
+            Seconds to wait
+        """
+        now = time.time() if now is None else now
+        session = self.next_session(now)
+        start = session.pre_open if include_pre_open else session.open
+        return max(0.0, start - now)
+
+
+_calendar: Optional[TradingCalendar] = None
+
+
+def get_calendar() -> TradingCalendar:
+    """Get the process-wide calendar (loaded on first use)."""
+    global _calendar
+    if _calendar is None:
+        _calendar = TradingCalendar()
+    return _calendar
+
+
+def format_session(session: Session) -> str:
+    """Describe a session for status lines, e.g. 'Mon 27-Oct 09:15 IST (Regular)'."""
+    opens = datetime.fromtimestamp(session.open, IST)
+    return f"{opens.strftime('%a %d-%b %H:%M')} IST ({session.name})"
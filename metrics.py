@@ -0,0 +1,350 @@
+"""
+In-process metrics with Prometheus text exposition.
+Counters and histograms are written from the monitor's hot path without
+locks: every thread updates its own shard and a scrape sums the shards.
+
+Served by web_ui.py at /metrics.
+"""
+import threading
+import weakref
+from bisect import bisect_left
+from typing import Callable, Dict, List, Sequence, Tuple
+
+
+# Seconds; covers a fast keep-alive call up to a read deadline
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Seconds; master order time to detection (broker times have 1s resolution)
+LAG_BUCKETS = (0.5, 1.0, 2.0, 3.0, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+
+def _escape(value) -> str:
+    """Escape a label value for the exposition format."""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: Sequence[str], values: Sequence, extra: str = '') -> str:
+    """Render {name="value",...} (empty string when there are no labels)."""
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+def _format_value(value: float) -> str:
+    """Render a sample value (integers without a trailing .0)."""
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Series:
+    """
+    One labelled series, sharded per thread.
+
+    Each thread writes only to its own list, so updates need no lock and
+    are never lost; readers sum all shards (a scrape may be a few updates
+    behind, never inconsistent within a shard). Shards of threads that have
+    ended are folded into a retired total, so short-lived threads (timers,
+    request handlers) don't grow the series.
+    """
+
+    __slots__ = ('_local', '_shards', '_retired', '_width', '_lock')
+
+    def __init__(self, width: int):
+        self._local = threading.local()
+        self._shards: List[Tuple[weakref.ref, List[float]]] = []  # (owning thread, shard)
+        self._retired = [0.0] * width  # Sum of shards whose thread has ended
+        self._width = width
+        self._lock = threading.Lock()  # Taken when shards are added or folded, never per update
+
+    def shard(self) -> List[float]:
+        """This thread's shard."""
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = [0.0] * self._width
+            with self._lock:
+                self._fold_dead()
+                self._shards.append((weakref.ref(threading.current_thread()), shard))
+            return shard
+
+    def _fold_dead(self):
+        """Move the shards of ended threads into the retired total (lock held)."""
+        live = []
+        for owner, shard in self._shards:
+            thread = owner()
+            if thread is not None and thread.is_alive():
+                live.append((owner, shard))
+            else:
+                for i, value in enumerate(shard):
+                    self._retired[i] += value
+        self._shards = live
+
+    def totals(self) -> List[float]:
+        """Sum of all shards."""
+        with self._lock:
+            self._fold_dead()
+            totals = list(self._retired)
+            shards = [shard for _, shard in self._shards]
+        for shard in shards:
+            for i, value in enumerate(shard):
+                totals[i] += value
+        return totals
+
+
+class _Metric:
+    """Base for labelled metrics."""
+
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        """
+        Initialize metric.
+
+        Args:
+            name: Metric name
+            documentation: HELP text
+            labelnames: Label names, in order
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple, object] = {}
+        self._create_lock = threading.Lock()  # Only taken the first time a label set is seen
+
+    def labels(self, *values):
+        """Get the child for a label set (positional, in labelnames order)."""
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+            with self._create_lock:
+                child = self._children.get(key)
+                if child is None:
+                    child = self._children[key] = self._new_child()
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def samples(self) -> List[str]:
+        """Exposition lines for all children."""
+        raise NotImplementedError
+
+    def render(self) -> str:
+        """HELP, TYPE and sample lines."""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return '\n'.join(lines)
+
+
+class _CounterChild:
+    """Counter for one label set."""
+
+    __slots__ = ('_series',)
+
+    def __init__(self):
+        self._series = _Series(1)
+
+    def inc(self, amount: float = 1.0):
+        """Increase the counter."""
+        self._series.shard()[0] += amount
+
+    @property
+    def value(self) -> float:
+        """Current total."""
+        return self._series.totals()[0]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    kind = 'counter'
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        """Increase an unlabelled counter."""
+        self.labels().inc(amount)
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"
+                for key, child in list(self._children.items())]
+
+
+class _HistogramChild:
+    """Histogram for one label set."""
+
+    __slots__ = ('_series', '_buckets')
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self._buckets = buckets
+        # One slot per bucket, one for +Inf, one for the sum
+        self._series = _Series(len(buckets) + 2)
+
+    def observe(self, value: float):
+        """Record one observation."""
+        shard = self._series.shard()
+        shard[bisect_left(self._buckets, value)] += 1
+        shard[-1] += value
+
+    def snapshot(self) -> Tuple[List[float], float, float]:
+        """(cumulative bucket counts incl. +Inf, sum, count)."""
+        totals = self._series.totals()
+        cumulative, running = [], 0.0
+        for count in totals[:-1]:
+            running += count
+            cumulative.append(running)
+        return cumulative, totals[-1], running
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in fixed buckets."""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        """
+        Initialize histogram.
+
+        Args:
+            name: Metric name
+            documentation: HELP text
+            labelnames: Label names, in order
+            buckets: Upper bounds (inclusive), ascending; +Inf is implicit
+        """
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        """Record an observation on an unlabelled histogram."""
+        self.labels().observe(value)
+
+    def samples(self) -> List[str]:
+        lines = []
+        bounds = [_format_value(b) for b in self.buckets] + ['+Inf']
+        for key, child in list(self._children.items()):
+            cumulative, total, count = child.snapshot()
+            for bound, value in zip(bounds, cumulative):
+                labels = _format_labels(self.labelnames, key, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{labels} {_format_value(value)}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {_format_value(count)}")
+        return lines
+
+
+class GaugeFunction(_Metric):
+    """Gauge read from a callback at scrape time (no cost between scrapes)."""
+
+    kind = 'gauge'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        """
+        Initialize gauge.
+
+        Args:
+            name: Metric name
+            documentation: HELP text
+            labelnames: Label names, in order
+        """
+        super().__init__(name, documentation, labelnames)
+        self._functions: Dict[Tuple, Callable[[], float]] = {}
+
+    def set_function(self, function: Callable[[], float], *values):
+        """
+        Read the gauge for a label set from a callback.
+
+        Args:
+            function: Returns the current value (None to skip the sample)
+            *values: Label values, in labelnames order
+        """
+        self._functions[tuple(str(v) for v in values)] = function
+
+    def remove(self, *values):
+        """Stop reporting a label set."""
+        self._functions.pop(tuple(str(v) for v in values), None)
+
+    def samples(self) -> List[str]:
+        lines = []
+        for key, function in list(self._functions.items()):
+            try:
+                value = function()
+            except Exception:
+                continue  # A broken callback must not break the scrape
+            if value is not None:
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self):
+        """Initialize empty registry."""
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing  # Module reloaded / registered twice: keep one series
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Register (or get) a counter."""
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        """Register (or get) a histogram."""
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge_function(self, name: str, documentation: str,
+                       labelnames: Sequence[str] = ()) -> GaugeFunction:
+        """Register (or get) a callback gauge."""
+        return self._register(GaugeFunction(name, documentation, labelnames))
+
+    def render(self) -> str:
+        """Prometheus text exposition (format 0.0.4) of every metric."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return '\n'.join(metric.render() for metric in metrics) + '\n'
+
+
+# Process-wide registry and the metrics the monitors report
+registry = MetricsRegistry()
+
+API_REQUESTS = registry.counter(
+    'smartapi_requests_total', 'SmartAPI REST calls by route, account and outcome',
+    ['route', 'account', 'outcome'])
+API_LATENCY = registry.histogram(
+    'smartapi_request_seconds', 'SmartAPI REST call latency', ['route', 'account'])
+RATE_LIMIT_HITS = registry.counter(
+    'smartapi_rate_limit_hits_total', 'Calls the broker rejected for exceeding its rate limit',
+    ['route', 'account'])
+BUDGET_DEFERRALS = registry.counter(
+    'rate_governor_deferrals_total', 'Calls held back because the shared budget was spent',
+    ['endpoint', 'account'])
+BACKOFF_SECONDS = registry.counter(
+    'rate_governor_backoff_seconds_total', 'Backoff imposed after the broker throttled a call',
+    ['endpoint', 'account'])
+POLL_ITERATION = registry.histogram(
+    'monitor_poll_iteration_seconds', 'Time spent per poll loop iteration (excluding the sleep)',
+    ['monitor'])
+DETECTION_LAG = registry.histogram(
+    'copy_detection_lag_seconds', 'Master order time to detection', ['source'], LAG_BUCKETS)
+COPY_ORDERS = registry.counter(
+    'copy_orders_total', 'Follower copy attempts by result', ['follower', 'result'])
+COPY_ACK_LATENCY = registry.histogram(
+    'copy_ack_seconds', 'Detection to follower order acknowledgement', ['follower'])
+POLL_INTERVAL = registry.gauge_function(
+    'monitor_poll_interval_seconds', 'Current adaptive poll interval', ['account'])
+QUEUE_DEPTH = registry.gauge_function(
+    'queue_depth', 'Items waiting in a queue', ['queue'])
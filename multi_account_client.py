@@ -6,19 +6,31 @@ import time
 from typing import Dict, List
 from datetime import datetime
 import pyotp
-from SmartApi.smartConnect import SmartConnect
+from config import Config
 from multi_account_config import AccountConfig
+from session_cache import SessionCache
+from login_scheduler import LoginScheduler
+from rate_governor import RateGovernor, shared_governor
+from placement_limiter import PlacementLimiter
+from hedged_request import HedgedCaller
+from transport import PooledSmartConnect, shared_transports
+from metrics import QUEUE_DEPTH
+from session_recorder import shared_recorder
 
 
 class MultiAccountClient:
     """Manages multiple SmartAPI client instances."""
     
-    def __init__(self, account: AccountConfig):
+    def __init__(self, account: AccountConfig, governor: RateGovernor = None,
+                 placement_limiter: PlacementLimiter = None, pool_maxsize: int = 2):
         """
         Initialize a SmartAPI client for a specific account.
         
         Args:
             account: AccountConfig instance with credentials
+            governor: RateGovernor to share (default: process-wide shared_governor)
+            placement_limiter: Order placement limiter (default: PlacementLimiter defaults)
+            pool_maxsize: Keep-alive connections to hold for this account (default: 2)
         """
         self.account = account
         self.api_key = account.api_key
@@ -27,24 +39,61 @@ class MultiAccountClient:
         self.totp_secret = account.totp_secret
         
         self.totp = pyotp.TOTP(self.totp_secret)
-        self.client = SmartConnect(api_key=self.api_key)
+        self.transport = shared_transports.get(self.client_id, pool_maxsize)
+        self.client = PooledSmartConnect(self.transport, api_key=self.api_key,
+                                         root=Config.SMARTAPI_ROOT_URL)
+        if Config.RECORD_SESSION_PATH:
+            shared_recorder(Config.RECORD_SESSION_PATH).attach(self.client, self.client_id)
         self.session_data = None
         self.feed_token = None
         self.session_time = None
         self.is_initialized = False
+        self.session_cache = SessionCache(Config.SESSION_CACHE_PATH) if Config.USE_SESSION_CACHE else None
+        self.governor = governor or shared_governor
+        self.placement_limiter = placement_limiter or PlacementLimiter(account=account.name)
+        self.last_queue_time = 0.0  # Seconds the last order waited for the limiter
+        self.order_book_caller = HedgedCaller(lambda: self.client.orderBook(),
+                                              self.governor, self.client_id)
     
-    def initialize_session(self, max_retries=3, base_delay=60):
+    def restore_session(self) -> bool:
+        """
+        Bring the session up from the session cache, without a login.
+        
+        Returns:
+            True if a cached session was restored (or one is already up)
+        """
+        if self.is_initialized:
+            return True
+        if not self.session_cache:
+            return False
+        restored = self.session_cache.restore(self.client, self.client_id)
+        if not restored:
+            return False
+        self.session_data = self.session_cache.get(self.client_id)
+        self.feed_token = self.client.getfeedToken()
+        self.session_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self.is_initialized = True
+        print(f"   ✅ {self.account.name} session {restored} from cache")
+        return True
+    
+    def initialize_session(self, max_retries=3, base_delay=60, budget=None):
         """
         Initialize SmartAPI session with retry logic.
         
         Args:
             max_retries: Maximum number of retry attempts
             base_delay: Base delay in seconds for exponential backoff
+            budget: LoginBudget of this API key; retries after a rate-limit
+                    error take their slot from it so they count against the
+                    same budget as the scheduler's logins
         """
         if self.is_initialized:
             print(f"   ♻️  {self.account.name} already initialized at {self.session_time}")
             return True
         
+        if self.restore_session():
+            return True
+        
         retry_count = 0
         
         while retry_count < max_retries:
@@ -60,6 +109,8 @@ class MultiAccountClient:
                 self.feed_token = self.client.getfeedToken()
                 self.session_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
                 self.is_initialized = True
+                if self.session_cache:
+                    self.session_cache.store(self.client, self.client_id)
                 
                 print(f"   ✅ {self.account.name} initialized successfully")
                 return True
@@ -71,6 +122,8 @@ class MultiAccountClient:
                     retry_count += 1
                     if retry_count < max_retries:
                         wait_time = base_delay * retry_count
+                        if budget is not None:
+                            wait_time = budget.reserve(not_before=time.time() + wait_time)
                         print(f"   ⚠️  Rate limit hit for {self.account.name}! "
                               f"Waiting {wait_time}s...")
                         time.sleep(wait_time)
@@ -92,32 +145,57 @@ class MultiAccountClient:
             
         Returns:
             API response dictionary
+            
+        Raises:
+            RateLimitDeferred: If the order would queue longer than the limiter allows
         """
         if not self.is_initialized:
             raise Exception(f"Client {self.account.name} not initialized")
         
+        # Bursts beyond the limiter's credit wait a few ms instead of being throttled
+        self.last_queue_time = self.placement_limiter.acquire()
+        self.governor.record(self.client_id, 'placeOrder')
         try:
-            response = self.client.placeOrder(order_params)
+            # Full response: callers check 'status' and read data['orderid']
+            response = self.client.placeOrderFullResponse(order_params)
             return response
         except Exception as e:
             print(f"   ❌ Error placing order in {self.account.name}: {e}")
             raise
     
-    def get_order_book(self):
-        """Fetch order book data."""
+    def get_order_book(self, deadline: float = None, hedge: bool = False):
+        """
+        Fetch order book data.
+        
+        Args:
+            deadline: Seconds to wait before giving up (None = HTTP timeout only)
+            hedge: Send a second request if the first is slower than the observed p95
+                   (only when the rate budget has room for it)
+        
+        Raises:
+            RateLimitDeferred: If the account's order book budget has no room yet
+            DeadlineExceeded: If no response arrived before the deadline
+        """
         if not self.is_initialized:
             raise Exception(f"Client {self.account.name} not initialized")
         
+        self.governor.acquire_or_defer(self.client_id, 'orderBook')
         try:
-            return self.client.orderBook()
+            return self.order_book_caller.call(deadline=deadline, hedge=hedge)
         except Exception as e:
             raise
     
     def get_trade_book(self):
-        """Fetch trade book data."""
+        """
+        Fetch trade book data.
+        
+        Raises:
+            RateLimitDeferred: If the account's trade book budget has no room yet
+        """
         if not self.is_initialized:
             raise Exception(f"Client {self.account.name} not initialized")
         
+        self.governor.acquire_or_defer(self.client_id, 'tradeBook')
         try:
             return self.client.tradeBook()
         except Exception as e:
@@ -129,6 +207,7 @@ class MultiAccountClient:
             raise Exception(f"Client {self.account.name} not initialized")
         
         try:
+            self.governor.acquire_or_defer(self.client_id, 'getProfile')
             return self.client.getProfile(self.client.refreshToken)
         except Exception as e:
             print(f"   ⚠️  Error fetching profile for {self.account.name}: {e}")
@@ -142,12 +221,23 @@ class ClientManager:
         """Initialize client manager."""
         self.master_client: MultiAccountClient = None
         self.follower_clients: List[MultiAccountClient] = []
-        self.initialization_delay = 5  # Seconds between client initializations
+        self.logins_per_minute = 3  # SmartAPI allows 3-5 session creations/minute per API key
+        self.max_parallel_logins = 8  # Logins in flight at once across all API keys
+        self.orders_per_second = 8  # Sustained placement rate per follower
+        self.order_burst = 5  # Orders a follower may place back-to-back (e.g. all legs of a spread)
+        self.max_order_queue_time = 2.0  # Seconds an order may wait before it is refused
+        self.master_pool_size = 4  # Keep-alive connections for the master (polls + hedged reads)
+        self.follower_pool_size = 2  # Keep-alive connections per follower
+        self.login_results: List[Dict] = []
     
     def initialize_clients(self, config):
         """
         Initialize all clients from configuration.
         
+        Logins run concurrently through a LoginScheduler: accounts on different
+        API keys are logged in side by side, accounts sharing a key are spaced
+        out to stay inside the login budget.
+        
         Args:
             config: MultiAccountConfig instance
         """
@@ -155,32 +245,35 @@ class ClientManager:
         print("INITIALIZING CLIENTS")
         print("="*100 + "\n")
         
-        # Initialize master account
-        print("🎯 Master Account:")
-        self.master_client = MultiAccountClient(config.master_account)
-        if not self.master_client.initialize_session():
-            raise Exception("Failed to initialize master account")
+        self.master_client = MultiAccountClient(config.master_account,
+                                                pool_maxsize=self.master_pool_size)
+        candidates = [MultiAccountClient(follower_config,
+                                         placement_limiter=self._make_placement_limiter(follower_config),
+                                         pool_maxsize=self.follower_pool_size)
+                      for follower_config in config.follower_accounts]
         
-        # Wait before initializing followers to avoid rate limits
-        if config.follower_accounts:
-            print(f"\n⏱️  Waiting {self.initialization_delay}s before initializing followers...\n")
-            time.sleep(self.initialization_delay)
+        # Master is scheduled first so it gets the earliest slot on its key
+        scheduler = LoginScheduler(logins_per_window=self.logins_per_minute,
+                                   window_seconds=60,
+                                   max_parallel=self.max_parallel_logins)
+        self.login_results = scheduler.run([self.master_client] + candidates)
         
-        # Initialize follower accounts
-        print("👥 Follower Accounts:")
-        success_count = 0
+        if not self.login_results[0]['success']:
+            raise Exception("Failed to initialize master account")
         
-        for idx, follower_config in enumerate(config.follower_accounts):
-            if idx > 0:
-                # Add delay between follower initializations
-                time.sleep(self.initialization_delay)
-            
-            follower_client = MultiAccountClient(follower_config)
-            if follower_client.initialize_session():
+        # Keep only followers that logged in successfully
+        success_count = 0
+        for follower_client, result in zip(candidates, self.login_results[1:]):
+            if result['success']:
                 self.follower_clients.append(follower_client)
                 success_count += 1
             else:
-                print(f"   ⚠️  Skipping {follower_config.name} due to initialization failure")
+                print(f"   ⚠️  Skipping {follower_client.account.name} due to initialization failure")
+        
+        scheduler.print_report(self.login_results)
+        
+        # Keep follower connections warm so the first order after a quiet spell is fast
+        shared_transports.start_warmer()
         
         print("\n" + "="*100)
         print(f"INITIALIZATION COMPLETE")
@@ -192,6 +285,15 @@ class ClientManager:
             print("⚠️  WARNING: No follower accounts initialized successfully!")
             print("   Copy trading will not execute any trades.\n")
     
+    def _make_placement_limiter(self, account: AccountConfig) -> PlacementLimiter:
+        """Create a placement limiter with this manager's settings."""
+        limiter = PlacementLimiter(rate=self.orders_per_second,
+                                   burst=self.order_burst,
+                                   max_wait=self.max_order_queue_time,
+                                   account=account.name)
+        QUEUE_DEPTH.set_function(lambda: limiter.waiting, f"placement:{account.name}")
+        return limiter
+    
     def get_all_active_followers(self) -> List[MultiAccountClient]:
         """Get list of successfully initialized follower clients."""
         return [client for client in self.follower_clients if client.is_initialized]
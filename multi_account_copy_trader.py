@@ -3,11 +3,44 @@ Multi-Account Copy Trading Manager
 Monitors master account and executes trades in multiple follower accounts.
 """
 import json
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, List, Optional
 from multi_account_config import MultiAccountConfig
 from multi_account_client import ClientManager, MultiAccountClient
+from order_feed import OrderUpdateFeed
+from copy_pipeline import CopyPipeline
+from hedged_request import HedgedCaller
+from transport import shared_transports
+from order_state import OrderBookDiffer
+from order_snapshot import OrderRecord
+from option_symbol import underlying_of
+from quantity_engine import QuantityEngine, SizingPlan
+from instrument_master import get_instrument_master
+from rate_governor import RateLimitDeferred
+from copy_latency import CopyTrace, parse_broker_time, summarize
+from metrics import POLL_ITERATION, DETECTION_LAG, COPY_ORDERS, COPY_ACK_LATENCY, QUEUE_DEPTH
+from structured_log import get_logger
+
+
+log = get_logger('copy_trader')
+
+# Text templates for the copy events; formatted by the log writer thread
+ORDER_DETECTED = (
+    "\n" + "🔔 " * 40 + "\nNEW ORDER DETECTED AT {clock}\n" + "🔔 " * 40 + "\n"
+    "\n📊 Master Account Order Details:\n"
+    "   Symbol: {symbol}\n"
+    "   Type: {transaction_type} {order_type}\n"
+    "   Quantity: {quantity}\n"
+    "   Price: {price}\n"
+    "   Product: {product}\n"
+    "   Exchange: {exchange}\n"
+    "   Status: {status}\n"
+    "   Order ID: {order_id}"
+)
+SECTION_END = "\n" + "=" * 100 + "\n"
 
 
 class CopyTradingSettings:
@@ -17,13 +50,15 @@ class CopyTradingSettings:
         """Initialize default settings."""
         # Order filtering
         self.copy_all_orders = True  # If False, only copy specific symbols
-        self.allowed_symbols = []  # Empty = all symbols allowed
-        self.blocked_symbols = []  # Symbols to never copy
+        self.allowed_symbols = []  # Empty = all symbols allowed (kept as a tuple: assign to change)
+        self.blocked_symbols = []  # Symbols to never copy (kept as a tuple: assign to change)
         
         # Quantity management
         self.use_fixed_quantity = False  # Use same quantity for all followers
         self.fixed_quantity = None  # Fixed quantity if use_fixed_quantity=True
         self.quantity_multiplier = 1.0  # Multiply master quantity by this factor
+        self.use_instrument_master = True  # Lot rounding, freeze-limit splits and tick checks
+        self.lot_rounding = 'down'  # 'down', 'nearest' or 'up' to a whole number of lots
         
         # Risk management
         self.max_order_value = None  # Maximum value per order (None = no limit)
@@ -34,6 +69,20 @@ class CopyTradingSettings:
         self.copy_limit_orders = True
         self.copy_stop_orders = True
         
+        # Execution
+        self.parallel_fan_out = True  # Send follower orders concurrently
+        self.max_concurrent_orders = 10  # Max follower orders in flight at once
+        self.decouple_placement = True  # Detect and place on separate threads (bounded queue)
+        self.copy_queue_size = 100  # Max detected orders waiting for placement
+        self.stale_order_seconds = 10  # Orders queued longer than this are reported stale
+        self.drop_stale_orders = False  # If True, skip stale orders instead of copying late
+        
+        # Detection
+        self.use_order_stream = False  # Push-based detection via order-update WebSocket
+        self.reconcile_interval = 60  # Seconds between order book reconciliations (stream mode)
+        self.order_book_deadline = 3.0  # Give up on a master order book read after this many seconds
+        self.hedge_order_book = False  # Send a second read when the first is slower than p95
+        
         # Safety features
         self.dry_run = False  # If True, simulate orders without placing them
         self.require_confirmation = False  # If True, ask before each trade
@@ -52,12 +101,18 @@ class CopyTradingSettings:
         symbol = order.get('tradingsymbol', '')
         order_type = order.get('ordertype', '').upper()
         
+        # Symbol lists may name a contract or its underlying (e.g. 'NIFTY')
+        listed = self._listed.get(symbol)
+        if listed is None:
+            listed = self._classify_symbol(symbol)
+        blocked, allowed = listed
+        
         # Check blocked symbols
-        if symbol in self.blocked_symbols:
+        if blocked:
             return False, f"Symbol {symbol} is blocked"
         
         # Check allowed symbols
-        if not self.copy_all_orders and symbol not in self.allowed_symbols:
+        if not self.copy_all_orders and not allowed:
             return False, f"Symbol {symbol} not in allowed list"
         
         # Check order type
@@ -70,6 +125,43 @@ class CopyTradingSettings:
         
         return True, "Order passes all filters"
     
+    def _classify_symbol(self, symbol: str) -> tuple:
+        """Whether a symbol (or its underlying) is blocked / allowed, remembered per symbol."""
+        underlying = underlying_of(symbol)
+        listed = (symbol in self._blocked_set or underlying in self._blocked_set,
+                  symbol in self._allowed_set or underlying in self._allowed_set)
+        if len(self._listed) >= 16384:
+            self._listed.clear()
+        self._listed[symbol] = listed
+        return listed
+    
+    @property
+    def allowed_symbols(self) -> tuple:
+        """
+        Symbols (or underlyings) to copy when copy_all_orders is False.
+        
+        A tuple, so an in-place change (which the filter would never see)
+        fails instead of being ignored - assign a new list to change it.
+        """
+        return self._allowed_symbols
+    
+    @allowed_symbols.setter
+    def allowed_symbols(self, symbols):
+        self._allowed_symbols = tuple(symbols or ())
+        self._allowed_set = frozenset(self._allowed_symbols)
+        self._listed = {}  # symbol -> (blocked, allowed), rebuilt on first use
+    
+    @property
+    def blocked_symbols(self) -> tuple:
+        """Symbols (or underlyings) never to copy (a tuple - assign to change)."""
+        return self._blocked_symbols
+    
+    @blocked_symbols.setter
+    def blocked_symbols(self, symbols):
+        self._blocked_symbols = tuple(symbols or ())
+        self._blocked_set = frozenset(self._blocked_symbols)
+        self._listed = {}
+    
     def calculate_follower_quantity(self, master_quantity: int, 
                                     follower_name: str = None) -> int:
         """
@@ -82,10 +174,23 @@ class CopyTradingSettings:
         Returns:
             Calculated quantity for follower
         """
+        return int(self.requested_quantity(master_quantity, follower_name))
+    
+    def requested_quantity(self, master_quantity: int, follower_name: str = None) -> float:
+        """
+        Get the follower quantity before any rounding (lot rounding starts from this).
+        
+        Args:
+            master_quantity: Quantity from master account
+            follower_name: Name of follower account (for account-specific rules)
+            
+        Returns:
+            Fixed quantity, or master quantity times the multiplier (may be fractional)
+        """
         if self.use_fixed_quantity and self.fixed_quantity:
             return self.fixed_quantity
         
-        return int(master_quantity * self.quantity_multiplier)
+        return master_quantity * self.quantity_multiplier
 
 
 class OrderTracker:
@@ -93,20 +198,117 @@ class OrderTracker:
     
     def __init__(self):
         """Initialize order tracker."""
-        self.known_master_orders = set()  # Order IDs seen from master
+        self.order_state = OrderBookDiffer()  # Per-order state of the master book
+        self.handled_master_orders = set()  # Master orders already sent for copying
         self.copy_records = []  # List of copy attempts
         self.failed_copies = []  # Failed copy attempts for retry
+        self.split_children = 0  # Records of child orders of a freeze-limit split
+        self.traces = {}  # Master order ID -> CopyTrace while its copy is in flight
+        self.last_snapshot = None  # Parsed master order book from the most recent poll
+        self._lock = threading.Lock()  # Followers may report from worker threads
+        self._state_lock = threading.Lock()  # Stream and poll may update state together
+    
+    @property
+    def known_master_orders(self) -> set:
+        """Order IDs seen from master."""
+        return self.order_state.known_ids()
     
     def is_new_order(self, order_id: str) -> bool:
         """Check if this is a new order we haven't seen."""
-        if order_id in self.known_master_orders:
-            return False
-        self.known_master_orders.add(order_id)
-        return True
+        return self.order_state.mark_seen(order_id)
+    
+    def claim_for_copy(self, order_id: str) -> bool:
+        """
+        Claim a master order for copying, so it is never copied twice.
+        
+        Returns:
+            True if the order had not been claimed before
+        """
+        with self._lock:
+            if order_id in self.handled_master_orders:
+                return False
+            self.handled_master_orders.add(order_id)
+            return True
+    
+    def release_claim(self, master_order: Dict):
+        """
+        Undo the claim of a master order that could not be handed on for copying.
+        
+        The order is forgotten by the differ too, so the next poll or
+        reconciliation detects it again as a completed order.
+        
+        Args:
+            master_order: Order claimed by claim_for_copy()
+        """
+        order_id = master_order.get('orderid')
+        with self._state_lock:
+            self.order_state.forget([order_id])
+        with self._lock:
+            self.handled_master_orders.discard(order_id)
+            self.traces.pop(order_id, None)
+    
+    def process_order_book(self, orders: List[Dict]) -> List[Dict]:
+        """
+        Diff a full master order book against known state.
+        
+        Args:
+            orders: Order dictionaries from master's orderBook
+            
+        Returns:
+            Orders that just completed and were claimed for copying
+        """
+        detected = time.time()
+        with self._state_lock:
+            self.last_snapshot = self.order_state.snapshot(orders)
+            events = self.order_state.diff(self.last_snapshot)
+        return self._claim_completions(events, detected)
+    
+    def process_order_update(self, order: Dict) -> List[Dict]:
+        """
+        Apply a single pushed order update.
+        
+        Args:
+            order: Order dictionary from the order update stream
+            
+        Returns:
+            The order if it just completed and was claimed for copying
+        """
+        detected = time.time()
+        with self._state_lock:
+            events = self.order_state.apply(order)
+        return self._claim_completions(events, detected)
+    
+    def _claim_completions(self, events: List, detected: float) -> List[Dict]:
+        """Claim completed orders for copying and start their latency traces."""
+        claimed = [event.order for event in events
+                   if event.is_completion and self.claim_for_copy(event.order_id)]
+        with self._lock:
+            for order in claimed:
+                self.traces[order.get('orderid')] = CopyTrace(order, detected)
+        return claimed
+    
+    def trace_for(self, master_order: Dict) -> CopyTrace:
+        """
+        Get the latency trace for a master order (started now if not detected here).
+        
+        Args:
+            master_order: Order from master account
+        """
+        with self._lock:
+            trace = self.traces.get(master_order.get('orderid'))
+            if trace is None:
+                trace = self.traces[master_order.get('orderid')] = CopyTrace(master_order)
+            return trace
+    
+    def finish_trace(self, master_order: Dict):
+        """Forget the trace of a master order whose copies are all done."""
+        with self._lock:
+            self.traces.pop(master_order.get('orderid'), None)
     
     def record_copy(self, master_order: Dict, follower_name: str, 
                    success: bool, response: Optional[Dict] = None,
-                   error: Optional[str] = None):
+                   error: Optional[str] = None, latency: Optional[Dict] = None,
+                   quantity: Optional[int] = None, part: Optional[str] = None):
         """
         Record a copy trading attempt.
         
@@ -116,29 +318,59 @@ class OrderTracker:
             success: Whether copy was successful
             response: API response if successful
             error: Error message if failed
+            latency: Stage timings from CopyTrace.follower_timings
+            quantity: Quantity placed (default: the master's)
+            part: 'i/n' for child i of a copy split into n orders at the freeze limit
         """
         record = {
             'timestamp': datetime.now().isoformat(),
             'master_order_id': master_order.get('orderid'),
             'symbol': master_order.get('tradingsymbol'),
             'transaction_type': master_order.get('transactiontype'),
-            'quantity': master_order.get('quantity'),
+            'quantity': master_order.get('quantity') if quantity is None else quantity,
             'price': master_order.get('price'),
+            'part': part,
             'follower': follower_name,
             'success': success,
             'follower_order_id': response.get('data', {}).get('orderid') if response else None,
-            'error': error
+            'error': error,
+            'latency': latency
         }
         
-        self.copy_records.append(record)
+        with self._lock:
+            self.copy_records.append(record)
+            if part is not None:
+                self.split_children += 1
+            
+            if not success:
+                self.failed_copies.append(record)
         
-        if not success:
-            self.failed_copies.append(record)
+        COPY_ORDERS.labels(follower_name, 'success' if success else 'failure').inc()
+        if latency and latency.get('acked') and latency.get('detected'):
+            COPY_ACK_LATENCY.labels(follower_name).observe(latency['acked'] - latency['detected'])
     
     def get_statistics(self) -> Dict:
-        """Get copy trading statistics."""
-        total = len(self.copy_records)
-        successful = sum(1 for r in self.copy_records if r['success'])
+        """
+        Get copy trading statistics.
+        
+        The child orders of a freeze-limit split count as one copy, which
+        succeeded if all of them did.
+        """
+        if not self.split_children:
+            total = len(self.copy_records)
+            successful = sum(1 for r in self.copy_records if r['success'])
+        else:
+            total = successful = 0
+            splits = {}  # (master order, follower) -> all children succeeded
+            for r in self.copy_records:
+                if r['part'] is None:
+                    total += 1
+                    successful += r['success']
+                else:
+                    key = (r['master_order_id'], r['follower'])
+                    splits[key] = splits.get(key, True) and r['success']
+            total += len(splits)
+            successful += sum(splits.values())
         failed = total - successful
         
         return {
@@ -148,13 +380,20 @@ class OrderTracker:
             'success_rate': (successful / total * 100) if total > 0 else 0
         }
     
+    def get_latency_statistics(self) -> Dict:
+        """Copy latency p50/p95/p99 per follower and stage (see copy_latency.INTERVALS)."""
+        with self._lock:
+            records = list(self.copy_records)
+        return summarize(records)
+    
     def save_to_file(self, filepath: str):
         """Save copy records to JSON file."""
         try:
             with open(filepath, 'w') as f:
                 json.dump({
                     'records': self.copy_records,
-                    'statistics': self.get_statistics()
+                    'statistics': self.get_statistics(),
+                    'latency': self.get_latency_statistics()
                 }, f, indent=2)
             print(f"   💾 Records saved to {filepath}")
         except Exception as e:
@@ -164,21 +403,34 @@ class OrderTracker:
 class MultiAccountCopyTrader:
     """Main copy trading manager for multiple accounts."""
     
-    def __init__(self, config: MultiAccountConfig, settings: CopyTradingSettings = None):
+    def __init__(self, config: MultiAccountConfig, settings: CopyTradingSettings = None,
+                 client_manager: ClientManager = None):
         """
         Initialize multi-account copy trader.
         
         Args:
             config: MultiAccountConfig with all account details
             settings: CopyTradingSettings for behavior customization
+            client_manager: Already-initialized ClientManager (skips logins if given)
         """
         self.config = config
         self.settings = settings or CopyTradingSettings()
-        self.client_manager = ClientManager()
         self.tracker = OrderTracker()
+        self.fan_out_spreads = []  # Seconds between first and last follower send
+        self.detection_counts = {'poll': 0, 'stream': 0, 'reconcile': 0}
+        self.order_feed = None
+        self.pipeline = None  # CopyPipeline while monitoring with decouple_placement
+        self.quantity_engine = (QuantityEngine(rounding=self.settings.lot_rounding)
+                                if self.settings.use_instrument_master else None)
+        self._executor = None
+        self._child_executor = None  # Child orders of a freeze-limit split
+        self._instrument_refresh = None  # Thread rebuilding the instrument index before each session
         
         # Initialize all clients
-        self.client_manager.initialize_clients(config)
+        if client_manager is None:
+            client_manager = ClientManager()
+            client_manager.initialize_clients(config)
+        self.client_manager = client_manager
         
         # Load initial orders to avoid copying old ones
         self._initialize_known_orders()
@@ -190,42 +442,44 @@ class MultiAccountCopyTrader:
             order_book = self.client_manager.master_client.get_order_book()
             
             if order_book and 'data' in order_book and order_book['data']:
+                self.tracker.order_state.prime(order_book['data'])
+                
+                # Orders already complete at startup must never be copied
                 for order in order_book['data']:
-                    order_id = order.get('orderid')
-                    if order_id:
-                        self.tracker.known_master_orders.add(order_id)
+                    if order.get('orderid') and order.get('status') == 'complete':
+                        self.tracker.claim_for_copy(order.get('orderid'))
                 
-                print(f"   ✅ Initialized with {len(self.tracker.known_master_orders)} "
+                print(f"   ✅ Initialized with {len(self.tracker.order_state)} "
                       f"existing orders\n")
         except Exception as e:
             print(f"   ⚠️  Error loading existing orders: {e}\n")
     
     def check_for_new_orders(self) -> List[Dict]:
         """
-        Check master account for new orders.
+        Check master account for orders that just completed.
+        
+        Orders are copied when they reach 'complete', whether they show up
+        already complete or complete on a later poll after being 'open'.
         
         Returns:
-            List of new orders detected
+            List of newly completed orders
         """
         try:
-            order_book = self.client_manager.master_client.get_order_book()
+            order_book = self.client_manager.master_client.get_order_book(
+                deadline=self.settings.order_book_deadline,
+                hedge=self.settings.hedge_order_book
+            )
             
             if not order_book or 'data' not in order_book or not order_book['data']:
                 return []
             
-            new_orders = []
-            for order in order_book['data']:
-                order_id = order.get('orderid')
-                
-                if order_id and self.tracker.is_new_order(order_id):
-                    # Only process completed orders
-                    if order.get('status') == 'complete':
-                        new_orders.append(order)
-            
-            return new_orders
+            return self.tracker.process_order_book(order_book['data'])
             
+        except RateLimitDeferred:
+            # Budget shared with other consumers is spent - the next poll will catch up
+            return []
         except Exception as e:
-            print(f"❌ Error checking for new orders: {e}")
+            log.error('poll_failed', "❌ Error checking for new orders: {error}", error=str(e))
             return []
     
     def copy_order_to_followers(self, master_order: Dict):
@@ -235,131 +489,294 @@ class MultiAccountCopyTrader:
         Args:
             master_order: Order dictionary from master account
         """
-        print("\n" + "🔔 " * 40)
-        print(f"NEW ORDER DETECTED AT {datetime.now()}")
-        print("🔔 " * 40)
+        trace = self.tracker.trace_for(master_order)
+        try:
+            self._copy_order_to_followers(master_order, trace)
+        finally:
+            self.tracker.finish_trace(master_order)
         
+        # After the fan-out, so parsing the broker time never delays a copy
+        master_time = parse_broker_time(trace.master_time)
+        if master_time is not None and trace.source:
+            DETECTION_LAG.labels(trace.source).observe(max(0.0, trace.detected - master_time))
+    
+    def _copy_order_to_followers(self, master_order: Dict, trace: CopyTrace):
+        """
+        Run the copy decision and fan-out for one master order.
+        
+        Args:
+            master_order: Order dictionary from master account
+            trace: Latency trace for this master order
+        """
         # Display order details
-        self._display_order(master_order)
+        self._display_order(master_order, trace.source)
         
         # Check if we should copy this order
         should_copy, reason = self.settings.should_copy_order(master_order)
+        trace.mark_decided()
         
         if not should_copy:
-            print(f"\n⏭️  Skipping order: {reason}\n")
-            print("="*100 + "\n")
+            log.info('copy_skipped', "\n⏭️  Skipping order: {reason}\n" + SECTION_END,
+                     order_id=master_order.get('orderid'), reason=reason)
             return
         
-        print(f"✅ Order approved for copying: {reason}")
+        log.info('copy_approved', "✅ Order approved for copying: {reason}",
+                 order_id=master_order.get('orderid'), reason=reason)
+        
+        # Prices off the tick grid would be rejected by every follower's broker
+        record = OrderRecord(master_order)  # Parsed once for every follower
+        if self.quantity_engine is not None:
+            price_error = self.quantity_engine.check_prices(record)
+            if price_error:
+                log.warning('copy_blocked', "\n🚫 Not copying: {reason}\n" + SECTION_END,
+                            order_id=master_order.get('orderid'), reason=price_error)
+                return
         
         # Get active followers
         active_followers = self.client_manager.get_all_active_followers()
         
         if not active_followers:
-            print("\n⚠️  No active follower accounts to copy to\n")
-            print("="*100 + "\n")
+            log.warning('copy_no_followers', "\n⚠️  No active follower accounts to copy to\n" + SECTION_END,
+                        order_id=master_order.get('orderid'))
             return
         
         # Dry run check
         if self.settings.dry_run:
-            print(f"\n🔍 DRY RUN MODE: Would copy to {len(active_followers)} followers")
-            self._display_order_params(master_order)
-            print("="*100 + "\n")
+            self._display_order_params(master_order, len(active_followers), record)
             return
         
         # Confirmation check
         if self.settings.require_confirmation:
+            log.flush()  # The prompt must come after the order details
             response = input(f"\n❓ Copy this order to {len(active_followers)} followers? (yes/no): ")
             if response.lower() not in ['yes', 'y']:
-                print("   ⏭️  Skipped by user\n")
-                print("="*100 + "\n")
+                log.info('copy_declined', "   ⏭️  Skipped by user\n" + SECTION_END,
+                         order_id=master_order.get('orderid'))
                 return
         
         # Copy to each follower
-        print(f"\n📤 Copying to {len(active_followers)} follower account(s)...\n")
+        log.info('fan_out_start', "\n📤 Copying to {followers} follower account(s)...\n",
+                 order_id=master_order.get('orderid'), followers=len(active_followers))
         
-        for follower_client in active_followers:
-            self._copy_to_single_follower(master_order, follower_client)
+        if self.settings.parallel_fan_out and len(active_followers) > 1:
+            send_times = self._fan_out_parallel(master_order, active_followers, trace, record)
+        else:
+            send_times = [self._copy_to_single_follower(master_order, follower_client, trace, record)
+                          for follower_client in active_followers]
         
-        print("\n" + "="*100 + "\n")
+        self._report_fan_out_spread(send_times)
+        
+        log.info('fan_out_done', SECTION_END, order_id=master_order.get('orderid'),
+                 sent=sum(1 for t in send_times if t is not None), followers=len(send_times))
+    
+    def _fan_out_parallel(self, master_order: Dict, followers: List[MultiAccountClient],
+                          trace: CopyTrace = None,
+                          record: OrderRecord = None) -> List[Optional[float]]:
+        """
+        Send the order to all followers at once using a bounded worker pool.
+        
+        Args:
+            master_order: Order from master account
+            followers: Follower clients to copy to
+            trace: Latency trace for this master order
+            record: Parsed master order (default: parsed here)
+            
+        Returns:
+            List of send timestamps (None where no order was sent)
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=max(1, self.settings.max_concurrent_orders),
+                thread_name_prefix="fan-out"
+            )
+        
+        record = record or OrderRecord(master_order)
+        futures = [self._executor.submit(self._copy_to_single_follower, master_order, client,
+                                         trace, record)
+                   for client in followers]
+        return [future.result() for future in futures]
+    
+    def _report_fan_out_spread(self, send_times: List[Optional[float]]) -> Optional[float]:
+        """
+        Report how far apart the first and last follower orders went out.
+        
+        Args:
+            send_times: Send timestamps returned by _copy_to_single_follower
+            
+        Returns:
+            Spread in seconds, or None if fewer than two orders were sent
+        """
+        sent = [t for t in send_times if t is not None]
+        if len(sent) < 2:
+            return None
+        
+        spread = max(sent) - min(sent)
+        self.fan_out_spreads.append(spread)
+        log.info('fan_out_spread',
+                 "\n⏱️  Fan-out spread: {spread_ms} ms between first and last of {sent} follower orders",
+                 spread_ms=round(spread * 1000, 1), sent=len(sent))
+        return spread
     
     def _copy_to_single_follower(self, master_order: Dict, 
-                                 follower_client: MultiAccountClient):
+                                 follower_client: MultiAccountClient,
+                                 trace: CopyTrace = None, record: OrderRecord = None):
         """
         Copy order to a single follower account.
         
         Args:
             master_order: Order from master account
             follower_client: Follower's client instance
+            trace: Latency trace for this master order (default: started now)
+            record: Parsed master order, shared by all followers (default: parsed here)
+            
+        Returns:
+            Timestamp at which the order was sent to the broker, or None
         """
+        trace = trace or self.tracker.trace_for(master_order)
         try:
-            # Calculate quantity for this follower
-            master_qty = int(master_order.get('quantity', 0))
-            follower_qty = self.settings.calculate_follower_quantity(
-                master_qty, 
+            record = record or OrderRecord(master_order)
+            
+            # Calculate quantity for this follower, in whole lots and freeze-limit sized orders
+            follower_qty = self.settings.requested_quantity(
+                record.quantity, 
                 follower_client.account.name
             )
+            plan = self._size_follower_order(record, follower_qty)
+        except Exception as e:
+            log.error('copy_result', "   ❌ {follower}: Exception - {error}",
+                      follower=follower_client.account.name, result='exception', error=str(e))
+            self.tracker.record_copy(master_order, follower_client.account.name, False, error=str(e),
+                                    latency=trace.follower_timings(None, None, None))
+            return None
+        
+        if not plan.ok:
+            # Bound to be rejected - don't spend a placement round trip or rate budget on it
+            log.warning('copy_result', "   🚫 {follower}: Not sent - {reason}",
+                        follower=follower_client.account.name, result='blocked', reason=plan.reason)
+            self.tracker.record_copy(master_order, follower_client.account.name, False, error=plan.reason)
+            return None
+        
+        if len(plan.children) == 1:
+            return self._place_follower_order(master_order, follower_client, trace, record, plan.quantity)
+        
+        log.info('copy_split', "   ✂️  {follower}: {quantity} split into {count} orders {children} "
+                 "(freeze limit)", follower=follower_client.account.name, quantity=plan.quantity,
+                 count=len(plan.children), children=plan.children)
+        if self._child_executor is None:
+            self._child_executor = ThreadPoolExecutor(
+                max_workers=max(1, self.settings.max_concurrent_orders),
+                thread_name_prefix="child-orders"
+            )
+        count = len(plan.children)
+        futures = [self._child_executor.submit(self._place_follower_order, master_order,
+                                               follower_client, trace, record, quantity,
+                                               f"{i}/{count}")
+                   for i, quantity in enumerate(plan.children, 1)]
+        sent = [t for t in (future.result() for future in futures) if t is not None]
+        return min(sent) if sent else None
+    
+    def _size_follower_order(self, record: OrderRecord, quantity: float) -> SizingPlan:
+        """
+        Size a follower's copy against the exchange's lot size and freeze limit.
+        
+        Args:
+            record: Parsed master order
+            quantity: Follower quantity from the copy settings, before any rounding
             
-            # Prepare order parameters
-            order_params = {
-                'variety': master_order.get('variety', 'NORMAL'),
-                'tradingsymbol': master_order.get('tradingsymbol'),
-                'symboltoken': master_order.get('symboltoken'),
-                'transactiontype': master_order.get('transactiontype'),
-                'exchange': master_order.get('exchange'),
-                'ordertype': master_order.get('ordertype'),
-                'producttype': master_order.get('producttype'),
-                'duration': master_order.get('duration', 'DAY'),
-                'price': str(master_order.get('price', '0')),
-                'squareoff': '0',
-                'stoploss': '0',
-                'quantity': str(follower_qty),
-            }
+        Returns:
+            SizingPlan (the quantity truncated as before if the instrument master is off)
+        """
+        if self.quantity_engine is None:
+            quantity = int(quantity)
+            return SizingPlan(quantity, [quantity], 1)
+        return self.quantity_engine.plan(record, quantity)
+    
+    def _place_follower_order(self, master_order: Dict, follower_client: MultiAccountClient,
+                              trace: CopyTrace, record: OrderRecord, quantity: int,
+                              part: Optional[str] = None):
+        """
+        Place one follower order and record the result.
+        
+        Args:
+            master_order: Order from master account
+            follower_client: Follower's client instance
+            trace: Latency trace for this master order
+            record: Parsed master order
+            quantity: Quantity of this broker order
+            part: 'i/n' if this is one child of a freeze-limit split
             
-            # Add trigger price if present
-            if master_order.get('triggerprice'):
-                order_params['triggerprice'] = str(master_order.get('triggerprice'))
+        Returns:
+            Timestamp at which the order was sent to the broker, or None
+        """
+        built_at = sent_at = acked_at = None
+        try:
+            # Prepare order parameters (common part built once per master order)
+            order_params = record.placement_params(quantity)
+            built_at = time.time()
             
             # Place order
-            print(f"   📤 {follower_client.account.name}: Placing order...")
+            log.debug('copy_sending', "   📤 {follower}: Placing order...",
+                      follower=follower_client.account.name)
+            sent_at = time.time()
             response = follower_client.place_order(order_params)
+            acked_at = time.time()
+            latency = trace.follower_timings(built_at, sent_at, acked_at)
             
             # Check response
             if response and response.get('status'):
                 order_id = response.get('data', {}).get('orderid', 'Unknown')
-                print(f"   ✅ {follower_client.account.name}: Success! Order ID: {order_id}")
+                log.info('copy_result', "   ✅ {follower}: Success! Order ID: {order_id}",
+                         follower=follower_client.account.name, result='success',
+                         order_id=order_id, ms=round((acked_at - sent_at) * 1000, 1))
                 self.tracker.record_copy(master_order, follower_client.account.name,
-                                        True, response)
+                                        True, response, latency=latency, quantity=quantity, part=part)
             else:
                 error_msg = response.get('message', 'Unknown error')
-                print(f"   ❌ {follower_client.account.name}: Failed - {error_msg}")
+                log.warning('copy_result', "   ❌ {follower}: Failed - {error}",
+                            follower=follower_client.account.name, result='failed',
+                            error=error_msg, ms=round((acked_at - sent_at) * 1000, 1))
                 self.tracker.record_copy(master_order, follower_client.account.name,
-                                        False, error=error_msg)
+                                        False, error=error_msg, latency=latency,
+                                        quantity=quantity, part=part)
                 
         except Exception as e:
-            print(f"   ❌ {follower_client.account.name}: Exception - {e}")
+            log.error('copy_result', "   ❌ {follower}: Exception - {error}",
+                      follower=follower_client.account.name, result='exception', error=str(e))
             self.tracker.record_copy(master_order, follower_client.account.name,
-                                    False, error=str(e))
-    
-    def _display_order(self, order: Dict):
-        """Display order details in a formatted way."""
-        print(f"\n📊 Master Account Order Details:")
-        print(f"   Symbol: {order.get('tradingsymbol')}")
-        print(f"   Type: {order.get('transactiontype')} {order.get('ordertype')}")
-        print(f"   Quantity: {order.get('quantity')}")
-        print(f"   Price: {order.get('price')}")
-        print(f"   Product: {order.get('producttype')}")
-        print(f"   Exchange: {order.get('exchange')}")
-        print(f"   Status: {order.get('status')}")
-        print(f"   Order ID: {order.get('orderid')}")
-    
-    def _display_order_params(self, order: Dict):
+                                    False, error=str(e),
+                                    latency=trace.follower_timings(built_at, sent_at, acked_at),
+                                    quantity=quantity, part=part)
+        
+        return sent_at
+    
+    def _display_order(self, order: Dict, source: str = None):
+        """Display order details in a formatted way (one log record)."""
+        log.info('order_detected', ORDER_DETECTED, source=source,
+                 order_id=order.get('orderid'), symbol=order.get('tradingsymbol'),
+                 transaction_type=order.get('transactiontype'), order_type=order.get('ordertype'),
+                 quantity=order.get('quantity'), price=order.get('price'),
+                 product=order.get('producttype'), exchange=order.get('exchange'),
+                 status=order.get('status'))
+    
+    def _display_order_params(self, order: Dict, followers: int, record: OrderRecord = None):
         """Display what would be copied (for dry run)."""
-        qty = self.settings.calculate_follower_quantity(int(order.get('quantity', 0)))
-        print(f"\n   Symbol: {order.get('tradingsymbol')}")
-        print(f"   Type: {order.get('transactiontype')}")
-        print(f"   Quantity: {order.get('quantity')} → {qty} (follower)")
-        print(f"   Price: {order.get('price')}")
+        record = record or OrderRecord(order)
+        plan = self._size_follower_order(record, self.settings.requested_quantity(record.quantity))
+        if not plan.ok:
+            sizing = f"not sent ({plan.reason})"
+        elif len(plan.children) > 1:
+            sizing = f"{plan.quantity} as {len(plan.children)} orders {plan.children}"
+        else:
+            sizing = str(plan.quantity)
+        log.info('copy_dry_run',
+                 "\n🔍 DRY RUN MODE: Would copy to {followers} followers\n"
+                 "\n   Symbol: {symbol}\n"
+                 "   Type: {transaction_type}\n"
+                 "   Quantity: {quantity} → {follower_quantity} (follower)\n"
+                 "   Price: {price}" + SECTION_END,
+                 order_id=order.get('orderid'), followers=followers,
+                 symbol=order.get('tradingsymbol'), transaction_type=order.get('transactiontype'),
+                 quantity=order.get('quantity'), follower_quantity=sizing, price=order.get('price'))
     
     def start_monitoring(self, interval: int = 3):
         """
@@ -378,16 +795,22 @@ class MultiAccountCopyTrader:
         print("="*100)
         print("\n⏰ Monitoring for new orders... (Press Ctrl+C to stop)\n")
         
+        self._refresh_instruments()
+        self._start_pipeline()
+        
         try:
             while True:
+                iteration_started = time.perf_counter()
                 new_orders = self.check_for_new_orders()
                 
                 for order in new_orders:
-                    self.copy_order_to_followers(order)
+                    self._dispatch_order(order, 'poll')
+                POLL_ITERATION.labels('copy_trader').observe(time.perf_counter() - iteration_started)
                 
                 time.sleep(interval)
                 
         except KeyboardInterrupt:
+            log.flush()
             print("\n\n" + "="*100)
             print("COPY TRADING STOPPED BY USER")
             print("="*100)
@@ -396,8 +819,160 @@ class MultiAccountCopyTrader:
             print(f"\n❌ Error in monitoring loop: {e}")
             self._display_summary()
     
+    def _refresh_instruments(self):
+        """
+        Rebuild the instrument index if it predates today (lot sizes change between series).
+        
+        Later rebuilds run before each session's pre-open on a background
+        thread, so a trader left running for days picks up new contracts
+        without holding up detection.
+        """
+        if self.quantity_engine is None:
+            return
+        if self.quantity_engine.instruments is None:
+            self.quantity_engine.instruments = get_instrument_master()
+        instruments = self.quantity_engine.instruments
+        if not instruments.ensure_fresh():
+            log.warning('instrument_master_missing',
+                        "⚠️  No instrument master - follower quantities are not rounded to lots")
+        if self._instrument_refresh is None:
+            self._instrument_refresh = instruments.start_daily_refresh()
+    
+    def _start_pipeline(self):
+        """Start the placement stage if detection and placement are decoupled."""
+        if self.settings.decouple_placement and self.pipeline is None:
+            self.pipeline = CopyPipeline(self.copy_order_to_followers,
+                                         maxsize=self.settings.copy_queue_size,
+                                         stale_after=self.settings.stale_order_seconds,
+                                         drop_stale=self.settings.drop_stale_orders)
+            self.pipeline.start()
+            QUEUE_DEPTH.set_function(lambda: self.pipeline.depth if self.pipeline else None,
+                                     'copy_pipeline')
+    
+    def _dispatch_order(self, order: Dict, source: str):
+        """
+        Hand a detected master order to the placement stage.
+        
+        Args:
+            order: Completed master order
+            source: How it was detected ('poll', 'stream', 'reconcile')
+        """
+        self.detection_counts[source] += 1
+        self.tracker.trace_for(order).source = source
+        if self.pipeline:
+            if not self.pipeline.submit(order, source):
+                # Queue full: leave the order to the next poll / reconciliation
+                self.tracker.release_claim(order)
+        else:
+            self.copy_order_to_followers(order)
+    
+    def _on_streamed_order(self, order: Dict):
+        """Handle an order pushed by the order update stream."""
+        for completed in self.tracker.process_order_update(order):
+            self._dispatch_order(completed, 'stream')
+    
+    def start_streaming(self, reconcile_interval: int = None, url: str = None):
+        """
+        Start copying from the master's order update stream.
+        
+        The WebSocket stream is the primary source. The order book is still
+        polled, but only every reconcile_interval seconds and right after a
+        reconnect, to pick up anything the stream missed.
+        
+        Args:
+            reconcile_interval: Seconds between reconciliation polls
+                                (default: settings.reconcile_interval)
+            url: Order update WebSocket URL (default: Config.ORDER_FEED_URL)
+        """
+        reconcile_interval = reconcile_interval or self.settings.reconcile_interval
+        master = self.client_manager.master_client
+        reconcile_now = threading.Event()
+        
+        self.order_feed = OrderUpdateFeed(
+            auth_token=master.client.access_token,
+            api_key=master.api_key,
+            client_code=master.client_id,
+            feed_token=master.feed_token,
+            on_order=self._on_streamed_order,
+            on_reconnect=reconcile_now.set,
+            url=url
+        )
+        
+        print("\n" + "="*100)
+        print("MULTI-ACCOUNT COPY TRADING STARTED (ORDER STREAM)")
+        print("="*100)
+        print(f"Master Account: {self.config.master_account.client_id}")
+        print(f"Follower Accounts: {len(self.client_manager.get_all_active_followers())}")
+        print(f"Order Stream: {self.order_feed.url}")
+        print(f"Reconciliation Interval: {reconcile_interval} seconds")
+        print(f"Dry Run Mode: {'ON ⚠️' if self.settings.dry_run else 'OFF'}")
+        print("="*100)
+        print("\n⏰ Listening for order updates... (Press Ctrl+C to stop)\n")
+        
+        self._refresh_instruments()
+        self._start_pipeline()
+        self.order_feed.start()
+        
+        try:
+            while True:
+                reconcile_now.wait(timeout=reconcile_interval)
+                reconcile_now.clear()
+                
+                for order in self.check_for_new_orders():
+                    self._dispatch_order(order, 'reconcile')
+                
+        except KeyboardInterrupt:
+            log.flush()
+            print("\n\n" + "="*100)
+            print("COPY TRADING STOPPED BY USER")
+            print("="*100)
+            self.order_feed.stop()
+            self._display_summary()
+        except Exception as e:
+            print(f"\n❌ Error in streaming loop: {e}")
+            self.order_feed.stop()
+            self._display_summary()
+    
+    def _display_placement_queues(self):
+        """Display how long follower orders waited for their placement limiter."""
+        lines = []
+        for follower in self.client_manager.get_all_active_followers():
+            stats = follower.placement_limiter.get_statistics()
+            if stats['queued_orders'] or stats['refused_orders']:
+                lines.append(f"      {follower.account.name}: {stats['queued_orders']}/{stats['orders']} "
+                             f"queued, avg {stats['avg_queue_ms']:.0f} ms, "
+                             f"max {stats['max_queue_ms']:.0f} ms, "
+                             f"refused {stats['refused_orders']}")
+        if lines:
+            print("   Placement Queueing:")
+            for line in lines:
+                print(line)
+    
+    def _display_copy_latency(self):
+        """Display master-to-follower copy latency percentiles per follower."""
+        latency = self.tracker.get_latency_statistics()
+        if not latency:
+            return
+        print("   Copy Latency (p50 / p95 / p99):")
+        for follower, intervals in latency.items():
+            parts = []
+            for name, label in (('fill_to_ack', 'fill→ack'), ('detect_to_ack', 'detect→ack'),
+                                ('send_to_ack', 'send→ack')):
+                if name in intervals:
+                    i = intervals[name]
+                    parts.append(f"{label} {i['p50_ms']:.0f}/{i['p95_ms']:.0f}/{i['p99_ms']:.0f} ms")
+            print(f"      {follower}: {', '.join(parts)}")
+    
     def _display_summary(self):
         """Display copy trading session summary."""
+        pipeline_stats = None
+        if self.pipeline:
+            print("\n⏳ Finishing queued copies...")
+            self.pipeline.stop()
+            pipeline_stats = self.pipeline.get_statistics()
+            self.pipeline = None
+        log.flush()  # Copy events from the queued orders come before the summary
+        
         stats = self.tracker.get_statistics()
         
         print("\n📊 Session Summary:")
@@ -405,6 +980,47 @@ class MultiAccountCopyTrader:
         print(f"   Successful: {stats['successful']}")
         print(f"   Failed: {stats['failed']}")
         print(f"   Success Rate: {stats['success_rate']:.1f}%")
+        if self.fan_out_spreads:
+            avg_spread = sum(self.fan_out_spreads) / len(self.fan_out_spreads)
+            print(f"   Fan-out Spread: avg {avg_spread * 1000:.1f} ms, "
+                  f"max {max(self.fan_out_spreads) * 1000:.1f} ms")
+        
+        if self.detection_counts['stream'] or self.detection_counts['reconcile']:
+            print(f"   Detected via Stream: {self.detection_counts['stream']}, "
+                  f"via Reconciliation: {self.detection_counts['reconcile']}")
+        
+        if pipeline_stats:
+            print(f"   Copy Queue: {pipeline_stats['processed']}/{pipeline_stats['submitted']} processed, "
+                  f"max depth {pipeline_stats['max_depth']}, "
+                  f"avg wait {pipeline_stats['avg_queue_ms']:.1f} ms, "
+                  f"max wait {pipeline_stats['max_queue_ms']:.1f} ms, "
+                  f"dropped {pipeline_stats['dropped']}, stale {pipeline_stats['stale']}")
+        
+        self._display_placement_queues()
+        self._display_copy_latency()
+        
+        caller = getattr(self.client_manager.master_client, 'order_book_caller', None)
+        if isinstance(caller, HedgedCaller) and caller.calls:
+            read_stats = caller.get_statistics()
+            print(f"   Order Book Reads: {read_stats['calls']}, "
+                  f"deadline misses {read_stats['deadline_misses']}, "
+                  f"refused while stalled {read_stats['saturated']}, "
+                  f"hedges {read_stats['hedges_won']}/{read_stats['hedges_sent']} won "
+                  f"({read_stats['hedges_skipped']} skipped for budget or workers), "
+                  f"saved {read_stats['time_saved_ms']:.0f} ms")
+        
+        transport_stats = shared_transports.get_statistics()
+        if transport_stats:
+            requests_sent = sum(t['requests'] for t in transport_stats.values())
+            handshakes = sum(t['handshakes'] for t in transport_stats.values())
+            connect_ms = sum(t['connect_ms_total'] for t in transport_stats.values())
+            print(f"   HTTP Connections: {handshakes} handshakes for {requests_sent} requests "
+                  f"({connect_ms:.0f} ms spent connecting)")
+        
+        for executor in (self._executor, self._child_executor):
+            if executor is not None:
+                executor.shutdown(wait=False)
+        self._executor = self._child_executor = None
         
         # Save records
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
@@ -0,0 +1,80 @@
+"""
+Option trading-symbol parsing.
+Splits exchange option symbols into underlying, expiry, strike and option
+type with one compiled pattern. Results are memoized (and their strings
+interned), so each distinct symbol is parsed once per process however many
+orders, polls and filters look at it.
+"""
+import re
+import sys
+from datetime import date, datetime
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+
+# Underlying, expiry, strike, CE/PE. Expiry is DDMMMYY (NFO, e.g. NIFTY28OCT2525000CE)
+# or YYMDD with M = 1-9/O/N/D (BFO weeklies, e.g. SENSEX25O2382000CE)
+OPTION_SYMBOL = re.compile(
+    r'^(?P<underlying>[A-Z0-9&-]+?)'
+    r'(?P<expiry>\d{2}[A-Z]{3}\d{2}|\d{2}[1-9OND]\d{2})'
+    r'(?P<strike>\d+(?:\.\d+)?)'
+    r'(?P<option_type>CE|PE)$'
+)
+
+# Month letters of YYMDD expiries
+_WEEKLY_MONTHS = {'O': 10, 'N': 11, 'D': 12}
+
+
+class OptionSymbol(NamedTuple):
+    """Parts of an option trading symbol."""
+    underlying: str
+    expiry: str  # As written in the symbol ('28OCT25' or '25O23')
+    strike: float
+    option_type: str  # 'CE' or 'PE'
+
+    @property
+    def expiry_date(self) -> date:
+        """Expiry as a date."""
+        if len(self.expiry) == 5:  # YYMDD
+            month = self.expiry[2]
+            return date(2000 + int(self.expiry[:2]), _WEEKLY_MONTHS.get(month) or int(month),
+                        int(self.expiry[3:]))
+        return datetime.strptime(self.expiry, '%d%b%y').date()
+
+
+@lru_cache(maxsize=16384)
+def parse_option_symbol(symbol: str) -> Optional[OptionSymbol]:
+    """
+    Parse an option trading symbol (memoized).
+
+    Args:
+        symbol: Trading symbol, e.g. 'NIFTY28OCT2525000CE'
+
+    Returns:
+        OptionSymbol, e.g. ('NIFTY', '28OCT25', 25000.0, 'CE'), or None if
+        the symbol is not an option (equities, futures, indices)
+    """
+    match = OPTION_SYMBOL.match(symbol) if isinstance(symbol, str) else None
+    if match is None:
+        return None
+    underlying, expiry, strike, option_type = match.groups()
+    return OptionSymbol(sys.intern(underlying), sys.intern(expiry), float(strike), sys.intern(option_type))
+
+
+def is_option_symbol(symbol: str) -> bool:
+    """Whether a trading symbol is an option (CE or PE)."""
+    return parse_option_symbol(symbol) is not None
+
+
+def underlying_of(symbol: str) -> str:
+    """
+    Get the underlying of an option symbol.
+
+    Args:
+        symbol: Trading symbol
+
+    Returns:
+        Underlying for options (e.g. 'NIFTY'), otherwise the symbol itself
+    """
+    option = parse_option_symbol(symbol)
+    return option.underlying if option else symbol
@@ -0,0 +1,176 @@
+"""
+Push-based order updates from the SmartAPI order-status WebSocket.
+Delivers each order change as soon as the broker publishes it, instead of
+waiting for the next order book poll.
+"""
+import json
+import socket
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+import websocket
+
+from config import Config
+
+
+class OrderUpdateFeed:
+    """
+    Background WebSocket client for the order-status stream.
+
+    Every message carrying an order is handed to on_order as an order-book
+    style dictionary. on_reconnect fires whenever the connection comes back
+    after a drop, so the caller can reconcile anything missed meanwhile.
+    """
+
+    HEARTBEAT_INTERVAL = 10  # Seconds between WebSocket pings
+    HEARTBEAT_TIMEOUT = 5  # Seconds to wait for a pong (also bounds shutdown time)
+    RECONNECT_DELAY = 5  # Seconds to wait before reconnecting
+
+    def __init__(self, auth_token: str, api_key: str, client_code: str, feed_token: str,
+                 on_order: Callable[[Dict], None],
+                 on_reconnect: Optional[Callable[[], None]] = None,
+                 url: Optional[str] = None):
+        """
+        Initialize order update feed.
+
+        Args:
+            auth_token: JWT access token of the account to watch
+            api_key: SmartAPI key
+            client_code: Angel One client ID
+            feed_token: Feed token from the session
+            on_order: Called with each updated order dictionary
+            on_reconnect: Called after the connection is re-established
+            url: WebSocket URL (default: Config.ORDER_FEED_URL)
+        """
+        self.url = url or Config.ORDER_FEED_URL
+        if not auth_token.startswith('Bearer '):
+            auth_token = 'Bearer ' + auth_token
+        self.headers = {
+            'Authorization': auth_token,
+            'x-api-key': api_key,
+            'x-client-code': client_code,
+            'x-feed-token': feed_token,
+        }
+        self.on_order = on_order
+        self.on_reconnect = on_reconnect
+
+        self.wsapp = None
+        self._thread = None
+        self.connected = threading.Event()
+        self.connect_count = 0
+        self.messages_received = 0
+        self.orders_received = 0
+        self.last_message_time = None
+
+    def start(self):
+        """Connect in a background thread (reconnects automatically)."""
+        if self._thread and self._thread.is_alive():
+            return
+
+        self.wsapp = websocket.WebSocketApp(
+            self.url,
+            header=self.headers,
+            on_open=self._on_open,
+            on_reconnect=self._on_open,  # websocket-client reports reconnects separately
+            on_message=self._on_message,
+            on_error=self._on_error,
+            on_close=self._on_close,
+        )
+        self._thread = threading.Thread(target=self._run, name="order-feed", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        """Run the WebSocket loop until stop() is called."""
+        self.wsapp.run_forever(ping_interval=self.HEARTBEAT_INTERVAL,
+                               ping_timeout=self.HEARTBEAT_TIMEOUT,
+                               reconnect=self.RECONNECT_DELAY)
+
+    def stop(self):
+        """Close the connection and stop reconnecting."""
+        if self.wsapp:
+            self.wsapp.keep_running = False
+            # Shut the socket down and let the reader thread tear it down
+            # itself: closing the fd under a blocked select() doesn't wake it
+            raw_sock = getattr(self.wsapp.sock, 'sock', None)
+            if raw_sock:
+                try:
+                    raw_sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+            if self._thread:
+                self._thread.join(timeout=1)
+            if not self._thread or self._thread.is_alive():
+                self.wsapp.close()
+        if self._thread:
+            self._thread.join(timeout=self.HEARTBEAT_TIMEOUT)
+        self.connected.clear()
+
+    def _on_open(self, wsapp):
+        """Callback when the connection (re)opens."""
+        self.connect_count += 1
+        self.connected.set()
+        if self.connect_count == 1:
+            print(f"[{datetime.now()}] 📡 Order update stream connected")
+        else:
+            print(f"[{datetime.now()}] 📡 Order update stream reconnected "
+                  f"(#{self.connect_count - 1}) - reconciling")
+            if self.on_reconnect:
+                self.on_reconnect()
+
+    def _on_close(self, wsapp, close_status_code=None, close_msg=None):
+        """Callback when the connection closes."""
+        self.connected.clear()
+        print(f"[{datetime.now()}] ⚠️  Order update stream closed")
+
+    def _on_error(self, wsapp, error):
+        """Callback when a WebSocket error occurs."""
+        print(f"[{datetime.now()}] ⚠️  Order update stream error: {error}")
+
+    def _on_message(self, wsapp, message):
+        """Callback for each message from the stream."""
+        self.messages_received += 1
+        self.last_message_time = time.time()
+
+        order = self.parse_message(message)
+        if order:
+            self.orders_received += 1
+            try:
+                self.on_order(order)
+            except Exception as e:
+                print(f"Error handling order update: {e}")
+
+    @staticmethod
+    def parse_message(message) -> Optional[Dict]:
+        """
+        Extract the order from an order-status message.
+
+        Messages look like {"status-code": "200", "order-status": "AB02",
+        "orderData": {...order book fields...}}. Heartbeats ('pong') and the
+        initial connection acknowledgement carry no order and return None.
+
+        Args:
+            message: Raw message (str or bytes)
+
+        Returns:
+            Order dictionary, or None if the message carries no order
+        """
+        if isinstance(message, bytes):
+            message = message.decode('utf-8', errors='replace')
+        if not message or message in ('pong', 'ping'):
+            return None
+
+        try:
+            data = json.loads(message)
+        except ValueError:
+            return None
+
+        order = data.get('orderData') if isinstance(data, dict) else None
+        if not isinstance(order, dict) or not order.get('orderid'):
+            return None
+
+        # The stream reports status as 'orderstatus' in some payloads
+        if not order.get('status') and order.get('orderstatus'):
+            order['status'] = order['orderstatus']
+        return order
@@ -0,0 +1,241 @@
+"""
+Local stand-in for the SmartAPI order-status WebSocket.
+Lets the push-based order feed be exercised offline (tests, simulator, demos).
+
+Usage:
+    server = LocalOrderFeedServer()
+    url = server.start()            # ws://127.0.0.1:<port>
+    server.push_order({...})        # broadcast an order update
+    server.drop_clients()           # simulate a disconnect
+    server.stop()
+"""
+import base64
+import hashlib
+import json
+import socket
+import struct
+import threading
+from typing import Dict, List, Optional
+
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+OPCODE_TEXT = 0x1
+OPCODE_CLOSE = 0x8
+OPCODE_PING = 0x9
+OPCODE_PONG = 0xA
+
+
+def _encode_frame(opcode: int, payload: bytes) -> bytes:
+    """Build an unmasked (server-to-client) WebSocket frame."""
+    header = bytes([0x80 | opcode])
+    length = len(payload)
+    if length < 126:
+        header += bytes([length])
+    elif length < 65536:
+        header += bytes([126]) + struct.pack('!H', length)
+    else:
+        header += bytes([127]) + struct.pack('!Q', length)
+    return header + payload
+
+
+def _recv_exact(conn: socket.socket, size: int) -> bytes:
+    """Read exactly size bytes or raise ConnectionError."""
+    data = b''
+    while len(data) < size:
+        chunk = conn.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("Client disconnected")
+        data += chunk
+    return data
+
+
+def _read_frame(conn: socket.socket):
+    """Read one (masked, client-to-server) frame. Returns (opcode, payload)."""
+    first, second = _recv_exact(conn, 2)
+    opcode = first & 0x0F
+    length = second & 0x7F
+    if length == 126:
+        length = struct.unpack('!H', _recv_exact(conn, 2))[0]
+    elif length == 127:
+        length = struct.unpack('!Q', _recv_exact(conn, 8))[0]
+    mask = _recv_exact(conn, 4) if second & 0x80 else None
+    payload = _recv_exact(conn, length)
+    if mask:
+        payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+    return opcode, payload
+
+
+class LocalOrderFeedServer:
+    """Minimal WebSocket server speaking the order-status message format."""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0):
+        """
+        Initialize stub server.
+
+        Args:
+            host: Interface to bind (default: localhost only)
+            port: Port to bind (default: 0 = pick a free port)
+        """
+        self.host = host
+        self.port = port
+        self._sock = None
+        self._clients: List[socket.socket] = []
+        self._lock = threading.Lock()
+        self._running = False
+        self.connection_headers: List[Dict[str, str]] = []  # Headers of each handshake
+
+    @property
+    def url(self) -> str:
+        """WebSocket URL clients should connect to."""
+        return f"ws://{self.host}:{self.port}"
+
+    def start(self) -> str:
+        """
+        Start accepting connections in a background thread.
+
+        Returns:
+            WebSocket URL of the server
+        """
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind((self.host, self.port))
+        self._sock.listen(16)
+        self.port = self._sock.getsockname()[1]
+        self._running = True
+        threading.Thread(target=self._accept_loop, name="order-feed-stub", daemon=True).start()
+        return self.url
+
+    def stop(self):
+        """Stop the server and disconnect all clients."""
+        self._running = False
+        self.drop_clients()
+        if self._sock:
+            self._sock.close()
+
+    @property
+    def client_count(self) -> int:
+        """Number of currently connected clients."""
+        with self._lock:
+            return len(self._clients)
+
+    def push_order(self, order: Dict, order_status: str = 'AB02'):
+        """
+        Broadcast an order update to all connected clients.
+
+        Args:
+            order: Order dictionary (order book fields)
+            order_status: Broker order-status code for the message
+        """
+        self.push_raw(json.dumps({
+            'user-id': order.get('clientcode', ''),
+            'status-code': '200',
+            'order-status': order_status,
+            'error-message': '',
+            'orderData': order,
+        }))
+
+    def push_raw(self, message: str):
+        """Broadcast a raw text message to all connected clients."""
+        frame = _encode_frame(OPCODE_TEXT, message.encode('utf-8'))
+        with self._lock:
+            clients = list(self._clients)
+        for conn in clients:
+            try:
+                conn.sendall(frame)
+            except OSError:
+                self._remove(conn)
+
+    def drop_clients(self):
+        """Abruptly disconnect every client (simulates a network drop)."""
+        with self._lock:
+            clients, self._clients = self._clients, []
+        for conn in clients:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            conn.close()
+
+    def _remove(self, conn: socket.socket):
+        """Forget a client connection."""
+        with self._lock:
+            if conn in self._clients:
+                self._clients.remove(conn)
+        try:
+            conn.close()
+        except OSError:
+            pass
+
+    def _accept_loop(self):
+        """Accept clients until stopped."""
+        while self._running:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                break
+            threading.Thread(target=self._serve_client, args=(conn,), daemon=True).start()
+
+    def _handshake(self, conn: socket.socket) -> Optional[Dict[str, str]]:
+        """Perform the HTTP upgrade. Returns request headers, or None on failure."""
+        request = b''
+        while b'\r\n\r\n' not in request:
+            chunk = conn.recv(4096)
+            if not chunk:
+                return None
+            request += chunk
+
+        lines = request.split(b'\r\n\r\n')[0].decode('latin-1').split('\r\n')
+        headers = {}
+        for line in lines[1:]:
+            if ':' in line:
+                name, value = line.split(':', 1)
+                headers[name.strip().lower()] = value.strip()
+
+        key = headers.get('sec-websocket-key')
+        if not key:
+            return None
+
+        accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode()).digest()).decode()
+        conn.sendall((
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n\r\n"
+        ).encode())
+        return headers
+
+    def _serve_client(self, conn: socket.socket):
+        """Handshake, send the connect acknowledgement, then answer heartbeats."""
+        try:
+            headers = self._handshake(conn)
+            if headers is None:
+                conn.close()
+                return
+
+            with self._lock:
+                self.connection_headers.append(headers)
+                self._clients.append(conn)
+
+            # The real service acknowledges with an order-less message
+            conn.sendall(_encode_frame(OPCODE_TEXT, json.dumps({
+                'user-id': headers.get('x-client-code', ''),
+                'status-code': '200',
+                'order-status': 'AB00',
+                'error-message': '',
+                'orderData': {},
+            }).encode()))
+
+            while self._running:
+                opcode, payload = _read_frame(conn)
+                if opcode == OPCODE_PING:
+                    conn.sendall(_encode_frame(OPCODE_PONG, payload))
+                elif opcode == OPCODE_TEXT and payload == b'ping':
+                    conn.sendall(_encode_frame(OPCODE_TEXT, b'pong'))
+                elif opcode == OPCODE_CLOSE:
+                    conn.sendall(_encode_frame(OPCODE_CLOSE, payload[:2]))
+                    break
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self._remove(conn)
@@ -2,8 +2,11 @@
 Order monitoring functions for checking and displaying orders.
 """
 from datetime import datetime, timedelta
-from order_utils import filter_and_aggregate_orders, is_option_order, filter_trades_by_date
+from order_utils import filter_and_aggregate_orders, is_option_order
+from trade_history import get_trade_history
+from config import IST
 from display import display_option_order, display_aggregated_orders, display_trades
+from structured_log import get_logger
 
 
 def check_option_orders(client):
@@ -26,24 +29,36 @@ def check_option_orders(client):
                 # Display all orders (not just options, if you want all)
                 # Change the condition below to display only specific types
                 display_option_order(order)
+            get_logger('orders').flush()  # Written before anything printed after this report
         else:
             print(f"[{datetime.now()}] No order data returned or empty order book.")
     except Exception as e:
         print(f"Error while fetching order book: {e}")
 
 
-def check_and_display_aggregated_orders(client):
+def check_and_display_aggregated_orders(client, aggregates=None):
     """
     Fetch orders and display aggregated view by symbol and transaction type.
     
     Args:
         client: SmartAPIClient instance
+        aggregates: RunningAggregates kept across polls (optional). Only new and
+                    changed orders are folded in, and the view is displayed
+                    when it changed (always on the first poll).
     """
     try:
         order_book = client.get_order_book()
-        if order_book is not None and 'data' in order_book and order_book['data'] is not None:
+        orders = order_book.get('data') if order_book is not None else None
+        if orders is None and aggregates is not None and order_book and order_book.get('status'):
+            orders = []  # Empty book (e.g. after the daily reset): clears the running view
+        if orders is not None:
             # Get aggregated orders
-            aggregated_orders = filter_and_aggregate_orders(order_book['data'])
+            if aggregates is None:
+                aggregated_orders = filter_and_aggregate_orders(orders)
+            elif aggregates.update(orders):
+                aggregated_orders = aggregates.rows()
+            else:
+                return  # Nothing changed since the last display
             display_aggregated_orders(aggregated_orders)
         else:
             print(f"[{datetime.now()}] No order data returned or empty order book.")
@@ -51,22 +66,23 @@ def check_and_display_aggregated_orders(client):
         print(f"Error while fetching order book: {e}")
 
 
-def get_trading_history_for_date(client, days_ago=2):
+def get_trading_history_for_date(client, days_ago=2, symbol=None, store=None):
     """
     Get trading history for a specific date.
     
+    The broker's trade book only holds today, so earlier days come from the
+    local trade history store; the API is only called when the date is today.
+    
     Args:
         client: SmartAPIClient instance
         days_ago: Number of days ago to check (default: 2)
+        symbol: Only trades in this trading symbol (optional)
+        store: TradeHistoryStore (default: the process-wide one)
     """
     try:
-        target_date = (datetime.now() - timedelta(days=days_ago)).date()
-        response = client.get_trade_book()
-        
-        if response and 'data' in response and response['data']:
-            filtered_trades = filter_trades_by_date(response['data'], target_date)
-            display_trades(filtered_trades, str(target_date))
-        else:
-            print(f"No trading history data returned from API.")
+        target_date = (datetime.now(IST) - timedelta(days=days_ago)).date()
+        store = store or get_trade_history()
+        trades = store.history(client, target_date, symbol=symbol)
+        display_trades(trades, str(target_date))
     except Exception as e:
         print(f"Error fetching trading history: {e}")
@@ -0,0 +1,188 @@
+"""
+Parsed order book snapshot shared by every consumer of a poll.
+Each order book response is turned into compact OrderRecords once (typed
+numbers, interned strings, the differ's fingerprint), instead of every
+consumer repeating .get() lookups and float() conversions on the raw dicts.
+"""
+import sys
+import time
+from typing import Callable, Dict, Iterator, List, Optional
+
+
+# Statuses an order never leaves
+TERMINAL_STATUSES = frozenset({'complete', 'rejected', 'cancelled'})
+
+_intern = sys.intern
+
+
+def fingerprint(order: Dict) -> tuple:
+    """Fields whose change is worth an event, in a cheap-to-compare tuple."""
+    return (
+        order.get('status'),
+        order.get('filledshares'),
+        order.get('quantity'),
+        order.get('price'),
+        order.get('triggerprice'),
+        order.get('ordertype'),
+    )
+
+
+def to_int(value) -> int:
+    """Convert a broker numeric field ('50', '50.0', 50, None) to int."""
+    try:
+        return int(float(value or 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+def to_float(value) -> float:
+    """Convert a broker numeric field ('101.5', 101.5, '', None) to float."""
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _text(value) -> str:
+    """Interned string for a repeated categorical field (symbols, sides, statuses)."""
+    return _intern(value) if isinstance(value, str) else ''
+
+
+class OrderRecord:
+    """One order book row, parsed once."""
+
+    __slots__ = ('order_id', 'symbol', 'symbol_token', 'exchange', 'transaction_type',
+                 'order_type', 'product_type', 'variety', 'duration', 'status',
+                 'quantity', 'quantity_exact', 'filled', 'price', 'trigger_price', 'average_price',
+                 'fingerprint', 'raw', '_params')
+
+    def __init__(self, order: Dict, order_fingerprint: tuple = None):
+        """
+        Parse an order.
+
+        Args:
+            order: Order dictionary from the orderBook API (kept as .raw)
+            order_fingerprint: fingerprint(order), if already computed
+        """
+        get = order.get
+        self.order_id = get('orderid')
+        self.symbol = _text(get('tradingsymbol'))
+        self.symbol_token = get('symboltoken')
+        self.exchange = _text(get('exchange'))
+        self.transaction_type = _text(get('transactiontype'))
+        self.order_type = _text(get('ordertype'))
+        self.product_type = _text(get('producttype'))
+        self.variety = _text(get('variety')) or 'NORMAL'
+        self.duration = _text(get('duration')) or 'DAY'
+        self.status = _text(get('status'))
+        self.quantity_exact = to_float(get('quantity'))  # As the aggregations sum it
+        self.quantity = int(self.quantity_exact)
+        self.filled = to_int(get('filledshares'))
+        self.price = to_float(get('price'))
+        self.trigger_price = to_float(get('triggerprice'))
+        self.average_price = to_float(get('averageprice'))
+        self.fingerprint = order_fingerprint or fingerprint(order)
+        self.raw = order
+        self._params = None
+
+    @property
+    def terminal(self) -> bool:
+        """True once the order can no longer change."""
+        return self.status in TERMINAL_STATUSES
+
+    def placement_params(self, quantity: int) -> Dict[str, str]:
+        """
+        Order parameters for copying this order with another quantity.
+
+        The common part is built once per record, so a fan-out to many
+        followers only copies a small dict per follower.
+
+        Args:
+            quantity: Follower quantity
+
+        Returns:
+            placeOrder parameters
+        """
+        if self._params is None:
+            raw = self.raw
+            params = {
+                'variety': self.variety,
+                'tradingsymbol': raw.get('tradingsymbol'),
+                'symboltoken': self.symbol_token,
+                'transactiontype': raw.get('transactiontype'),
+                'exchange': raw.get('exchange'),
+                'ordertype': raw.get('ordertype'),
+                'producttype': raw.get('producttype'),
+                'duration': self.duration,
+                'price': str(raw.get('price', '0')),
+                'squareoff': '0',
+                'stoploss': '0',
+            }
+            if raw.get('triggerprice'):
+                params['triggerprice'] = str(raw.get('triggerprice'))
+            self._params = params
+        params = dict(self._params)
+        params['quantity'] = str(quantity)
+        return params
+
+    def __repr__(self):
+        return f"OrderRecord({self.order_id}, {self.symbol}, {self.status})"
+
+
+class OrderBookSnapshot:
+    """
+    All orders of one order book response, as OrderRecords.
+
+    Built by OrderBookDiffer.snapshot(), which reuses the record of every
+    order that has not changed since the last poll, so a poll only parses
+    new and changed orders. The full record list is only assembled when a
+    consumer (aggregation, lookups) asks for it; a poll that just diffs
+    touches the new and changed orders alone.
+    """
+
+    __slots__ = ('_records', '_orders', '_resolve', 'fresh', 'taken_at', '_by_id')
+
+    def __init__(self, records: Optional[List[OrderRecord]], fresh: List[OrderRecord] = None,
+                 taken_at: float = None, orders: List[Dict] = None,
+                 resolve: Callable[[List[Dict], List[OrderRecord]], List[OrderRecord]] = None):
+        """
+        Initialize snapshot.
+
+        Args:
+            records: Every order, in order book order (None = built from orders on first use)
+            fresh: Records parsed for this snapshot (new or changed); default: all
+            taken_at: When the response was received (default: now)
+            orders: Order dictionaries of the response (when records is None)
+            resolve: Gives the records of (orders, fresh) (when records is None)
+        """
+        self._records = records
+        self._orders = orders
+        self._resolve = resolve
+        self.fresh = records if fresh is None else fresh
+        self.taken_at = time.time() if taken_at is None else taken_at
+        self._by_id: Optional[Dict[str, OrderRecord]] = None
+
+    @classmethod
+    def from_orders(cls, orders) -> 'OrderBookSnapshot':
+        """Parse every order of a response (no reuse)."""
+        return cls([OrderRecord(order) for order in orders or ()])
+
+    @property
+    def records(self) -> List[OrderRecord]:
+        """Every order, in order book order."""
+        if self._records is None:
+            self._records = self._resolve(self._orders, self.fresh)
+            self._orders = self._resolve = None
+        return self._records
+
+    def __len__(self):
+        return len(self._records if self._records is not None else self._orders)
+
+    def __iter__(self) -> Iterator[OrderRecord]:
+        return iter(self.records)
+
+    def get(self, order_id: str) -> Optional[OrderRecord]:
+        """Look up an order by ID (index built on first use)."""
+        if self._by_id is None:
+            self._by_id = {record.order_id: record for record in self.records}
+        return self._by_id.get(order_id)
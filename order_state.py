@@ -0,0 +1,272 @@
+"""
+Order book differ shared by all order monitors.
+Keeps per-order state and turns each order book poll into typed events
+(new order, status change, modification, partial fill).
+"""
+from typing import Dict, Iterable, List, Optional, Union
+
+from order_snapshot import (TERMINAL_STATUSES, OrderBookSnapshot, OrderRecord,
+                            fingerprint as _fingerprint, to_int as _to_int)
+
+
+# Marker for order IDs known by ID only (see OrderBookDiffer.mark_seen)
+_UNOBSERVED = None
+
+_MISSING = object()
+
+
+class OrderEvent:
+    """A single change detected in the order book."""
+
+    NEW = 'new'
+    STATUS_CHANGE = 'status_change'
+    MODIFIED = 'modified'
+    PARTIAL_FILL = 'partial_fill'
+
+    __slots__ = ('kind', 'order_id', 'order', 'status', 'previous_status', 'filled_delta')
+
+    def __init__(self, kind: str, order: Dict, previous_status: Optional[str] = None,
+                 filled_delta: int = 0):
+        """
+        Initialize order event.
+
+        Args:
+            kind: One of NEW, STATUS_CHANGE, MODIFIED, PARTIAL_FILL
+            order: Current order dictionary from the order book
+            previous_status: Status before this change (None for new orders)
+            filled_delta: Newly filled quantity (for partial fills)
+        """
+        self.kind = kind
+        self.order = order
+        self.order_id = order.get('orderid')
+        self.status = order.get('status')
+        self.previous_status = previous_status
+        self.filled_delta = filled_delta
+
+    @property
+    def is_completion(self) -> bool:
+        """True when this event means the order just became fully executed."""
+        return self.status == 'complete' and self.kind in (self.NEW, self.STATUS_CHANGE)
+
+    def __repr__(self):
+        if self.kind == self.STATUS_CHANGE:
+            return f"OrderEvent({self.kind}, {self.order_id}, {self.previous_status}->{self.status})"
+        return f"OrderEvent({self.kind}, {self.order_id}, {self.status})"
+
+
+class OrderBookDiffer:
+    """
+    Tracks order state across polls and reports what changed.
+
+    Orders in a terminal state are parked in a set and skipped with a single
+    lookup on later polls, so the per-poll work grows with the number of
+    live (open / partially filled) orders rather than the whole day's book.
+    """
+
+    def __init__(self):
+        """Initialize differ with no known orders."""
+        self._state: Dict[str, Optional[tuple]] = {}  # order_id -> fingerprint
+        self._terminal: Dict[str, Optional[OrderRecord]] = {}  # IDs that can no longer change -> record
+        self._live: Dict[str, Optional[OrderRecord]] = {}  # IDs that can still change -> record
+
+    def __len__(self):
+        return len(self._state)
+
+    def __contains__(self, order_id):
+        return order_id in self._state
+
+    def known_ids(self) -> set:
+        """Get the set of order IDs seen so far."""
+        return set(self._state)
+
+    def live_count(self) -> int:
+        """Number of known orders not yet in a terminal state (open, pending, part-filled)."""
+        return len(self._live)
+
+    def prime(self, orders: Optional[Iterable[Dict]]):
+        """
+        Record the current order book without emitting events.
+
+        Args:
+            orders: Order dictionaries from orderBook API
+        """
+        for order in orders or ():
+            order_id = order.get('orderid')
+            if order_id:
+                self._remember(order_id, order)
+
+    def mark_seen(self, order_id: str) -> bool:
+        """
+        Mark an order ID as known without recording its state.
+
+        Args:
+            order_id: Order ID
+
+        Returns:
+            True if the ID was not known before
+        """
+        if order_id in self._state:
+            return False
+        self._state[order_id] = _UNOBSERVED
+        return True
+
+    def forget(self, order_ids: Iterable[str]):
+        """
+        Drop orders that left the order book (e.g. at the broker's daily reset).
+
+        Args:
+            order_ids: Order IDs to forget (an ID seen again is a new order)
+        """
+        for order_id in order_ids:
+            self._state.pop(order_id, None)
+            self._terminal.pop(order_id, None)
+            self._live.pop(order_id, None)
+
+    def snapshot(self, orders: Optional[Iterable[Dict]]) -> OrderBookSnapshot:
+        """
+        Parse an order book response once for every consumer of the poll.
+
+        Orders in a terminal state are skipped with one lookup, and open
+        orders whose fingerprint matches the known state are skipped without
+        building a record: only new and changed orders are parsed
+        (snapshot.fresh). The full record list is assembled on first use of
+        snapshot.records, reusing the records parsed on earlier polls.
+
+        Args:
+            orders: Order dictionaries from orderBook API
+
+        Returns:
+            OrderBookSnapshot (pass it to diff(), use its records in the same poll)
+        """
+        orders = orders if isinstance(orders, list) else list(orders or ())
+        terminal = self._terminal
+        state_get = self._state.get
+        fresh = []
+        append = fresh.append
+
+        for order in orders:
+            order_id = order.get('orderid')
+            if not order_id or order_id in terminal:
+                continue
+            order_fingerprint = _fingerprint(order)
+            if state_get(order_id) != order_fingerprint:
+                append(OrderRecord(order, order_fingerprint))
+
+        return OrderBookSnapshot(None, fresh, orders=orders, resolve=self._records_of)
+
+    def _records_of(self, orders: List[Dict], fresh: List[OrderRecord]) -> List[OrderRecord]:
+        """
+        Get the records of a snapshot's orders (OrderBookSnapshot.records).
+
+        Fresh records win; otherwise the record parsed on an earlier poll is
+        reused, or parsed now (orders known from prime() or apply()) and kept.
+        """
+        terminal, live = self._terminal, self._live
+        terminal_get, live_get = terminal.get, live.get
+        fresh_by_id = {record.order_id: record for record in fresh}
+        records = []
+        append = records.append
+
+        for order in orders:
+            order_id = order.get('orderid')
+            record = ((fresh_by_id.get(order_id) if fresh_by_id else None)
+                      or terminal_get(order_id) or live_get(order_id))
+            if record is None:
+                record = OrderRecord(order)
+                if order_id in terminal:
+                    terminal[order_id] = record
+                elif order_id in live:
+                    live[order_id] = record
+            append(record)
+
+        return records
+
+    def diff(self, orders: Union[OrderBookSnapshot, Iterable[Dict], None]) -> List[OrderEvent]:
+        """
+        Compare a fresh order book against the known state.
+
+        Args:
+            orders: OrderBookSnapshot from snapshot(), or order dictionaries
+                    from orderBook API
+
+        Returns:
+            List of events, in order book order
+        """
+        events = []
+        terminal = self._terminal
+
+        if isinstance(orders, OrderBookSnapshot):
+            for record in orders.fresh:
+                order_id = record.order_id
+                if order_id and order_id not in terminal:
+                    events.extend(self._update(order_id, record.raw, record.fingerprint, record))
+            return events
+
+        for order in orders or ():
+            order_id = order.get('orderid')
+            if not order_id or order_id in terminal:
+                continue
+            events.extend(self._update(order_id, order))
+
+        return events
+
+    def apply(self, order: Dict) -> List[OrderEvent]:
+        """
+        Apply a single order update (e.g. from a push feed).
+
+        Args:
+            order: Order dictionary
+
+        Returns:
+            List of events for this order
+        """
+        order_id = order.get('orderid')
+        if not order_id or order_id in self._terminal:
+            return []
+        return self._update(order_id, order)
+
+    def _remember(self, order_id: str, order: Dict, fingerprint: tuple = None,
+                  record: OrderRecord = None):
+        """Store the latest state of an order."""
+        fingerprint = fingerprint or _fingerprint(order)
+        self._state[order_id] = fingerprint
+        if fingerprint[0] in TERMINAL_STATUSES:
+            self._terminal[order_id] = record
+            self._live.pop(order_id, None)
+        else:
+            self._live[order_id] = record
+
+    def _update(self, order_id: str, order: Dict, fingerprint: tuple = None,
+                record: OrderRecord = None) -> List[OrderEvent]:
+        """Diff one order against its stored state and record the new state."""
+        fingerprint = fingerprint or _fingerprint(order)
+
+        if order_id not in self._state:
+            self._remember(order_id, order, fingerprint, record)
+            return [OrderEvent(OrderEvent.NEW, order)]
+
+        previous = self._state[order_id]
+        if previous == fingerprint:
+            return []
+
+        self._remember(order_id, order, fingerprint, record)
+        if previous is _UNOBSERVED:
+            # Known by ID only - this is the first state we see, not a change
+            return []
+
+        events = []
+        prev_status, prev_filled = previous[0], previous[1]
+
+        if fingerprint[2:] != previous[2:]:
+            events.append(OrderEvent(OrderEvent.MODIFIED, order, prev_status))
+
+        filled_delta = _to_int(fingerprint[1]) - _to_int(prev_filled)
+        if filled_delta > 0 and fingerprint[0] != 'complete':
+            events.append(OrderEvent(OrderEvent.PARTIAL_FILL, order, prev_status,
+                                     filled_delta=filled_delta))
+
+        if fingerprint[0] != prev_status:
+            events.append(OrderEvent(OrderEvent.STATUS_CHANGE, order, prev_status,
+                                     filled_delta=max(filled_delta, 0)))
+
+        return events
@@ -1,8 +1,18 @@
 """
 Utility functions for processing and filtering orders.
 """
-from collections import defaultdict
+from bisect import bisect_left, insort
 from datetime import datetime, timedelta
+from option_symbol import parse_option_symbol, is_option_symbol
+from order_snapshot import OrderBookSnapshot, to_float
+from order_state import OrderBookDiffer, OrderEvent
+
+# aggregate_by_contract levels: the symbol parts that make up a group
+CONTRACT_LEVELS = {
+    'underlying': ('underlying',),
+    'expiry': ('underlying', 'expiry'),
+    'strike': ('underlying', 'expiry', 'strike'),
+}
 
 
 def filter_and_aggregate_orders(orders_data):
@@ -14,62 +24,359 @@ def filter_and_aggregate_orders(orders_data):
     - Keep only one aggregated entry
     
     Args:
-        orders_data: List of order dictionaries from orderBook API
+        orders_data: List of order dictionaries from orderBook API, or an
+                     OrderBookSnapshot of it (numbers already parsed)
         
     Returns:
         List of aggregated order dictionaries
     """
-    # Dictionary to store aggregated data: key = (symbol, transaction_type)
-    aggregated = defaultdict(lambda: {
-        'total_quantity': 0,
-        'max_price': 0,
-        'order_ids': [],
-        'status': None,
-        'symbol': None,
-        'transaction_type': None
-    })
+    if isinstance(orders_data, OrderBookSnapshot):
+        return _aggregate_records(orders_data.records)
+    
+    aggregated = {}  # (symbol, transaction_type) -> [quantity, max price, order IDs, status]
     
     for order in orders_data:
-        symbol = order.get('tradingsymbol', '')
-        transaction_type = order.get('transactiontype', '')
-        status = order.get('status', '')
+        get = order.get
+        status = get('status', '')
+        symbol = get('tradingsymbol', '')
         
         # Only process completed option orders
-        if (status != 'rejected') and (status != 'cancelled') and ('CE' in symbol or 'PE' in symbol):
-            key = (symbol, transaction_type)
+        if status == 'rejected' or status == 'cancelled' or parse_option_symbol(symbol) is None:
+            continue
+        
+        key = (symbol, get('transactiontype', ''))
+        entry = aggregated.get(key)
+        if entry is None:
+            entry = aggregated[key] = [0, 0, [], None]
+        
+        # Accumulate quantity, track highest price, keep IDs and the latest status
+        entry[0] += float(get('quantity', 0))
+        price = float(get('price', 0))
+        if price > entry[1]:
+            entry[1] = price
+        entry[2].append(get('orderid'))
+        entry[3] = status
+    
+    # Sorted by symbol and transaction type for consistent output
+    return _aggregated_list(aggregated)
+
+
+def _aggregate_records(records):
+    """
+    filter_and_aggregate_orders over parsed OrderRecords.
+    
+    Args:
+        records: OrderRecords from an OrderBookSnapshot
+        
+    Returns:
+        List of aggregated order dictionaries (same shape as for dicts)
+    """
+    aggregated = {}  # (symbol, transaction_type) -> [quantity, max price, order IDs, status]
+    
+    for record in records:
+        status = record.status
+        symbol = record.symbol
+        if status == 'rejected' or status == 'cancelled' or parse_option_symbol(symbol) is None:
+            continue
+        
+        key = (symbol, record.transaction_type)
+        entry = aggregated.get(key)
+        if entry is None:
+            entry = aggregated[key] = [0, 0, [], None]
+        entry[0] += record.quantity_exact
+        if record.price > entry[1]:
+            entry[1] = record.price
+        entry[2].append(record.order_id)
+        entry[3] = status
+    
+    return _aggregated_list(aggregated)
+
+
+def _aggregated_list(aggregated):
+    """Aggregated dictionaries from (symbol, transaction_type) -> entry, sorted by key."""
+    return [{
+        'tradingsymbol': symbol,
+        'transactiontype': transaction_type,
+        'total_quantity': quantity,
+        'highest_price': max_price,
+        'order_count': len(order_ids),
+        'order_ids': order_ids,
+        'status': status
+    } for (symbol, transaction_type), (quantity, max_price, order_ids, status) in sorted(aggregated.items())]
+
+
+def aggregate_by_contract(orders_data, level='underlying'):
+    """
+    Aggregate option orders by underlying, expiry or strike and transaction type.
+    
+    Filters like filter_and_aggregate_orders (rejected and cancelled orders
+    and non-option symbols are skipped). At 'strike' level the CE and PE of
+    a strike are combined.
+    
+    Args:
+        orders_data: List of order dictionaries from orderBook API, or an
+                     OrderBookSnapshot of it
+        level: 'underlying', 'expiry' or 'strike'
+        
+    Returns:
+        List of aggregated dictionaries with the level's fields ('underlying',
+        'expiry', 'strike'), 'transactiontype', 'total_quantity',
+        'highest_price', 'order_count', 'order_ids' and 'status', sorted by them
+    """
+    if level not in CONTRACT_LEVELS:
+        raise ValueError(f"level must be one of {', '.join(CONTRACT_LEVELS)}, not {level!r}")
+    fields = CONTRACT_LEVELS[level]
+    width = len(fields)
+    
+    if isinstance(orders_data, OrderBookSnapshot):
+        rows = ((r.symbol, r.transaction_type, r.status, r.quantity_exact, r.price, r.order_id)
+                for r in orders_data.records)
+    else:
+        rows = ((o.get('tradingsymbol', ''), o.get('transactiontype', ''), o.get('status', ''),
+                 o.get('quantity'), o.get('price'), o.get('orderid')) for o in orders_data)
+    
+    aggregated = {}  # (contract key, transaction_type) -> [quantity, max price, order IDs, status]
+    contracts = {}  # symbol -> contract key at this level (None = not an option)
+    
+    for symbol, transaction_type, status, quantity, price, order_id in rows:
+        if status == 'rejected' or status == 'cancelled':
+            continue
+        if symbol in contracts:
+            contract = contracts[symbol]
+        else:
+            option = parse_option_symbol(symbol)
+            contract = contracts[symbol] = option[:width] if option else None
+        if contract is None:
+            continue
+        
+        key = (contract, transaction_type)
+        entry = aggregated.get(key)
+        if entry is None:
+            entry = aggregated[key] = [0, 0, [], None]
+        entry[0] += to_float(quantity)
+        price = to_float(price)
+        if price > entry[1]:
+            entry[1] = price
+        entry[2].append(order_id)
+        entry[3] = status
+    
+    results = []
+    for (contract, transaction_type), (quantity, max_price, order_ids, status) in sorted(aggregated.items()):
+        entry = dict(zip(fields, contract))
+        entry.update({
+            'transactiontype': transaction_type,
+            'total_quantity': quantity,
+            'highest_price': max_price,
+            'order_count': len(order_ids),
+            'order_ids': order_ids,
+            'status': status
+        })
+        results.append(entry)
+    return results
+
+
+class RunningAggregates:
+    """
+    filter_and_aggregate_orders kept up to date from order events.
+    
+    Each new or changed order moves only its own contribution between
+    (symbol, transaction_type) groups, and the groups are kept in a sorted
+    key list, so a poll costs time in proportion to what changed instead of
+    a full rebuild and re-sort of the day's book. Orders that are no longer
+    in the book (the broker clears it for the next trading day) are taken
+    out again, so rows() gives the same result as filter_and_aggregate_orders
+    over the latest poll. Each group lists its orders (and takes its status)
+    in order book order, from the positions of the latest poll in which
+    orders joined or left the book; a modified order keeps its place.
+    """
+    
+    def __init__(self):
+        """Initialize with no orders."""
+        self.differ = OrderBookDiffer()
+        self._orders = {}  # order_id -> (key, quantity, price, status) of orders counted in a group
+        self._groups = {}  # key -> [quantity, {price: order count}, max price, {order_id: None},
+                           #        order_ids in book order (None = to be sorted)]
+        self._position = {}  # order_id -> index in the book (refreshed when orders join or leave)
+        self._keys = []  # Group keys, sorted
+        self._rows = {}  # key -> aggregated dictionary (rebuilt when the group changes)
+        self._dirty = set()  # Keys whose dictionary is out of date
+        self.version = 0  # Bumped on every change to rows()
+        self.polls = 0  # Order book polls folded in by update()
+    
+    def __len__(self):
+        return len(self._keys)
+    
+    def update(self, orders):
+        """
+        Fold an order book poll in (only new and changed orders are looked at).
+        
+        Args:
+            orders: List of order dictionaries from orderBook API
             
-            # Accumulate quantity
-            quantity = float(order.get('quantity', 0))
-            aggregated[key]['total_quantity'] += quantity
+        Returns:
+            bool: True if the aggregated rows changed (always for the first poll)
+        """
+        orders = orders if isinstance(orders, list) else list(orders or ())
+        differ = self.differ
+        events = differ.diff(differ.snapshot(orders))
+        changed = not self.polls
+        self.polls += 1
+        joined = False
+        for event in events:
+            joined = joined or event.kind == OrderEvent.NEW
+            changed = self.apply(event.order) or changed
+        left = len(differ) > len(orders)
+        if left:
+            # Known orders are missing from this poll (only then is the book scanned for them)
+            changed = self._drop_missing(orders) or changed
+        if joined or left:
+            changed = self._reposition(orders) or changed
+        return changed
+    
+    def _reposition(self, orders):
+        """
+        Take the order book positions of a poll in which orders joined or left.
+        
+        Args:
+            orders: List of order dictionaries of the latest poll
             
-            # Track highest price
-            price = float(order.get('price', 0))
-            if price > aggregated[key]['max_price']:
-                aggregated[key]['max_price'] = price
+        Returns:
+            bool: True if a group's orders are now listed in a different order
+        """
+        position = self._position = {order.get('orderid'): i for i, order in enumerate(orders)}
+        changed = False
+        for key, group in self._groups.items():
+            ids = group[4]
+            if ids is not None and any(position[a] > position[b] for a, b in zip(ids, ids[1:])):
+                group[4] = None
+                self._dirty.add(key)
+                changed = True
+        if changed:
+            self.version += 1
+        return changed
+    
+    def _drop_missing(self, orders):
+        """
+        Forget the orders that are no longer in the order book.
+        
+        Args:
+            orders: List of order dictionaries of the latest poll
             
-            # Store metadata
-            aggregated[key]['order_ids'].append(order.get('orderid'))
-            aggregated[key]['status'] = status
-            aggregated[key]['symbol'] = symbol
-            aggregated[key]['transaction_type'] = transaction_type
-    
-    # Convert to list of dictionaries
-    result = []
-    for (symbol, trans_type), data in aggregated.items():
-        result.append({
-            'tradingsymbol': data['symbol'],
-            'transactiontype': data['transaction_type'],
-            'total_quantity': data['total_quantity'],
-            'highest_price': data['max_price'],
-            'order_count': len(data['order_ids']),
-            'order_ids': data['order_ids'],
-            'status': data['status']
-        })
+        Returns:
+            bool: True if the aggregated rows changed
+        """
+        missing = self.differ.known_ids() - {order.get('orderid') for order in orders}
+        self.differ.forget(missing)
+        changed = False
+        for order_id in missing:
+            previous = self._orders.get(order_id)
+            if previous is not None:
+                self._remove(order_id, previous)
+                changed = True
+        if changed:
+            self.version += 1
+        return changed
     
-    # Sort by symbol and transaction type for consistent output
-    result.sort(key=lambda x: (x['tradingsymbol'], x['transactiontype']))
+    def apply(self, order):
+        """
+        Apply the current state of one order.
+        
+        Args:
+            order: Order dictionary (new or changed)
+            
+        Returns:
+            bool: True if the aggregated rows changed
+        """
+        order_id = order.get('orderid')
+        status = order.get('status', '')
+        symbol = order.get('tradingsymbol', '')
+        
+        if status == 'rejected' or status == 'cancelled' or parse_option_symbol(symbol) is None:
+            entry = None
+        else:
+            entry = ((symbol, order.get('transactiontype', '')),
+                     to_float(order.get('quantity')), to_float(order.get('price')), status)
+        
+        previous = self._orders.get(order_id)
+        if previous == entry:
+            return False
+        if previous is not None:
+            # An order that stays in its group keeps its place in order_ids
+            self._remove(order_id, previous, keep_place=entry is not None and entry[0] == previous[0])
+        if entry is not None:
+            self._add(order_id, entry)
+        self.version += 1
+        return True
+    
+    def _add(self, order_id, entry):
+        """Count an order in its group."""
+        key, quantity, price, _ = entry
+        self._orders[order_id] = entry
+        group = self._groups.get(key)
+        if group is None:
+            group = self._groups[key] = [0, {}, 0, {}, None]
+            insort(self._keys, key)
+        group[0] += quantity
+        prices = group[1]
+        prices[price] = prices.get(price, 0) + 1
+        if price > group[2]:
+            group[2] = price
+        if order_id not in group[3]:  # Keeps its place if it was counted before
+            group[3][order_id] = None
+            group[4] = None
+        self._dirty.add(key)
     
-    return result
+    def _remove(self, order_id, entry, keep_place=False):
+        """Take an order's contribution out of its group."""
+        key, quantity, price, _ = entry
+        del self._orders[order_id]
+        group = self._groups[key]
+        group[0] -= quantity
+        prices = group[1]
+        prices[price] -= 1
+        if not prices[price]:
+            del prices[price]
+            if price == group[2]:
+                group[2] = max(prices, default=0)  # Distinct prices of one group only
+        self._dirty.add(key)
+        
+        if keep_place:
+            return
+        order_ids = group[3]
+        del order_ids[order_id]
+        group[4] = None
+        if not order_ids:
+            del self._groups[key]
+            del self._keys[bisect_left(self._keys, key)]
+            self._rows.pop(key, None)
+    
+    def rows(self):
+        """
+        Aggregated orders, as filter_and_aggregate_orders returns them.
+        
+        Returns:
+            List of aggregated order dictionaries, sorted by symbol and transaction type
+            (shared between calls - don't modify)
+        """
+        for key in self._dirty:
+            group = self._groups.get(key)
+            if group is None:
+                continue
+            quantity, _, max_price, order_ids, ids = group
+            if ids is None:
+                position = self._position
+                ids = group[4] = sorted(order_ids, key=lambda i: position.get(i, len(position)))
+            self._rows[key] = {
+                'tradingsymbol': key[0],
+                'transactiontype': key[1],
+                'total_quantity': quantity,
+                'highest_price': max_price,
+                'order_count': len(ids),
+                'order_ids': ids,
+                'status': self._orders[ids[-1]][3]
+            }
+        self._dirty.clear()
+        return [self._rows[key] for key in self._keys]
 
 
 def is_option_order(symbol):
@@ -80,9 +387,9 @@ def is_option_order(symbol):
         symbol: Trading symbol string
         
     Returns:
-        bool: True if it's an option order (contains CE or PE)
+        bool: True if it parses as an option symbol (underlying, expiry, strike, CE/PE)
     """
-    return 'CE' in symbol or 'PE' in symbol
+    return is_option_symbol(symbol)
 
 
 def filter_trades_by_date(trades, target_date):
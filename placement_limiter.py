@@ -0,0 +1,115 @@
+"""
+Per-account order placement limiter.
+Lets a burst of legs go out at once, then spaces further orders a few
+milliseconds apart instead of letting the broker reject them.
+"""
+import threading
+import time
+from collections import deque
+from typing import Dict
+
+from rate_governor import RateLimitDeferred
+
+
+class PlacementLimiter:
+    """
+    Token bucket with burst credit and a short wait queue.
+
+    The bucket holds up to `burst` orders and refills at `rate` orders per
+    second. An order arriving at an empty bucket waits for its token instead
+    of failing, as long as the wait stays under max_wait.
+    """
+
+    def __init__(self, rate: float = 8.0, burst: int = 5, max_wait: float = 2.0,
+                 account: str = ''):
+        """
+        Initialize placement limiter.
+
+        Args:
+            rate: Sustained orders per second (default: 8)
+            burst: Orders that may go out back-to-back (default: 5)
+            max_wait: Longest an order may queue before it is refused, in seconds (default: 2)
+            account: Account name, for error messages
+        """
+        self.rate = rate
+        self.burst = burst
+        self.max_wait = max_wait
+        self.account = account
+
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+        # Queue-time statistics
+        self.orders = 0
+        self.queued_orders = 0
+        self.refused_orders = 0
+        self.waiting = 0  # Orders currently queued
+        self._waits = deque(maxlen=500)  # Recent queue times in seconds
+
+    def reserve(self) -> float:
+        """
+        Take a token, possibly one that refills in the future.
+
+        Returns:
+            Seconds the caller must wait before placing its order
+
+        Raises:
+            RateLimitDeferred: If the wait would exceed max_wait
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+            wait = 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+            if wait > self.max_wait:
+                self.refused_orders += 1
+                raise RateLimitDeferred(self.account, 'placeOrder', wait)
+
+            self._tokens -= 1
+            return wait
+
+    def acquire(self) -> float:
+        """
+        Block until this order may be placed.
+
+        Returns:
+            Seconds spent queued
+        """
+        wait = self.reserve()
+        if wait > 0:
+            with self._lock:
+                self.waiting += 1
+            try:
+                time.sleep(wait)
+            finally:
+                with self._lock:
+                    self.waiting -= 1
+
+        with self._lock:
+            self.orders += 1
+            if wait > 0:
+                self.queued_orders += 1
+            self._waits.append(wait)
+        return wait
+
+    def get_statistics(self) -> Dict:
+        """
+        Get queue-time statistics.
+
+        Returns:
+            Dictionary with order counts and queue times in milliseconds
+        """
+        with self._lock:
+            waits = sorted(self._waits)
+            count = len(waits)
+            return {
+                'orders': self.orders,
+                'queued_orders': self.queued_orders,
+                'refused_orders': self.refused_orders,
+                'waiting': self.waiting,
+                'avg_queue_ms': sum(waits) / count * 1000 if count else 0.0,
+                'p95_queue_ms': waits[min(count - 1, int(count * 0.95))] * 1000 if count else 0.0,
+                'max_queue_ms': waits[-1] * 1000 if count else 0.0,
+            }
@@ -0,0 +1,137 @@
+"""
+Activity-adaptive poll scheduling.
+Polls fast while the master account is active (an order was just detected
+or orders are still open) and backs off step by step when it goes quiet,
+never faster than the calls-per-minute budget allows.
+"""
+import time
+from typing import List, Optional
+
+from rate_governor import RateGovernor
+from structured_log import get_logger
+
+
+log = get_logger('poll_scheduler')
+
+
+class AdaptivePollScheduler:
+    """
+    Chooses the interval until the next order book poll.
+
+    Reasons reported with each interval:
+    - 'activity': an order event was seen on this poll
+    - 'open_orders': the master has open / pending orders that may fill
+    - 'cooldown': activity was seen recently; still polling fast
+    - 'idle': no activity; interval grows by `decay` up to idle_interval
+    - 'session_start': the market just opened; polling fast for the cooldown
+    - 'off_hours': outside market hours
+    - 'market_closed': sleeping until the next session opens
+
+    budget_limited is set when the interval had to be stretched to stay
+    within the budget (the reason still says why polling wanted to be fast).
+    """
+
+    def __init__(self, calls_per_minute: int, fast_interval: float = 2.0,
+                 idle_interval: float = 30.0, off_hours_interval: float = 60.0,
+                 decay: float = 1.5, cooldown: float = 60.0,
+                 governor: RateGovernor = None, account: str = None,
+                 endpoint: str = 'orderBook'):
+        """
+        Initialize scheduler.
+
+        Args:
+            calls_per_minute: Order book calls this poller may make per minute
+            fast_interval: Interval while active (raised to the budget pace if lower)
+            idle_interval: Slowest interval during market hours
+            off_hours_interval: Interval outside market hours
+            decay: Factor the interval grows by on each quiet poll
+            cooldown: Seconds to keep polling fast after the last activity
+            governor: Shared governor; if set, calls by other consumers of the
+                      account also count against the budget
+            account: Account the budget belongs to (with governor)
+            endpoint: Endpoint the budget belongs to (with governor)
+        """
+        self.budget_interval = 60.0 / calls_per_minute  # Sustainable pace
+        self.fast_interval = fast_interval
+        self.idle_interval = idle_interval
+        self.off_hours_interval = off_hours_interval
+        self.decay = decay
+        self.cooldown = cooldown
+        self.governor = governor
+        self.account = account
+        self.endpoint = endpoint
+
+        self.interval = max(fast_interval, self.budget_interval)
+        self.reason = 'activity'  # Start fast: activity at startup is likely
+        self.budget_limited = fast_interval < self.budget_interval
+        self.last_activity = time.time()
+        self.changes: List[tuple] = []  # (timestamp, interval, reason, budget_limited), latest last
+
+    def update(self, events: int = 0, open_orders: int = 0, market_open: bool = True,
+               until_open: Optional[float] = None, now: Optional[float] = None) -> float:
+        """
+        Pick the interval after a poll.
+
+        Args:
+            events: Order events (new orders, fills, status changes) seen on the poll
+            open_orders: Master orders still open / pending
+            market_open: Whether the market is open
+            until_open: Seconds until the next session (when closed); used as
+                        the interval instead of off_hours_interval
+            now: Current time (default: time.time())
+
+        Returns:
+            Seconds until the next poll (also kept in self.interval)
+        """
+        now = time.time() if now is None else now
+        fast = self.fast_interval
+
+        if not market_open:
+            if until_open is not None:
+                interval, reason = until_open, 'market_closed'
+            else:
+                interval, reason = self.off_hours_interval, 'off_hours'
+        elif self.reason in ('market_closed', 'off_hours'):
+            # Orders often arrive right at the open
+            self.last_activity = now
+            interval, reason = fast, 'session_start'
+        elif events:
+            self.last_activity = now
+            interval, reason = fast, 'activity'
+        elif open_orders:
+            interval, reason = fast, 'open_orders'
+        elif now - self.last_activity < self.cooldown:
+            interval, reason = fast, 'cooldown'
+        else:
+            interval = min(max(self.interval, fast) * self.decay, self.idle_interval)
+            reason = 'idle'
+
+        budget_limited = False
+        if interval < self.budget_interval and market_open:
+            interval, budget_limited = self.budget_interval, True
+
+        if self.governor is not None:
+            # Other consumers of the account may have spent the shared budget
+            wait = self.governor.time_until_available(self.account, self.endpoint)
+            if wait > interval:
+                interval, budget_limited = wait, True
+
+        self._set(interval, reason, budget_limited, now)
+        return interval
+
+    def _set(self, interval: float, reason: str, budget_limited: bool, now: float):
+        """Store the interval, recording and logging changes of reason."""
+        if reason != self.reason or budget_limited != self.budget_limited:
+            self.changes.append((now, interval, reason, budget_limited))
+            del self.changes[:-50]
+            log.info('poll_interval', "   ⏱️  Poll interval {interval}s ({reason}{limited})",
+                     interval=round(interval, 1), reason=reason, budget_limited=budget_limited,
+                     limited=', budget-limited' if budget_limited else '')
+        self.interval = interval
+        self.reason = reason
+        self.budget_limited = budget_limited
+
+    def describe(self) -> str:
+        """Short text for status lines, e.g. '6.0s (activity, budget-limited)'."""
+        limited = ', budget-limited' if self.budget_limited else ''
+        return f"{self.interval:.1f}s ({self.reason}{limited})"
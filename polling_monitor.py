@@ -3,57 +3,86 @@ Simple polling-based order monitor (more reliable than WebSocket).
 Checks for new orders every few seconds.
 """
 import time
-from datetime import datetime
 from smartapi_client import SmartAPIClient
-from display import display_option_order
+from display import display_new_order
+from order_state import OrderBookDiffer, OrderEvent
+from rate_governor import RateGovernor, shared_governor
+from metrics import POLL_ITERATION
+from structured_log import get_logger
+
+
+log = get_logger('polling')
 
 
 class PollingOrderMonitor:
     """Poll-based order monitor - checks every N seconds for new orders."""
     
-    def __init__(self, client: SmartAPIClient, check_interval=1):
+    def __init__(self, client: SmartAPIClient, check_interval=1, governor: RateGovernor = None):
         """
         Initialize polling monitor.
         
         Args:
             client: SmartAPIClient instance
             check_interval: Seconds between checks (default: 1)
+            governor: RateGovernor to share (default: process-wide shared_governor)
         """
         self.client = client
         self.check_interval = check_interval
-        self.known_order_ids = set()
+        self.governor = governor or shared_governor
+        self.account = client.client_id
+        self.next_call_at = None  # Set when the budget defers a poll
+        self.order_book_deadline = 3.0  # Seconds before a slow order book read is abandoned
+        self.order_state = OrderBookDiffer()
+        self.last_events = []  # Events from the most recent poll
+        self.last_snapshot = None  # Parsed order book from the most recent poll
         self._initialize_known_orders()
     
     def _initialize_known_orders(self):
         """Load existing orders to avoid treating them as new."""
         try:
+            self.governor.record(self.account, 'orderBook')
             order_book = self.client.get_order_book()
             if order_book and 'data' in order_book and order_book['data']:
-                self.known_order_ids = {
-                    order.get('orderid') for order in order_book['data']
-                }
-                print(f"✅ Initialized with {len(self.known_order_ids)} existing orders")
+                self.order_state.prime(order_book['data'])
+                print(f"✅ Initialized with {len(self.order_state)} existing orders")
         except Exception as e:
             print(f"Error initializing known orders: {e}")
     
+    @property
+    def known_order_ids(self):
+        """Order IDs seen so far."""
+        return self.order_state.known_ids()
+    
     def check_for_new_orders(self):
-        """Check order book for new orders."""
+        """
+        Check order book for changes.
+        
+        All detected events are kept in self.last_events; only brand-new
+        orders are returned.
+        
+        Returns:
+            List of new order dictionaries
+        """
+        self.last_events = []
+        
+        wait_time = self.governor.try_acquire(self.account, 'orderBook')
+        if wait_time > 0:
+            # Budget spent (possibly by another monitor on this account) - skip this poll
+            self.next_call_at = time.time() + wait_time
+            return []
+        self.next_call_at = None
+        
         try:
-            order_book = self.client.get_order_book()
+            order_book = self.client.get_order_book(deadline=self.order_book_deadline)
             if not order_book or 'data' not in order_book or not order_book['data']:
                 return []
             
-            new_orders = []
-            for order in order_book['data']:
-                order_id = order.get('orderid')
-                
-                if order_id and order_id not in self.known_order_ids:
-                    self.known_order_ids.add(order_id)
-                    new_orders.append(order)
-            
-            return new_orders
+            self.last_snapshot = self.order_state.snapshot(order_book['data'])
+            self.last_events = self.order_state.diff(self.last_snapshot)
+            return [event.order for event in self.last_events
+                    if event.kind == OrderEvent.NEW]
         except Exception as e:
-            print(f"Error checking for new orders: {e}")
+            log.error('poll_failed', "Error checking for new orders: {error}", error=str(e))
             return []
     
     def on_new_order(self, order):
@@ -64,10 +93,19 @@ class PollingOrderMonitor:
         Args:
             order: Order dictionary
         """
-        print("\n" + "🔔 " * 30)
-        print(f"NEW ORDER DETECTED AT {datetime.now()}")
-        print("🔔 " * 30 + "\n")
-        display_option_order(order)
+        display_new_order(order)
+    
+    def on_order_update(self, event: OrderEvent):
+        """
+        Handler called when a known order changes (status, fill, modification).
+        Override this method for custom behavior.
+        
+        Args:
+            event: OrderEvent describing the change
+        """
+        log.info('order_update', "🔄 ORDER UPDATE [{kind}] {order_id} {symbol}: {previous} → {status}",
+                 kind=event.kind, order_id=event.order_id, symbol=event.order.get('tradingsymbol'),
+                 previous=event.previous_status, status=event.status)
     
     def start(self):
         """Start monitoring for new orders."""
@@ -81,14 +119,25 @@ class PollingOrderMonitor:
         
         try:
             while True:
+                iteration_started = time.perf_counter()
                 new_orders = self.check_for_new_orders()
                 
                 for order in new_orders:
                     self.on_new_order(order)
                 
-                time.sleep(self.check_interval)
+                for event in self.last_events:
+                    if event.kind != OrderEvent.NEW:
+                        self.on_order_update(event)
+                POLL_ITERATION.labels('polling').observe(time.perf_counter() - iteration_started)
+                
+                # Poll again at the interval, or as soon as a deferred poll is allowed
+                delay = self.check_interval
+                if self.next_call_at:
+                    delay = max(delay, self.next_call_at - time.time())
+                time.sleep(delay)
                 
         except KeyboardInterrupt:
+            log.flush()
             print("\n\nMonitoring stopped by user.")
 
 
@@ -0,0 +1,183 @@
+"""
+Follower order sizing against exchange constraints.
+Rounds follower quantities to whole lots, splits quantities above the
+freeze limit into child orders and checks limit / trigger prices against
+the tick size - locally, from the instrument master - so orders the
+exchange would reject never cost a placement round trip or rate budget.
+"""
+import math
+from typing import Dict, List, NamedTuple, Optional
+
+from instrument_master import Instrument, InstrumentMaster, get_instrument_master
+from order_snapshot import OrderRecord
+
+
+ROUNDING_MODES = ('down', 'nearest', 'up')
+
+# Order types whose limit price / trigger price is sent to the exchange
+PRICED_ORDER_TYPES = frozenset({'LIMIT', 'STOPLOSS_LIMIT'})
+TRIGGERED_ORDER_TYPES = frozenset({'STOPLOSS_LIMIT', 'STOPLOSS_MARKET'})
+
+
+class SizingPlan(NamedTuple):
+    """How a follower quantity goes to the broker."""
+    quantity: int  # Total after lot rounding
+    children: List[int]  # Quantity of each broker order (several only above the freeze limit)
+    lot_size: int
+    reason: Optional[str] = None  # Why nothing can be placed (None = place the children)
+
+    @property
+    def ok(self) -> bool:
+        """True if there is something to place."""
+        return self.reason is None
+
+
+def round_to_lot(quantity: float, lot_size: int, rounding: str = 'down') -> int:
+    """
+    Round a quantity to a multiple of the lot size.
+
+    Args:
+        quantity: Requested quantity (may be fractional after a multiplier)
+        lot_size: Exchange lot size
+        rounding: 'down' (never more than requested), 'nearest' or 'up'
+
+    Returns:
+        Quantity in whole lots (0 if 'down' leaves less than one lot)
+    """
+    lot_size = max(int(lot_size), 1)
+    lots = quantity / lot_size
+    if rounding == 'down':
+        whole = math.floor(lots + 1e-9)
+    elif rounding == 'up':
+        whole = math.ceil(lots - 1e-9)
+    elif rounding == 'nearest':
+        whole = math.floor(lots + 0.5)
+    else:
+        raise ValueError(f"rounding must be one of {', '.join(ROUNDING_MODES)}, not {rounding!r}")
+    return whole * lot_size
+
+
+def split_for_freeze(quantity: int, lot_size: int, freeze_qty: int) -> List[int]:
+    """
+    Split a quantity into orders no larger than the freeze limit.
+
+    Every child is a whole number of lots; all but the last are the largest
+    lot multiple allowed.
+
+    Args:
+        quantity: Total quantity (a lot multiple)
+        lot_size: Exchange lot size
+        freeze_qty: Largest quantity per order (0 = no limit)
+
+    Returns:
+        Child quantities, largest first
+    """
+    if not freeze_qty or quantity <= freeze_qty:
+        return [quantity]
+    lot_size = max(int(lot_size), 1)
+    largest = max(freeze_qty // lot_size, 1) * lot_size
+    children = [largest] * (quantity // largest)
+    if quantity % largest:
+        children.append(quantity % largest)
+    return children
+
+
+def on_tick(price: float, tick_size: float) -> bool:
+    """Whether a price is a whole number of ticks (compared in paise)."""
+    if not tick_size or not price:
+        return True
+    paise = price * 100
+    tick = round(tick_size * 100)
+    return abs(paise - round(paise)) < 1e-6 and round(paise) % tick == 0
+
+
+class QuantityEngine:
+    """
+    Sizes follower orders from the instrument master.
+
+    Instruments missing from the master (or no index at all) keep the old
+    behaviour: the quantity is used as is and prices are not checked.
+    """
+
+    def __init__(self, instruments: InstrumentMaster = None, rounding: str = 'down'):
+        """
+        Initialize quantity engine.
+
+        Args:
+            instruments: Instrument master (default: the process-wide one)
+            rounding: Lot rounding mode ('down', 'nearest' or 'up')
+        """
+        if rounding not in ROUNDING_MODES:
+            raise ValueError(f"rounding must be one of {', '.join(ROUNDING_MODES)}, not {rounding!r}")
+        self.instruments = instruments
+        self.rounding = rounding
+        self._cache: Dict[tuple, Optional[Instrument]] = {}
+        self._cache_built_at = None
+
+    def instrument(self, record: OrderRecord) -> Optional[Instrument]:
+        """
+        Look up the instrument of an order (cached per token until the index is rebuilt).
+
+        Args:
+            record: Parsed master order
+
+        Returns:
+            Instrument, or None if unknown
+        """
+        if self.instruments is None:
+            self.instruments = get_instrument_master()
+        if self._cache_built_at != self.instruments.built_at:
+            self._cache = {}
+            self._cache_built_at = self.instruments.built_at
+
+        key = (record.exchange, record.symbol_token, record.symbol)
+        if key not in self._cache:
+            self._cache[key] = self.instruments.for_order(record.raw)
+        return self._cache[key]
+
+    def check_prices(self, record: OrderRecord, instrument: Instrument = None) -> Optional[str]:
+        """
+        Check the limit and trigger prices against the tick size.
+
+        Args:
+            record: Parsed master order
+            instrument: Its instrument (default: looked up)
+
+        Returns:
+            Reason the exchange would reject the prices, or None if they are fine
+        """
+        instrument = instrument or self.instrument(record)
+        if instrument is None or not instrument.tick_size:
+            return None
+        tick = instrument.tick_size
+        if record.order_type in PRICED_ORDER_TYPES and not on_tick(record.price, tick):
+            return f"Price {record.price} is not a multiple of the {tick} tick"
+        if record.order_type in TRIGGERED_ORDER_TYPES and not on_tick(record.trigger_price, tick):
+            return f"Trigger price {record.trigger_price} is not a multiple of the {tick} tick"
+        return None
+
+    def plan(self, record: OrderRecord, quantity: float, instrument: Instrument = None) -> SizingPlan:
+        """
+        Size one follower's copy of an order.
+
+        Args:
+            record: Parsed master order
+            quantity: Follower quantity from the copy settings (before lot rounding)
+            instrument: The order's instrument (default: looked up)
+
+        Returns:
+            SizingPlan
+        """
+        instrument = instrument or self.instrument(record)
+        if instrument is None:
+            quantity = int(quantity)
+            if quantity <= 0:
+                return SizingPlan(0, [], 1, f"Quantity {quantity} is not positive")
+            return SizingPlan(quantity, [quantity], 1)
+
+        lot_size = instrument.lot_size
+        rounded = round_to_lot(quantity, lot_size, self.rounding)
+        if rounded <= 0:
+            return SizingPlan(0, [], lot_size,
+                              f"Quantity {quantity:g} is less than one lot of {lot_size}")
+        return SizingPlan(rounded, split_for_freeze(rounded, lot_size, instrument.freeze_qty), lot_size)
@@ -0,0 +1,216 @@
+"""
+Central, non-blocking rate governor for SmartAPI calls.
+Every API consumer in the process asks the same governor before calling, so
+monitors and clients sharing an account share one budget per endpoint.
+"""
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+from metrics import BUDGET_DEFERRALS, BACKOFF_SECONDS
+
+
+# Per-account budgets as (max_calls, window_seconds) pairs. Every window must
+# have room for a call to be allowed. Kept below SmartAPI's published limits.
+DEFAULT_BUDGETS = {
+    'orderBook': ((1, 1.0), (30, 60.0)),
+    'tradeBook': ((1, 1.0), (30, 60.0)),
+    'getProfile': ((3, 1.0),),
+    'placeOrder': ((15, 1.0),),
+}
+
+
+class RateLimitDeferred(Exception):
+    """Raised instead of calling the API when the budget has no room yet."""
+
+    def __init__(self, account: str, endpoint: str, retry_after: float):
+        """
+        Initialize deferral.
+
+        Args:
+            account: Account the call was for
+            endpoint: Endpoint name (e.g. 'orderBook')
+            retry_after: Seconds until the call would be allowed
+        """
+        super().__init__(f"Rate limit budget for {endpoint} ({account}) exhausted, "
+                         f"retry in {retry_after:.2f}s")
+        self.account = account
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+
+
+class _SlidingLog:
+    """Call timestamps for one (account, endpoint) pair."""
+
+    __slots__ = ('limits', 'calls', 'blocked_until')
+
+    def __init__(self, limits: Tuple[Tuple[int, float], ...]):
+        self.limits = limits
+        self.calls = deque()
+        self.blocked_until = 0.0
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until every window has room for one more call."""
+        longest = max(window for _, window in self.limits)
+        while self.calls and self.calls[0] <= now - longest:
+            self.calls.popleft()
+
+        wait = max(0.0, self.blocked_until - now)
+        for max_calls, window in self.limits:
+            if len(self.calls) < max_calls:
+                continue
+            # Room opens when the call max_calls places back leaves the window
+            free_at = self.calls[-max_calls] + window
+            if free_at > now:
+                wait = max(wait, free_at - now)
+        return wait
+
+
+class RateGovernor:
+    """
+    Sliding-log rate governor keyed by (account, endpoint).
+
+    Nothing here sleeps: try_acquire() either grants the call or says how
+    long to wait, so callers can schedule the retry instead of stalling.
+    """
+
+    def __init__(self, budgets: Optional[Dict[str, Tuple[Tuple[int, float], ...]]] = None):
+        """
+        Initialize rate governor.
+
+        Args:
+            budgets: Endpoint -> ((max_calls, window_seconds), ...) (default: DEFAULT_BUDGETS)
+        """
+        self.budgets = dict(budgets or DEFAULT_BUDGETS)
+        self._overrides: Dict[Tuple[str, str], Tuple[Tuple[int, float], ...]] = {}
+        self._logs: Dict[Tuple[str, str], _SlidingLog] = {}
+        self._lock = threading.Lock()
+        self.granted = 0
+        self.deferred = 0
+
+    def _log_for(self, account: str, endpoint: str) -> _SlidingLog:
+        """Get (or create) the log for a key (caller must hold the lock)."""
+        key = (account, endpoint)
+        log = self._logs.get(key)
+        if log is None:
+            limits = self._overrides.get(key) or self.budgets.get(endpoint) or ((10, 1.0),)
+            log = self._logs[key] = _SlidingLog(limits)
+        return log
+
+    def set_budget(self, account: str, endpoint: str, max_calls: int, window_seconds: float):
+        """
+        Add a tighter limit for one account's endpoint.
+
+        Limits only ever tighten: the default windows still apply, so the
+        most conservative consumer of a shared account sets the pace.
+
+        Args:
+            account: Account (client ID)
+            endpoint: Endpoint name
+            max_calls: Calls allowed per window
+            window_seconds: Window length in seconds
+        """
+        with self._lock:
+            key = (account, endpoint)
+            limits = tuple(self._overrides.get(key) or self.budgets.get(endpoint) or ())
+            limit = (max_calls, float(window_seconds))
+            if limit not in limits:
+                limits += (limit,)
+            self._overrides[key] = limits
+            self._log_for(account, endpoint).limits = limits
+
+    def time_until_available(self, account: str, endpoint: str) -> float:
+        """
+        Seconds until a call would be allowed, without reserving it.
+
+        Args:
+            account: Account (client ID)
+            endpoint: Endpoint name
+
+        Returns:
+            0.0 if a call is allowed now
+        """
+        with self._lock:
+            return self._log_for(account, endpoint).wait_time(time.time())
+
+    def try_acquire(self, account: str, endpoint: str) -> float:
+        """
+        Reserve a call if the budget allows it.
+
+        Args:
+            account: Account (client ID)
+            endpoint: Endpoint name
+
+        Returns:
+            0.0 if the call was granted, otherwise seconds to wait before retrying
+        """
+        with self._lock:
+            now = time.time()
+            log = self._log_for(account, endpoint)
+            wait = log.wait_time(now)
+            if wait > 0:
+                self.deferred += 1
+                BUDGET_DEFERRALS.labels(endpoint, account).inc()
+                return wait
+            log.calls.append(now)
+            self.granted += 1
+            return 0.0
+
+    def acquire_or_defer(self, account: str, endpoint: str):
+        """
+        Reserve a call or raise RateLimitDeferred.
+
+        Args:
+            account: Account (client ID)
+            endpoint: Endpoint name
+
+        Raises:
+            RateLimitDeferred: If the budget has no room yet
+        """
+        wait = self.try_acquire(account, endpoint)
+        if wait > 0:
+            raise RateLimitDeferred(account, endpoint, wait)
+
+    def record(self, account: str, endpoint: str):
+        """Count a call that was made without asking (e.g. an order that must go out)."""
+        with self._lock:
+            now = time.time()
+            log = self._log_for(account, endpoint)
+            log.wait_time(now)  # Prune old entries
+            log.calls.append(now)
+
+    def note_throttled(self, account: str, endpoint: str, backoff_seconds: float):
+        """
+        Block an endpoint after the broker reported a rate limit.
+
+        Args:
+            account: Account (client ID)
+            endpoint: Endpoint name
+            backoff_seconds: Seconds to hold off all callers
+        """
+        with self._lock:
+            log = self._log_for(account, endpoint)
+            log.blocked_until = max(log.blocked_until, time.time() + backoff_seconds)
+        BACKOFF_SECONDS.labels(endpoint, account).inc(backoff_seconds)
+
+    def usage(self, account: str, endpoint: str, window_seconds: float = 60) -> int:
+        """
+        Calls made in the last window_seconds.
+
+        Args:
+            account: Account (client ID)
+            endpoint: Endpoint name
+            window_seconds: Look-back window (default: 60)
+
+        Returns:
+            Number of calls
+        """
+        with self._lock:
+            cutoff = time.time() - window_seconds
+            log = self._logs.get((account, endpoint))
+            return sum(1 for t in log.calls if t > cutoff) if log else 0
+
+
+# Process-wide governor shared by every monitor and client
+shared_governor = RateGovernor()
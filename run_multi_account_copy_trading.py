@@ -46,6 +46,16 @@ def main():
         settings.copy_limit_orders = True
         settings.copy_stop_orders = True
         
+        # Execution
+        settings.parallel_fan_out = True  # Send to all followers at once
+        settings.max_concurrent_orders = 10  # Cap on follower orders in flight
+        settings.decouple_placement = True  # Keep detecting while orders are being placed
+        settings.copy_queue_size = 100  # Detected orders that may wait for placement
+        
+        # Detection
+        settings.use_order_stream = False  # True = order-update WebSocket + slow reconciliation
+        settings.reconcile_interval = 60  # Seconds between reconciliation polls (stream mode)
+        
         # Safety features
         settings.require_confirmation = False  # Ask before each trade
         settings.log_all_actions = True
@@ -77,8 +87,11 @@ def main():
         # Initialize copy trader
         copy_trader = MultiAccountCopyTrader(config, settings)
         
-        # Start monitoring (checks every 3 seconds)
-        copy_trader.start_monitoring(interval=3)
+        # Start monitoring
+        if settings.use_order_stream:
+            copy_trader.start_streaming()
+        else:
+            copy_trader.start_monitoring(interval=3)  # Checks every 3 seconds
         
     except KeyboardInterrupt:
         print("\n\n⏹️  Stopped by user\n")
@@ -0,0 +1,217 @@
+"""
+Persistent on-disk cache of SmartAPI sessions, shared between processes.
+Lets a restarted process (or the web UI running next to the copy trader)
+reuse a live session instead of spending a TOTP login.
+"""
+import base64
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: fall back to msvcrt byte-range locks
+    fcntl = None
+    import msvcrt
+
+
+# Refresh tokens are issued for the trading day; treat them as usable for a day
+REFRESH_TOKEN_LIFETIME = 24 * 60 * 60
+
+# Don't hand out sessions that expire within this many seconds
+EXPIRY_MARGIN = 5 * 60
+
+
+def jwt_expiry(token: str) -> Optional[float]:
+    """
+    Read the 'exp' claim from a JWT without verifying it.
+
+    Args:
+        token: JWT access token (with or without 'Bearer ' prefix)
+
+    Returns:
+        Expiry as a Unix timestamp, or None if it can't be read
+    """
+    try:
+        if token.startswith('Bearer '):
+            token = token[len('Bearer '):]
+        payload = token.split('.')[1]
+        payload += '=' * (-len(payload) % 4)
+        claims = json.loads(base64.urlsafe_b64decode(payload))
+        return float(claims['exp'])
+    except Exception:
+        return None
+
+
+class SessionCache:
+    """JSON file of sessions keyed by client_id, guarded by a file lock."""
+
+    def __init__(self, path: str):
+        """
+        Initialize session cache.
+
+        Args:
+            path: Path to the cache file (a '.lock' file is created next to it)
+        """
+        self.path = path
+        self.lock_path = path + '.lock'
+
+    @contextmanager
+    def _locked(self, exclusive: bool):
+        """Hold the cache lock (shared for reads, exclusive for writes)."""
+        directory = os.path.dirname(os.path.abspath(self.lock_path))
+        os.makedirs(directory, exist_ok=True)
+
+        with open(self.lock_path, 'a+') as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _read(self) -> Dict:
+        """Read the whole cache (caller must hold the lock)."""
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _write(self, data: Dict):
+        """Atomically replace the cache file (caller must hold the exclusive lock)."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.session_cache')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f)
+            os.chmod(tmp_path, 0o600)  # Tokens are credentials
+            os.replace(tmp_path, self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def get(self, client_id: str) -> Optional[Dict]:
+        """
+        Get the cached session entry for an account.
+
+        Args:
+            client_id: Angel One client ID
+
+        Returns:
+            Session entry dictionary, or None if nothing is cached
+        """
+        with self._locked(exclusive=False):
+            return self._read().get(client_id)
+
+    def put(self, client_id: str, jwt_token: str, refresh_token: str,
+            feed_token: str, expires_at: Optional[float] = None):
+        """
+        Store (or replace) the session for an account.
+
+        Args:
+            client_id: Angel One client ID
+            jwt_token: JWT access token
+            refresh_token: Refresh token
+            feed_token: Feed token
+            expires_at: Access token expiry (read from the JWT if not given)
+        """
+        now = time.time()
+        entry = {
+            'jwt_token': jwt_token,
+            'refresh_token': refresh_token,
+            'feed_token': feed_token,
+            'expires_at': expires_at or jwt_expiry(jwt_token) or now + REFRESH_TOKEN_LIFETIME,
+            'refresh_expires_at': now + REFRESH_TOKEN_LIFETIME,
+            'updated_at': now,
+        }
+
+        with self._locked(exclusive=True):
+            data = self._read()
+            data[client_id] = entry
+            self._write(data)
+
+    def invalidate(self, client_id: str):
+        """Remove an account's session from the cache."""
+        with self._locked(exclusive=True):
+            data = self._read()
+            if data.pop(client_id, None) is not None:
+                self._write(data)
+
+    def restore(self, smart_connect, client_id: str) -> Optional[str]:
+        """
+        Load a cached session into a SmartConnect instance.
+
+        A still-valid access token is reused as is. An expired one is renewed
+        with the refresh token. Either way the session is verified with a
+        profile call before it is trusted.
+
+        Args:
+            smart_connect: SmartConnect instance to populate
+            client_id: Angel One client ID
+
+        Returns:
+            'cached' or 'refreshed' on success, None if a full login is needed
+        """
+        entry = self.get(client_id)
+        if not entry:
+            return None
+
+        now = time.time()
+        smart_connect.setUserId(client_id)
+        smart_connect.setRefreshToken(entry['refresh_token'])
+        # generateTokens also expects the old JWT in the Authorization header
+        smart_connect.setAccessToken(entry['jwt_token'])
+        smart_connect.setFeedToken(entry['feed_token'])
+
+        try:
+            if entry['expires_at'] - EXPIRY_MARGIN > now:
+                if self._verify(smart_connect):
+                    return 'cached'
+
+            if entry['refresh_expires_at'] > now:
+                response = smart_connect.generateToken(entry['refresh_token'])
+                if response and response.get('status') and self._verify(smart_connect):
+                    data = response.get('data', {})
+                    self.put(client_id,
+                             smart_connect.access_token,
+                             data.get('refreshToken') or entry['refresh_token'],
+                             smart_connect.getfeedToken())
+                    return 'refreshed'
+        except Exception as e:
+            error_msg = str(e).lower()
+            if 'access rate' in error_msg or 'access denied' in error_msg:
+                # Throttled, not rejected - the session may still be good
+                smart_connect.setAccessToken(None)
+                return None
+
+        # Session is unusable - make sure no other process tries it again
+        self.invalidate(client_id)
+        smart_connect.setAccessToken(None)
+        return None
+
+    def store(self, smart_connect, client_id: str):
+        """Save the session currently held by a SmartConnect instance."""
+        if smart_connect.access_token and smart_connect.refresh_token:
+            self.put(client_id,
+                     smart_connect.access_token,
+                     smart_connect.refresh_token,
+                     smart_connect.getfeedToken())
+
+    @staticmethod
+    def _verify(smart_connect) -> bool:
+        """Check that the session is accepted by the broker."""
+        profile = smart_connect.getProfile(smart_connect.refresh_token)
+        return bool(profile and profile.get('status'))
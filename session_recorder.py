@@ -0,0 +1,469 @@
+"""
+Record-and-replay harness for order book sessions.
+Captures every orderBook() / tradeBook() response with timestamps into a
+gzip'd JSON-lines file (one segment file per process: a restart writes
+session.1.jsonl.gz next to session.jsonl.gz), and feeds a recorded session back through the
+monitors at 1x or accelerated speed to reproduce incidents and benchmark
+detection changes against real trading days.
+
+Recording:
+    RECORD_SESSION_PATH=logs/session_2025-10-27.jsonl.gz python run_multi_account_copy_trading.py
+
+Replaying:
+    python session_recorder.py logs/session_2025-10-27.jsonl.gz --target copy --speed 60
+"""
+import argparse
+import atexit
+import glob
+import gzip
+import json
+import os
+import re
+import threading
+import time
+import zlib
+from collections import Counter, defaultdict
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional
+
+from rate_governor import RateGovernor
+
+
+FORMAT_VERSION = 1
+RECORDED_ENDPOINTS = {'orderBook': 'orderBook', 'tradeBook': 'tradeBook'}
+
+
+def _split_path(path: str):
+    """Split 'logs/session.jsonl.gz' into ('logs/session', '.jsonl.gz')."""
+    directory, name = os.path.split(path)
+    stem, dot, extension = name.partition('.')
+    return os.path.join(directory, stem), dot + extension
+
+
+def segment_paths(path: str) -> List[str]:
+    """
+    Get the segment files of a session, in the order they were written.
+
+    Args:
+        path: Session file path as given to SessionRecorder
+
+    Returns:
+        Existing segment files (the path itself first, then path.1, path.2, ...)
+    """
+    root, extension = _split_path(path)
+    numbered = re.compile(re.escape(os.path.basename(root)) + r'\.(\d+)' + re.escape(extension) + '$')
+    segments = []
+    for candidate in glob.glob(glob.escape(root) + '.*' + glob.escape(extension)):
+        match = numbered.match(os.path.basename(candidate))
+        if match:
+            segments.append((int(match.group(1)), candidate))
+    return ([path] if os.path.exists(path) else []) + [p for _, p in sorted(segments)]
+
+
+class SessionRecorder:
+    """
+    Writes API responses to a compressed session file.
+
+    Every record is flushed as it is written, and each process writes its
+    own segment file, so a crash loses at most the record being written and
+    never makes the segments of later runs unreadable.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize recorder.
+
+        Args:
+            path: Session file path (gzip'd JSON lines; if it exists, the next
+                  free segment, e.g. session.1.jsonl.gz, is written instead)
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        root, extension = _split_path(path)
+        segment = 0
+        while True:
+            self.path = path if not segment else f"{root}.{segment}{extension}"
+            try:
+                self._file = gzip.open(self.path, 'xt', encoding='utf-8')
+                break
+            except FileExistsError:
+                segment += 1
+
+        self._lock = threading.Lock()
+        self.records = 0
+        self._write({'type': 'header', 'version': FORMAT_VERSION, 'started': time.time()})
+        atexit.register(self.close)
+
+    def _write(self, entry: Dict):
+        """Write one line (caller may hold the lock)."""
+        self._file.write(json.dumps(entry, separators=(',', ':')) + '\n')
+        self._file.flush()  # Readable up to here if the process dies
+
+    def record(self, account: str, endpoint: str, started: float, latency: float,
+               response=None, error: str = None):
+        """
+        Record one API call.
+
+        Args:
+            account: Account (client ID)
+            endpoint: 'orderBook' or 'tradeBook'
+            started: Unix time the request was sent
+            latency: Seconds until the response arrived
+            response: Parsed response (None if the call failed)
+            error: Error message if the call raised
+        """
+        entry = {'t': round(started, 4), 'lat': round(latency, 4),
+                 'account': account, 'endpoint': endpoint}
+        if error is not None:
+            entry['error'] = error
+        else:
+            entry['response'] = response
+        with self._lock:
+            if self._file.closed:
+                return
+            self._write(entry)
+            self.records += 1
+
+    def attach(self, smart_connect, account: str):
+        """
+        Record every order book / trade book call made through a SmartConnect.
+
+        Args:
+            smart_connect: SmartConnect instance to instrument
+            account: Account (client ID) the instance belongs to
+        """
+        for method_name, endpoint in RECORDED_ENDPOINTS.items():
+            original = getattr(smart_connect, method_name)
+            setattr(smart_connect, method_name, self._recording(original, account, endpoint))
+
+    def _recording(self, fetch: Callable, account: str, endpoint: str) -> Callable:
+        """Wrap a fetch function so its result is recorded."""
+        def recorded_fetch(*args, **kwargs):
+            started = time.time()
+            try:
+                response = fetch(*args, **kwargs)
+            except Exception as e:
+                self.record(account, endpoint, started, time.time() - started, error=str(e))
+                raise
+            self.record(account, endpoint, started, time.time() - started, response=response)
+            return response
+        return recorded_fetch
+
+    def close(self):
+        """Flush and close the session file."""
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+_recorders: Dict[str, SessionRecorder] = {}
+_recorders_lock = threading.Lock()
+
+
+def shared_recorder(path: str) -> SessionRecorder:
+    """Get the process-wide recorder for a session file."""
+    with _recorders_lock:
+        if path not in _recorders:
+            _recorders[path] = SessionRecorder(path)
+        return _recorders[path]
+
+
+class RecordedSession:
+    """A session file loaded into memory."""
+
+    def __init__(self, records: List[Dict]):
+        """
+        Initialize session.
+
+        Args:
+            records: Call records in recorded order
+        """
+        self.records = sorted(records, key=lambda r: r['t'])
+
+    @classmethod
+    def load(cls, path: str) -> 'RecordedSession':
+        """
+        Read a session (every segment file, and every segment appended to one).
+
+        A segment cut short by a crash gives the records written before it.
+        """
+        records = []
+        for segment in segment_paths(path) or [path]:
+            records.extend(cls._read_segment(segment))
+        return cls(records)
+
+    @staticmethod
+    def _read_segment(path: str) -> List[Dict]:
+        """Read the records of one segment file, up to a truncated tail."""
+        records = []
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break  # Truncated tail of an unclean shutdown
+                    if entry.get('type') != 'header':
+                        records.append(entry)
+        except FileNotFoundError:
+            raise
+        except (EOFError, zlib.error, OSError):
+            pass  # Compressed stream cut off by a crash: keep what was read
+        return records
+
+    def accounts(self) -> List[str]:
+        """Accounts with recorded calls, most active first."""
+        return [account for account, _ in Counter(r['account'] for r in self.records).most_common()]
+
+    def calls(self, account: str, endpoint: str = 'orderBook') -> List[Dict]:
+        """Recorded calls for one account and endpoint, in order."""
+        return [r for r in self.records if r['account'] == account and r['endpoint'] == endpoint]
+
+
+class ReplayClient:
+    """
+    Stands in for SmartAPIClient / MultiAccountClient during replay.
+
+    Each get_order_book() / get_trade_book() returns the next recorded
+    response for the account (or raises the recorded error).
+    """
+
+    def __init__(self, session: RecordedSession, account: str, name: str = None):
+        """
+        Initialize replay client.
+
+        Args:
+            session: Recorded session
+            account: Account (client ID) to replay
+            name: Display name (default: account)
+        """
+        self.client_id = account
+        self.account = SimpleNamespace(name=name or account, client_id=account)
+        self.is_initialized = True
+        self.feed_token = None
+        self._queues = {endpoint: list(session.calls(account, endpoint))
+                        for endpoint in RECORDED_ENDPOINTS.values()}
+        self._positions = defaultdict(int)
+        self.current = None  # Record served last
+
+    def remaining(self, endpoint: str = 'orderBook') -> int:
+        """Recorded calls not yet served."""
+        return len(self._queues[endpoint]) - self._positions[endpoint]
+
+    def peek(self, endpoint: str = 'orderBook') -> Optional[Dict]:
+        """Next recorded call, or None when exhausted."""
+        position = self._positions[endpoint]
+        queue = self._queues[endpoint]
+        return queue[position] if position < len(queue) else None
+
+    def skip(self, endpoint: str = 'orderBook'):
+        """Drop the next recorded call without serving it."""
+        if self.remaining(endpoint):
+            self._positions[endpoint] += 1
+
+    def _next(self, endpoint: str):
+        """Serve the next recorded call."""
+        position = self._positions[endpoint]
+        queue = self._queues[endpoint]
+        if position >= len(queue):
+            return {'status': True, 'message': 'SUCCESS', 'data': []}
+        self._positions[endpoint] += 1
+        self.current = queue[position]
+        if 'error' in self.current:
+            raise Exception(self.current['error'])
+        return self.current['response']
+
+    def get_order_book(self, deadline: float = None, hedge: bool = False):
+        """Next recorded order book."""
+        return self._next('orderBook')
+
+    def get_trade_book(self):
+        """Next recorded trade book."""
+        return self._next('tradeBook')
+
+
+class UnlimitedGovernor(RateGovernor):
+    """Governor that never defers - replayed calls were paid for when recorded."""
+
+    def try_acquire(self, account: str, endpoint: str) -> float:
+        """Always grant."""
+        return 0.0
+
+    def set_budget(self, account: str, endpoint: str, max_calls: int, window_seconds: float):
+        """Ignore per-monitor budgets."""
+
+
+class ReplayResult:
+    """Outcome of replaying a session through one detector."""
+
+    def __init__(self):
+        """Initialize empty result."""
+        self.polls = 0
+        self.errors = 0
+        self.skipped = 0  # Recorded calls the detector did not make (e.g. while backing off)
+        self.detections: List[Dict] = []  # {'orderid', 'recorded_at', 'detected_at'}
+        self.wall_time = 0.0
+
+    @property
+    def duplicates(self) -> List[str]:
+        """Order IDs reported more than once (would be duplicate copies)."""
+        counts = Counter(d['orderid'] for d in self.detections)
+        return [order_id for order_id, count in counts.items() if count > 1]
+
+    def summary(self) -> Dict:
+        """Summary counters."""
+        return {
+            'polls': self.polls,
+            'errors': self.errors,
+            'skipped': self.skipped,
+            'detections': len(self.detections),
+            'unique_orders': len({d['orderid'] for d in self.detections}),
+            'duplicates': len(self.duplicates),
+            'wall_time': self.wall_time,
+        }
+
+
+class Replayer:
+    """Drives a detector's check_for_new_orders() through a recorded session."""
+
+    def __init__(self, session: RecordedSession, speed: float = 1.0):
+        """
+        Initialize replayer.
+
+        Args:
+            session: Recorded session
+            speed: Replay speed (1 = real time, 60 = a minute per second, 0 = no waiting)
+        """
+        self.session = session
+        self.speed = speed
+
+    def _run(self, client: ReplayClient, check: Callable[[], List[Dict]],
+             on_detected: Callable[[Dict], None] = None,
+             before_poll: Callable[[], None] = None) -> ReplayResult:
+        """
+        Call check() once per recorded order book, paced by the recording.
+
+        Args:
+            client: Replay client serving the recording
+            check: Detector poll
+            on_detected: Called with each detected order
+            before_poll: Called before each recorded poll (e.g. to clear a
+                         back-off the detector set on the wall clock - the
+                         recording already holds the gap it caused)
+        """
+        result = ReplayResult()
+        start = time.time()
+        previous = None
+
+        while client.remaining('orderBook'):
+            upcoming = client.peek('orderBook')
+            recorded_at = upcoming['t']
+            if self.speed and previous is not None:
+                time.sleep(max(0.0, (recorded_at - previous) / self.speed))
+            previous = recorded_at
+
+            if before_poll:
+                before_poll()
+            remaining = client.remaining('orderBook')
+            detected = check() or []
+            if client.remaining('orderBook') == remaining:
+                # The detector didn't make the recorded call - drop it rather than spin on it
+                client.skip('orderBook')
+                result.skipped += 1
+            else:
+                result.polls += 1
+                if 'error' in upcoming:
+                    result.errors += 1
+            for order in detected:
+                result.detections.append({'orderid': order.get('orderid'),
+                                          'recorded_at': recorded_at,
+                                          'detected_at': time.time()})
+                if on_detected:
+                    on_detected(order)
+
+        result.wall_time = time.time() - start
+        return result
+
+    def replay_monitor(self, account: str = None) -> ReplayResult:
+        """
+        Replay through SmartPollingMonitor.check_for_new_orders.
+
+        The first recorded order book primes the monitor, like a real start.
+
+        Args:
+            account: Account to replay (default: the most active one)
+        """
+        from smart_polling import SmartPollingMonitor
+
+        client = ReplayClient(self.session, account or self.session.accounts()[0])
+        monitor = SmartPollingMonitor(client, governor=UnlimitedGovernor())
+
+        def on_recording_clock():
+            monitor.backoff_until = None  # The recorded polls already reflect the back-off
+
+        self.monitor = monitor
+        return self._run(client, monitor.check_for_new_orders, before_poll=on_recording_clock)
+
+    def replay_copy_trader(self, account: str = None, settings=None,
+                           followers: List = None, copy: bool = False) -> ReplayResult:
+        """
+        Replay through MultiAccountCopyTrader.check_for_new_orders.
+
+        Args:
+            account: Master account to replay (default: the most active one)
+            settings: CopyTradingSettings (default: dry run)
+            followers: Follower clients to fan out to when copy=True
+            copy: Also run copy_order_to_followers for each detected order
+        """
+        from multi_account_copy_trader import MultiAccountCopyTrader, CopyTradingSettings
+
+        account = account or self.session.accounts()[0]
+        master = ReplayClient(self.session, account)
+        if settings is None:
+            settings = CopyTradingSettings()
+            settings.dry_run = True
+        settings.decouple_placement = False  # Measure detection and fan-out inline
+
+        followers = list(followers or [])
+        client_manager = SimpleNamespace(master_client=master, follower_clients=followers,
+                                         get_all_active_followers=lambda: followers)
+        config = SimpleNamespace(master_account=master.account, follower_accounts=[])
+        trader = MultiAccountCopyTrader(config, settings, client_manager=client_manager)
+        self.trader = trader
+        return self._run(master, trader.check_for_new_orders,
+                         trader.copy_order_to_followers if copy else None)
+
+
+def main():
+    """Replay a recorded session from the command line."""
+    parser = argparse.ArgumentParser(description="Replay a recorded order book session")
+    parser.add_argument('path', help="Session file (.jsonl.gz)")
+    parser.add_argument('--target', choices=['monitor', 'copy'], default='copy')
+    parser.add_argument('--speed', type=float, default=0, help="1 = real time, 0 = as fast as possible")
+    parser.add_argument('--account', help="Account to replay (default: most active)")
+    args = parser.parse_args()
+
+    session = RecordedSession.load(args.path)
+    print(f"📼 Loaded {len(session.records)} recorded calls for {len(session.accounts())} account(s)")
+
+    replayer = Replayer(session, speed=args.speed)
+    if args.target == 'monitor':
+        result = replayer.replay_monitor(args.account)
+    else:
+        result = replayer.replay_copy_trader(args.account)
+
+    summary = result.summary()
+    print("\n📊 Replay Summary:")
+    print(f"   Polls: {summary['polls']} ({summary['errors']} recorded errors, "
+          f"{summary['skipped']} skipped)")
+    print(f"   Orders Detected: {summary['detections']} ({summary['unique_orders']} unique)")
+    print(f"   Duplicates: {summary['duplicates']} {result.duplicates if result.duplicates else ''}")
+    print(f"   Wall Time: {summary['wall_time']:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
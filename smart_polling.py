@@ -3,9 +3,19 @@ Smart polling strategy with rate limit protection.
 Optimizes API calls while staying within SmartAPI limits.
 """
 import time
-from datetime import datetime, timedelta
 from smartapi_client import SmartAPIClient
-from display import display_option_order
+from display import display_new_order
+from order_state import OrderBookDiffer, OrderEvent
+from rate_governor import RateGovernor, shared_governor
+from poll_scheduler import AdaptivePollScheduler
+from market_calendar import TradingCalendar, get_calendar, format_session, CLOSED, OPEN, PRE_OPEN
+from metrics import POLL_ITERATION, POLL_INTERVAL
+from structured_log import get_logger
+
+
+log = get_logger('smart_polling')
+
+MARKET_STATUS = {OPEN: "🟢 MARKET HOURS", PRE_OPEN: "🟡 PRE-OPEN", CLOSED: "🔴 OFF HOURS"}
 
 
 class SmartPollingMonitor:
@@ -17,31 +27,53 @@ class SmartPollingMonitor:
     - Recommended: 1-2 requests per second to be safe
     
     Strategies:
-    1. Adaptive polling: Fast during market hours, slower otherwise
+    1. Adaptive polling: Fast while the master is active, decaying when idle
+       (see AdaptivePollScheduler); asleep between trading sessions
     2. Exponential backoff on errors
     3. Cache-based detection (only polls when needed)
     """
     
-    def __init__(self, client: SmartAPIClient):
+    def __init__(self, client: SmartAPIClient, governor: RateGovernor = None,
+                 calendar: TradingCalendar = None):
         """
         Initialize smart monitor.
         
         Args:
             client: SmartAPIClient instance
+            governor: RateGovernor to share (default: process-wide shared_governor)
+            calendar: Trading calendar (default: process-wide, from nse_holidays.json)
         """
         self.client = client
-        self.known_order_ids = set()
-        self._initialize_known_orders()
+        self.calendar = calendar or get_calendar()
+        self.order_state = OrderBookDiffer()
+        self.last_events = []  # Events from the most recent poll
+        self.last_snapshot = None  # Parsed order book from the most recent poll
         
-        # Rate limiting
-        self.api_calls_count = 0
-        self.api_calls_window_start = time.time()
+        # Rate limiting - the budget lives in the governor, shared with every
+        # other consumer of this account
+        self.governor = governor or shared_governor
+        self.account = client.client_id
+        self.api_calls_count = 0  # Total order book calls made by this monitor
         self.max_calls_per_minute = 10  # Conservative: 10 calls/minute (6 seconds between calls)
+        self.governor.set_budget(self.account, 'orderBook', self.max_calls_per_minute, 60)
+        self.next_call_at = None  # Set when the budget defers a poll
+        self.order_book_deadline = 4.0  # Seconds before a slow order book read is abandoned
+        
+        self._initialize_known_orders()
         
         # Adaptive polling intervals
-        self.market_hours_interval = 6  # 6 seconds during market hours (10 calls/min - SAFE)
-        self.off_hours_interval = 60    # 60 seconds outside market hours
-        self.current_interval = self.market_hours_interval
+        self.market_hours_interval = 6  # 6 seconds while the master is active (10 calls/min - SAFE)
+        self.idle_interval = 30         # Market hours, no orders for a while
+        self.off_hours_interval = 60    # If a poll lands just after the close
+        self.scheduler = AdaptivePollScheduler(
+            self.max_calls_per_minute,
+            fast_interval=self.market_hours_interval,
+            idle_interval=self.idle_interval,
+            off_hours_interval=self.off_hours_interval,
+            governor=self.governor, account=self.account
+        )
+        self.current_interval = self.scheduler.interval
+        POLL_INTERVAL.set_function(lambda: self.current_interval, self.account)
         
         # Rate limit backoff
         self.consecutive_rate_limits = 0
@@ -59,14 +91,13 @@ class SmartPollingMonitor:
                     print(f"🔄 Retrying initialization in {wait_time}s (attempt {attempt + 1}/{max_retries})...")
                     time.sleep(wait_time)
                 
+                self.governor.record(self.account, 'orderBook')
                 order_book = self.client.get_order_book()
                 if order_book and 'data' in order_book:
                     order_data = order_book['data']
                     if order_data:  # Check if data is not None and not empty
-                        self.known_order_ids = {
-                            order.get('orderid') for order in order_data
-                        }
-                        print(f"✅ Initialized with {len(self.known_order_ids)} existing orders")
+                        self.order_state.prime(order_data)
+                        print(f"✅ Initialized with {len(self.order_state)} existing orders")
                     else:
                         print("✅ Initialized with 0 existing orders (no orders placed yet)")
                 return  # Success!
@@ -80,64 +111,83 @@ class SmartPollingMonitor:
                     else:
                         print(f"⚠️  Could not initialize known orders after {max_retries} attempts")
                         print(f"    Will start monitoring anyway, but may detect old orders as new")
-                        self.known_order_ids = set()
+                        self.order_state = OrderBookDiffer()
                 else:
                     print(f"Error initializing known orders: {e}")
-                    self.known_order_ids = set()
+                    self.order_state = OrderBookDiffer()
+    
+    @property
+    def known_order_ids(self):
+        """Order IDs seen so far."""
+        return self.order_state.known_ids()
+    
+    @property
+    def calls_this_minute(self):
+        """Order book calls for this account in the last 60s, across all consumers."""
+        return self.governor.usage(self.account, 'orderBook', 60)
     
     def _is_market_hours(self):
         """
-        Check if current time is within market hours.
-        NSE: 9:15 AM - 3:30 PM IST (Mon-Fri)
+        Check if a trading session (pre-open included) is in progress.
+        NSE: 9:00 pre-open, 9:15 AM - 3:30 PM IST on trading days, plus special
+        sessions such as Muhurat trading (see market_calendar.py)
         """
-        now = datetime.now()
-        
-        # Skip weekends
-        if now.weekday() >= 5:  # Saturday=5, Sunday=6
-            return False
-        
-        # Check time
-        market_open = now.replace(hour=9, minute=15, second=0)
-        market_close = now.replace(hour=15, minute=30, second=0)
-        
-        return market_open <= now <= market_close
+        return self.calendar.phase() != CLOSED
     
     def _check_rate_limit(self):
         """
-        Check and enforce rate limits.
-        Returns True if we can make a call, False if we should wait.
-        """
-        current_time = time.time()
-        
-        # Reset counter every minute
-        if current_time - self.api_calls_window_start >= 60:
-            self.api_calls_count = 0
-            self.api_calls_window_start = current_time
+        Ask the rate governor for an order book call.
+        Returns True if we can make a call, False if the poll should be skipped.
         
-        # Check if we've hit the limit
-        if self.api_calls_count >= self.max_calls_per_minute:
-            wait_time = 60 - (current_time - self.api_calls_window_start)
-            if wait_time > 0:
-                print(f"⚠️  Rate limit reached ({self.api_calls_count}/{self.max_calls_per_minute}). Waiting {wait_time:.1f}s...")
-                time.sleep(wait_time + 1)  # Wait until next minute + 1 second buffer
-                self.api_calls_count = 0
-                self.api_calls_window_start = time.time()
+        Never sleeps: when the budget is spent, next_call_at is set so the
+        polling loop can schedule the next attempt.
+        """
+        wait_time = self.governor.try_acquire(self.account, 'orderBook')
+        if wait_time > 0:
+            self.next_call_at = time.time() + wait_time
+            log.warning('budget_deferred',
+                        "⚠️  Rate limit budget reached ({calls}/{limit}). Next call in {wait:.1f}s",
+                        calls=self.calls_this_minute, limit=self.max_calls_per_minute,
+                        wait=round(wait_time, 1))
+            return False
         
+        self.next_call_at = None
         return True
     
+    def _next_delay(self):
+        """Seconds to sleep before the next poll."""
+        if self.next_call_at:
+            return max(0.0, self.next_call_at - time.time())
+        return self.current_interval
+    
     def _adaptive_interval(self):
-        """Get polling interval based on market hours."""
-        if self._is_market_hours():
-            return self.market_hours_interval
-        else:
-            return self.off_hours_interval
+        """
+        Get polling interval from master activity and market hours.
+        
+        Fast right after order events or while master orders are open,
+        decaying toward idle_interval when quiet; never faster than
+        max_calls_per_minute allows.
+        """
+        return self.scheduler.update(events=len(self.last_events),
+                                     open_orders=self.order_state.live_count(),
+                                     market_open=self._is_market_hours())
     
     def check_for_new_orders(self):
-        """Check order book for new orders with rate limiting."""
+        """
+        Check order book for changes with rate limiting.
+        
+        All detected events (status changes, fills, modifications) are kept
+        in self.last_events; only brand-new orders are returned.
+        
+        Returns:
+            List of new order dictionaries
+        """
+        self.last_events = []
+        
         # Check if we're in backoff period
         if self.backoff_until and time.time() < self.backoff_until:
             remaining = int(self.backoff_until - time.time())
-            print(f"⏸️  In backoff period. Waiting {remaining}s...")
+            log.info('backoff', "⏸️  In backoff period. Waiting {remaining}s...", remaining=remaining)
             return []
         
         # Check rate limit first
@@ -146,7 +196,7 @@ class SmartPollingMonitor:
         
         try:
             # Make API call
-            order_book = self.client.get_order_book()
+            order_book = self.client.get_order_book(deadline=self.order_book_deadline)
             self.api_calls_count += 1
             
             # Reset consecutive rate limits on success
@@ -160,15 +210,13 @@ class SmartPollingMonitor:
             if not order_data:  # None or empty list
                 return []
             
-            # Find new orders
-            new_orders = []
-            for order in order_data:
-                order_id = order.get('orderid')
-                
-                if order_id and order_id not in self.known_order_ids:
-                    self.known_order_ids.add(order_id)
-                    new_orders.append(order)
-            print(new_orders)
+            # Parse once, then diff against known state
+            self.last_snapshot = self.order_state.snapshot(order_data)
+            self.last_events = self.order_state.diff(self.last_snapshot)
+            new_orders = [event.order for event in self.last_events
+                          if event.kind == OrderEvent.NEW]
+            log.debug('poll', orders=len(self.last_snapshot), parsed=len(self.last_snapshot.fresh),
+                      events=len(self.last_events), new=len(new_orders))
             return new_orders
             
         except Exception as e:
@@ -180,15 +228,16 @@ class SmartPollingMonitor:
                 backoff_time = min(60 * (2 ** (self.consecutive_rate_limits - 1)), 300)  # Max 5 minutes
                 self.backoff_until = time.time() + backoff_time
                 
-                print(f"⚠️  Rate limit hit! (attempt {self.consecutive_rate_limits})")
-                print(f"   🔄 Backing off for {backoff_time} seconds...")
-                print(f"   💡 TIP: Current polling interval may be too aggressive")
+                log.warning('rate_limited',
+                            "⚠️  Rate limit hit! (attempt {attempt})\n"
+                            "   🔄 Backing off for {backoff} seconds...\n"
+                            "   💡 TIP: Current polling interval may be too aggressive",
+                            attempt=self.consecutive_rate_limits, backoff=backoff_time)
                 
-                # Reset counters
-                self.api_calls_count = 0
-                self.api_calls_window_start = time.time()
+                # Hold off every consumer of this account, not just this monitor
+                self.governor.note_throttled(self.account, 'orderBook', backoff_time)
             else:
-                print(f"Error checking for new orders: {e}")
+                log.error('poll_failed', "Error checking for new orders: {error}", error=str(e))
             return []
     
     def on_new_order(self, order):
@@ -199,10 +248,39 @@ class SmartPollingMonitor:
         Args:
             order: Order dictionary
         """
-        print("\n" + "🔔 " * 30)
-        print(f"NEW ORDER DETECTED AT {datetime.now()}")
-        print("🔔 " * 30 + "\n")
-        display_option_order(order)
+        display_new_order(order)
+    
+    def on_order_update(self, event: OrderEvent):
+        """
+        Handler called when a known order changes (status, fill, modification).
+        Override this method for custom behavior.
+        
+        Args:
+            event: OrderEvent describing the change
+        """
+        order = event.order
+        if event.kind == OrderEvent.STATUS_CHANGE:
+            detail = f"{event.previous_status} → {event.status}"
+        elif event.kind == OrderEvent.PARTIAL_FILL:
+            detail = f"+{event.filled_delta} filled ({order.get('filledshares')}/{order.get('quantity')})"
+        else:
+            detail = f"qty {order.get('quantity')} @ {order.get('price')}"
+        log.info('order_update', "🔄 ORDER UPDATE [{kind}] {order_id} {symbol}: {detail}",
+                 kind=event.kind, order_id=order.get('orderid'),
+                 symbol=order.get('tradingsymbol'), detail=detail)
+    
+    def _sleep_until_open(self, until_open: float):
+        """
+        Sleep through a market closure (nights, weekends, holidays).
+        
+        Args:
+            until_open: Seconds until the next session's pre-open
+        """
+        self.current_interval = self.scheduler.update(market_open=False, until_open=until_open)
+        log.info('market_closed', "[{clock}] 🔴 MARKET CLOSED | Next session: {session} - "
+                 "sleeping {hours:.1f}h", session=format_session(self.calendar.next_session()),
+                 hours=until_open / 3600, seconds=round(until_open))
+        time.sleep(until_open)
     
     def start(self):
         """Start monitoring with intelligent polling."""
@@ -211,7 +289,8 @@ class SmartPollingMonitor:
         print("="*100)
         print(f"Rate Limit: {self.max_calls_per_minute} calls/minute (safe limit)")
         print(f"Market Hours Interval: {self.market_hours_interval}s (~{60//self.market_hours_interval} calls/min)")
-        print(f"Off Hours Interval: {self.off_hours_interval}s")
+        print(f"Idle Interval: up to {self.idle_interval}s (no recent orders)")
+        print(f"Next Session: {format_session(self.calendar.next_session())}")
         print(f"Monitoring account: {self.client.client_id}")
         print("⚠️  If you see rate limit errors, the monitor will auto-backoff")
         
@@ -226,26 +305,43 @@ class SmartPollingMonitor:
         
         try:
             while True:
-                # Get adaptive interval
-                self.current_interval = self._adaptive_interval()
+                # Between sessions, sleep straight to the next pre-open instead of polling
+                until_open = self.calendar.seconds_until_open()
+                if until_open > 0:
+                    self._sleep_until_open(until_open)
+                    continue
+                
+                iteration_started = time.perf_counter()
                 
                 # Show status
-                market_status = "🟢 MARKET HOURS" if self._is_market_hours() else "🔴 OFF HOURS"
-                print(f"[{datetime.now().strftime('%H:%M:%S')}] {market_status} | "
-                      f"Checking... (interval: {self.current_interval}s, "
-                      f"API calls this minute: {self.api_calls_count}/{self.max_calls_per_minute})")
+                log.info('poll_iteration',
+                         "[{clock}] {market} | Checking... (interval: {interval}, "
+                         "API calls this minute: {calls}/{limit})",
+                         market=MARKET_STATUS[self.calendar.phase()],
+                         interval=self.scheduler.describe(), calls=self.calls_this_minute,
+                         limit=self.max_calls_per_minute)
                 
                 # Check for new orders
                 new_orders = self.check_for_new_orders()
                 
+                # Next interval from what this poll saw
+                self.current_interval = self._adaptive_interval()
+                
                 if new_orders:
                     for order in new_orders:
                         self.on_new_order(order)
                 
-                # Wait before next check
-                time.sleep(self.current_interval)
+                for event in self.last_events:
+                    if event.kind != OrderEvent.NEW:
+                        self.on_order_update(event)
+                
+                POLL_ITERATION.labels('smart_polling').observe(time.perf_counter() - iteration_started)
+                
+                # Wait before next check (sooner if the budget deferred this one)
+                time.sleep(self._next_delay())
                 
         except KeyboardInterrupt:
+            log.flush()
             print("\n\nMonitoring stopped by user.")
             print(f"Total API calls made: {self.api_calls_count}")
 
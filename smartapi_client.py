@@ -4,8 +4,12 @@ SmartAPI client initialization and session management.
 from datetime import datetime
 import pyotp
 import time
-from SmartApi.smartConnect import SmartConnect
 from config import Config
+from session_cache import SessionCache
+from rate_governor import shared_governor
+from hedged_request import HedgedCaller
+from transport import PooledSmartConnect, shared_transports
+from session_recorder import shared_recorder
 
 
 class SmartAPIClient:
@@ -35,7 +39,12 @@ class SmartAPIClient:
         self.totp_secret = Config.TOTP_SECRET
         
         self.totp = pyotp.TOTP(self.totp_secret)
-        self.client = SmartConnect(api_key=self.api_key)
+        self.client = PooledSmartConnect(shared_transports.get(self.client_id, pool_maxsize=4),
+                                         api_key=self.api_key, root=Config.SMARTAPI_ROOT_URL)
+        if Config.RECORD_SESSION_PATH:
+            shared_recorder(Config.RECORD_SESSION_PATH).attach(self.client, self.client_id)
+        self.order_book_caller = HedgedCaller(lambda: self.client.orderBook(),
+                                              shared_governor, self.client_id)
         self._initialize_session()
         self.session_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         SmartAPIClient._session_initialized = True
@@ -47,6 +56,15 @@ class SmartAPIClient:
         Args:
             max_retries: Maximum number of retry attempts
         """
+        cache = SessionCache(Config.SESSION_CACHE_PATH) if Config.USE_SESSION_CACHE else None
+        if cache:
+            restored = cache.restore(self.client, self.client_id)
+            if restored:
+                self.session_data = cache.get(self.client_id)
+                self.feed_token = self.client.getfeedToken()
+                print(f"✅ Session {restored} from cache at {datetime.now()} (no login needed)")
+                return self.session_data
+        
         retry_count = 0
         base_delay = 60  # Start with 60 seconds
         
@@ -61,6 +79,8 @@ class SmartAPIClient:
                 )
                 self.session_data = session
                 self.feed_token = self.client.getfeedToken()
+                if cache:
+                    cache.store(self.client, self.client_id)
                 print(f"✅ Session initialized successfully at {datetime.now()}")
                 return session
                 
@@ -85,10 +105,19 @@ class SmartAPIClient:
                     print(f"❌ Error initializing session: {e}")
                     raise
     
-    def get_order_book(self):
-        """Fetch order book data with error handling."""
+    def get_order_book(self, deadline=None, hedge=False):
+        """
+        Fetch order book data with error handling.
+        
+        Args:
+            deadline: Seconds to wait before giving up (None = HTTP timeout only)
+            hedge: Send a second request if the first is slower than the observed p95
+            
+        Raises:
+            DeadlineExceeded: If no response arrived before the deadline
+        """
         try:
-            return self.client.orderBook()
+            return self.order_book_caller.call(deadline=deadline, hedge=hedge)
         except Exception as e:
             error_msg = str(e).lower()
             # Don't print rate limit errors - let caller handle them
@@ -0,0 +1,444 @@
+"""
+Local SmartAPI simulator for offline load testing and benchmarking.
+Serves the REST endpoints SmartConnect uses (login, token refresh, profile,
+order book, trade book, place order) with configurable latency, throttling
+and order book size, so the whole system can run without broker access.
+
+Usage:
+    python smartapi_simulator.py --port 8765 --order-book-size 200
+    SMARTAPI_ROOT_URL=http://127.0.0.1:8765 python run_multi_account_copy_trading.py
+"""
+import argparse
+import base64
+import itertools
+import json
+import math
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+from order_feed_stub import LocalOrderFeedServer
+
+
+# Path -> endpoint name (paths as in SmartConnect._routes)
+ROUTES = {
+    '/rest/auth/angelbroking/user/v1/loginByPassword': 'login',
+    '/rest/auth/angelbroking/jwt/v1/generateTokens': 'generateTokens',
+    '/rest/secure/angelbroking/user/v1/getProfile': 'getProfile',
+    '/rest/secure/angelbroking/order/v1/getOrderBook': 'orderBook',
+    '/rest/secure/angelbroking/order/v1/getTradeBook': 'tradeBook',
+    '/rest/secure/angelbroking/order/v1/placeOrder': 'placeOrder',
+}
+
+# Broker limits per client code as (max_calls, window_seconds)
+DEFAULT_RATE_LIMITS = {
+    'login': (1, 1.0),
+    'generateTokens': (1, 1.0),
+    'getProfile': (3, 1.0),
+    'orderBook': (1, 1.0),
+    'tradeBook': (1, 1.0),
+    'placeOrder': (20, 1.0),
+}
+
+# The broker answers throttled calls with plain text, not JSON
+THROTTLE_MESSAGE = b"Access denied because of exceeding access rate"
+
+SESSION_LIFETIME = 8 * 60 * 60
+
+
+class LatencyModel:
+    """Log-normal response latency described by its median and p99."""
+
+    def __init__(self, median_ms: float = 40, p99_ms: float = 150):
+        """
+        Initialize latency model.
+
+        Args:
+            median_ms: Median latency in milliseconds
+            p99_ms: 99th percentile latency in milliseconds (>= median)
+        """
+        self.median_ms = median_ms
+        self.p99_ms = max(p99_ms, median_ms)
+        self._sigma = math.log(self.p99_ms / median_ms) / 2.326 if median_ms > 0 else 0.0
+
+    def sample(self) -> float:
+        """Draw one latency in seconds."""
+        if self.median_ms <= 0:
+            return 0.0
+        return random.lognormvariate(math.log(self.median_ms), self._sigma) / 1000
+
+
+def _fake_jwt(client_code: str, lifetime: int = SESSION_LIFETIME) -> str:
+    """Build an unsigned JWT with a real 'exp' claim (enough for the session cache)."""
+    def encode(data: Dict) -> str:
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip('=')
+    claims = {'username': client_code, 'exp': int(time.time()) + lifetime,
+              'nonce': random.getrandbits(32)}
+    return f"{encode({'alg': 'none', 'typ': 'JWT'})}.{encode(claims)}.sim"
+
+
+def _sample_order(order_id: str, client_code: str, index: int) -> Dict:
+    """Synthetic option order in order book format."""
+    strike = 24000 + (index % 40) * 50
+    option = 'CE' if index % 2 else 'PE'
+    status = 'complete' if index % 5 else 'cancelled'
+    quantity = str(75 * (1 + index % 4))
+    return {
+        'orderid': order_id,
+        'clientcode': client_code,
+        'variety': 'NORMAL',
+        'tradingsymbol': f"NIFTY28OCT25{strike}{option}",
+        'symboltoken': str(40000 + index),
+        'transactiontype': 'BUY' if index % 3 else 'SELL',
+        'exchange': 'NFO',
+        'ordertype': 'MARKET',
+        'producttype': 'CARRYFORWARD',
+        'duration': 'DAY',
+        'price': '0',
+        'averageprice': f"{100 + index % 50}.5",
+        'triggerprice': '0',
+        'quantity': quantity,
+        'filledshares': quantity if status == 'complete' else '0',
+        'unfilledshares': '0' if status == 'complete' else quantity,
+        'status': status,
+        'orderstatus': status,
+        'text': '',
+        'updatetime': datetime.now().strftime('%d-%b-%Y %H:%M:%S'),
+        'exchtime': datetime.now().strftime('%d-%b-%Y %H:%M:%S'),
+    }
+
+
+class SmartAPISimulator:
+    """
+    In-process stand-in for the SmartAPI REST service.
+
+    Each client code gets its own order book. Orders placed through the API
+    complete immediately and appear in the book (and on the order feed, if
+    enabled), so a master order injected with inject_order() flows through
+    the copy trader exactly like a live one.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0,
+                 latency: Optional[Dict[str, LatencyModel]] = None,
+                 rate_limits: Optional[Dict[str, tuple]] = None,
+                 throttle_probability: float = 0.0,
+                 order_book_size: int = 0,
+                 with_order_feed: bool = False):
+        """
+        Initialize simulator.
+
+        Args:
+            host: Interface to bind (default: localhost only)
+            port: Port to bind (default: 0 = pick a free port)
+            latency: Endpoint -> LatencyModel ('default' applies to the rest)
+            rate_limits: Endpoint -> (max_calls, window_seconds); None disables throttling
+            throttle_probability: Chance of throttling an otherwise allowed call
+            order_book_size: Synthetic orders pre-loaded into each account's book
+            with_order_feed: Also run a LocalOrderFeedServer and push order updates to it
+        """
+        self.host = host
+        self.port = port
+        self.latency = {'default': LatencyModel()}
+        self.latency.update(latency or {})
+        self.rate_limits = DEFAULT_RATE_LIMITS if rate_limits is None else rate_limits
+        self.throttle_probability = throttle_probability
+        self.order_book_size = order_book_size
+
+        self.order_feed = LocalOrderFeedServer(host) if with_order_feed else None
+        self._server = None
+        self._lock = threading.Lock()
+        self._order_ids = itertools.count(250000000000001)
+        self._order_books: Dict[str, List[Dict]] = {}
+        self._tokens: Dict[str, str] = {}  # access/refresh token -> client code
+        self._calls: Dict[tuple, deque] = defaultdict(deque)
+
+        # Counters
+        self.requests = defaultdict(int)
+        self.throttled = defaultdict(int)
+
+    @property
+    def root_url(self) -> str:
+        """Root URL to pass to SmartConnect (or set as SMARTAPI_ROOT_URL)."""
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> str:
+        """
+        Start serving in a background thread.
+
+        Returns:
+            Root URL of the simulator
+        """
+        simulator = self
+
+        class Handler(_SimulatorHandler):
+            sim = simulator
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, name="smartapi-simulator",
+                         daemon=True).start()
+        if self.order_feed:
+            self.order_feed.start()
+        return self.root_url
+
+    def stop(self):
+        """Stop the simulator."""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self.order_feed:
+            self.order_feed.stop()
+
+    # --- State -------------------------------------------------------------
+
+    def order_book(self, client_code: str) -> List[Dict]:
+        """Get (creating on first use) the order book of an account."""
+        with self._lock:
+            return self._book_for(client_code)
+
+    def _book_for(self, client_code: str) -> List[Dict]:
+        """Order book of an account (caller must hold the lock)."""
+        book = self._order_books.get(client_code)
+        if book is None:
+            book = self._order_books[client_code] = [
+                _sample_order(str(next(self._order_ids)), client_code, i)
+                for i in range(self.order_book_size)
+            ]
+        return book
+
+    def inject_order(self, client_code: str, **fields) -> Dict:
+        """
+        Add an order to an account's book as if it were placed from the broker app.
+
+        Args:
+            client_code: Account whose book receives the order
+            **fields: Order book fields overriding the generated defaults
+
+        Returns:
+            The added order
+        """
+        with self._lock:
+            book = self._book_for(client_code)
+            order = _sample_order(str(next(self._order_ids)), client_code, len(book) + 1)
+            order.update(status='complete', orderstatus='complete')
+            order.update(fields)
+            book.append(order)
+        if self.order_feed:
+            self.order_feed.push_order(dict(order))
+        return order
+
+    def _is_throttled(self, client_code: str, endpoint: str) -> bool:
+        """Apply the endpoint's sliding-window limit for this caller."""
+        if self.throttle_probability and random.random() < self.throttle_probability:
+            return True
+        limit = self.rate_limits.get(endpoint) if self.rate_limits else None
+        if not limit:
+            return False
+
+        max_calls, window = limit
+        now = time.time()
+        with self._lock:
+            calls = self._calls[(client_code, endpoint)]
+            while calls and calls[0] <= now - window:
+                calls.popleft()
+            if len(calls) >= max_calls:
+                return True
+            calls.append(now)
+        return False
+
+    # --- Endpoint handlers -------------------------------------------------
+
+    def handle(self, endpoint: str, body: Dict, token: Optional[str], caller: str):
+        """
+        Produce the response for one request.
+
+        Returns:
+            (status_code, payload) - payload is a dict (JSON) or bytes (plain text)
+        """
+        with self._lock:
+            self.requests[endpoint] += 1
+            client_code = self._tokens.get(token) if token else None
+
+        time.sleep(self.latency.get(endpoint, self.latency['default']).sample())
+
+        if self._is_throttled(client_code or body.get('clientcode') or caller, endpoint):
+            with self._lock:
+                self.throttled[endpoint] += 1
+            return 403, THROTTLE_MESSAGE
+
+        if endpoint == 'login':
+            return 200, self._login(body)
+        if endpoint == 'generateTokens':
+            with self._lock:
+                client_code = self._tokens.get(body.get('refreshToken'))
+            if not client_code:
+                return 200, {'status': False, 'message': 'Invalid Token', 'errorcode': 'AG8001', 'data': None}
+            return 200, self._issue_tokens(client_code, refresh_token=body['refreshToken'])
+
+        if not client_code:
+            return 401, {'success': False, 'message': 'Invalid Token', 'errorCode': 'AG8001', 'data': ''}
+
+        if endpoint == 'getProfile':
+            return 200, _ok({'clientcode': client_code, 'name': f"Simulated {client_code}",
+                             'exchanges': ['NSE', 'NFO'], 'products': ['CARRYFORWARD', 'INTRADAY']})
+        if endpoint == 'orderBook':
+            return 200, _ok([dict(order) for order in self.order_book(client_code)])
+        if endpoint == 'tradeBook':
+            trades = [dict(order, fillid=order['orderid'], fillprice=order['averageprice'],
+                           fillsize=order['filledshares'])
+                      for order in self.order_book(client_code) if order['status'] == 'complete']
+            return 200, _ok(trades)
+        if endpoint == 'placeOrder':
+            return 200, self._place_order(client_code, body)
+        return 404, {'status': False, 'message': 'Unknown route'}
+
+    def _login(self, body: Dict) -> Dict:
+        """Accept any credentials and open a session."""
+        client_code = body.get('clientcode')
+        if not client_code:
+            return {'status': False, 'message': 'Invalid clientcode', 'errorcode': 'AB1007', 'data': None}
+        return self._issue_tokens(client_code)
+
+    def _issue_tokens(self, client_code: str, refresh_token: str = None) -> Dict:
+        """Create tokens for an account."""
+        jwt = _fake_jwt(client_code)
+        refresh_token = refresh_token or f"refresh-{client_code}-{random.getrandbits(48):x}"
+        with self._lock:
+            self._tokens[jwt] = client_code
+            self._tokens[refresh_token] = client_code
+        return _ok({'jwtToken': jwt, 'refreshToken': refresh_token,
+                    'feedToken': f"feed-{client_code}"})
+
+    def _place_order(self, client_code: str, params: Dict) -> Dict:
+        """Fill the order immediately and add it to the book."""
+        quantity = str(params.get('quantity', '0'))
+        order = self.inject_order(
+            client_code,
+            variety=params.get('variety', 'NORMAL'),
+            tradingsymbol=params.get('tradingsymbol'),
+            symboltoken=params.get('symboltoken'),
+            transactiontype=params.get('transactiontype'),
+            exchange=params.get('exchange'),
+            ordertype=params.get('ordertype'),
+            producttype=params.get('producttype'),
+            duration=params.get('duration', 'DAY'),
+            price=str(params.get('price', '0')),
+            triggerprice=str(params.get('triggerprice', '0')),
+            quantity=quantity,
+            filledshares=quantity,
+            unfilledshares='0',
+        )
+        return _ok({'script': order['tradingsymbol'], 'orderid': order['orderid'],
+                    'uniqueorderid': f"sim-{order['orderid']}"})
+
+    def get_statistics(self) -> Dict:
+        """Get request and throttle counts per endpoint."""
+        with self._lock:
+            return {'requests': dict(self.requests), 'throttled': dict(self.throttled)}
+
+
+def _ok(data) -> Dict:
+    """Successful SmartAPI response envelope."""
+    return {'status': True, 'message': 'SUCCESS', 'errorcode': '', 'data': data}
+
+
+class _SimulatorHandler(BaseHTTPRequestHandler):
+    """HTTP front end; the bound subclass sets `sim`."""
+
+    protocol_version = 'HTTP/1.1'  # Keep-alive, like the real API
+    sim: SmartAPISimulator = None
+
+    def _dispatch(self):
+        path = self.path.split('?', 1)[0]
+        endpoint = ROUTES.get(path)
+
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+        try:
+            body = json.loads(raw) if raw else {}
+        except ValueError:
+            body = {}
+
+        token = None
+        auth = self.headers.get('Authorization', '')
+        if auth.startswith('Bearer '):
+            token = auth[len('Bearer '):]
+
+        if endpoint is None:
+            status, payload = 404, {'status': False, 'message': 'Unknown route'}
+        else:
+            status, payload = self.sim.handle(endpoint, body, token, self.client_address[0])
+
+        if isinstance(payload, bytes):
+            content, content_type = payload, 'text/plain'
+        else:
+            content, content_type = json.dumps(payload).encode(), 'application/json'
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    do_GET = _dispatch
+    do_POST = _dispatch
+
+    def do_HEAD(self):
+        """Connection warm-up probes."""
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output clean
+
+
+def main():
+    """Run the simulator from the command line."""
+    parser = argparse.ArgumentParser(description="Local SmartAPI simulator")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--median-ms', type=float, default=40, help="Median response latency")
+    parser.add_argument('--p99-ms', type=float, default=150, help="p99 response latency")
+    parser.add_argument('--order-book-size', type=int, default=0, help="Orders pre-loaded per account")
+    parser.add_argument('--throttle-probability', type=float, default=0.0)
+    parser.add_argument('--no-rate-limits', action='store_true', help="Never throttle by rate")
+    parser.add_argument('--order-feed', action='store_true', help="Also serve the order update stream")
+    args = parser.parse_args()
+
+    simulator = SmartAPISimulator(
+        host=args.host, port=args.port,
+        latency={'default': LatencyModel(args.median_ms, args.p99_ms)},
+        rate_limits={} if args.no_rate_limits else None,
+        throttle_probability=args.throttle_probability,
+        order_book_size=args.order_book_size,
+        with_order_feed=args.order_feed,
+    )
+    root = simulator.start()
+
+    print("="*100)
+    print("SMARTAPI SIMULATOR")
+    print("="*100)
+    print(f"REST root:   {root}   (export SMARTAPI_ROOT_URL={root})")
+    if simulator.order_feed:
+        print(f"Order feed:  {simulator.order_feed.url}   (export ORDER_FEED_URL={simulator.order_feed.url})")
+    print(f"Latency:     median {args.median_ms} ms, p99 {args.p99_ms} ms")
+    print(f"Order book:  {args.order_book_size} orders per account")
+    print("Press Ctrl+C to stop")
+    print("="*100 + "\n")
+
+    try:
+        while True:
+            time.sleep(10)
+            print(f"[{datetime.now().strftime('%H:%M:%S')}] {simulator.get_statistics()}")
+    except KeyboardInterrupt:
+        simulator.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+Non-blocking structured logging.
+Callers only enqueue (event, fields); a writer thread formats and writes, so
+a slow terminal or a piped log collector never stalls the poll or copy loop.
+
+Output is either human text (the familiar emoji lines) or JSON lines:
+
+    LOG_FORMAT=json LOG_LEVEL=DEBUG python run_multi_account_copy_trading.py
+
+Usage:
+    log = get_logger('copy_trader')
+    log.info('copy_result', "   ✅ {follower}: Success! Order ID: {order_id}",
+             follower=name, order_id=order_id, ms=12.5)
+"""
+import atexit
+import json
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, Optional, TextIO
+
+from config import Config
+
+
+DEBUG, INFO, WARNING, ERROR = 10, 20, 30, 40
+LEVELS = {'DEBUG': DEBUG, 'INFO': INFO, 'WARNING': WARNING, 'ERROR': ERROR}
+LEVEL_NAMES = {value: name.lower() for name, value in LEVELS.items()}
+
+_FLUSH = object()  # Marker asking the writer to signal once it reaches it
+IDLE_WAIT = 0.05   # Seconds the writer sleeps when the queue is empty
+
+
+class LogWriter:
+    """Background thread that formats and writes queued records."""
+
+    def __init__(self, level: int = INFO, fmt: str = 'text', stream: Optional[TextIO] = None,
+                 maxsize: int = 10000):
+        """
+        Initialize writer.
+
+        Args:
+            level: Minimum level to record
+            fmt: 'text' (templates, for terminals) or 'json' (one object per line)
+            stream: Output stream (default: sys.stdout at write time)
+            maxsize: Records held before new ones are dropped (the hot path never waits)
+        """
+        self.level = level
+        self.fmt = fmt
+        self.stream = stream
+        self.dropped = 0
+        self.maxsize = maxsize
+        # deque.append/popleft are atomic: the hot path takes no lock and
+        # never wakes the writer, which polls every IDLE_WAIT instead
+        self._queue = deque()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def submit(self, record: tuple):
+        """Queue a record (dropped and counted if the writer is too far behind)."""
+        if self._thread is None:
+            self._start()
+        if len(self._queue) < self.maxsize:
+            self._queue.append(record)
+        else:
+            self.dropped += 1
+
+    def _start(self):
+        """Start the writer thread on first use."""
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        """Drain the queue, writing in batches."""
+        reported_drops = 0
+        while True:
+            batch = []
+            while len(batch) < 500:
+                try:
+                    batch.append(self._queue.popleft())
+                except IndexError:
+                    break
+            if not batch and self.dropped == reported_drops:
+                self._wakeup.wait(IDLE_WAIT)
+                self._wakeup.clear()
+                continue
+
+            lines, markers = [], []
+            for record in batch:
+                if isinstance(record, tuple) and record[0] is _FLUSH:
+                    markers.append(record[1])
+                else:
+                    lines.append(self.format(record))
+            if self.dropped > reported_drops:
+                lines.append(self.format((time.time(), WARNING, 'log', 'log_records_dropped', None,
+                                          {'dropped': self.dropped - reported_drops})))
+                reported_drops = self.dropped
+
+            if lines:
+                stream = self.stream or sys.stdout
+                try:
+                    stream.write('\n'.join(lines) + '\n')
+                    stream.flush()
+                except (ValueError, OSError):
+                    pass  # Stream closed (interpreter shutdown) - nothing to do
+            for marker in markers:
+                marker.set()
+
+    def format(self, record: tuple) -> str:
+        """Render one record as a line (or block) of output."""
+        timestamp, level, logger, event, template, fields = record
+        if self.fmt == 'json':
+            entry = {'ts': datetime.fromtimestamp(timestamp).isoformat(timespec='milliseconds'),
+                     'level': LEVEL_NAMES[level], 'logger': logger, 'event': event}
+            entry.update(fields)
+            return json.dumps(entry, default=str, ensure_ascii=False, separators=(',', ':'))
+
+        if template:
+            try:
+                return template.format(clock=datetime.fromtimestamp(timestamp).strftime('%H:%M:%S'),
+                                       **fields)
+            except (KeyError, IndexError, ValueError):
+                pass  # Fall back to the compact form rather than lose the record
+        clock = datetime.fromtimestamp(timestamp).strftime('%H:%M:%S')
+        details = ' '.join(f"{key}={value}" for key, value in fields.items())
+        return f"[{clock}] {LEVEL_NAMES[level].upper()} {logger}: {event} {details}".rstrip()
+
+    def flush(self, timeout: float = 2.0) -> bool:
+        """
+        Wait until everything queued so far has been written.
+
+        Args:
+            timeout: Maximum seconds to wait
+
+        Returns:
+            True if the writer caught up in time
+        """
+        if self._thread is None:
+            return True
+        marker = threading.Event()
+        self._queue.append((_FLUSH, marker))  # Never dropped, even when full
+        self._wakeup.set()
+        return marker.wait(timeout)
+
+
+class StructuredLogger:
+    """Named logger that hands records to the shared writer."""
+
+    __slots__ = ('name', 'writer')
+
+    def __init__(self, name: str, writer: LogWriter):
+        """
+        Initialize logger.
+
+        Args:
+            name: Component name (e.g. 'copy_trader')
+            writer: Writer records are queued on
+        """
+        self.name = name
+        self.writer = writer
+
+    def log(self, level: int, event: str, template: str = None, **fields):
+        """
+        Record an event.
+
+        Args:
+            level: DEBUG, INFO, WARNING or ERROR
+            event: Short event name (the JSON 'event' field)
+            template: str.format template for text output ({clock} is the record time);
+                      formatted on the writer thread, never here
+            **fields: Event fields (JSON-serializable or str()-able)
+        """
+        if level >= self.writer.level:
+            self.writer.submit((time.time(), level, self.name, event, template, fields))
+
+    def enabled(self, level: int) -> bool:
+        """Whether records at this level are kept (skip building costly fields if not)."""
+        return level >= self.writer.level
+
+    def debug(self, event: str, template: str = None, **fields):
+        """Record a DEBUG event."""
+        self.log(DEBUG, event, template, **fields)
+
+    def info(self, event: str, template: str = None, **fields):
+        """Record an INFO event."""
+        self.log(INFO, event, template, **fields)
+
+    def warning(self, event: str, template: str = None, **fields):
+        """Record a WARNING event."""
+        self.log(WARNING, event, template, **fields)
+
+    def error(self, event: str, template: str = None, **fields):
+        """Record an ERROR event."""
+        self.log(ERROR, event, template, **fields)
+
+    def flush(self, timeout: float = 2.0) -> bool:
+        """Wait for queued records to be written (e.g. before prompting for input)."""
+        return self.writer.flush(timeout)
+
+
+# Process-wide writer, configured from the environment
+writer = LogWriter(level=LEVELS.get(Config.LOG_LEVEL.upper(), INFO), fmt=Config.LOG_FORMAT.lower())
+_loggers: Dict[str, StructuredLogger] = {}
+
+
+def get_logger(name: str) -> StructuredLogger:
+    """Get the logger for a component."""
+    logger = _loggers.get(name)
+    if logger is None:
+        logger = _loggers.setdefault(name, StructuredLogger(name, writer))
+    return logger
+
+
+def configure(level: str = None, fmt: str = None, stream: TextIO = None):
+    """
+    Change logging settings at runtime.
+
+    Args:
+        level: 'DEBUG', 'INFO', 'WARNING' or 'ERROR'
+        fmt: 'text' or 'json'
+        stream: Output stream (None keeps the current one)
+    """
+    writer.flush()
+    if level:
+        writer.level = LEVELS[level.upper()]
+    if fmt:
+        writer.fmt = fmt.lower()
+    if stream is not None:
+        writer.stream = stream
+
+
+atexit.register(writer.flush)
@@ -17,7 +17,29 @@ from tests.test_config import TestConfig
 from tests.test_order_detection import TestOrderDetection
 from tests.test_rate_limiting import TestRateLimiting
 from tests.test_smartapi_client import TestSmartAPIClient
-from tests.test_market_hours import TestMarketHours
+from tests.test_market_hours import TestMarketHours, TestTradingCalendar
+from tests.test_login_scheduler import TestLoginBudget, TestLoginScheduler
+from tests.test_session_cache import TestSessionCache
+from tests.test_order_state import TestOrderBookDiffer, TestCopyTraderDetection
+from tests.test_order_feed import TestParseMessage, TestOrderFeed, TestStreamingCopyTrader
+from tests.test_rate_governor import TestRateGovernor, TestMonitorsShareBudget
+from tests.test_placement_limiter import TestPlacementLimiter, TestFollowerPlacement
+from tests.test_copy_pipeline import TestCopyPipeline, TestDecoupledCopyTrader
+from tests.test_hedged_request import TestHedgedCaller
+from tests.test_transport import TestPooledTransport
+from tests.test_smartapi_simulator import TestSmartAPISimulator
+from tests.test_session_recorder import TestSessionRecorder
+from tests.test_benchmarks import TestBenchmarkHarness
+from tests.test_copy_latency import TestCopyLatency
+from tests.test_metrics import TestMetrics
+from tests.test_structured_log import TestStructuredLog
+from tests.test_poll_scheduler import TestAdaptivePollScheduler
+from tests.test_order_snapshot import TestOrderSnapshot
+from tests.test_order_utils import TestOrderAggregation, TestRunningAggregates
+from tests.test_trade_history import TestTradeHistoryStore
+from tests.test_instrument_master import TestInstrumentMaster
+from tests.test_option_symbol import TestOptionSymbol
+from tests.test_quantity_engine import TestQuantityEngine, TestFollowerSizing
 
 def run_all_tests():
     """Run all test suites."""
@@ -30,6 +52,38 @@ def run_all_tests():
     suite.addTests(loader.loadTestsFromTestCase(TestRateLimiting))
     suite.addTests(loader.loadTestsFromTestCase(TestSmartAPIClient))
     suite.addTests(loader.loadTestsFromTestCase(TestMarketHours))
+    suite.addTests(loader.loadTestsFromTestCase(TestTradingCalendar))
+    suite.addTests(loader.loadTestsFromTestCase(TestLoginBudget))
+    suite.addTests(loader.loadTestsFromTestCase(TestLoginScheduler))
+    suite.addTests(loader.loadTestsFromTestCase(TestSessionCache))
+    suite.addTests(loader.loadTestsFromTestCase(TestOrderBookDiffer))
+    suite.addTests(loader.loadTestsFromTestCase(TestCopyTraderDetection))
+    suite.addTests(loader.loadTestsFromTestCase(TestParseMessage))
+    suite.addTests(loader.loadTestsFromTestCase(TestOrderFeed))
+    suite.addTests(loader.loadTestsFromTestCase(TestStreamingCopyTrader))
+    suite.addTests(loader.loadTestsFromTestCase(TestRateGovernor))
+    suite.addTests(loader.loadTestsFromTestCase(TestMonitorsShareBudget))
+    suite.addTests(loader.loadTestsFromTestCase(TestPlacementLimiter))
+    suite.addTests(loader.loadTestsFromTestCase(TestFollowerPlacement))
+    suite.addTests(loader.loadTestsFromTestCase(TestCopyPipeline))
+    suite.addTests(loader.loadTestsFromTestCase(TestDecoupledCopyTrader))
+    suite.addTests(loader.loadTestsFromTestCase(TestHedgedCaller))
+    suite.addTests(loader.loadTestsFromTestCase(TestPooledTransport))
+    suite.addTests(loader.loadTestsFromTestCase(TestSmartAPISimulator))
+    suite.addTests(loader.loadTestsFromTestCase(TestSessionRecorder))
+    suite.addTests(loader.loadTestsFromTestCase(TestBenchmarkHarness))
+    suite.addTests(loader.loadTestsFromTestCase(TestCopyLatency))
+    suite.addTests(loader.loadTestsFromTestCase(TestMetrics))
+    suite.addTests(loader.loadTestsFromTestCase(TestStructuredLog))
+    suite.addTests(loader.loadTestsFromTestCase(TestAdaptivePollScheduler))
+    suite.addTests(loader.loadTestsFromTestCase(TestOrderSnapshot))
+    suite.addTests(loader.loadTestsFromTestCase(TestOrderAggregation))
+    suite.addTests(loader.loadTestsFromTestCase(TestRunningAggregates))
+    suite.addTests(loader.loadTestsFromTestCase(TestTradeHistoryStore))
+    suite.addTests(loader.loadTestsFromTestCase(TestInstrumentMaster))
+    suite.addTests(loader.loadTestsFromTestCase(TestOptionSymbol))
+    suite.addTests(loader.loadTestsFromTestCase(TestQuantityEngine))
+    suite.addTests(loader.loadTestsFromTestCase(TestFollowerSizing))
     
     # Run tests
     runner = unittest.TextTestRunner(verbosity=2)
@@ -0,0 +1,75 @@
+"""
+Test the benchmark harness.
+Critical: A false regression wastes time; a missed one ships a slowdown.
+"""
+
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.run_benchmarks import compare, measure, median_runs, run_suite
+
+
+def timing(seconds, calibration=1e-3):
+    """A measured timing."""
+    return {'min': seconds, 'median': seconds, 'calibration': calibration}
+
+
+class TestBenchmarkHarness(unittest.TestCase):
+    """Test measurement and baseline comparison."""
+
+    def test_compare_flags_regressions(self):
+        """Test statuses against the tolerance."""
+        baselines = {'a[1]': timing(1e-3), 'b[1]': timing(1e-3), 'c[1]': timing(1e-3)}
+        results = {'a[1]': timing(1.1e-3), 'b[1]': timing(2e-3), 'c[1]': timing(0.5e-3),
+                   'd[1]': timing(1e-3)}
+
+        statuses = {row['case']: row['status'] for row in compare(results, baselines, 0.3)}
+
+        self.assertEqual(statuses, {'a[1]': 'ok', 'b[1]': 'regression',
+                                    'c[1]': 'faster', 'd[1]': 'new'})
+
+    def test_host_drift_is_calibrated_out(self):
+        """Test that a uniformly slower host is not a regression."""
+        baselines = {'a[1]': timing(1e-3, calibration=1e-3)}
+        results = {'a[1]': timing(2e-3, calibration=2e-3)}
+
+        row = compare(results, baselines, 0.3)[0]
+
+        self.assertEqual(row['status'], 'ok')
+        self.assertAlmostEqual(row['ratio'], 1.0)
+
+    def test_small_cases_get_wider_tolerance(self):
+        """Test that sub-10 µs cases are judged with twice the tolerance."""
+        baselines = {'a[1]': timing(2e-6), 'b[1]': timing(2e-6)}
+        results = {'a[1]': timing(2.9e-6), 'b[1]': timing(3.3e-6)}
+
+        statuses = {row['case']: row['status'] for row in compare(results, baselines, 0.3)}
+
+        self.assertEqual(statuses, {'a[1]': 'ok', 'b[1]': 'regression'})
+
+    def test_baseline_is_median_run(self):
+        """Test that one outlying run doesn't become the baseline."""
+        runs = [{'a[1]': timing(1e-3)}, {'a[1]': timing(3e-3)}, {'a[1]': timing(1.2e-3, calibration=1e-3)}]
+
+        self.assertEqual(median_runs(runs)['a[1]']['min'], 1.2e-3)
+
+    def test_measure_reports_calibration(self):
+        """Test that measure times the callable and the reference."""
+        result = measure(lambda: sum(range(100)), repeat=2, min_sample_time=0.001)
+
+        self.assertGreater(result['min'], 0)
+        self.assertLessEqual(result['min'], result['median'])
+        self.assertGreater(result['calibration'], 0)
+
+    def test_cases_run(self):
+        """Test that a registered case sets up and runs."""
+        results = run_suite(quick=True, repeat=1, only={'should_copy_order[1]'})
+
+        self.assertEqual(list(results), ['should_copy_order[1]'])
+
+
+if __name__ == '__main__':
+    unittest.main()
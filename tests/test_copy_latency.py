@@ -0,0 +1,84 @@
+"""
+Test end-to-end copy latency tracing.
+Critical: We must be able to say where the seconds between master fill and follower ack went.
+"""
+
+import unittest
+import sys
+import os
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import IST
+from copy_latency import parse_broker_time, master_order_time, intervals, summarize
+from multi_account_copy_trader import CopyTradingSettings
+from tests.test_multi_account_copy_trading import make_trader, make_follower
+
+
+def completed_order(order_id='101', updatetime='27-Oct-2025 10:15:32'):
+    """Create a completed master order."""
+    return {'orderid': order_id, 'status': 'complete', 'tradingsymbol': 'NIFTY28OCT2525000CE',
+            'transactiontype': 'BUY', 'quantity': '75', 'price': '0', 'exchange': 'NFO',
+            'ordertype': 'MARKET', 'producttype': 'CARRYFORWARD', 'symboltoken': '43210',
+            'updatetime': updatetime}
+
+
+class TestCopyLatency(unittest.TestCase):
+    """Test timestamp parsing, stage capture and per-follower percentiles."""
+
+    def test_broker_time_is_ist(self):
+        """Test that broker timestamps are read as IST."""
+        expected = datetime(2025, 10, 27, 10, 15, 32, tzinfo=IST).timestamp()
+
+        self.assertEqual(parse_broker_time('27-Oct-2025 10:15:32'), expected)
+        self.assertEqual(parse_broker_time('2025-10-27 10:15:32'), expected)
+        self.assertIsNone(parse_broker_time(''))
+        self.assertIsNone(parse_broker_time('not a time'))
+
+    def test_exchange_time_preferred(self):
+        """Test that the exchange update time wins over the broker's."""
+        order = {'updatetime': '27-Oct-2025 10:15:33',
+                 'exchorderupdatetime': '27-Oct-2025 10:15:32'}
+
+        self.assertEqual(master_order_time(order), '27-Oct-2025 10:15:32')
+
+    def test_stages_recorded_per_follower(self):
+        """Test that every copy record carries ordered stage timestamps."""
+        settings = CopyTradingSettings()
+        settings.decouple_placement = False
+        followers = [make_follower('F1', delay=0.02), make_follower('F2', delay=0.01)]
+        trader = make_trader(followers, settings)
+
+        for order in trader.tracker.process_order_book([completed_order()]):
+            trader._dispatch_order(order, 'poll')
+
+        self.assertEqual(len(trader.tracker.copy_records), 2)
+        for record in trader.tracker.copy_records:
+            latency = record['latency']
+            self.assertEqual(latency['source'], 'poll')
+            ordered = [latency[s] for s in ('detected', 'decided', 'built', 'sent', 'acked')]
+            self.assertEqual(ordered, sorted(ordered))
+            durations = intervals(latency)
+            self.assertGreaterEqual(durations['send_to_ack'], 10)
+            self.assertIn('fill_to_ack', durations)
+        self.assertEqual(trader.tracker.traces, {}, "Finished traces are released")
+
+    def test_percentiles_per_follower(self):
+        """Test p50/p95/p99 summaries."""
+        records = [{'follower': 'F1', 'latency': {'sent': 1000.0, 'acked': 1000.0 + ms / 1000}}
+                   for ms in range(1, 101)]
+        records.append({'follower': 'F2', 'latency': None})
+
+        summary = summarize(records)
+
+        self.assertEqual(list(summary), ['F1'])
+        stats = summary['F1']['send_to_ack']
+        self.assertEqual(stats['count'], 100)
+        self.assertAlmostEqual(stats['p50_ms'], 51.0, places=3)
+        self.assertAlmostEqual(stats['p95_ms'], 96.0, places=3)
+        self.assertAlmostEqual(stats['p99_ms'], 100.0, places=3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+"""
+Test the detect -> copy pipeline.
+Critical: Slow placement must never delay detection of the next master order.
+"""
+
+import unittest
+import threading
+import time
+import sys
+import os
+from unittest.mock import Mock, patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from copy_pipeline import CopyPipeline
+from multi_account_copy_trader import MultiAccountCopyTrader, CopyTradingSettings
+
+
+class TestCopyPipeline(unittest.TestCase):
+    """Test queueing, backpressure and staleness."""
+
+    def test_processes_in_detection_order(self):
+        """Test that queued orders are copied in the order they were detected."""
+        copied = []
+        pipeline = CopyPipeline(lambda order: copied.append(order['orderid']))
+        pipeline.start()
+
+        for order_id in ['1', '2', '3', '4']:
+            self.assertTrue(pipeline.submit({'orderid': order_id}))
+        pipeline.stop()
+
+        self.assertEqual(copied, ['1', '2', '3', '4'])
+        stats = pipeline.get_statistics()
+        self.assertEqual(stats['submitted'], 4)
+        self.assertEqual(stats['processed'], 4)
+        self.assertEqual(stats['depth'], 0)
+
+    def test_full_queue_drops_without_blocking(self):
+        """Test that a full queue drops new events instead of stalling the detector."""
+        release = threading.Event()
+        pipeline = CopyPipeline(lambda order: release.wait(5), maxsize=2)
+        pipeline.start()
+
+        pipeline.submit({'orderid': '1'})  # Taken by the placement thread
+        time.sleep(0.05)
+        self.assertTrue(pipeline.submit({'orderid': '2'}))
+        self.assertTrue(pipeline.submit({'orderid': '3'}))
+
+        start = time.time()
+        self.assertFalse(pipeline.submit({'orderid': '4'}))
+        self.assertLess(time.time() - start, 0.1)
+
+        release.set()
+        pipeline.stop()
+        stats = pipeline.get_statistics()
+        self.assertEqual(stats['dropped'], 1)
+        self.assertEqual(stats['max_depth'], 2)
+        self.assertEqual(stats['processed'], 3)
+
+    def test_stale_events_are_counted_and_optionally_skipped(self):
+        """Test that events stuck in the queue are reported as stale."""
+        copied = []
+        pipeline = CopyPipeline(lambda order: copied.append(order['orderid']),
+                                stale_after=5, drop_stale=True)
+
+        with patch('copy_pipeline.time.time', return_value=100.0):
+            pipeline.submit({'orderid': '1'})
+        with patch('copy_pipeline.time.time', return_value=103.0):
+            pipeline.submit({'orderid': '2'})
+
+        with patch('copy_pipeline.time.time', return_value=106.0):
+            pipeline.start()
+            pipeline.stop()
+
+        self.assertEqual(copied, ['2'])
+        stats = pipeline.get_statistics()
+        self.assertEqual(stats['stale'], 1)
+        self.assertAlmostEqual(stats['max_queue_ms'], 6000.0)
+
+
+class TestDecoupledCopyTrader(unittest.TestCase):
+    """Test that the copy trader detects while placement is still running."""
+
+    def test_detection_not_blocked_by_slow_placement(self):
+        """Test that dispatching returns immediately while followers are slow."""
+        follower = Mock()
+        follower.account.name = 'Follower1'
+
+        def place_order(params):
+            time.sleep(0.3)
+            return {'status': True, 'data': {'orderid': 'F1'}}
+
+        follower.place_order.side_effect = place_order
+        client_manager = Mock()
+        client_manager.get_all_active_followers.return_value = [follower]
+        client_manager.master_client.get_order_book.return_value = {'status': True, 'data': []}
+
+        trader = MultiAccountCopyTrader(Mock(), CopyTradingSettings(), client_manager=client_manager)
+        trader._start_pipeline()
+
+        start = time.time()
+        for order_id in ['1', '2']:
+            trader._dispatch_order({'orderid': order_id, 'status': 'complete', 'quantity': '75',
+                                    'tradingsymbol': 'NIFTY28OCT2525000CE',
+                                    'transactiontype': 'BUY', 'ordertype': 'MARKET'}, 'poll')
+        self.assertLess(time.time() - start, 0.1)
+
+        trader.pipeline.stop()
+        self.assertEqual(follower.place_order.call_count, 2)
+        self.assertEqual(trader.detection_counts['poll'], 2)
+
+    def test_order_refused_by_full_queue_is_copied_later(self):
+        """Test that an order the full queue refused is detected and copied on the next poll."""
+        follower = Mock()
+        follower.account.name = 'Follower1'
+        follower.place_order.return_value = {'status': True, 'data': {'orderid': 'F1'}}
+        client_manager = Mock()
+        client_manager.get_all_active_followers.return_value = [follower]
+        client_manager.master_client.get_order_book.return_value = {'status': True, 'data': []}
+        settings = CopyTradingSettings()
+        settings.copy_queue_size = 1
+        trader = MultiAccountCopyTrader(Mock(), settings, client_manager=client_manager)
+
+        def completed(order_id):
+            return {'orderid': order_id, 'status': 'complete', 'quantity': '75',
+                    'tradingsymbol': 'NIFTY28OCT2525000CE', 'transactiontype': 'BUY',
+                    'ordertype': 'MARKET'}
+
+        book = [completed('1'), completed('2')]
+        client_manager.master_client.get_order_book.return_value = {'status': True, 'data': book}
+        trader._start_pipeline()
+        trader.pipeline.stop()  # Nothing drains the queue: the second order finds it full
+        for order in trader.check_for_new_orders():
+            trader._dispatch_order(order, 'poll')
+        self.assertEqual(trader.pipeline.dropped, 1)
+        self.assertNotIn('2', trader.tracker.handled_master_orders)
+        self.assertNotIn('2', trader.tracker.traces)
+
+        trader.pipeline.start()
+        for order in trader.check_for_new_orders():
+            trader._dispatch_order(order, 'poll')
+        trader.pipeline.stop()
+        copied = [call[0][0]['quantity'] for call in follower.place_order.call_args_list]
+        self.assertEqual(len(copied), 2)
+        self.assertIn('2', trader.tracker.handled_master_orders)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+"""
+Test deadline-bounded and hedged order book reads.
+Critical: A stuck read must not stall detection for the full HTTP timeout.
+"""
+
+import unittest
+import itertools
+import threading
+import time
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hedged_request import HedgedCaller, DeadlineExceeded, CallerSaturated
+from rate_governor import RateGovernor
+
+
+def warmed_caller(fetch, governor=None):
+    """Create a caller whose observed p95 is ~10ms."""
+    caller = HedgedCaller(fetch, governor or RateGovernor(), 'A1')
+    caller._latencies.extend([0.01] * HedgedCaller.MIN_SAMPLES)
+    return caller
+
+
+class TestHedgedCaller(unittest.TestCase):
+    """Test deadlines, hedging and counters."""
+
+    def test_plain_call_without_deadline(self):
+        """Test that no deadline and no hedge is a direct call."""
+        caller = HedgedCaller(lambda: {'data': []}, RateGovernor(), 'A1')
+        self.assertEqual(caller.call(), {'data': []})
+        self.assertEqual(caller.calls, 0)
+
+    def test_deadline_bounds_slow_read(self):
+        """Test that a slow read gives up at the deadline."""
+        release = threading.Event()
+        caller = HedgedCaller(lambda: release.wait(5), RateGovernor(), 'A1')
+
+        start = time.time()
+        with self.assertRaises(DeadlineExceeded):
+            caller.call(deadline=0.1)
+        self.assertLess(time.time() - start, 0.5)
+        self.assertEqual(caller.deadline_misses, 1)
+        release.set()
+
+    def test_errors_propagate(self):
+        """Test that API errors still reach the caller."""
+        def fetch():
+            raise Exception("Access denied because of exceeding access rate")
+
+        caller = HedgedCaller(fetch, RateGovernor(), 'A1')
+        with self.assertRaises(Exception) as ctx:
+            caller.call(deadline=1.0)
+        self.assertIn('access rate', str(ctx.exception))
+
+    def test_hedge_wins_when_first_read_is_slow(self):
+        """Test that a hedge beats a slow first request and savings are counted."""
+        counter = itertools.count()
+
+        def fetch():
+            if next(counter) == 0:
+                time.sleep(0.3)
+                return {'data': 'slow'}
+            return {'data': 'fast'}
+
+        caller = warmed_caller(fetch)
+        self.assertEqual(caller.call(deadline=2.0, hedge=True), {'data': 'fast'})
+
+        time.sleep(0.4)  # Let the beaten request finish
+        stats = caller.get_statistics()
+        self.assertEqual(stats['hedges_sent'], 1)
+        self.assertEqual(stats['hedges_won'], 1)
+        self.assertGreater(stats['time_saved_ms'], 100)
+
+    def test_hedge_skipped_without_budget(self):
+        """Test that hedging never spends rate budget that isn't there."""
+        governor = RateGovernor({'orderBook': ((1, 60.0),)})
+        governor.record('A1', 'orderBook')  # The first request used the budget
+
+        def fetch():
+            time.sleep(0.05)
+            return {'data': []}
+
+        caller = warmed_caller(fetch, governor)
+        self.assertEqual(caller.call(deadline=1.0, hedge=True), {'data': []})
+        self.assertEqual(caller.hedges_sent, 0)
+        self.assertEqual(caller.hedges_skipped, 1)
+
+    def test_stalled_requests_fail_fast(self):
+        """Test that a new call is refused at once while stalled ones hold every worker."""
+        release = threading.Event()
+        caller = HedgedCaller(lambda: release.wait(5), RateGovernor(), 'A1', max_workers=2)
+        for _ in range(2):
+            with self.assertRaises(DeadlineExceeded):
+                caller.call(deadline=0.05)
+
+        start = time.time()
+        with self.assertRaises(CallerSaturated):
+            caller.call(deadline=1.0)
+        self.assertLess(time.time() - start, 0.05)
+        self.assertEqual(caller.get_statistics()['saturated'], 1)
+
+        release.set()
+        time.sleep(0.1)  # Stalled requests end and free their workers
+        self.assertTrue(caller.call(deadline=1.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
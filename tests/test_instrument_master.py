@@ -0,0 +1,157 @@
+"""
+Test the memory-mapped instrument master index.
+Critical: Lot sizes must come from the exchange, not be guessed per order.
+"""
+
+import unittest
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+from unittest.mock import Mock, patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import IST
+from instrument_master import (InstrumentMaster, build_index, iter_json_array, load_freeze_limits,
+                               REFRESH_LEAD_SECONDS)
+from market_calendar import TradingCalendar
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'scrip_master_sample.json')
+
+
+class TestInstrumentMaster(unittest.TestCase):
+    """Test building, lookups, staleness and refresh."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'instruments.bin')
+        with open(FIXTURE, encoding='utf-8') as f:
+            self.rows = json.load(f)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def build(self, **kwargs):
+        build_index(self.rows, self.path, **kwargs)
+        return InstrumentMaster(self.path, url='http://localhost/unused')
+
+    def test_lookup_by_token_and_symbol(self):
+        """Test that both keys find the same instrument with converted sizes."""
+        master = self.build()
+        by_token = master.by_token('43210')
+        self.assertEqual(by_token, master.by_symbol('NIFTY28OCT2525000CE'))
+        self.assertEqual(by_token.lot_size, 75)
+        self.assertEqual(by_token.tick_size, 0.05)
+        self.assertEqual(by_token.strike, 25000.0)
+        self.assertEqual(by_token.expiry, '28OCT2025')
+        self.assertEqual(by_token.instrument_type, 'OPTIDX')
+        self.assertEqual(master.by_token(52001).lot_size, 35)
+
+    def test_same_token_on_two_exchanges(self):
+        """Test that tokens are looked up within their exchange segment."""
+        master = self.build()
+        self.assertEqual(master.by_token('2885', 'NSE').symbol, 'RELIANCE-EQ')
+        self.assertEqual(master.by_token('2885', 'NFO').symbol, 'RELIANCE28OCT25FUT')
+        self.assertEqual(master.by_symbol('SENSEX25O2382000CE', 'BFO').lot_size, 20)
+        self.assertIsNone(master.by_symbol('SENSEX25O2382000CE', 'NFO'))
+
+    def test_unknown_and_skipped_rows(self):
+        """Test misses and that rows without a token are not indexed."""
+        master = self.build()
+        self.assertIsNone(master.by_token('999999'))
+        self.assertIsNone(master.by_symbol('BROKEN'))
+        self.assertEqual(len(master), len(self.rows) - 1)
+
+    def test_freeze_limits(self):
+        """Test that index derivatives get their freeze quantity and others none."""
+        master = self.build(freeze_limits={'NIFTY': 1800, 'BANKNIFTY': 900})
+        self.assertEqual(master.by_symbol('NIFTY28OCT2525000PE').freeze_qty, 1800)
+        self.assertEqual(master.by_symbol('BANKNIFTY28OCT25FUT').freeze_qty, 900)
+        self.assertEqual(master.by_token('99926000', 'NSE').freeze_qty, 0)
+        self.assertEqual(master.by_symbol('RELIANCE28OCT251400CE').freeze_qty, 0)
+        self.assertEqual(load_freeze_limits()['NIFTY'], 1800)
+
+    def test_for_order(self):
+        """Test looking up an order by token, falling back to its symbol."""
+        master = self.build()
+        order = {'symboltoken': '52001', 'tradingsymbol': 'BANKNIFTY28OCT2556000CE', 'exchange': 'NFO'}
+        self.assertEqual(master.for_order(order).token, '52001')
+        order = {'tradingsymbol': 'NIFTY28OCT2525050CE', 'exchange': 'NFO'}
+        self.assertEqual(master.for_order(order).token, '43212')
+
+    def test_missing_index_is_empty_and_stale(self):
+        """Test that a missing index gives no lookups until it is built."""
+        master = InstrumentMaster(self.path, url='http://localhost/unused')
+        self.assertEqual(len(master), 0)
+        self.assertIsNone(master.by_token('43210'))
+        self.assertTrue(master.is_stale())
+
+        self.assertEqual(master.refresh(source=FIXTURE), len(self.rows) - 1)
+        self.assertEqual(master.by_token('43210').lot_size, 75)
+        self.assertFalse(master.is_stale())
+
+    def test_stale_after_the_trading_day(self):
+        """Test that an index built yesterday (IST) is stale."""
+        built = datetime(2025, 10, 27, 23, 0, tzinfo=IST).timestamp()
+        master = self.build(built_at=built)
+        self.assertFalse(master.is_stale(now=built + 30 * 60))
+        self.assertTrue(master.is_stale(now=built + 90 * 60))
+
+    def test_failed_refresh_keeps_old_index(self):
+        """Test that a download failure leaves the existing index in use."""
+        master = self.build(built_at=time.time() - 3 * 86400)
+        with patch.object(InstrumentMaster, '_download', side_effect=OSError('offline')):
+            self.assertTrue(master.ensure_fresh())
+        self.assertEqual(master.by_token('43210').lot_size, 75)
+
+    def test_rows_parsed_one_at_a_time(self):
+        """Test that the streamed parse gives json.load's rows whatever the chunking."""
+        with open(FIXTURE, encoding='utf-8') as f:
+            text = f.read()
+        for chunk_size in (1, 7, 1 << 20):
+            self.assertEqual(list(iter_json_array(io.StringIO(text), chunk_size)), self.rows)
+        self.assertEqual(list(iter_json_array(io.StringIO('[1, 23,456 ]'), 2)), [1, 23, 456])
+        for broken in ('{"token": "1"}', '[{"token": "1"}', '[{"token": '):
+            with self.assertRaises(ValueError):
+                list(iter_json_array(io.StringIO(broken), 4))
+
+    def test_refresh_before_each_pre_open(self):
+        """Test that the daily refresh is due before the next session's pre-open."""
+        master = self.build()
+        calendar = TradingCalendar()
+        before_pre_open = datetime(2025, 10, 27, 9, 0, tzinfo=IST).timestamp() - REFRESH_LEAD_SECONDS
+        friday_evening = datetime(2025, 10, 24, 18, 0, tzinfo=IST).timestamp()
+        self.assertEqual(master.seconds_until_refresh(calendar, friday_evening),
+                         before_pre_open - friday_evening)
+        # Once the refresh time has come, the next one is a session later
+        tuesday = datetime(2025, 10, 28, 9, 0, tzinfo=IST).timestamp() - REFRESH_LEAD_SECONDS
+        self.assertEqual(master.seconds_until_refresh(calendar, before_pre_open), tuesday - before_pre_open)
+
+    def test_daily_refresh_runs_in_background(self):
+        """Test that a long-running process rebuilds a stale index on its own."""
+        master = self.build(built_at=time.time() - 3 * 86400)
+        refreshed = []
+        with patch.object(InstrumentMaster, 'seconds_until_refresh', return_value=0.05), \
+                patch.object(InstrumentMaster, 'refresh', side_effect=lambda: refreshed.append(1)):
+            thread = master.start_daily_refresh(Mock(spec=TradingCalendar))
+            time.sleep(0.3)
+            master.stop_daily_refresh()
+            thread.join(timeout=1)
+        self.assertTrue(refreshed)
+        self.assertFalse(thread.is_alive())
+
+    def test_invalid_file_ignored(self):
+        """Test that a file that is not an index is treated as missing."""
+        with open(self.path, 'wb') as f:
+            f.write(b'not an index at all, just some bytes')
+        master = InstrumentMaster(self.path, url='http://localhost/unused')
+        self.assertEqual(len(master), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
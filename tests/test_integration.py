@@ -14,7 +14,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 class TestIntegration(unittest.TestCase):
     """Integration tests for the full system."""
     
-    @patch('smartapi_client.SmartConnect')
+    @patch('smartapi_client.PooledSmartConnect')
     def test_full_detection_flow(self, mock_smartconnect):
         """Test complete order detection flow."""
         # Mock API responses
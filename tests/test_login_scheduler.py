@@ -0,0 +1,126 @@
+"""
+Test the rate-aware login scheduler.
+Critical: Too many logins on one API key = 'access rate' errors = no trading.
+"""
+
+import unittest
+import time
+import sys
+import os
+from unittest.mock import Mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from login_scheduler import LoginBudget, LoginScheduler
+
+
+def make_client(name, api_key, delay=0.1, success=True, cached=False):
+    """Create a mocked client whose login takes `delay` seconds."""
+    client = Mock()
+    client.account.name = name
+    client.api_key = api_key
+    client.restore_session.return_value = cached
+    
+    def initialize_session(budget=None):
+        client.login_started = time.time()
+        time.sleep(delay)
+        return success
+    
+    client.initialize_session.side_effect = initialize_session
+    return client
+
+
+class TestLoginBudget(unittest.TestCase):
+    """Test the per-key sliding window."""
+    
+    def test_allows_up_to_budget_immediately(self):
+        """Test that the first N logins need no wait."""
+        budget = LoginBudget(max_logins=3, window_seconds=60)
+        waits = [budget.reserve() for _ in range(3)]
+        self.assertEqual(waits, [0.0, 0.0, 0.0])
+    
+    def test_spaces_logins_beyond_budget(self):
+        """Test that extra logins wait for the window to slide."""
+        budget = LoginBudget(max_logins=2, window_seconds=60)
+        budget.reserve()
+        budget.reserve()
+        
+        self.assertAlmostEqual(budget.reserve(), 60, delta=0.5)
+        self.assertAlmostEqual(budget.reserve(), 60, delta=0.5)
+        self.assertAlmostEqual(budget.reserve(), 120, delta=0.5)
+    
+    def test_retry_slot_not_before(self):
+        """Test that a retry after a rate-limit error is counted in the window."""
+        budget = LoginBudget(max_logins=1, window_seconds=60)
+        self.assertAlmostEqual(budget.reserve(not_before=time.time() + 30), 30, delta=0.5)
+        self.assertAlmostEqual(budget.reserve(), 90, delta=0.5)
+
+
+class TestLoginScheduler(unittest.TestCase):
+    """Test concurrent login scheduling."""
+    
+    def test_different_keys_log_in_concurrently(self):
+        """Test that accounts on different API keys are not serialized."""
+        clients = [make_client(f'Account{i}', f'key{i}', delay=0.2) for i in range(5)]
+        scheduler = LoginScheduler(logins_per_window=1, window_seconds=60)
+        
+        start = time.time()
+        results = scheduler.run(clients)
+        
+        self.assertLess(time.time() - start, 0.6)
+        self.assertTrue(all(r['success'] for r in results))
+    
+    def test_same_key_respects_budget(self):
+        """Test that accounts sharing a key are spaced out."""
+        clients = [make_client(f'Account{i}', 'shared', delay=0.0) for i in range(3)]
+        scheduler = LoginScheduler(logins_per_window=2, window_seconds=0.3)
+        
+        results = scheduler.run(clients)
+        
+        starts = sorted(c.login_started for c in clients)
+        self.assertGreaterEqual(starts[2] - starts[0], 0.25)
+        self.assertGreater(results[2]['queue_wait'], 0)
+    
+    def test_throttled_key_does_not_hold_workers(self):
+        """Test that an account waiting for its key's slot leaves the worker to other keys."""
+        clients = [make_client('Master', 'key1', delay=0.0),
+                   make_client('Follower1', 'key1', delay=0.0),
+                   make_client('Follower2', 'key2', delay=0.0)]
+        scheduler = LoginScheduler(logins_per_window=1, window_seconds=0.5, max_parallel=1)
+        
+        start = time.time()
+        scheduler.run(clients)
+        
+        self.assertLess(clients[2].login_started - start, 0.2)
+        self.assertGreaterEqual(clients[1].login_started - start, 0.45)
+    
+    def test_cached_sessions_skip_budget(self):
+        """Test that accounts restored from the session cache use no login slot."""
+        clients = [make_client('Master', 'shared', cached=True),
+                   make_client('Follower1', 'shared', delay=0.0)]
+        scheduler = LoginScheduler(logins_per_window=1, window_seconds=60)
+        
+        start = time.time()
+        results = scheduler.run(clients)
+        
+        self.assertLess(time.time() - start, 0.5)
+        clients[0].initialize_session.assert_not_called()
+        self.assertTrue(all(r['success'] for r in results))
+    
+    def test_reports_latency_and_failures(self):
+        """Test per-account latency and failure reporting."""
+        clients = [
+            make_client('Master', 'key1', delay=0.1),
+            make_client('Follower1', 'key2', delay=0.0, success=False),
+        ]
+        results = LoginScheduler().run(clients)
+        
+        self.assertEqual([r['account'] for r in results], ['Master', 'Follower1'])
+        self.assertGreaterEqual(results[0]['latency'], 0.1)
+        self.assertTrue(results[0]['success'])
+        self.assertFalse(results[1]['success'])
+        self.assertIsNotNone(results[1]['error'])
+
+
+if __name__ == '__main__':
+    unittest.main()
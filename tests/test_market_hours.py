@@ -4,12 +4,22 @@ Critical: Wrong hours = unnecessary API calls = rate limit issues.
 """
 
 import unittest
-from datetime import datetime, time as dt_time
+import json
+import tempfile
+from datetime import datetime, time as dt_time, timezone
 import sys
 import os
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from config import IST
+from market_calendar import TradingCalendar, CLOSED, OPEN, PRE_OPEN
+
+
+def ist(*args):
+    """Unix time of an IST wall-clock time."""
+    return datetime(*args, tzinfo=IST).timestamp()
+
 
 class TestMarketHours(unittest.TestCase):
     """Test market hours detection logic."""
@@ -96,5 +106,76 @@ class TestMarketHours(unittest.TestCase):
         self.assertTrue(is_weekday, "Friday should be a weekday")
 
 
+class TestTradingCalendar(unittest.TestCase):
+    """Test the holiday-file trading calendar."""
+    
+    def setUp(self):
+        self.calendar = TradingCalendar()  # Bundled nse_holidays.json
+    
+    def test_regular_session_phases(self):
+        """Test pre-open, open and closed phases on a trading day (IST)."""
+        self.assertEqual(self.calendar.phase(ist(2025, 10, 27, 8, 59)), CLOSED)
+        self.assertEqual(self.calendar.phase(ist(2025, 10, 27, 9, 5)), PRE_OPEN)
+        self.assertEqual(self.calendar.phase(ist(2025, 10, 27, 9, 15)), OPEN)
+        self.assertEqual(self.calendar.phase(ist(2025, 10, 27, 15, 30)), OPEN)
+        self.assertEqual(self.calendar.phase(ist(2025, 10, 27, 15, 31)), CLOSED)
+    
+    def test_independent_of_server_timezone(self):
+        """Test that a UTC clock reading maps to the IST session."""
+        utc_morning = datetime(2025, 10, 27, 4, 0, tzinfo=timezone.utc).timestamp()  # 09:30 IST
+        self.assertTrue(self.calendar.is_open(utc_morning))
+    
+    def test_holidays_and_weekends_closed(self):
+        """Test that listed holidays and weekends have no session."""
+        self.assertEqual(self.calendar.phase(ist(2025, 10, 22, 10, 0)), CLOSED)  # Balipratipada
+        self.assertEqual(self.calendar.phase(ist(2025, 12, 25, 10, 0)), CLOSED)  # Christmas
+        self.assertEqual(self.calendar.phase(ist(2025, 10, 25, 10, 0)), CLOSED)  # Saturday
+    
+    def test_muhurat_session(self):
+        """Test the special evening session on a holiday."""
+        self.assertEqual(self.calendar.phase(ist(2025, 10, 21, 10, 0)), CLOSED)
+        self.assertEqual(self.calendar.phase(ist(2025, 10, 21, 13, 35)), PRE_OPEN)
+        self.assertEqual(self.calendar.phase(ist(2025, 10, 21, 14, 0)), OPEN)
+        self.assertEqual(self.calendar.session_at(ist(2025, 10, 21, 14, 0)).name, 'Muhurat Trading')
+    
+    def test_sleep_until_next_open(self):
+        """Test that closures skip straight to the next session's pre-open."""
+        # Friday after the close -> Monday 09:00
+        friday_evening = ist(2025, 10, 24, 16, 0)
+        self.assertEqual(self.calendar.seconds_until_open(friday_evening),
+                         ist(2025, 10, 27, 9, 0) - friday_evening)
+        # Before a holiday -> the day after it
+        self.assertEqual(self.calendar.next_session(ist(2025, 12, 24, 18, 0)).day.isoformat(),
+                         '2025-12-26')
+        # During a session -> no wait
+        self.assertEqual(self.calendar.seconds_until_open(ist(2025, 10, 27, 11, 0)), 0.0)
+        # To the open rather than the pre-open
+        self.assertEqual(self.calendar.seconds_until_open(ist(2025, 10, 27, 8, 0), include_pre_open=False),
+                         75 * 60)
+    
+    def test_last_session(self):
+        """Test the session a trade book made after the close belongs to."""
+        # After midnight, before Monday's pre-open -> Friday
+        self.assertEqual(self.calendar.last_session(ist(2025, 10, 27, 0, 30)).day.isoformat(), '2025-10-24')
+        # During pre-open -> that day's session
+        self.assertEqual(self.calendar.last_session(ist(2025, 10, 27, 9, 5)).day.isoformat(), '2025-10-27')
+        # Over a holiday -> the day before it
+        self.assertEqual(self.calendar.last_session(ist(2025, 12, 25, 12, 0)).day.isoformat(), '2025-12-24')
+        # New Year's morning -> the previous year's last session
+        self.assertEqual(self.calendar.last_session(ist(2026, 1, 1, 8, 0)).day.year, 2025)
+    
+    def test_missing_year_assumes_weekdays(self):
+        """Test that a year absent from the file still gets weekday sessions."""
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+            json.dump({'regular_session': {'pre_open': '09:00', 'open': '09:15', 'close': '15:30'},
+                       'years': {}}, f)
+        try:
+            calendar = TradingCalendar(f.name)
+            self.assertTrue(calendar.is_open(ist(2025, 12, 25, 10, 0)))  # No holiday list
+            self.assertFalse(calendar.is_open(ist(2025, 12, 27, 10, 0)))  # Saturday
+        finally:
+            os.remove(f.name)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,112 @@
+"""
+Test in-process metrics and the /metrics endpoint.
+Critical: Counters must be exact under concurrent writers without locking the hot path.
+"""
+
+import unittest
+import threading
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metrics import MetricsRegistry
+
+
+class TestMetrics(unittest.TestCase):
+    """Test counters, histograms, gauges and exposition."""
+
+    def setUp(self):
+        self.registry = MetricsRegistry()
+
+    def test_counter_exact_across_threads(self):
+        """Test that per-thread shards lose no increments."""
+        counter = self.registry.counter('calls_total', 'Calls', ['account'])
+
+        def work():
+            child = counter.labels('A1')
+            for _ in range(10000):
+                child.inc()
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(counter.labels('A1').value, 80000)
+
+    def test_ended_threads_are_folded(self):
+        """Test that short-lived threads don't grow the series but keep their counts."""
+        counter = self.registry.counter('timers_total', 'Timer callbacks')
+        child = counter.labels()
+
+        for _ in range(50):
+            thread = threading.Thread(target=child.inc)
+            thread.start()
+            thread.join()
+
+        self.assertEqual(child.value, 50)
+        self.assertEqual(len(child._series._shards), 0)
+        child.inc()
+        self.assertEqual(child.value, 51)
+        self.assertEqual(len(child._series._shards), 1)
+
+    def test_histogram_exposition(self):
+        """Test cumulative buckets, sum and count."""
+        histogram = self.registry.histogram('latency_seconds', 'Latency', ['route'],
+                                            buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 2.0):
+            histogram.labels('api.order.book').observe(value)
+
+        text = self.registry.render()
+
+        self.assertIn('# TYPE latency_seconds histogram', text)
+        self.assertIn('latency_seconds_bucket{route="api.order.book",le="0.1"} 2', text)
+        self.assertIn('latency_seconds_bucket{route="api.order.book",le="1"} 3', text)
+        self.assertIn('latency_seconds_bucket{route="api.order.book",le="+Inf"} 4', text)
+        self.assertIn('latency_seconds_sum{route="api.order.book"} 2.65', text)
+        self.assertIn('latency_seconds_count{route="api.order.book"} 4', text)
+
+    def test_gauge_function_read_at_scrape(self):
+        """Test that callback gauges are read on render and broken ones skipped."""
+        gauge = self.registry.gauge_function('queue_depth', 'Depth', ['queue'])
+        depth = [3]
+        gauge.set_function(lambda: depth[0], 'copy_pipeline')
+        gauge.set_function(lambda: 1 / 0, 'broken')
+
+        depth[0] = 5
+        text = self.registry.render()
+
+        self.assertIn('queue_depth{queue="copy_pipeline"} 5', text)
+        self.assertNotIn('broken', text)
+
+    def test_label_values_escaped(self):
+        """Test that quotes in label values cannot break the format."""
+        self.registry.counter('copies_total', 'Copies', ['follower']).labels('Dad "main"').inc()
+
+        self.assertIn('copies_total{follower="Dad \\"main\\""} 1', self.registry.render())
+
+    def test_wrong_label_count_rejected(self):
+        """Test that a label mismatch fails loudly."""
+        counter = self.registry.counter('calls_total', 'Calls', ['route', 'account'])
+
+        with self.assertRaises(ValueError):
+            counter.labels('api.order.book')
+
+    def test_web_ui_serves_metrics(self):
+        """Test the /metrics route."""
+        import web_ui
+        from metrics import COPY_ORDERS
+
+        COPY_ORDERS.labels('Follower 1', 'success').inc()
+        response = web_ui.app.test_client().get('/metrics')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith('text/plain'))
+        self.assertIn('copy_orders_total{follower="Follower 1",result="success"}',
+                      response.get_data(as_text=True))
+
+
+if __name__ == '__main__':
+    unittest.main()
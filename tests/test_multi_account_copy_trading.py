@@ -6,12 +6,38 @@ import unittest
 from unittest.mock import Mock, patch, MagicMock
 import sys
 import os
+import threading
+import time
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from multi_account_config import AccountConfig, MultiAccountConfig
-from multi_account_copy_trader import CopyTradingSettings, OrderTracker
+from multi_account_copy_trader import (
+    CopyTradingSettings, OrderTracker, MultiAccountCopyTrader
+)
+
+
+def make_trader(followers, settings=None):
+    """Build a copy trader around mocked followers without logging in."""
+    client_manager = Mock()
+    client_manager.get_all_active_followers.return_value = followers
+    client_manager.master_client.get_order_book.return_value = {'status': True, 'data': []}
+    return MultiAccountCopyTrader(Mock(), settings or CopyTradingSettings(),
+                                  client_manager=client_manager)
+
+
+def make_follower(name, delay=0.0, response=None):
+    """Create a mocked follower client whose place_order takes `delay` seconds."""
+    follower = Mock()
+    follower.account.name = name
+    
+    def place_order(params):
+        time.sleep(delay)
+        return response or {'status': True, 'data': {'orderid': f'{name}-1'}}
+    
+    follower.place_order.side_effect = place_order
+    return follower
 
 
 class TestAccountConfig(unittest.TestCase):
@@ -113,6 +139,34 @@ class TestCopyTradingSettings(unittest.TestCase):
         self.assertFalse(should_copy)
         self.assertIn('blocked', reason.lower())
     
+    def test_should_copy_order_matches_underlying(self):
+        """Test that symbol lists naming an underlying cover its option contracts."""
+        settings = CopyTradingSettings()
+        settings.copy_all_orders = False
+        settings.allowed_symbols = ['NIFTY', 'BANKNIFTY28OCT2556000CE']
+        settings.blocked_symbols = ['NIFTY28OCT2525000PE']
+        
+        def copies(symbol):
+            return settings.should_copy_order({'tradingsymbol': symbol, 'ordertype': 'MARKET'})[0]
+        
+        self.assertTrue(copies('NIFTY28OCT2525000CE'))
+        self.assertFalse(copies('NIFTY28OCT2525000PE'))
+        self.assertTrue(copies('BANKNIFTY28OCT2556000CE'))
+        self.assertFalse(copies('BANKNIFTY28OCT2556000PE'))
+        self.assertFalse(copies('FINNIFTY28OCT2526500CE'))
+    
+    def test_symbol_lists_cannot_be_changed_in_place(self):
+        """Test that an in-place change fails instead of being silently ignored."""
+        settings = CopyTradingSettings()
+        settings.blocked_symbols = ['FINNIFTY']
+        with self.assertRaises(AttributeError):
+            settings.blocked_symbols.append('NIFTY')
+        
+        settings.blocked_symbols = list(settings.blocked_symbols) + ['NIFTY']
+        should_copy, _ = settings.should_copy_order({'tradingsymbol': 'NIFTY28OCT2525000CE',
+                                                     'ordertype': 'MARKET'})
+        self.assertFalse(should_copy)
+    
     def test_should_copy_order_types(self):
         """Test filtering by order type."""
         settings = CopyTradingSettings()
@@ -221,6 +275,102 @@ class TestOrderTracker(unittest.TestCase):
         self.assertEqual(stats['successful'], 3)
         self.assertEqual(stats['failed'], 1)
         self.assertEqual(stats['success_rate'], 75.0)
+    
+    def test_split_counts_as_one_copy(self):
+        """Test that the child orders of a freeze-limit split count as one copy."""
+        tracker = OrderTracker()
+        master_order = {'orderid': 'M123', 'tradingsymbol': 'NIFTY', 'quantity': '4200'}
+        
+        tracker.record_copy(master_order, 'Follower1', True, quantity=1800, part='1/2')
+        tracker.record_copy(master_order, 'Follower1', False, error='Failed', quantity=2400, part='2/2')
+        tracker.record_copy(master_order, 'Follower2', True, quantity=4200)
+        
+        stats = tracker.get_statistics()
+        self.assertEqual((stats['total_copies'], stats['successful'], stats['failed']), (2, 1, 1))
+        self.assertEqual(tracker.failed_copies[0]['quantity'], 2400)
+
+
+class TestParallelFanOut(unittest.TestCase):
+    """Test concurrent follower fan-out."""
+    
+    master_order = {
+        'orderid': 'M1',
+        'tradingsymbol': 'NIFTY28OCT2525000CE',
+        'transactiontype': 'BUY',
+        'ordertype': 'MARKET',
+        'quantity': '75',
+        'price': '0',
+        'status': 'complete'
+    }
+    
+    def test_parallel_fan_out_sends_concurrently(self):
+        """Test that slow followers are placed at the same time, not one by one."""
+        followers = [make_follower(f'Follower{i}', delay=0.2) for i in range(5)]
+        trader = make_trader(followers)
+        
+        start = time.time()
+        trader.copy_order_to_followers(dict(self.master_order))
+        elapsed = time.time() - start
+        
+        self.assertLess(elapsed, 0.6, "Followers were placed sequentially")
+        self.assertEqual(len(trader.tracker.copy_records), 5)
+        self.assertEqual(trader.tracker.get_statistics()['successful'], 5)
+        self.assertEqual(len(trader.fan_out_spreads), 1)
+        self.assertLess(trader.fan_out_spreads[0], 0.2)
+    
+    def test_concurrency_cap_is_respected(self):
+        """Test that no more than max_concurrent_orders are in flight."""
+        in_flight = []
+        peak = []
+        lock = threading.Lock()
+        
+        def place_order(params):
+            with lock:
+                in_flight.append(1)
+                peak.append(len(in_flight))
+            time.sleep(0.05)
+            with lock:
+                in_flight.pop()
+            return {'status': True, 'data': {'orderid': 'X'}}
+        
+        followers = []
+        for i in range(6):
+            follower = Mock()
+            follower.account.name = f'Follower{i}'
+            follower.place_order.side_effect = place_order
+            followers.append(follower)
+        
+        settings = CopyTradingSettings()
+        settings.max_concurrent_orders = 2
+        trader = make_trader(followers, settings)
+        trader.copy_order_to_followers(dict(self.master_order))
+        
+        self.assertLessEqual(max(peak), 2)
+        self.assertEqual(len(trader.tracker.copy_records), 6)
+    
+    def test_failures_are_recorded_per_follower(self):
+        """Test that one failing follower does not affect the others."""
+        good = make_follower('Good')
+        bad = make_follower('Bad', response={'status': False, 'message': 'Margin exceeded'})
+        trader = make_trader([good, bad])
+        
+        trader.copy_order_to_followers(dict(self.master_order))
+        
+        stats = trader.tracker.get_statistics()
+        self.assertEqual(stats['successful'], 1)
+        self.assertEqual(stats['failed'], 1)
+        self.assertEqual(trader.tracker.failed_copies[0]['follower'], 'Bad')
+    
+    def test_sequential_mode(self):
+        """Test that parallel fan-out can be disabled."""
+        settings = CopyTradingSettings()
+        settings.parallel_fan_out = False
+        trader = make_trader([make_follower('A'), make_follower('B')], settings)
+        
+        trader.copy_order_to_followers(dict(self.master_order))
+        
+        self.assertIsNone(trader._executor)
+        self.assertEqual(len(trader.tracker.copy_records), 2)
 
 
 class TestOrderParameters(unittest.TestCase):
@@ -312,6 +462,7 @@ def run_all_tests():
     suite.addTests(loader.loadTestsFromTestCase(TestAccountConfig))
     suite.addTests(loader.loadTestsFromTestCase(TestCopyTradingSettings))
     suite.addTests(loader.loadTestsFromTestCase(TestOrderTracker))
+    suite.addTests(loader.loadTestsFromTestCase(TestParallelFanOut))
     suite.addTests(loader.loadTestsFromTestCase(TestOrderParameters))
     
     # Run tests
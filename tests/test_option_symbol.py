@@ -0,0 +1,55 @@
+"""
+Test option symbol parsing.
+Critical: Equities that happen to contain 'CE' or 'PE' must not look like options.
+"""
+
+import unittest
+import sys
+import os
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from option_symbol import OptionSymbol, parse_option_symbol, is_option_symbol, underlying_of
+
+
+class TestOptionSymbol(unittest.TestCase):
+    """Test parsing, memoization and the underlying lookup."""
+
+    def test_monthly_symbols(self):
+        """Test NFO symbols with a DDMMMYY expiry."""
+        option = parse_option_symbol('NIFTY28OCT2525000CE')
+        self.assertEqual(option, OptionSymbol('NIFTY', '28OCT25', 25000.0, 'CE'))
+        self.assertEqual(option.expiry_date, date(2025, 10, 28))
+        self.assertEqual(parse_option_symbol('M&M28OCT253200.5PE'), ('M&M', '28OCT25', 3200.5, 'PE'))
+        self.assertEqual(parse_option_symbol('NIFTYNXT5028OCT2568000CE').underlying, 'NIFTYNXT50')
+        self.assertEqual(parse_option_symbol('BAJAJ-AUTO25NOV259000PE').underlying, 'BAJAJ-AUTO')
+
+    def test_weekly_symbols(self):
+        """Test BFO weeklies with a YYMDD expiry."""
+        option = parse_option_symbol('SENSEX25O2382000CE')
+        self.assertEqual(option, ('SENSEX', '25O23', 82000.0, 'CE'))
+        self.assertEqual(option.expiry_date, date(2025, 10, 23))
+        self.assertEqual(parse_option_symbol('SENSEX2561782500PE').expiry_date, date(2025, 6, 17))
+
+    def test_non_options(self):
+        """Test that equities, futures and odd input are not options."""
+        for symbol in ('RELIANCE-EQ', 'PERSISTENT-EQ', 'NIFTY28OCT25FUT', 'Nifty 50', 'CE', '', None, 123):
+            self.assertIsNone(parse_option_symbol(symbol), symbol)
+            self.assertFalse(is_option_symbol(symbol))
+
+    def test_parsed_once(self):
+        """Test that a repeated symbol is served from the cache."""
+        parse_option_symbol.cache_clear()
+        first = parse_option_symbol('BANKNIFTY28OCT2556000CE')
+        self.assertIs(parse_option_symbol('BANKNIFTY28OCT2556000CE'), first)
+        self.assertEqual(parse_option_symbol.cache_info().misses, 1)
+
+    def test_underlying_of(self):
+        """Test the underlying of options and the symbol itself otherwise."""
+        self.assertEqual(underlying_of('FINNIFTY28OCT2526500PE'), 'FINNIFTY')
+        self.assertEqual(underlying_of('RELIANCE-EQ'), 'RELIANCE-EQ')
+
+
+if __name__ == '__main__':
+    unittest.main()
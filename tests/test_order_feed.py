@@ -0,0 +1,134 @@
+"""
+Test the push-based order update feed against the local WebSocket stand-in.
+Critical: A silent stream = missed copies; reconnect gaps must be reconciled.
+"""
+
+import unittest
+import threading
+import time
+import sys
+import os
+from unittest.mock import Mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from order_feed import OrderUpdateFeed
+from order_feed_stub import LocalOrderFeedServer
+from multi_account_copy_trader import MultiAccountCopyTrader, CopyTradingSettings
+
+
+def wait_for(condition, timeout=5.0):
+    """Poll condition() until it is true or the timeout expires."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+class TestParseMessage(unittest.TestCase):
+    """Test order-status message parsing."""
+    
+    def test_parses_order(self):
+        message = '{"status-code": "200", "order-status": "AB02", "orderData": {"orderid": "1", "status": "complete"}}'
+        self.assertEqual(OrderUpdateFeed.parse_message(message)['orderid'], '1')
+    
+    def test_ignores_heartbeat_and_ack(self):
+        self.assertIsNone(OrderUpdateFeed.parse_message('pong'))
+        self.assertIsNone(OrderUpdateFeed.parse_message('{"order-status": "AB00", "orderData": {}}'))
+        self.assertIsNone(OrderUpdateFeed.parse_message('not json'))
+    
+    def test_orderstatus_alias(self):
+        message = '{"orderData": {"orderid": "1", "orderstatus": "open"}}'
+        self.assertEqual(OrderUpdateFeed.parse_message(message)['status'], 'open')
+
+
+class TestOrderFeed(unittest.TestCase):
+    """Test the feed end to end against LocalOrderFeedServer."""
+    
+    def setUp(self):
+        self.server = LocalOrderFeedServer()
+        self.url = self.server.start()
+        self.received = []
+        self.reconnects = threading.Event()
+        self.feed = OrderUpdateFeed('jwt', 'api_key', 'C123', 'feed',
+                                    on_order=self.received.append,
+                                    on_reconnect=self.reconnects.set,
+                                    url=self.url)
+        self.feed.RECONNECT_DELAY = 0.2
+    
+    def tearDown(self):
+        self.feed.stop()
+        self.server.stop()
+    
+    def test_receives_pushed_orders(self):
+        """Test that pushed orders reach on_order with auth headers sent."""
+        self.feed.start()
+        self.assertTrue(wait_for(lambda: self.server.client_count == 1))
+        
+        self.server.push_order({'orderid': '42', 'status': 'complete'})
+        
+        self.assertTrue(wait_for(lambda: len(self.received) == 1))
+        self.assertEqual(self.received[0]['orderid'], '42')
+        headers = self.server.connection_headers[0]
+        self.assertEqual(headers['authorization'], 'Bearer jwt')
+        self.assertEqual(headers['x-client-code'], 'C123')
+    
+    def test_reconnects_and_signals(self):
+        """Test that a dropped connection is re-established and reported."""
+        self.feed.start()
+        self.assertTrue(wait_for(lambda: self.server.client_count == 1))
+        
+        self.server.drop_clients()
+        
+        self.assertTrue(self.reconnects.wait(timeout=5), "on_reconnect not called")
+        self.assertTrue(wait_for(lambda: self.server.client_count == 1))
+        self.server.push_order({'orderid': '43', 'status': 'open'})
+        self.assertTrue(wait_for(lambda: len(self.received) == 1))
+
+
+class TestStreamingCopyTrader(unittest.TestCase):
+    """Test stream-driven detection in MultiAccountCopyTrader."""
+    
+    def setUp(self):
+        self.follower = Mock()
+        self.follower.account.name = 'Follower1'
+        self.follower.place_order.return_value = {'status': True, 'data': {'orderid': 'F1'}}
+        
+        client_manager = Mock()
+        client_manager.get_all_active_followers.return_value = [self.follower]
+        client_manager.master_client.get_order_book.return_value = {
+            'status': True, 'data': [{'orderid': '1', 'status': 'open', 'quantity': '75'}]
+        }
+        self.trader = MultiAccountCopyTrader(Mock(), CopyTradingSettings(),
+                                             client_manager=client_manager)
+        self.master_order = {
+            'orderid': '1', 'status': 'complete', 'quantity': '75', 'filledshares': '75',
+            'tradingsymbol': 'NIFTY28OCT2525000CE', 'transactiontype': 'BUY',
+            'ordertype': 'MARKET', 'price': '0'
+        }
+    
+    def test_streamed_completion_is_copied_once(self):
+        """Test that a pushed completion is copied and reconciliation skips it."""
+        self.trader._on_streamed_order(dict(self.master_order))
+        self.assertEqual(self.follower.place_order.call_count, 1)
+        self.assertEqual(self.trader.detection_counts['stream'], 1)
+        
+        # Reconciliation sees the same completed order in the book
+        self.trader.client_manager.master_client.get_order_book.return_value = {
+            'status': True, 'data': [dict(self.master_order)]
+        }
+        self.assertEqual(self.trader.check_for_new_orders(), [])
+        self.assertEqual(self.follower.place_order.call_count, 1)
+    
+    def test_reconciliation_fills_gaps(self):
+        """Test that a completion missed by the stream is found by polling."""
+        self.trader.client_manager.master_client.get_order_book.return_value = {
+            'status': True, 'data': [dict(self.master_order)]
+        }
+        self.assertEqual([o['orderid'] for o in self.trader.check_for_new_orders()], ['1'])
+
+
+if __name__ == '__main__':
+    unittest.main()
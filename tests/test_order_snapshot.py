@@ -0,0 +1,122 @@
+"""
+Test the parsed order book snapshot.
+Critical: Reusing parsed orders must never hide a change from the differ.
+"""
+
+import unittest
+import sys
+import os
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from order_snapshot import OrderRecord, OrderBookSnapshot
+from order_state import OrderBookDiffer, OrderEvent
+from order_utils import filter_and_aggregate_orders, aggregate_by_contract
+from tests.test_order_state import order
+
+
+class TestOrderSnapshot(unittest.TestCase):
+    """Test record parsing, reuse across polls and shared consumers."""
+
+    def test_record_fields_are_typed(self):
+        """Test that numbers are parsed and repeated strings interned."""
+        raw = order('1', status='open', filled='25', quantity='75', price='101.5')
+        record = OrderRecord(raw)
+        self.assertEqual(record.quantity, 75)
+        self.assertEqual(record.filled, 25)
+        self.assertEqual(record.price, 101.5)
+        self.assertIs(record.symbol, OrderRecord(dict(raw)).symbol)
+        self.assertFalse(record.terminal)
+        self.assertIs(record.raw, raw)
+
+    def test_placement_params(self):
+        """Test that follower params share the master fields and differ in quantity."""
+        raw = dict(order('1', status='complete'), symboltoken='43210', exchange='NFO',
+                   transactiontype='BUY', producttype='CARRYFORWARD', triggerprice='95')
+        record = OrderRecord(raw)
+        first, second = record.placement_params(75), record.placement_params(150)
+        self.assertEqual(first['quantity'], '75')
+        self.assertEqual(second['quantity'], '150')
+        self.assertEqual(first['tradingsymbol'], 'NIFTY28OCT2525000CE')
+        self.assertEqual(first['variety'], 'NORMAL')
+        self.assertEqual(first['triggerprice'], '95')
+        self.assertEqual(first['price'], '100.0')
+
+    def test_unchanged_orders_are_reused(self):
+        """Test that only new and changed orders are parsed again."""
+        differ = OrderBookDiffer()
+        differ.prime([order('1'), order('2', status='complete')])
+
+        first = differ.snapshot([order('1'), order('2', status='complete')])
+        self.assertEqual(first.fresh, [])
+        second = differ.snapshot([order('1'), order('2', status='complete'), order('3')])
+        self.assertIs(second.records[0], first.records[0])
+        self.assertIs(second.records[1], first.records[1])
+        self.assertEqual([r.order_id for r in second.fresh], ['3'])
+
+    def test_snapshot_diff_matches_dict_diff(self):
+        """Test that diffing a snapshot reports the same events as the dicts."""
+        books = [
+            [order('1'), order('2')],
+            [order('1', filled='25'), order('2', status='cancelled'), order('3')],
+            [order('1', status='complete', filled='75'), order('2', status='cancelled'), order('3')],
+        ]
+        by_dict, by_snapshot = OrderBookDiffer(), OrderBookDiffer()
+        for book in books:
+            expected = [(e.kind, e.order_id) for e in by_dict.diff(book)]
+            snapshot = by_snapshot.snapshot([dict(o) for o in book])
+            actual = [(e.kind, e.order_id) for e in by_snapshot.diff(snapshot)]
+            self.assertEqual(actual, expected)
+        self.assertIn((OrderEvent.STATUS_CHANGE, '1'), actual + expected)
+
+    def test_snapshot_not_diffed_is_not_lost(self):
+        """Test that a change seen by an undiffed snapshot is still reported later."""
+        differ = OrderBookDiffer()
+        differ.prime([order('1')])
+        differ.snapshot([order('1', status='complete', filled='75')])  # Never diffed
+
+        events = differ.diff(differ.snapshot([order('1', status='complete', filled='75')]))
+        self.assertTrue(events[-1].is_completion)
+
+    def test_poll_parses_changed_orders_only(self):
+        """Test that a poll builds no record for unchanged orders until records are read."""
+        differ = OrderBookDiffer()
+        book = [order('1'), order('2', status='complete'), order('3')]
+        differ.prime(book)
+        changed = [order('1'), order('2', status='complete'), order('3', price='101.0')]
+
+        with patch('order_state.OrderRecord', wraps=OrderRecord) as parse:
+            snapshot = differ.snapshot(changed)
+            self.assertEqual(parse.call_count, 1)
+            self.assertEqual(len(snapshot), 3)
+            self.assertEqual([r.price for r in snapshot.records], [100.0, 100.0, 101.0])
+        self.assertIs(snapshot.get('3'), snapshot.fresh[0])
+
+    def test_aggregation_from_snapshot(self):
+        """Test that aggregating a snapshot gives the dict result."""
+        book = [order('1', quantity='75', price='100'), order('2', quantity='50', price='120'),
+                order('3', status='rejected'), dict(order('4'), tradingsymbol='NIFTY-EQ')]
+        from_dicts = filter_and_aggregate_orders(book)
+        from_snapshot = filter_and_aggregate_orders(OrderBookSnapshot.from_orders(book))
+        self.assertEqual(from_snapshot, from_dicts)
+        self.assertEqual(from_snapshot[0]['total_quantity'], 125)
+        self.assertEqual(from_snapshot[0]['highest_price'], 120.0)
+
+    def test_aggregated_quantities_match_dicts(self):
+        """Test that snapshot totals are floats with fractions kept, as from the dicts."""
+        book = [order('1', quantity='75'), order('2', quantity='37.5'),
+                dict(order('3', quantity='12.5'), tradingsymbol='NIFTY04NOV2525100CE')]
+        snapshot = OrderBookSnapshot.from_orders(book)
+        for from_dicts, from_snapshot in (
+                (filter_and_aggregate_orders(book), filter_and_aggregate_orders(snapshot)),
+                (aggregate_by_contract(book, 'underlying'), aggregate_by_contract(snapshot, 'underlying'))):
+            self.assertEqual(from_snapshot, from_dicts)
+            for row in from_snapshot:
+                self.assertIsInstance(row['total_quantity'], float)
+        self.assertEqual(filter_and_aggregate_orders(snapshot)[-1]['total_quantity'], 112.5)
+        self.assertEqual(aggregate_by_contract(snapshot, 'underlying')[0]['total_quantity'], 125.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,179 @@
+"""
+Test the order book differ.
+Critical: Missed transitions = missed copies. Repeated events = duplicate trades.
+"""
+
+import unittest
+import sys
+import os
+from unittest.mock import Mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from order_state import OrderBookDiffer, OrderEvent
+
+
+def order(order_id, status='open', filled='0', quantity='75', price='100.0'):
+    """Build a minimal order book row."""
+    return {
+        'orderid': order_id,
+        'tradingsymbol': 'NIFTY28OCT2525000CE',
+        'status': status,
+        'filledshares': filled,
+        'quantity': quantity,
+        'price': price,
+        'triggerprice': '0',
+        'ordertype': 'LIMIT',
+    }
+
+
+class TestOrderBookDiffer(unittest.TestCase):
+    """Test order state transitions."""
+    
+    def test_new_orders(self):
+        """Test that unseen orders are reported as new."""
+        differ = OrderBookDiffer()
+        events = differ.diff([order('1'), order('2', status='complete')])
+        
+        self.assertEqual([e.kind for e in events], [OrderEvent.NEW, OrderEvent.NEW])
+        self.assertFalse(events[0].is_completion)
+        self.assertTrue(events[1].is_completion)
+    
+    def test_primed_orders_are_not_new(self):
+        """Test that orders present at startup are not reported."""
+        differ = OrderBookDiffer()
+        differ.prime([order('1'), order('2')])
+        
+        self.assertEqual(differ.diff([order('1'), order('2')]), [])
+        self.assertEqual(len(differ), 2)
+    
+    def test_open_to_complete(self):
+        """Test that an open order completing later is reported."""
+        differ = OrderBookDiffer()
+        differ.prime([order('1', status='open')])
+        
+        events = differ.diff([order('1', status='complete', filled='75')])
+        
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0].kind, OrderEvent.STATUS_CHANGE)
+        self.assertEqual(events[0].previous_status, 'open')
+        self.assertTrue(events[0].is_completion)
+    
+    def test_rejected_and_cancelled(self):
+        """Test rejection and cancellation transitions."""
+        differ = OrderBookDiffer()
+        differ.prime([order('1'), order('2')])
+        
+        events = differ.diff([order('1', status='rejected'), order('2', status='cancelled')])
+        
+        self.assertEqual([(e.kind, e.status) for e in events],
+                         [(OrderEvent.STATUS_CHANGE, 'rejected'),
+                          (OrderEvent.STATUS_CHANGE, 'cancelled')])
+        self.assertFalse(any(e.is_completion for e in events))
+    
+    def test_partial_fill(self):
+        """Test that partial fills report the newly filled quantity."""
+        differ = OrderBookDiffer()
+        differ.prime([order('1')])
+        
+        events = differ.diff([order('1', filled='25')])
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0].kind, OrderEvent.PARTIAL_FILL)
+        self.assertEqual(events[0].filled_delta, 25)
+        
+        events = differ.diff([order('1', filled='50')])
+        self.assertEqual(events[0].filled_delta, 25)
+    
+    def test_modification(self):
+        """Test that price/quantity modifications are reported."""
+        differ = OrderBookDiffer()
+        differ.prime([order('1')])
+        
+        events = differ.diff([order('1', price='101.5')])
+        
+        self.assertEqual([e.kind for e in events], [OrderEvent.MODIFIED])
+    
+    def test_unchanged_orders_emit_nothing(self):
+        """Test that repeated polls of the same book are silent."""
+        differ = OrderBookDiffer()
+        book = [order(str(i)) for i in range(50)]
+        differ.diff(book)
+        
+        self.assertEqual(differ.diff(book), [])
+    
+    def test_terminal_orders_are_skipped(self):
+        """Test that completed orders are never diffed again."""
+        differ = OrderBookDiffer()
+        differ.diff([order('1', status='complete', filled='75')])
+        
+        # Even a garbled row for a completed order produces no event
+        self.assertEqual(differ.diff([order('1', status='open')]), [])
+    
+    def test_mark_seen(self):
+        """Test ID-only tracking used by OrderTracker.is_new_order."""
+        differ = OrderBookDiffer()
+        self.assertTrue(differ.mark_seen('1'))
+        self.assertFalse(differ.mark_seen('1'))
+        
+        # First observed state of an ID-only order is not a change
+        self.assertEqual(differ.diff([order('1', status='complete')]), [])
+    
+    def test_apply_single_update(self):
+        """Test applying one pushed order update."""
+        differ = OrderBookDiffer()
+        differ.prime([order('1')])
+        
+        events = differ.apply(order('1', status='complete', filled='75'))
+        self.assertTrue(events[0].is_completion)
+        self.assertEqual(differ.apply(order('1', status='complete', filled='75')), [])
+
+    def test_live_count_tracks_open_orders(self):
+        """Test that only observed, non-terminal orders count as live."""
+        differ = OrderBookDiffer()
+        differ.prime([order('1'), order('2', status='complete')])
+        differ.mark_seen('3')
+        self.assertEqual(differ.live_count(), 1)
+
+        differ.diff([order('1', status='complete', filled='75'), order('4', status='trigger pending')])
+        self.assertEqual(differ.live_count(), 1)
+
+
+class TestCopyTraderDetection(unittest.TestCase):
+    """Test that the copy trader copies orders when they complete."""
+    
+    def make_trader(self, books):
+        from multi_account_copy_trader import MultiAccountCopyTrader, CopyTradingSettings, OrderTracker
+        client_manager = Mock()
+        client_manager.master_client.get_order_book.side_effect = [
+            {'status': True, 'data': book} for book in books
+        ]
+        return MultiAccountCopyTrader(Mock(), CopyTradingSettings(),
+                                      client_manager=client_manager)
+    
+    def test_open_order_is_copied_when_it_completes(self):
+        """Test that an order first seen as open is copied once it completes."""
+        trader = self.make_trader([
+            [],
+            [order('1', status='open')],
+            [order('1', status='complete', filled='75')],
+            [order('1', status='complete', filled='75')],
+        ])
+        
+        self.assertEqual(trader.check_for_new_orders(), [])
+        completed = trader.check_for_new_orders()
+        self.assertEqual([o['orderid'] for o in completed], ['1'])
+        self.assertEqual(trader.check_for_new_orders(), [], "Order copied twice!")
+    
+    def test_orders_complete_at_startup_are_not_copied(self):
+        """Test that historical completed orders are ignored."""
+        trader = self.make_trader([
+            [order('1', status='complete', filled='75')],
+            [order('1', status='complete', filled='75'), order('2', status='complete')],
+        ])
+        
+        completed = trader.check_for_new_orders()
+        self.assertEqual([o['orderid'] for o in completed], ['2'])
+
+
+if __name__ == '__main__':
+    unittest.main()
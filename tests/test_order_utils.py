@@ -0,0 +1,208 @@
+"""
+Test order aggregation by symbol and by contract.
+Critical: The faster loops must give the same totals as before.
+"""
+
+import unittest
+import random
+import sys
+import os
+from unittest.mock import Mock, patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from order_snapshot import OrderBookSnapshot
+from order_utils import (filter_and_aggregate_orders, aggregate_by_contract, is_option_order,
+                         RunningAggregates)
+from order_monitor import check_and_display_aggregated_orders
+from tests.test_order_state import order
+
+
+def book():
+    """Orders over two expiries, both option types and a few skipped orders."""
+    return [
+        dict(order('1', quantity='75', price='100'), tradingsymbol='NIFTY28OCT2525000CE'),
+        dict(order('2', quantity='50', price='120'), tradingsymbol='NIFTY28OCT2525000PE'),
+        dict(order('3', quantity='25', price='90'), tradingsymbol='NIFTY04NOV2525100CE'),
+        dict(order('4', quantity='30', price='300'), tradingsymbol='BANKNIFTY28OCT2556000CE'),
+        dict(order('5', status='rejected', quantity='500'), tradingsymbol='NIFTY28OCT2525000CE'),
+        dict(order('6', quantity='10'), tradingsymbol='NIFTY-EQ'),
+        dict(order('7', quantity='15', price='80', status='open'), tradingsymbol='NIFTY28OCT2525000CE'),
+    ]
+
+
+class TestOrderAggregation(unittest.TestCase):
+    """Test filter_and_aggregate_orders and aggregate_by_contract."""
+
+    def test_aggregate_by_symbol(self):
+        """Test totals, highest price, order IDs and latest status per symbol."""
+        result = filter_and_aggregate_orders(book())
+        self.assertEqual([row['tradingsymbol'] for row in result],
+                         ['BANKNIFTY28OCT2556000CE', 'NIFTY04NOV2525100CE',
+                          'NIFTY28OCT2525000CE', 'NIFTY28OCT2525000PE'])
+        call = result[2]
+        self.assertEqual(call['total_quantity'], 90.0)
+        self.assertEqual(call['highest_price'], 100.0)
+        self.assertEqual(call['order_ids'], ['1', '7'])
+        self.assertEqual(call['order_count'], 2)
+        self.assertEqual(call['status'], 'open')
+
+    def test_equities_are_not_options(self):
+        """Test that symbols merely containing CE or PE are not aggregated."""
+        self.assertFalse(is_option_order('RELIANCE-EQ'))
+        self.assertFalse(is_option_order('PERSISTENT-EQ'))
+        self.assertTrue(is_option_order('NIFTY28OCT2525000PE'))
+        orders = book() + [dict(order('8'), tradingsymbol='RELIANCE-EQ')]
+        self.assertEqual(filter_and_aggregate_orders(orders), filter_and_aggregate_orders(book()))
+
+    def test_aggregate_by_underlying(self):
+        """Test that every strike and expiry of an underlying is combined."""
+        result = aggregate_by_contract(book(), level='underlying')
+        self.assertEqual([(row['underlying'], row['total_quantity']) for row in result],
+                         [('BANKNIFTY', 30.0), ('NIFTY', 165.0)])
+        self.assertEqual(result[1]['order_ids'], ['1', '2', '3', '7'])
+        self.assertEqual(result[1]['highest_price'], 120.0)
+
+    def test_aggregate_by_expiry_and_strike(self):
+        """Test the expiry level and the strike level (CE and PE together)."""
+        by_expiry = aggregate_by_contract(book(), level='expiry')
+        self.assertEqual([(row['underlying'], row['expiry'], row['order_count']) for row in by_expiry],
+                         [('BANKNIFTY', '28OCT25', 1), ('NIFTY', '04NOV25', 1), ('NIFTY', '28OCT25', 3)])
+
+        by_strike = aggregate_by_contract(book(), level='strike')
+        nifty = [row for row in by_strike if row['expiry'] == '28OCT25' and row['underlying'] == 'NIFTY']
+        self.assertEqual(len(nifty), 1)
+        self.assertEqual(nifty[0]['strike'], 25000.0)
+        self.assertEqual(nifty[0]['total_quantity'], 140.0)
+
+    def test_snapshot_gives_same_result(self):
+        """Test that contract aggregation of a snapshot matches the dicts."""
+        for level in ('underlying', 'expiry', 'strike'):
+            self.assertEqual(aggregate_by_contract(OrderBookSnapshot.from_orders(book()), level),
+                             aggregate_by_contract(book(), level))
+
+    def test_unknown_level(self):
+        """Test that an unknown level is rejected."""
+        with self.assertRaises(ValueError):
+            aggregate_by_contract(book(), level='lot')
+
+
+class TestRunningAggregates(unittest.TestCase):
+    """Test that RunningAggregates matches a full rebuild poll after poll."""
+
+    def assert_matches(self, aggregates, orders):
+        aggregates.update([dict(o) for o in orders])
+        self.assertEqual(aggregates.rows(), filter_and_aggregate_orders(orders))
+
+    def test_new_modified_and_cancelled_orders(self):
+        """Test growth, modification, cancellation and completion across polls."""
+        aggregates = RunningAggregates()
+        orders = book()[:3]
+        self.assert_matches(aggregates, orders)
+
+        orders += book()[3:]
+        self.assert_matches(aggregates, orders)
+
+        orders[0] = dict(orders[0], quantity='150', price='99')  # Modified, keeps its place
+        self.assert_matches(aggregates, orders)
+        self.assertEqual(aggregates.rows()[2]['order_ids'], ['1', '7'])
+
+        orders[6] = dict(orders[6], status='complete')
+        self.assert_matches(aggregates, orders)
+
+        orders[3] = dict(orders[3], status='cancelled')  # Last order of its group
+        self.assert_matches(aggregates, orders)
+        self.assertNotIn('BANKNIFTY28OCT2556000CE', [row['tradingsymbol'] for row in aggregates.rows()])
+
+    def test_highest_price_falls_back(self):
+        """Test that cancelling the highest-priced order restores the next highest."""
+        aggregates = RunningAggregates()
+        orders = [order('1', price='100'), order('2', price='120'), order('3', price='120')]
+        self.assert_matches(aggregates, orders)
+        orders[1] = dict(orders[1], status='cancelled')
+        self.assert_matches(aggregates, orders)
+        self.assertEqual(aggregates.rows()[0]['highest_price'], 120.0)
+        orders[2] = dict(orders[2], status='cancelled')
+        self.assert_matches(aggregates, orders)
+        self.assertEqual(aggregates.rows()[0]['highest_price'], 100.0)
+
+    def test_random_polls(self):
+        """Test random order flows against the full rebuild."""
+        rng = random.Random(7)
+        symbols = ['NIFTY28OCT2525000CE', 'NIFTY28OCT2525000PE', 'BANKNIFTY28OCT2556000CE', 'TCS-EQ']
+        aggregates = RunningAggregates()
+        orders = []
+        for poll in range(60):
+            for _ in range(rng.randint(0, 3)):
+                orders.append(dict(order(str(len(orders)), quantity=str(rng.choice([25, 50, 75])),
+                                         price=str(rng.randint(90, 110))),
+                                   tradingsymbol=rng.choice(symbols),
+                                   transactiontype=rng.choice(['BUY', 'SELL'])))
+            for index in rng.sample(range(len(orders)), min(2, len(orders))):
+                if orders[index]['status'] == 'open':
+                    orders[index] = dict(orders[index], status=rng.choice(['open', 'complete', 'cancelled']),
+                                         price=str(rng.randint(90, 110)))
+            self.assert_matches(aggregates, orders)
+
+    def test_unchanged_poll(self):
+        """Test that a poll with no changes reports no change (except the first)."""
+        aggregates = RunningAggregates()
+        self.assertTrue(aggregates.update([]))
+        self.assertTrue(aggregates.update(book()))
+        self.assertFalse(aggregates.update(book()))
+        self.assertEqual(len(aggregates), 4)
+
+    def test_newest_first_book(self):
+        """Test that a book listing new orders first gives the rebuild's order_ids and status."""
+        aggregates = RunningAggregates()
+        orders = [order('A', status='complete')]
+        self.assert_matches(aggregates, orders)
+        orders.insert(0, order('B', status='open'))
+        self.assert_matches(aggregates, orders)
+        self.assertEqual(aggregates.rows()[0]['order_ids'], ['B', 'A'])
+        self.assertEqual(aggregates.rows()[0]['status'], 'complete')
+
+        rng = random.Random(3)
+        for poll in range(30):
+            orders.insert(0, dict(order(f"N{poll}", price=str(rng.randint(90, 110))),
+                                  transactiontype=rng.choice(['BUY', 'SELL'])))
+            index = rng.randrange(len(orders))
+            if orders[index]['status'] == 'open':
+                orders[index] = dict(orders[index], status=rng.choice(['open', 'complete', 'cancelled']))
+            self.assert_matches(aggregates, orders)
+
+    def test_orders_leaving_the_book(self):
+        """Test that orders gone from the book (next day's reset) leave the view."""
+        aggregates = RunningAggregates()
+        self.assert_matches(aggregates, book()[:2])
+        self.assert_matches(aggregates, book()[2:3])
+        self.assertEqual(len(aggregates), 1)
+
+        self.assertTrue(aggregates.update([]))
+        self.assertEqual(aggregates.rows(), [])
+        self.assert_matches(aggregates, book()[:2])  # Same IDs again are new orders
+
+    def test_monitor_clears_view_on_empty_book(self):
+        """Test that an empty book (data: None) clears the displayed view."""
+        client = Mock()
+        client.get_order_book.return_value = {'status': True, 'data': book()}
+        aggregates = RunningAggregates()
+        with patch('order_monitor.display_aggregated_orders') as display:
+            check_and_display_aggregated_orders(client, aggregates)
+            client.get_order_book.return_value = {'status': True, 'data': None}
+            check_and_display_aggregated_orders(client, aggregates)
+        display.assert_called_with([])
+
+    def test_monitor_displays_changes_only(self):
+        """Test that the monitor displays the view only when it changed."""
+        client = Mock()
+        client.get_order_book.return_value = {'status': True, 'data': book()}
+        aggregates = RunningAggregates()
+        with patch('order_monitor.display_aggregated_orders') as display:
+            check_and_display_aggregated_orders(client, aggregates)
+            check_and_display_aggregated_orders(client, aggregates)
+        display.assert_called_once_with(filter_and_aggregate_orders(book()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+"""
+Test per-follower order placement limiting.
+Critical: A throttled follower order = a missed copy. A burst must queue, not fail.
+"""
+
+import unittest
+import sys
+import os
+from unittest.mock import Mock, patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from placement_limiter import PlacementLimiter
+from rate_governor import RateGovernor, RateLimitDeferred
+
+
+class TestPlacementLimiter(unittest.TestCase):
+    """Test token bucket with burst credit."""
+
+    def setUp(self):
+        self.now = 100.0
+        self.slept = []
+
+        def sleep(seconds):
+            self.slept.append(seconds)
+            self.now += seconds
+
+        patchers = [
+            patch('placement_limiter.time.monotonic', side_effect=lambda: self.now),
+            patch('placement_limiter.time.sleep', side_effect=sleep),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_burst_goes_out_immediately(self):
+        """Test that a 4-leg burst within the credit is not delayed."""
+        limiter = PlacementLimiter(rate=8, burst=5)
+
+        waits = [limiter.acquire() for _ in range(4)]
+
+        self.assertEqual(waits, [0.0] * 4)
+        self.assertEqual(self.slept, [])
+
+    def test_orders_beyond_burst_queue_briefly(self):
+        """Test that orders past the burst wait one refill interval each."""
+        limiter = PlacementLimiter(rate=10, burst=2)
+
+        waits = [limiter.reserve() for _ in range(4)]
+
+        self.assertEqual(waits[:2], [0.0, 0.0])
+        self.assertAlmostEqual(waits[2], 0.1)
+        self.assertAlmostEqual(waits[3], 0.2)
+
+    def test_credit_refills(self):
+        """Test that idle time restores burst credit up to the cap."""
+        limiter = PlacementLimiter(rate=10, burst=2)
+        limiter.reserve()
+        limiter.reserve()
+
+        self.now += 10  # Long idle - credit capped at burst
+        self.assertEqual(limiter.reserve(), 0.0)
+        self.assertEqual(limiter.reserve(), 0.0)
+        self.assertGreater(limiter.reserve(), 0.0)
+
+    def test_refuses_beyond_max_wait(self):
+        """Test that an order is refused rather than queued for too long."""
+        limiter = PlacementLimiter(rate=1, burst=1, max_wait=1.5, account='F1')
+        limiter.reserve()
+        limiter.reserve()  # Waits 1s
+
+        with self.assertRaises(RateLimitDeferred):
+            limiter.reserve()
+        self.assertEqual(limiter.get_statistics()['refused_orders'], 1)
+
+    def test_statistics(self):
+        """Test that queue time is measured per limiter."""
+        limiter = PlacementLimiter(rate=10, burst=1)
+        limiter.acquire()
+        limiter.acquire()
+
+        stats = limiter.get_statistics()
+        self.assertEqual(stats['orders'], 2)
+        self.assertEqual(stats['queued_orders'], 1)
+        self.assertAlmostEqual(stats['max_queue_ms'], 100.0)
+        self.assertAlmostEqual(stats['avg_queue_ms'], 50.0)
+
+
+class TestFollowerPlacement(unittest.TestCase):
+    """Test the limiter in front of MultiAccountClient.place_order."""
+
+    def test_place_order_waits_for_limiter(self):
+        """Test that a burst of follower orders all reach the broker."""
+        from multi_account_client import MultiAccountClient
+
+        account = Mock(api_key='key', client_id='F1', password='1234',
+                       totp_secret='JBSWY3DPEHPK3PXP')
+        account.name = 'Follower 1'
+        limiter = PlacementLimiter(rate=200, burst=2, account=account.name)
+        client = MultiAccountClient(account, governor=RateGovernor(), placement_limiter=limiter)
+        client.is_initialized = True
+        client.client = Mock()
+        client.client.placeOrderFullResponse.return_value = {'status': True, 'data': {'orderid': '1'}}
+
+        for _ in range(4):
+            client.place_order({'tradingsymbol': 'NIFTY28OCT2525000CE'})
+
+        self.assertEqual(client.client.placeOrderFullResponse.call_count, 4)
+        self.assertEqual(limiter.get_statistics()['queued_orders'], 2)
+        self.assertGreater(client.last_queue_time, 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+"""
+Test the activity-adaptive poll scheduler.
+Critical: Poll fast when orders are likely, but never beyond the call budget.
+"""
+
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from poll_scheduler import AdaptivePollScheduler
+from rate_governor import RateGovernor
+
+
+class TestAdaptivePollScheduler(unittest.TestCase):
+    """Test interval choice, decay and the budget floor."""
+
+    def make_scheduler(self, calls_per_minute=30, **kwargs):
+        scheduler = AdaptivePollScheduler(calls_per_minute, fast_interval=2.0, idle_interval=30.0,
+                                          off_hours_interval=60.0, decay=2.0, cooldown=20.0,
+                                          **kwargs)
+        scheduler.last_activity = 0.0
+        return scheduler
+
+    def test_activity_polls_fast(self):
+        """Test that an order event switches to the fast interval."""
+        scheduler = self.make_scheduler()
+        self.assertEqual(scheduler.update(events=0, now=100.0), 4.0)
+        self.assertEqual(scheduler.update(events=2, now=104.0), 2.0)
+        self.assertEqual(scheduler.reason, 'activity')
+        self.assertFalse(scheduler.budget_limited)
+
+    def test_idle_decays_to_ceiling(self):
+        """Test that quiet polls grow the interval step by step up to idle_interval."""
+        scheduler = self.make_scheduler()
+        intervals = [scheduler.update(now=100.0 + i) for i in range(6)]
+        self.assertEqual(intervals, [4.0, 8.0, 16.0, 30.0, 30.0, 30.0])
+        self.assertEqual(scheduler.reason, 'idle')
+
+    def test_open_orders_and_cooldown_stay_fast(self):
+        """Test that open master orders and recent activity keep polling fast."""
+        scheduler = self.make_scheduler()
+        scheduler.update(now=100.0)
+        scheduler.update(now=101.0)
+        self.assertEqual(scheduler.update(open_orders=1, now=102.0), 2.0)
+        self.assertEqual(scheduler.reason, 'open_orders')
+
+        scheduler.update(events=1, now=110.0)
+        self.assertEqual(scheduler.update(now=125.0), 2.0)
+        self.assertEqual(scheduler.reason, 'cooldown')
+        self.assertEqual(scheduler.update(now=131.0), 4.0)
+        self.assertEqual(scheduler.reason, 'idle')
+
+    def test_off_hours(self):
+        """Test the off-hours interval regardless of activity."""
+        scheduler = self.make_scheduler()
+        self.assertEqual(scheduler.update(events=1, market_open=False, now=100.0), 60.0)
+        self.assertEqual(scheduler.reason, 'off_hours')
+
+    def test_sleeps_until_open_then_starts_fast(self):
+        """Test the closed interval and the fast polling right after the open."""
+        scheduler = self.make_scheduler()
+        self.assertEqual(scheduler.update(market_open=False, until_open=3600.0, now=100.0), 3600.0)
+        self.assertEqual(scheduler.reason, 'market_closed')
+        self.assertEqual(scheduler.update(now=3700.0), 2.0)
+        self.assertEqual(scheduler.reason, 'session_start')
+        self.assertEqual(scheduler.update(now=3702.0), 2.0)
+        self.assertEqual(scheduler.reason, 'cooldown')
+
+    def test_budget_floor(self):
+        """Test that the interval never goes below the calls-per-minute pace."""
+        scheduler = self.make_scheduler(calls_per_minute=10)
+        self.assertEqual(scheduler.update(events=1, now=100.0), 6.0)
+        self.assertEqual(scheduler.reason, 'activity')
+        self.assertTrue(scheduler.budget_limited)
+        self.assertEqual(scheduler.describe(), '6.0s (activity, budget-limited)')
+
+    def test_shared_budget_stretches_interval(self):
+        """Test that calls by other consumers of the account delay the next poll."""
+        governor = RateGovernor()
+        governor.set_budget('A1', 'orderBook', 2, 60)
+        governor.record('A1', 'orderBook')
+        governor.record('A1', 'orderBook')
+        scheduler = self.make_scheduler(governor=governor, account='A1')
+
+        interval = scheduler.update(events=1)
+        self.assertGreater(interval, 50.0)
+        self.assertTrue(scheduler.budget_limited)
+
+    def test_changes_recorded(self):
+        """Test that each change of reason is kept with its interval."""
+        scheduler = self.make_scheduler()
+        scheduler.update(now=100.0)
+        scheduler.update(now=101.0)
+        scheduler.update(events=1, now=102.0)
+        self.assertEqual([(t, reason) for t, _, reason, _ in scheduler.changes],
+                         [(100.0, 'idle'), (102.0, 'activity')])
+
+
+if __name__ == '__main__':
+    unittest.main()
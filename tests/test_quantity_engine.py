@@ -0,0 +1,194 @@
+"""
+Test follower order sizing against lot size, freeze limit and tick size.
+Critical: An order the exchange is bound to reject must never be sent.
+"""
+
+import unittest
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from unittest.mock import Mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from instrument_master import InstrumentMaster, build_index
+from multi_account_copy_trader import MultiAccountCopyTrader, CopyTradingSettings
+from order_snapshot import OrderRecord
+from quantity_engine import QuantityEngine, round_to_lot, split_for_freeze, on_tick
+from tests.test_instrument_master import FIXTURE
+
+
+def master_order(**fields):
+    """A completed NIFTY option order (token 43210 in the fixture)."""
+    order = {'orderid': 'M1', 'tradingsymbol': 'NIFTY28OCT2525000CE', 'symboltoken': '43210',
+             'exchange': 'NFO', 'transactiontype': 'BUY', 'ordertype': 'MARKET',
+             'producttype': 'CARRYFORWARD', 'status': 'complete', 'quantity': '75', 'price': '100.05'}
+    order.update(fields)
+    return order
+
+
+class InstrumentFixture(unittest.TestCase):
+    """Instrument master built from the fixture, NIFTY freeze limit 1800."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        path = os.path.join(self.directory, 'instruments.bin')
+        with open(FIXTURE, encoding='utf-8') as f:
+            build_index(json.load(f), path, freeze_limits={'NIFTY': 1800, 'BANKNIFTY': 900})
+        self.instruments = InstrumentMaster(path, url='http://localhost/unused')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class TestQuantityEngine(InstrumentFixture):
+    """Test lot rounding, freeze splits and tick checks."""
+
+    def test_round_to_lot(self):
+        """Test the three rounding modes."""
+        self.assertEqual(round_to_lot(112.5, 75), 75)
+        self.assertEqual(round_to_lot(112.5, 75, 'nearest'), 150)
+        self.assertEqual(round_to_lot(76, 75, 'up'), 150)
+        self.assertEqual(round_to_lot(150, 75, 'up'), 150)
+        self.assertEqual(round_to_lot(74, 75), 0)
+        with self.assertRaises(ValueError):
+            round_to_lot(75, 75, 'sideways')
+
+    def test_split_for_freeze(self):
+        """Test that children are whole lots no larger than the freeze limit."""
+        self.assertEqual(split_for_freeze(1800, 75, 1800), [1800])
+        self.assertEqual(split_for_freeze(4200, 75, 1800), [1800, 1800, 600])
+        self.assertEqual(split_for_freeze(1050, 35, 900), [875, 175])
+        self.assertEqual(split_for_freeze(5000, 1, 0), [5000])
+
+    def test_on_tick(self):
+        """Test tick alignment in paise, free of float noise."""
+        self.assertTrue(on_tick(100.05, 0.05))
+        self.assertTrue(on_tick(0.1 + 0.2, 0.05))
+        self.assertFalse(on_tick(100.03, 0.05))
+        self.assertFalse(on_tick(100.051, 0.05))
+        self.assertTrue(on_tick(0, 0.05))
+
+    def test_plan_from_instrument(self):
+        """Test follower plans sized from the instrument master."""
+        engine = QuantityEngine(self.instruments)
+        record = OrderRecord(master_order())
+        self.assertEqual(engine.plan(record, 150).children, [150])
+        self.assertEqual(engine.plan(record, 160).quantity, 150)
+        self.assertEqual(engine.plan(record, 3750).children, [1800, 1800, 150])
+
+        too_small = engine.plan(record, 50)
+        self.assertFalse(too_small.ok)
+        self.assertIn('less than one lot of 75', too_small.reason)
+
+    def test_unknown_instrument_keeps_quantity(self):
+        """Test that orders missing from the master are sized as before."""
+        engine = QuantityEngine(self.instruments)
+        record = OrderRecord(master_order(symboltoken='1', tradingsymbol='UNKNOWN28OCT25100CE'))
+        self.assertEqual(engine.plan(record, 50).children, [50])
+        self.assertIsNone(engine.check_prices(record))
+
+    def test_check_prices(self):
+        """Test limit and trigger prices against the tick size."""
+        engine = QuantityEngine(self.instruments)
+        self.assertIsNone(engine.check_prices(OrderRecord(master_order(ordertype='LIMIT'))))
+        self.assertIsNone(engine.check_prices(OrderRecord(master_order(price='100.03'))))  # Market
+        self.assertIn('Price 100.03', engine.check_prices(OrderRecord(
+            master_order(ordertype='LIMIT', price='100.03'))))
+        self.assertIn('Trigger price 99.02', engine.check_prices(OrderRecord(
+            master_order(ordertype='STOPLOSS_MARKET', price='0', triggerprice='99.02'))))
+
+
+class TestFollowerSizing(InstrumentFixture):
+    """Test sized placement through the copy trader."""
+
+    def make_trader(self, followers, **settings):
+        copy_settings = CopyTradingSettings()
+        copy_settings.decouple_placement = False
+        for name, value in settings.items():
+            setattr(copy_settings, name, value)
+        client_manager = Mock()
+        client_manager.get_all_active_followers.return_value = followers
+        client_manager.master_client.get_order_book.return_value = {'status': True, 'data': []}
+        trader = MultiAccountCopyTrader(Mock(), copy_settings, client_manager=client_manager)
+        trader.quantity_engine.instruments = self.instruments
+        return trader
+
+    def make_follower(self, name='Follower1', delay=0.0):
+        follower = Mock()
+        follower.account.name = name
+
+        def place_order(params):
+            time.sleep(delay)
+            return {'status': True, 'data': {'orderid': f"{name}-{params['quantity']}"}}
+        follower.place_order.side_effect = place_order
+        return follower
+
+    def test_quantity_rounded_to_lots(self):
+        """Test that a multiplier result is sent as whole lots."""
+        follower = self.make_follower()
+        trader = self.make_trader([follower], quantity_multiplier=1.5)
+        trader.copy_order_to_followers(master_order(quantity='150'))
+        self.assertEqual(follower.place_order.call_args[0][0]['quantity'], '225')
+
+    def test_below_one_lot_not_sent(self):
+        """Test that a quantity under one lot never reaches the broker."""
+        follower = self.make_follower()
+        trader = self.make_trader([follower], quantity_multiplier=0.5)
+        trader.copy_order_to_followers(master_order(quantity='75'))
+        follower.place_order.assert_not_called()
+        self.assertEqual(trader.tracker.failed_copies[0]['error'],
+                         'Quantity 37.5 is less than one lot of 75')
+
+    def test_multiplier_rounded_before_truncation(self):
+        """Test that lot rounding starts from the unrounded multiplier result."""
+        follower = self.make_follower()
+        trader = self.make_trader([follower], quantity_multiplier=1.5, lot_rounding='nearest')
+        trader.copy_order_to_followers(master_order(quantity='75'))  # 112.5 -> 150, not 112 -> 75
+        self.assertEqual(follower.place_order.call_args[0][0]['quantity'], '150')
+
+    def test_freeze_split_placed_concurrently(self):
+        """Test that children of a freeze split are all placed at once."""
+        follower = self.make_follower(delay=0.2)
+        trader = self.make_trader([follower])
+        started = time.time()
+        trader.copy_order_to_followers(master_order(quantity='4200'))
+        self.assertLess(time.time() - started, 0.5)
+
+        sent = sorted(int(call[0][0]['quantity']) for call in follower.place_order.call_args_list)
+        self.assertEqual(sent, [600, 1800, 1800])
+        records = sorted(trader.tracker.copy_records, key=lambda record: record['part'])
+        self.assertEqual([(r['part'], r['quantity']) for r in records],
+                         [('1/3', 1800), ('2/3', 1800), ('3/3', 600)])
+        self.assertTrue(all(record['success'] for record in records))
+        stats = trader.tracker.get_statistics()
+        self.assertEqual((stats['total_copies'], stats['successful']), (1, 1))
+
+    def test_off_tick_price_not_copied(self):
+        """Test that a limit price off the tick grid is stopped before the followers."""
+        follower = self.make_follower()
+        trader = self.make_trader([follower])
+        trader.copy_order_to_followers(master_order(ordertype='LIMIT', price='100.03'))
+        follower.place_order.assert_not_called()
+
+    def test_instrument_master_off(self):
+        """Test that the old behaviour is kept when the instrument master is disabled."""
+        follower = self.make_follower()
+        copy_settings = CopyTradingSettings()
+        copy_settings.decouple_placement = False
+        copy_settings.use_instrument_master = False
+        client_manager = Mock()
+        client_manager.get_all_active_followers.return_value = [follower]
+        client_manager.master_client.get_order_book.return_value = {'status': True, 'data': []}
+        trader = MultiAccountCopyTrader(Mock(), copy_settings, client_manager=client_manager)
+        self.assertIsNone(trader.quantity_engine)
+
+        trader.copy_order_to_followers(master_order(quantity='50'))
+        self.assertEqual(follower.place_order.call_args[0][0]['quantity'], '50')
+
+
+if __name__ == '__main__':
+    unittest.main()
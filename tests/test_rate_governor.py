@@ -0,0 +1,133 @@
+"""
+Test the shared rate governor.
+Critical: Too many API calls = account blocked = no trading possible.
+"""
+
+import unittest
+import sys
+import os
+from unittest.mock import Mock, patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rate_governor import RateGovernor, RateLimitDeferred
+
+
+class TestRateGovernor(unittest.TestCase):
+    """Test sliding-log budgets."""
+
+    def setUp(self):
+        self.now = 1000.0
+        patcher = patch('rate_governor.time.time', side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.governor = RateGovernor({'orderBook': ((2, 1.0), (3, 60.0))})
+
+    def test_grants_until_budget_spent(self):
+        """Test that calls are granted up to the limit, then deferred."""
+        self.assertEqual(self.governor.try_acquire('A1', 'orderBook'), 0.0)
+        self.assertEqual(self.governor.try_acquire('A1', 'orderBook'), 0.0)
+
+        wait = self.governor.try_acquire('A1', 'orderBook')
+        self.assertAlmostEqual(wait, 1.0)
+        self.assertEqual(self.governor.usage('A1', 'orderBook'), 2, "Deferred calls must not count")
+
+    def test_window_slides(self):
+        """Test that room opens as old calls leave the window."""
+        self.governor.try_acquire('A1', 'orderBook')
+        self.now += 0.5
+        self.governor.try_acquire('A1', 'orderBook')
+
+        self.now += 0.6  # First call has left the 1s window
+        self.assertEqual(self.governor.try_acquire('A1', 'orderBook'), 0.0)
+
+        # Per-minute window is now full: wait until the first call is 60s old
+        self.now += 1.0
+        self.assertAlmostEqual(self.governor.try_acquire('A1', 'orderBook'), 57.9)
+
+    def test_accounts_and_endpoints_are_independent(self):
+        """Test that budgets are per (account, endpoint)."""
+        self.governor.try_acquire('A1', 'orderBook')
+        self.governor.try_acquire('A1', 'orderBook')
+
+        self.assertEqual(self.governor.try_acquire('A2', 'orderBook'), 0.0)
+        self.assertEqual(self.governor.try_acquire('A1', 'tradeBook'), 0.0)
+
+    def test_set_budget_only_tightens(self):
+        """Test that a consumer's own limit adds to the defaults."""
+        self.governor.set_budget('A1', 'orderBook', 1, 10)
+        self.governor.set_budget('A1', 'orderBook', 1, 10)
+
+        self.governor.try_acquire('A1', 'orderBook')
+        self.assertAlmostEqual(self.governor.time_until_available('A1', 'orderBook'), 10.0)
+        self.assertEqual(self.governor.try_acquire('A2', 'orderBook'), 0.0)
+
+    def test_note_throttled_blocks_all_callers(self):
+        """Test that a broker rate-limit response holds off the endpoint."""
+        self.governor.note_throttled('A1', 'orderBook', 30)
+        self.assertAlmostEqual(self.governor.try_acquire('A1', 'orderBook'), 30.0)
+
+        self.now += 30
+        self.assertEqual(self.governor.try_acquire('A1', 'orderBook'), 0.0)
+
+    def test_acquire_or_defer_raises(self):
+        """Test that a spent budget raises with the retry delay."""
+        self.governor.record('A1', 'orderBook')
+        self.governor.record('A1', 'orderBook')
+
+        with self.assertRaises(RateLimitDeferred) as ctx:
+            self.governor.acquire_or_defer('A1', 'orderBook')
+        self.assertAlmostEqual(ctx.exception.retry_after, 1.0)
+        self.assertEqual(ctx.exception.endpoint, 'orderBook')
+
+
+class TestMonitorsShareBudget(unittest.TestCase):
+    """Test that consumers of one account draw from one budget without sleeping."""
+
+    def make_client(self):
+        client = Mock()
+        client.client_id = 'A1'
+        client.get_order_book.return_value = {'data': []}
+        return client
+
+    @patch('smart_polling.time.sleep')
+    def test_smart_polling_defers_without_sleeping(self, mock_sleep):
+        """Test that a spent budget skips the poll instead of blocking."""
+        from smart_polling import SmartPollingMonitor
+        from polling_monitor import PollingOrderMonitor
+
+        governor = RateGovernor({'orderBook': ((1, 60.0),)})
+        client = self.make_client()
+        smart = SmartPollingMonitor(client, governor=governor)  # Startup load uses the budget
+        simple = PollingOrderMonitor(client, governor=governor)
+        client.get_order_book.reset_mock()
+
+        self.assertEqual(smart.check_for_new_orders(), [])
+        self.assertEqual(simple.check_for_new_orders(), [])
+
+        client.get_order_book.assert_not_called()
+        mock_sleep.assert_not_called()
+        self.assertIsNotNone(smart.next_call_at)
+        self.assertIsNotNone(simple.next_call_at)
+
+    def test_multi_account_client_raises_deferred(self):
+        """Test that follower reads raise RateLimitDeferred instead of calling the API."""
+        from multi_account_client import MultiAccountClient
+
+        account = Mock(api_key='key', client_id='F1', password='1234',
+                       totp_secret='JBSWY3DPEHPK3PXP')
+        account.name = 'Follower 1'
+        governor = RateGovernor({'orderBook': ((1, 60.0),)})
+        client = MultiAccountClient(account, governor=governor)
+        client.is_initialized = True
+        client.client = Mock()
+        client.client.orderBook.return_value = {'data': []}
+
+        client.get_order_book()
+        with self.assertRaises(RateLimitDeferred):
+            client.get_order_book()
+        self.assertEqual(client.client.orderBook.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+"""
+Test the persistent session cache.
+Critical: Every unnecessary login burns the 3-5/minute login budget.
+"""
+
+import unittest
+import base64
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from unittest.mock import Mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from session_cache import SessionCache, jwt_expiry
+
+
+def make_jwt(exp):
+    """Build an unsigned JWT with the given expiry."""
+    def encode(obj):
+        return base64.urlsafe_b64encode(json.dumps(obj).encode()).decode().rstrip('=')
+    return f"{encode({'alg': 'HS512'})}.{encode({'exp': exp})}.signature"
+
+
+def make_smart_connect(profile_ok=True):
+    """Create a mocked SmartConnect that keeps the tokens it is given."""
+    conn = Mock()
+    conn.access_token = None
+    conn.refresh_token = None
+    conn.feed_token = None
+    conn.setAccessToken.side_effect = lambda t: setattr(conn, 'access_token', t)
+    conn.setRefreshToken.side_effect = lambda t: setattr(conn, 'refresh_token', t)
+    conn.setFeedToken.side_effect = lambda t: setattr(conn, 'feed_token', t)
+    conn.getfeedToken.side_effect = lambda: conn.feed_token
+    conn.getProfile.return_value = {'status': profile_ok, 'data': {}}
+    return conn
+
+
+class TestSessionCache(unittest.TestCase):
+    """Test session reuse and renewal."""
+    
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.cache = SessionCache(os.path.join(self.tmpdir, 'sessions.json'))
+    
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+    
+    def test_jwt_expiry(self):
+        """Test reading expiry from a JWT."""
+        self.assertEqual(jwt_expiry(make_jwt(1761589800)), 1761589800)
+        self.assertEqual(jwt_expiry('Bearer ' + make_jwt(1761589800)), 1761589800)
+        self.assertIsNone(jwt_expiry('not-a-jwt'))
+    
+    def test_reuses_valid_session(self):
+        """Test that a valid cached session is reused without login."""
+        jwt = make_jwt(time.time() + 3600)
+        self.cache.put('C123', jwt, 'refresh', 'feed')
+        
+        conn = make_smart_connect()
+        self.assertEqual(self.cache.restore(conn, 'C123'), 'cached')
+        self.assertEqual(conn.access_token, jwt)
+        self.assertEqual(conn.feed_token, 'feed')
+        conn.generateSession.assert_not_called()
+        conn.generateToken.assert_not_called()
+    
+    def test_renews_expired_session_with_refresh_token(self):
+        """Test that an expired session is renewed instead of re-logging in."""
+        self.cache.put('C123', make_jwt(time.time() - 10), 'refresh', 'feed')
+        new_jwt = make_jwt(time.time() + 3600)
+        
+        conn = make_smart_connect()
+        
+        def generate_token(refresh_token):
+            conn.setAccessToken(new_jwt)
+            conn.setFeedToken('feed2')
+            return {'status': True, 'data': {'jwtToken': new_jwt, 'refreshToken': 'refresh2'}}
+        
+        conn.generateToken.side_effect = generate_token
+        
+        self.assertEqual(self.cache.restore(conn, 'C123'), 'refreshed')
+        entry = self.cache.get('C123')
+        self.assertEqual(entry['jwt_token'], new_jwt)
+        self.assertEqual(entry['refresh_token'], 'refresh2')
+    
+    def test_rejected_session_is_invalidated(self):
+        """Test that a session the broker rejects is dropped from the cache."""
+        self.cache.put('C123', make_jwt(time.time() + 3600), 'refresh', 'feed')
+        conn = make_smart_connect(profile_ok=False)
+        conn.generateToken.return_value = {'status': False}
+        
+        self.assertIsNone(self.cache.restore(conn, 'C123'))
+        self.assertIsNone(self.cache.get('C123'))
+        self.assertIsNone(conn.access_token)
+    
+    def test_missing_entry(self):
+        """Test that an unknown account needs a full login."""
+        self.assertIsNone(self.cache.restore(make_smart_connect(), 'UNKNOWN'))
+    
+    def test_concurrent_writers(self):
+        """Test that concurrent writers don't lose each other's entries."""
+        def writer(idx):
+            self.cache.put(f'C{idx}', make_jwt(time.time() + 3600), 'r', 'f')
+        
+        threads = [threading.Thread(target=writer, args=(i,)) for i in range(20)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        
+        for i in range(20):
+            self.assertIsNotNone(self.cache.get(f'C{i}'))
+
+
+if __name__ == '__main__':
+    unittest.main()
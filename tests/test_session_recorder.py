@@ -0,0 +1,156 @@
+"""
+Test session recording and replay.
+Critical: A replayed day must reproduce exactly what the monitors saw live.
+"""
+
+import unittest
+import tempfile
+import sys
+import os
+from unittest.mock import Mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from session_recorder import SessionRecorder, RecordedSession, Replayer, ReplayClient, segment_paths
+from multi_account_copy_trader import CopyTradingSettings
+
+
+def make_order(order_id, status='complete', symbol='NIFTY28OCT2525000CE'):
+    """Create an order book entry."""
+    return {'orderid': order_id, 'status': status, 'tradingsymbol': symbol,
+            'transactiontype': 'BUY', 'quantity': '75', 'averageprice': '120.5',
+            'price': '0', 'exchange': 'NFO', 'ordertype': 'MARKET',
+            'producttype': 'CARRYFORWARD', 'symboltoken': '43210'}
+
+
+def book(*orders):
+    """Wrap orders in an order book response."""
+    return {'status': True, 'message': 'SUCCESS', 'data': list(orders)}
+
+
+class TestSessionRecorder(unittest.TestCase):
+    """Test recording order books and replaying them through the monitors."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.path = os.path.join(self.tmpdir.name, 'session.jsonl.gz')
+
+    def record_day(self, books):
+        """Record a sequence of order books through an instrumented client."""
+        recorder = SessionRecorder(self.path)
+        smart_connect = Mock()
+        smart_connect.orderBook.side_effect = books
+        recorder.attach(smart_connect, 'M1')
+        for _ in books:
+            try:
+                smart_connect.orderBook()
+            except Exception:
+                pass
+        recorder.close()
+        return RecordedSession.load(self.path)
+
+    def test_round_trip(self):
+        """Test that responses and errors are recorded in order with timestamps."""
+        session = self.record_day([book(make_order('1')), Exception('Access rate exceeded')])
+
+        calls = session.calls('M1')
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(calls[0]['response']['data'][0]['orderid'], '1')
+        self.assertEqual(calls[1]['error'], 'Access rate exceeded')
+        self.assertLessEqual(calls[0]['t'], calls[1]['t'])
+        self.assertEqual(session.accounts(), ['M1'])
+
+    def test_appended_sessions_load_together(self):
+        """Test that a restart writes a new segment that loads with the first."""
+        self.record_day([book()])
+        session = self.record_day([book(make_order('1'))])
+
+        self.assertEqual(len(session.calls('M1')), 2)
+        self.assertEqual(segment_paths(self.path),
+                         [self.path, os.path.join(self.tmpdir.name, 'session.1.jsonl.gz')])
+
+    def test_crash_keeps_records_before_it(self):
+        """Test that a recording cut off by a crash loses only its last record."""
+        recorder = SessionRecorder(self.path)
+        for i in range(20):
+            flushed = os.path.getsize(self.path)
+            recorder.record('M1', 'orderBook', i, 0.1, response=book(make_order(str(i))))
+        with open(self.path, 'rb') as f:
+            written = f.read()  # Process dies here: the gzip stream is never closed
+        recorder.close()
+        with open(self.path, 'wb') as f:
+            f.write(written[:(flushed + len(written)) // 2])  # ...in the middle of the last write
+
+        self.assertEqual(len(RecordedSession.load(self.path).calls('M1')), 19)
+        session = self.record_day([book(make_order('next run'))])
+        self.assertEqual(len(session.calls('M1')), 20)
+
+    def test_replay_monitor_detects_new_orders(self):
+        """Test that SmartPollingMonitor sees the recorded new order once."""
+        session = self.record_day([
+            book(make_order('1')),
+            book(make_order('1'), make_order('2', symbol='BANKNIFTY28OCT2556000PE')),
+            book(make_order('1'), make_order('2', symbol='BANKNIFTY28OCT2556000PE')),
+        ])
+
+        result = Replayer(session, speed=0).replay_monitor()
+
+        self.assertEqual(result.polls, 2, "First book primes the monitor")
+        self.assertEqual([d['orderid'] for d in result.detections], ['2'])
+        self.assertEqual(result.duplicates, [])
+
+    def test_replay_monitor_through_rate_limit_error(self):
+        """Test that a recorded rate-limit error doesn't stall or spin the replay."""
+        session = self.record_day([
+            book(make_order('1')),
+            Exception('Access denied because of exceeding access rate'),
+            book(make_order('1'), make_order('2')),
+        ])
+
+        replayer = Replayer(session, speed=0)
+        result = replayer.replay_monitor()
+
+        self.assertEqual(result.polls, 2)
+        self.assertEqual(result.errors, 1)
+        self.assertEqual(result.skipped, 0)
+        self.assertEqual([d['orderid'] for d in result.detections], ['2'])
+        self.assertEqual(replayer.monitor.consecutive_rate_limits, 0)
+        self.assertLess(result.wall_time, 1.0)
+
+    def test_calls_the_detector_skips_are_dropped(self):
+        """Test that a detector that makes no call ends the replay instead of spinning."""
+        session = self.record_day([book(), book(make_order('1'))])
+        replayer = Replayer(session, speed=0)
+
+        result = replayer._run(ReplayClient(session, 'M1'), lambda: [])
+
+        self.assertEqual(result.polls, 0)
+        self.assertEqual(result.skipped, 2)
+
+    def test_replay_copy_trader_fans_out(self):
+        """Test that the copy trader detects completion and copies to followers."""
+        session = self.record_day([
+            book(),
+            book(make_order('7', status='open')),
+            Exception('Access rate exceeded'),
+            book(make_order('7')),
+        ])
+        follower = Mock()
+        follower.account.name = 'Follower 1'
+        follower.place_order.return_value = {'status': True, 'data': {'orderid': 'F7'}}
+
+        settings = CopyTradingSettings()
+        settings.require_confirmation = False
+
+        replayer = Replayer(session, speed=0)
+        result = replayer.replay_copy_trader(settings=settings, followers=[follower], copy=True)
+
+        self.assertEqual(result.summary()['detections'], 1)
+        self.assertEqual(result.errors, 1)
+        self.assertEqual(follower.place_order.call_count, 1)
+        self.assertEqual(replayer.trader.tracker.get_statistics()['successful'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+"""
+Test the local SmartAPI simulator against the real client code.
+Critical: Offline benchmarks are only meaningful if the clients talk to it unchanged.
+"""
+
+import unittest
+import sys
+import os
+from unittest.mock import Mock, patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from smartapi_simulator import SmartAPISimulator, LatencyModel
+
+
+def make_account(client_id):
+    """Create an account config for the simulator (any credentials are accepted)."""
+    account = Mock(api_key='sim-key', client_id=client_id, password='1234',
+                   totp_secret='JBSWY3DPEHPK3PXP')
+    account.name = f"Account {client_id}"
+    return account
+
+
+class TestSmartAPISimulator(unittest.TestCase):
+    """Test MultiAccountClient end to end against the simulator."""
+
+    @classmethod
+    def setUpClass(cls):
+        # One simulator for the class; each test uses its own account
+        cls.simulator = SmartAPISimulator(latency={'default': LatencyModel(0)},
+                                          order_book_size=25)
+        cls.root = cls.simulator.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.simulator.stop()
+
+    def setUp(self):
+        for patcher in (patch.object(Config, 'SMARTAPI_ROOT_URL', self.root),
+                        patch.object(Config, 'USE_SESSION_CACHE', False)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def make_client(self, client_id):
+        from multi_account_client import MultiAccountClient
+        from rate_governor import RateGovernor
+
+        client = MultiAccountClient(make_account(client_id), governor=RateGovernor(budgets={}))
+        self.assertTrue(client.initialize_session())
+        return client
+
+    def test_login_and_order_book(self):
+        """Test that a client logs in and reads a book of the configured size."""
+        client = self.make_client('SIM001')
+
+        order_book = client.get_order_book()
+        self.assertTrue(order_book['status'])
+        self.assertEqual(len(order_book['data']), 25)
+        self.assertEqual(client.client.userId, 'SIM001')
+
+    def test_placed_order_appears_in_book(self):
+        """Test that placeOrder fills immediately and shows up in the book."""
+        client = self.make_client('SIM002')
+
+        response = client.place_order({
+            'variety': 'NORMAL', 'tradingsymbol': 'NIFTY28OCT2525000CE', 'symboltoken': '43210',
+            'transactiontype': 'BUY', 'exchange': 'NFO', 'ordertype': 'MARKET',
+            'producttype': 'CARRYFORWARD', 'duration': 'DAY', 'price': '0', 'quantity': '75',
+        })
+
+        self.assertTrue(response['status'])
+        order_id = response['data']['orderid']
+        book = {o['orderid']: o for o in self.simulator.order_book('SIM002')}
+        self.assertEqual(book[order_id]['status'], 'complete')
+        self.assertEqual(book[order_id]['quantity'], '75')
+
+    def test_throttled_calls_look_like_the_broker(self):
+        """Test that exceeding the rate limit yields the 'access rate' error."""
+        client = self.make_client('SIM003')
+
+        client.client.orderBook()
+        with self.assertRaises(Exception) as ctx:
+            client.client.orderBook()  # Same second - over the 1/s limit
+        self.assertIn('access rate', str(ctx.exception).lower())
+        self.assertEqual(self.simulator.get_statistics()['throttled']['orderBook'], 1)
+
+        from metrics import RATE_LIMIT_HITS
+        self.assertEqual(RATE_LIMIT_HITS.labels('api.order.book', 'SIM003').value, 1)
+
+    def test_unknown_token_rejected(self):
+        """Test that secure endpoints require a session."""
+        client = self.make_client('SIM004')
+        client.client.setAccessToken('not-a-token')
+
+        self.assertFalse(client.client.orderBook()['success'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+"""
+Test the queued structured logger.
+Critical: Logging from the poll and copy loops must never block on output.
+"""
+
+import unittest
+import io
+import json
+import threading
+import time
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from structured_log import LogWriter, StructuredLogger, DEBUG, INFO, WARNING
+
+
+class BlockedStream(io.StringIO):
+    """Stream whose writes wait until released (a stalled terminal or pipe)."""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def write(self, text):
+        self.release.wait(5)
+        return super().write(text)
+
+
+class TestStructuredLog(unittest.TestCase):
+    """Test formatting, levels and non-blocking submission."""
+
+    def setUp(self):
+        self.stream = io.StringIO()
+        self.writer = LogWriter(level=INFO, fmt='text', stream=self.stream)
+        self.log = StructuredLogger('copy_trader', self.writer)
+
+    def test_text_uses_template(self):
+        """Test that text output is the template formatted with the fields."""
+        self.log.info('copy_result', "   ✅ {follower}: Success! Order ID: {order_id}",
+                      follower='F1', order_id='123', ms=12.5)
+        self.assertTrue(self.writer.flush())
+        self.assertEqual(self.stream.getvalue(), "   ✅ F1: Success! Order ID: 123\n")
+
+    def test_text_without_template_is_compact(self):
+        """Test the key=value fallback (also used when a template field is missing)."""
+        self.log.info('poll', orders=3, new=1)
+        self.log.info('poll', "{missing}", orders=4)
+        self.writer.flush()
+        lines = self.stream.getvalue().splitlines()
+        self.assertTrue(lines[0].endswith("INFO copy_trader: poll orders=3 new=1"))
+        self.assertTrue(lines[1].endswith("INFO copy_trader: poll orders=4"))
+
+    def test_json_lines(self):
+        """Test that JSON output has one object per record with all fields."""
+        self.writer.fmt = 'json'
+        self.log.warning('copy_result', "ignored {follower}", follower='F1', result='failed')
+        self.writer.flush()
+        entry = json.loads(self.stream.getvalue())
+        self.assertEqual(entry['level'], 'warning')
+        self.assertEqual(entry['logger'], 'copy_trader')
+        self.assertEqual(entry['event'], 'copy_result')
+        self.assertEqual(entry['follower'], 'F1')
+        self.assertEqual(entry['result'], 'failed')
+        self.assertIn('ts', entry)
+
+    def test_level_filtering(self):
+        """Test that records below the level are dropped before queueing."""
+        self.log.debug('poll', orders=1)
+        self.assertFalse(self.log.enabled(DEBUG))
+        self.assertTrue(self.log.enabled(WARNING))
+        self.writer.flush()
+        self.assertEqual(self.stream.getvalue(), '')
+
+    def test_submit_never_blocks(self):
+        """Test that a stalled stream drops records instead of stalling the caller."""
+        stream = BlockedStream()
+        writer = LogWriter(level=INFO, stream=stream, maxsize=10)
+        log = StructuredLogger('polling', writer)
+
+        started = time.perf_counter()
+        for i in range(1000):
+            log.info('poll', orders=i)
+        elapsed = time.perf_counter() - started
+
+        self.assertLess(elapsed, 1.0)
+        self.assertGreater(writer.dropped, 0)
+
+        stream.release.set()
+        self.assertTrue(writer.flush())
+        self.assertIn('log_records_dropped', stream.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
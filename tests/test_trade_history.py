@@ -0,0 +1,125 @@
+"""
+Test the multi-day trade history store.
+Critical: Past days must come from the store, never from another trade book call.
+"""
+
+import unittest
+import os
+import shutil
+import sys
+import tempfile
+from datetime import date, datetime, timedelta
+from unittest.mock import Mock, patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import IST
+from market_calendar import Session, TradingCalendar
+from order_monitor import get_trading_history_for_date
+from trade_history import TradeHistoryStore, trade_date_of
+
+
+def trade(fill_id, symbol='NIFTY28OCT2525000CE', side='BUY', size='75', price='100.5',
+          filltime='10:15:32', **fields):
+    """Build a trade book row (SmartAPI rows carry a fill time but no date)."""
+    row = {'fillid': fill_id, 'orderid': f"O{fill_id}", 'tradingsymbol': symbol,
+           'transactiontype': side, 'fillsize': size, 'fillprice': price, 'filltime': filltime}
+    row.update(fields)
+    return row
+
+
+class TestTradeHistoryStore(unittest.TestCase):
+    """Test storing, de-duplicating and querying trades."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.session_day = datetime.now(IST).date()
+        calendar = Mock(spec=TradingCalendar)
+        calendar.last_session.side_effect = lambda now=None: Session(self.session_day, 0, 0, 0)
+        self.store = TradeHistoryStore(os.path.join(self.directory, 'trades.db'), calendar)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_trade_date_of(self):
+        """Test dated rows and undated SmartAPI rows."""
+        self.assertEqual(trade_date_of({'tradeDate': '2025-10-27 10:15:32'}, date(2025, 10, 28)),
+                         date(2025, 10, 27))
+        self.assertEqual(trade_date_of({'filltime': '10:15:32'}, date(2025, 10, 28)), date(2025, 10, 28))
+        self.assertEqual(trade_date_of({'date': '27-Oct'}, date(2025, 10, 28)), date(2025, 10, 28))
+
+    def test_repeated_snapshots_store_each_fill_once(self):
+        """Test that re-fetching the day's trade book only adds the new fills."""
+        day = date(2025, 10, 27)
+        self.assertEqual(self.store.record([trade('1'), trade('2')], 'A1', day), 2)
+        self.assertEqual(self.store.record([trade('1'), trade('2'), trade('3')], 'A1', day), 1)
+        self.assertEqual([t['fillid'] for t in self.store.trades(day)], ['1', '2', '3'])
+
+    def test_queries_by_range_symbol_and_account(self):
+        """Test date range, symbol and account filters."""
+        self.store.record([trade('1'), trade('2', symbol='BANKNIFTY28OCT2556000PE')], 'A1', date(2025, 10, 27))
+        self.store.record([trade('3')], 'A1', date(2025, 10, 28))
+        self.store.record([trade('1')], 'A2', date(2025, 10, 28))  # Same fill ID, other account
+
+        self.assertEqual(len(self.store.trades(date(2025, 10, 27), date(2025, 10, 28))), 4)
+        self.assertEqual([t['fillid'] for t in self.store.trades(
+            date(2025, 10, 27), date(2025, 10, 28), symbol='NIFTY28OCT2525000CE', account='A1')], ['1', '3'])
+        self.assertEqual(self.store.dates(), [date(2025, 10, 27), date(2025, 10, 28)])
+        self.assertEqual(self.store.dates('A2'), [date(2025, 10, 28)])
+
+    def test_store_survives_reopen(self):
+        """Test that history is kept across processes."""
+        self.store.record([trade('1')], 'A1', date(2025, 10, 27))
+        self.store.close()
+        self.store = TradeHistoryStore(self.store.path, self.store.calendar)
+        self.assertEqual(len(self.store.trades(date(2025, 10, 27))), 1)
+
+    def test_broker_called_for_latest_session_only(self):
+        """Test that only ranges including the latest session fetch the trade book."""
+        client = Mock()
+        client.get_trade_book.return_value = {'status': True, 'data': [trade('9')]}
+        today = self.session_day
+        self.store.record([trade('1')], '', today - timedelta(days=2))
+
+        self.assertEqual([t['fillid'] for t in self.store.history(client, today - timedelta(days=2))], ['1'])
+        client.get_trade_book.assert_not_called()
+
+        trades = self.store.history(client, today - timedelta(days=2), today)
+        self.assertEqual([t['fillid'] for t in trades], ['1', '9'])
+        client.get_trade_book.assert_called_once()
+
+    def test_sync_after_midnight_keeps_session_date(self):
+        """Test that the previous session's fills synced after midnight are not stored twice."""
+        client = Mock()
+        client.get_trade_book.return_value = {'status': True, 'data': [trade('1'), trade('2')]}
+        self.store.calendar = TradingCalendar()
+        friday_afternoon = datetime(2025, 10, 24, 14, 0, tzinfo=IST).timestamp()
+        saturday_night = datetime(2025, 10, 25, 0, 30, tzinfo=IST).timestamp()  # Book not reset yet
+
+        with patch('market_calendar.time.time', return_value=friday_afternoon):
+            self.assertEqual(self.store.sync_today(client), 2)
+        with patch('market_calendar.time.time', return_value=saturday_night):
+            self.assertEqual(self.store.sync_today(client), 0)
+        self.assertEqual(self.store.dates(), [date(2025, 10, 24)])
+
+    def test_empty_trade_book(self):
+        """Test that a missing or empty trade book stores nothing."""
+        client = Mock()
+        client.get_trade_book.return_value = None
+        self.assertEqual(self.store.sync_today(client), 0)
+        client.get_trade_book.return_value = {'status': True, 'data': None}
+        self.assertEqual(self.store.sync_today(client), 0)
+
+    def test_history_for_date(self):
+        """Test the order monitor's history view is served from the store."""
+        client = Mock()
+        self.store.record([trade('1')], '', datetime.now(IST).date() - timedelta(days=2))
+        with patch('order_monitor.display_trades') as display:
+            get_trading_history_for_date(client, days_ago=2, store=self.store)
+        client.get_trade_book.assert_not_called()
+        self.assertEqual([t['fillid'] for t in display.call_args[0][0]], ['1'])
+
+
+if __name__ == '__main__':
+    unittest.main()
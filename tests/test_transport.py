@@ -0,0 +1,119 @@
+"""
+Test the pooled keep-alive transport.
+Critical: Every request must still reach the API with the same headers and errors.
+"""
+
+import unittest
+import http.server
+import json
+import threading
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import SmartApi.smartExceptions as ex
+from transport import HttpTransport, PooledSmartConnect, TransportPool
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    """Answers like the order book endpoint, keeping connections alive."""
+
+    protocol_version = 'HTTP/1.1'
+    response = {'status': True, 'message': 'SUCCESS', 'data': []}
+    seen_auth = []
+
+    def _reply(self, body: bytes):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        _Handler.seen_auth.append(self.headers.get('Authorization'))
+        self._reply(json.dumps(_Handler.response).encode())
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class TestPooledTransport(unittest.TestCase):
+    """Test connection reuse and SmartConnect compatibility."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.root = f"http://127.0.0.1:{cls.server.server_port}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        _Handler.response = {'status': True, 'message': 'SUCCESS', 'data': []}
+        _Handler.seen_auth = []
+
+    def make_client(self, transport):
+        client = PooledSmartConnect(transport, api_key='key', root=self.root)
+        client.setAccessToken('jwt')
+        return client
+
+    def test_connection_reused_across_calls(self):
+        """Test that repeated calls share one keep-alive connection."""
+        transport = HttpTransport('A1')
+        client = self.make_client(transport)
+
+        for _ in range(5):
+            self.assertEqual(client.orderBook()['message'], 'SUCCESS')
+
+        stats = transport.stats.as_dict()
+        self.assertEqual(stats['requests'], 5)
+        self.assertEqual(stats['handshakes'], 1)
+        self.assertEqual(_Handler.seen_auth, ['Bearer jwt'] * 5)
+
+    def test_calls_counted_in_metrics(self):
+        """Test that each call is counted per route, account and outcome."""
+        from metrics import API_REQUESTS, API_LATENCY
+
+        client = self.make_client(HttpTransport('METRICS1'))
+        client.orderBook()
+        _Handler.response = {'error_type': 'TokenException', 'message': 'Invalid token'}
+        with self.assertRaises(ex.TokenException):
+            client.orderBook()
+
+        self.assertEqual(API_REQUESTS.labels('api.order.book', 'METRICS1', 'ok').value, 1)
+        self.assertEqual(API_REQUESTS.labels('api.order.book', 'METRICS1', 'error').value, 1)
+        self.assertEqual(API_LATENCY.labels('api.order.book', 'METRICS1').snapshot()[2], 2)
+
+    def test_api_errors_raised_as_before(self):
+        """Test that broker error payloads still raise SmartAPI exceptions."""
+        _Handler.response = {'error_type': 'TokenException', 'message': 'Invalid token'}
+        client = self.make_client(HttpTransport('A1'))
+
+        with self.assertRaises(ex.TokenException):
+            client.orderBook()
+
+    def test_warm_up_opens_connection_ahead_of_use(self):
+        """Test that a warmed transport serves the next call without a handshake."""
+        pool = TransportPool(root=self.root, keepalive_interval=0)
+        transport = pool.get('A1')
+        self.assertIs(pool.get('A1'), transport, "Accounts share one transport")
+
+        pool.warm_up()
+        self.make_client(transport).orderBook()
+
+        stats = pool.get_statistics()['A1']
+        self.assertEqual(stats['warm_ups'], 1)
+        self.assertEqual(stats['handshakes'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,230 @@
+"""
+Local multi-day trade history.
+The broker's trade book only holds the current day, so each sync folds
+today's fills into a SQLite store keyed by trade date (then account and
+fill), with indexes on symbol and account. Undated fills belong to the
+latest trading session, which the trade book holds until the broker
+clears it - not to the calendar day they were fetched on. Dates are
+worked out once when a fill is stored; date-range and symbol queries are index lookups that
+never re-parse a row, and past days never cost an API call.
+"""
+import json
+import sqlite3
+import threading
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional
+
+from config import Config
+from market_calendar import TradingCalendar, get_calendar
+from order_snapshot import to_float, to_int
+from structured_log import get_logger
+
+
+log = get_logger('trade_history')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS trades (
+    trade_date  TEXT NOT NULL,     -- YYYY-MM-DD (IST)
+    account     TEXT NOT NULL,
+    fill_id     TEXT NOT NULL,     -- fillid, or orderid:filltime without one
+    order_id    TEXT,
+    symbol      TEXT,
+    side        TEXT,
+    quantity    INTEGER,
+    price       REAL,
+    fill_time   TEXT,
+    raw         TEXT NOT NULL,     -- Trade book row as JSON
+    PRIMARY KEY (trade_date, account, fill_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS trades_by_symbol ON trades (symbol, trade_date);
+CREATE INDEX IF NOT EXISTS trades_by_account ON trades (account, trade_date);
+"""
+
+_DATE_FIELDS = ('tradeDate', 'date', 'time')
+
+
+def trade_date_of(trade: Dict, default: date) -> date:
+    """
+    Get the date of a trade book row.
+
+    Args:
+        trade: Trade dictionary
+        default: Date to use when the row carries none (SmartAPI rows only
+                 have a fill time - they are from the session the book holds)
+
+    Returns:
+        Trade date
+    """
+    for field in _DATE_FIELDS:
+        value = trade.get(field)
+        if value:
+            try:
+                return datetime.strptime(str(value).split(' ')[0], '%Y-%m-%d').date()
+            except ValueError:
+                continue
+    return default
+
+
+class TradeHistoryStore:
+    """SQLite store of trade book rows, partitioned by trade date."""
+
+    def __init__(self, path: str = None, calendar: TradingCalendar = None):
+        """
+        Initialize trade history store.
+
+        Args:
+            path: Database file (default: Config.TRADE_HISTORY_PATH, ':memory:' for tests)
+            calendar: Trading calendar dating undated fills (default: the process-wide one)
+        """
+        self.path = path or Config.TRADE_HISTORY_PATH
+        self.calendar = calendar or get_calendar()
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+
+    def close(self):
+        """Close the database."""
+        with self._lock:
+            self._db.close()
+
+    def session_date(self) -> date:
+        """
+        Get the day of the session whose fills the broker's trade book holds.
+
+        Returns:
+            Day of the session in progress, or else of the latest one (a sync
+            after midnight still stores the previous session's fills under
+            that session's date)
+        """
+        return self.calendar.last_session().day
+
+    def record(self, trades: Iterable[Dict], account: str = '', trade_date: date = None) -> int:
+        """
+        Store trade book rows, skipping fills already stored.
+
+        Args:
+            trades: Trade dictionaries from tradeBook API
+            account: Account the trades belong to
+            trade_date: Date of rows that carry none (default: session_date())
+
+        Returns:
+            Number of fills that were new
+        """
+        default_date = trade_date or self.session_date()
+        rows = []
+        for trade in trades or ():
+            order_id = trade.get('orderid') or ''
+            fill_id = trade.get('fillid') or f"{order_id}:{trade.get('filltime') or ''}"
+            rows.append((
+                trade_date_of(trade, default_date).isoformat(), account, str(fill_id), order_id,
+                trade.get('tradingsymbol'), trade.get('transactiontype'),
+                to_int(trade.get('fillsize') or trade.get('quantity')),
+                to_float(trade.get('fillprice') or trade.get('price')),
+                trade.get('filltime'), json.dumps(trade, separators=(',', ':')),
+            ))
+        if not rows:
+            return 0
+
+        with self._lock, self._db:
+            before = self._db.total_changes
+            self._db.executemany('INSERT OR IGNORE INTO trades VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+            return self._db.total_changes - before
+
+    def sync_today(self, client, account: str = '') -> int:
+        """
+        Fetch the trade book (the latest session's fills) and store the ones not seen yet.
+
+        Args:
+            client: SmartAPIClient / MultiAccountClient (get_trade_book())
+            account: Account the client trades for
+
+        Returns:
+            Number of new fills
+        """
+        response = client.get_trade_book()
+        if not response or not response.get('data'):
+            return 0
+        added = self.record(response['data'], account)
+        if added:
+            log.info('trade_history_sync', "💾 {added} new fill(s) stored for {account}",
+                     added=added, account=account or 'default account')
+        return added
+
+    def trades(self, start: date, end: date = None, symbol: str = None,
+               account: str = None) -> List[Dict]:
+        """
+        Get stored trades.
+
+        Args:
+            start: First trade date
+            end: Last trade date (default: start)
+            symbol: Only this trading symbol
+            account: Only this account
+
+        Returns:
+            Trade dictionaries as the broker returned them, by date and fill time
+        """
+        query = 'SELECT raw FROM trades WHERE trade_date BETWEEN ? AND ?'
+        params = [start.isoformat(), (end or start).isoformat()]
+        if symbol is not None:
+            query += ' AND symbol = ?'
+            params.append(symbol)
+        if account is not None:
+            query += ' AND account = ?'
+            params.append(account)
+        query += ' ORDER BY trade_date, fill_time, fill_id'
+
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+        return [json.loads(raw) for (raw,) in rows]
+
+    def dates(self, account: str = None) -> List[date]:
+        """
+        Get the trade dates held in the store.
+
+        Args:
+            account: Only dates with trades for this account
+
+        Returns:
+            Dates, oldest first
+        """
+        if account is None:
+            query, params = 'SELECT DISTINCT trade_date FROM trades ORDER BY trade_date', ()
+        else:
+            query = 'SELECT DISTINCT trade_date FROM trades WHERE account = ? ORDER BY trade_date'
+            params = (account,)
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+        return [date.fromisoformat(value) for (value,) in rows]
+
+    def history(self, client, start: date, end: date = None, symbol: str = None,
+                account: str = '') -> List[Dict]:
+        """
+        Get trades for a date range, fetching from the broker only if it includes
+        the latest session.
+
+        Args:
+            client: Client to sync today's trades with
+            start: First trade date
+            end: Last trade date (default: start)
+            symbol: Only this trading symbol
+            account: Account the client trades for
+
+        Returns:
+            Trade dictionaries, by date and fill time
+        """
+        session_day = self.session_date()
+        if start <= session_day <= (end or start):
+            self.sync_today(client, account)
+        return self.trades(start, end, symbol=symbol, account=account)
+
+
+_store: Optional[TradeHistoryStore] = None
+
+
+def get_trade_history() -> TradeHistoryStore:
+    """Get the process-wide trade history store (opened on first use)."""
+    global _store
+    if _store is None:
+        _store = TradeHistoryStore()
+    return _store
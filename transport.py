@@ -0,0 +1,293 @@
+"""
+Pooled keep-alive HTTP transport shared by all SmartConnect instances.
+Each account keeps warm TLS connections to the SmartAPI host, so a poll or
+the first placeOrder after an idle stretch doesn't pay for a new handshake.
+"""
+import json
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urljoin
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+import SmartApi.smartExceptions as ex
+from SmartApi.smartConnect import SmartConnect
+from config import Config
+from metrics import API_REQUESTS, API_LATENCY, RATE_LIMIT_HITS
+
+
+class TransportStats:
+    """Connection counters for one account's transport."""
+
+    def __init__(self):
+        """Initialize counters."""
+        self.requests = 0
+        self.handshakes = 0  # New TCP (+TLS) connections opened
+        self.connect_time = 0.0  # Seconds spent opening connections
+        self.warm_ups = 0
+        self._lock = threading.Lock()
+
+    def record_connect(self, seconds: float):
+        """Count a newly opened connection."""
+        with self._lock:
+            self.handshakes += 1
+            self.connect_time += seconds
+
+    def record_request(self):
+        """Count a request sent through the transport."""
+        with self._lock:
+            self.requests += 1
+
+    def as_dict(self) -> Dict:
+        """Get the counters as a dictionary."""
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'handshakes': self.handshakes,
+                'reused': max(0, self.requests - self.handshakes),
+                'connect_ms_total': self.connect_time * 1000,
+                'connect_ms_avg': self.connect_time / self.handshakes * 1000 if self.handshakes else 0.0,
+                'warm_ups': self.warm_ups,
+            }
+
+
+def _counting_pool_classes(stats: TransportStats) -> Dict:
+    """urllib3 pool classes whose connections report to stats when they connect."""
+
+    class CountingHTTPConnection(HTTPConnection):
+        def connect(self):
+            start = time.perf_counter()
+            super().connect()
+            stats.record_connect(time.perf_counter() - start)
+
+    class CountingHTTPSConnection(HTTPSConnection):
+        def connect(self):
+            start = time.perf_counter()
+            super().connect()
+            stats.record_connect(time.perf_counter() - start)
+
+    class CountingHTTPConnectionPool(HTTPConnectionPool):
+        ConnectionCls = CountingHTTPConnection
+
+    class CountingHTTPSConnectionPool(HTTPSConnectionPool):
+        ConnectionCls = CountingHTTPSConnection
+
+    return {'http': CountingHTTPConnectionPool, 'https': CountingHTTPSConnectionPool}
+
+
+class _CountingAdapter(HTTPAdapter):
+    """HTTPAdapter whose connection pools count handshakes."""
+
+    def __init__(self, stats: TransportStats, **kwargs):
+        self.stats = stats
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = _counting_pool_classes(self.stats)
+
+
+class HttpTransport:
+    """Keep-alive requests session for one account."""
+
+    def __init__(self, account: str, pool_maxsize: int = 2):
+        """
+        Initialize transport.
+
+        Args:
+            account: Account (client ID) this transport serves
+            pool_maxsize: Connections kept open to the API host (default: 2)
+        """
+        self.account = account
+        self.pool_maxsize = pool_maxsize
+        self.stats = TransportStats()
+        self.last_used = 0.0
+
+        self.session = requests.Session()
+        adapter = _CountingAdapter(self.stats, pool_connections=1, pool_maxsize=pool_maxsize)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a request over a pooled connection."""
+        self.stats.record_request()
+        self.last_used = time.time()
+        return self.session.request(method, url, **kwargs)
+
+    def warm_up(self, root: str, timeout: float = 5):
+        """
+        Open (or refresh) a pooled connection without calling any API.
+
+        Args:
+            root: API root URL
+            timeout: Seconds to wait for the host
+        """
+        try:
+            self.session.head(root, timeout=timeout, allow_redirects=False)
+            self.stats.warm_ups += 1
+            self.last_used = time.time()
+        except requests.RequestException:
+            pass  # The next real request will reconnect
+
+    def close(self):
+        """Close all pooled connections."""
+        self.session.close()
+
+
+class TransportPool:
+    """
+    Registry of per-account transports with a background warmer.
+
+    The warmer touches every transport that has been idle longer than
+    keepalive_interval, so connections survive quiet stretches between
+    master orders instead of being dropped by the server.
+    """
+
+    def __init__(self, root: str = SmartConnect._rootUrl, keepalive_interval: float = 45):
+        """
+        Initialize transport pool.
+
+        Args:
+            root: API root URL used for warm-up (default: SmartAPI root)
+            keepalive_interval: Idle seconds before a transport is warmed (default: 45)
+        """
+        self.root = root
+        self.keepalive_interval = keepalive_interval
+        self._transports: Dict[str, HttpTransport] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._warmer: Optional[threading.Thread] = None
+
+    def get(self, account: str, pool_maxsize: int = 2) -> HttpTransport:
+        """
+        Get (or create) the transport for an account.
+
+        Args:
+            account: Account (client ID)
+            pool_maxsize: Connections to keep for this account (used on first call)
+
+        Returns:
+            HttpTransport shared by every SmartConnect of this account
+        """
+        with self._lock:
+            transport = self._transports.get(account)
+            if transport is None:
+                transport = self._transports[account] = HttpTransport(account, pool_maxsize)
+            return transport
+
+    def warm_up(self, idle_only: bool = True):
+        """
+        Warm up connections for all accounts.
+
+        Args:
+            idle_only: Only touch transports idle longer than keepalive_interval
+        """
+        cutoff = time.time() - self.keepalive_interval
+        with self._lock:
+            transports = list(self._transports.values())
+        for transport in transports:
+            if not idle_only or transport.last_used < cutoff:
+                transport.warm_up(self.root)
+
+    def start_warmer(self):
+        """Start the background warm-up thread."""
+        if self._warmer and self._warmer.is_alive():
+            return
+        self._stop.clear()
+        self._warmer = threading.Thread(target=self._warm_loop, name="http-warmer", daemon=True)
+        self._warmer.start()
+
+    def stop_warmer(self):
+        """Stop the background warm-up thread."""
+        self._stop.set()
+        if self._warmer:
+            self._warmer.join(timeout=5)
+            self._warmer = None
+
+    def _warm_loop(self):
+        """Warm idle transports until stopped."""
+        while not self._stop.wait(self.keepalive_interval / 3):
+            self.warm_up(idle_only=True)
+
+    def get_statistics(self) -> Dict[str, Dict]:
+        """Get connection counters per account."""
+        with self._lock:
+            return {account: t.stats.as_dict() for account, t in self._transports.items()}
+
+
+class PooledSmartConnect(SmartConnect):
+    """SmartConnect that sends every request through a shared HttpTransport."""
+
+    def __init__(self, transport: HttpTransport, **kwargs):
+        """
+        Initialize pooled SmartConnect.
+
+        Args:
+            transport: HttpTransport of the account
+            **kwargs: Passed through to SmartConnect
+        """
+        super().__init__(**kwargs)
+        self.transport = transport
+
+    def _request(self, route, method, parameters=None):
+        """Make an HTTP request (same contract as SmartConnect._request), with metrics."""
+        account = self.transport.account
+        started = time.perf_counter()
+        try:
+            data = self._send(route, method, parameters)
+        except Exception as e:
+            API_LATENCY.labels(route, account).observe(time.perf_counter() - started)
+            throttled = 'access rate' in str(e).lower()
+            if throttled:
+                RATE_LIMIT_HITS.labels(route, account).inc()
+            API_REQUESTS.labels(route, account, 'throttled' if throttled else 'error').inc()
+            raise
+        API_LATENCY.labels(route, account).observe(time.perf_counter() - started)
+        API_REQUESTS.labels(route, account, 'ok').inc()
+        return data
+
+    def _send(self, route, method, parameters=None):
+        """Send the request and parse the response."""
+        params = parameters.copy() if parameters else {}
+        url = urljoin(self.root, self._routes[route].format(**params))
+
+        headers = self.requestHeaders()
+        if self.access_token:
+            headers["Authorization"] = "Bearer {}".format(self.access_token)
+
+        r = self.transport.request(method,
+                                   url,
+                                   data=json.dumps(params) if method in ["POST", "PUT"] else None,
+                                   params=json.dumps(params) if method in ["GET", "DELETE"] else None,
+                                   headers=headers,
+                                   verify=not self.disable_ssl,
+                                   allow_redirects=True,
+                                   timeout=self.timeout,
+                                   proxies=self.proxies)
+
+        if "json" in headers["Content-type"]:
+            try:
+                data = json.loads(r.content.decode("utf8"))
+            except ValueError:
+                raise ex.DataException("Couldn't parse the JSON response received from the server: {content}".format(
+                    content=r.content))
+
+            if data.get("error_type"):
+                if self.session_expiry_hook and r.status_code == 403 and data["error_type"] == "TokenException":
+                    self.session_expiry_hook()
+                exp = getattr(ex, data["error_type"], ex.GeneralException)
+                raise exp(data["message"], code=r.status_code)
+            return data
+        elif "csv" in headers["Content-type"]:
+            return r.content
+        else:
+            raise ex.DataException("Unknown Content-type ({content_type}) with response: ({content})".format(
+                content_type=headers["Content-type"],
+                content=r.content))
+
+
+# Process-wide transports shared by SmartAPIClient and every MultiAccountClient
+shared_transports = TransportPool(root=Config.SMARTAPI_ROOT_URL or SmartConnect._rootUrl)
@@ -2,13 +2,14 @@
 Web-based UI for monitoring orders in real-time.
 Simple Flask server with live updates.
 """
-from flask import Flask, render_template, jsonify
+from flask import Flask, Response, render_template, jsonify
 from flask_cors import CORS
 from datetime import datetime
 import threading
 import os
 from smartapi_client import SmartAPIClient
 from smart_polling import SmartPollingMonitor
+from metrics import registry
 
 app = Flask(__name__)
 CORS(app)
@@ -64,8 +65,8 @@ class UIOrderMonitor(SmartPollingMonitor):
         """Override to update monitoring status."""
         global monitoring_status
         monitoring_status['last_check'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        monitoring_status['polling_interval'] = f"{self.current_interval}s"
-        monitoring_status['api_calls'] = f"{self.api_calls_count}/{self.max_calls_per_minute}"
+        monitoring_status['polling_interval'] = self.scheduler.describe()
+        monitoring_status['api_calls'] = f"{self.calls_this_minute}/{self.max_calls_per_minute}"
         monitoring_status['market_hours'] = self._is_market_hours()
         return super().check_for_new_orders()
     
@@ -147,6 +148,12 @@ def get_all_orders():
     return jsonify(all_orders)
 
 
+@app.route('/metrics')
+def get_metrics():
+    """Prometheus metrics (API calls, rate limits, detection and copy latency, queues)."""
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
+
 @app.route('/api/start', methods=['POST'])
 def start_monitor():
     """Start monitoring."""
@@ -3,30 +3,43 @@ WebSocket-based real-time order monitoring for copy trading.
 Uses SmartAPI WebSocket to get instant notifications when orders are placed.
 """
 import json
+import threading
 from datetime import datetime
 from SmartApi import SmartWebSocketV2
 from smartapi_client import SmartAPIClient
-from display import display_option_order
+from display import display_new_order
+from order_state import OrderBookDiffer, OrderEvent
+from rate_governor import RateGovernor, shared_governor
 from config import Config
+from structured_log import get_logger
+
+
+log = get_logger('websocket')
 
 
 class OrderMonitor:
     """Real-time order monitor using WebSocket."""
     
-    def __init__(self, client: SmartAPIClient):
+    def __init__(self, client: SmartAPIClient, governor: RateGovernor = None):
         """
         Initialize order monitor.
         
         Args:
             client: SmartAPIClient instance
+            governor: RateGovernor to share (default: process-wide shared_governor)
         """
         self.client = client
         self.feed_token = client.feed_token
         self.api_key = Config.API_KEY
         self.client_code = Config.CLIENT_ID
         
-        # Store last known orders to detect new ones
-        self.known_order_ids = set()
+        # Order book calls are budgeted per account across all consumers
+        self.governor = governor or shared_governor
+        self._deferred_check = None  # Timer for a check postponed by the budget
+        self._check_lock = threading.Lock()  # Timer and socket threads both check
+        
+        # Track order state to detect new orders and changes
+        self.order_state = OrderBookDiffer()
         self._initialize_known_orders()
         
         # WebSocket connection
@@ -35,15 +48,19 @@ class OrderMonitor:
     def _initialize_known_orders(self):
         """Load existing orders to avoid treating them as new."""
         try:
+            self.governor.record(self.client_code, 'orderBook')
             order_book = self.client.get_order_book()
             if order_book and 'data' in order_book and order_book['data']:
-                self.known_order_ids = {
-                    order.get('orderid') for order in order_book['data']
-                }
-                print(f"Initialized with {len(self.known_order_ids)} existing orders")
+                self.order_state.prime(order_book['data'])
+                print(f"Initialized with {len(self.order_state)} existing orders")
         except Exception as e:
             print(f"Error initializing known orders: {e}")
     
+    @property
+    def known_order_ids(self):
+        """Order IDs seen so far."""
+        return self.order_state.known_ids()
+    
     def on_open(self, wsapp):
         """Callback when WebSocket connection opens."""
         print(f"[{datetime.now()}] WebSocket connection opened")
@@ -84,21 +101,42 @@ class OrderMonitor:
     
     def _check_for_new_orders(self):
         """Check order book for new orders and process them."""
-        try:
-            order_book = self.client.get_order_book()
-            if not order_book or 'data' not in order_book or not order_book['data']:
-                return
-            
-            # Find new orders
-            for order in order_book['data']:
-                order_id = order.get('orderid')
+        wait_time = self.governor.try_acquire(self.client_code, 'orderBook')
+        if wait_time > 0:
+            # A burst of messages shares one postponed check instead of blocking the socket
+            pending = self._deferred_check
+            if not (pending and pending.is_alive()) or pending is threading.current_thread():
+                self._deferred_check = threading.Timer(wait_time, self._check_for_new_orders)
+                self._deferred_check.daemon = True
+                self._deferred_check.start()
+            return
+        
+        with self._check_lock:
+            try:
+                order_book = self.client.get_order_book()
+                if not order_book or 'data' not in order_book or not order_book['data']:
+                    return
                 
-                if order_id and order_id not in self.known_order_ids:
-                    # NEW ORDER DETECTED!
-                    self.known_order_ids.add(order_id)
-                    self.on_new_order(order)
-        except Exception as e:
-            print(f"Error checking for new orders: {e}")
+                # Dispatch new orders and changes to known ones
+                for event in self.order_state.diff(order_book['data']):
+                    if event.kind == OrderEvent.NEW:
+                        # NEW ORDER DETECTED!
+                        self.on_new_order(event.order)
+                    else:
+                        self.on_order_update(event)
+            except Exception as e:
+                log.error('poll_failed', "Error checking for new orders: {error}", error=str(e))
+    
+    def on_order_update(self, event: OrderEvent):
+        """
+        Handler for changes to known orders (status, fill, modification).
+        
+        Args:
+            event: OrderEvent describing the change
+        """
+        log.info('order_update', "[{clock}] ORDER UPDATE [{kind}] {order_id} {symbol}: {previous} → {status}",
+                 kind=event.kind, order_id=event.order_id, symbol=event.order.get('tradingsymbol'),
+                 previous=event.previous_status, status=event.status)
     
     def on_new_order(self, order):
         """
@@ -108,12 +146,8 @@ class OrderMonitor:
         Args:
             order: Order dictionary from orderBook API
         """
-        print("\n" + "🔔 " * 30)
-        print(f"NEW ORDER DETECTED AT {datetime.now()}")
-        print("🔔 " * 30 + "\n")
-        
-        # Display order details
-        display_option_order(order)
+        # Announce with order details
+        display_new_order(order)
         
         # TODO: Implement copy trading logic here
         # self.place_mirror_order(order)